@@ -0,0 +1,89 @@
+"""Receivables aging materialized view
+
+Revision ID: 018_receivables_aging
+Revises: 017_audit_indexes
+Create Date: 2026-10-19
+
+Creates finance.receivables_aging, a materialized view with open invoice
+amounts bucketed by days overdue (current, 0-30, 31-60, 61-90, 90+) per
+student and term. Refreshed CONCURRENTLY by the API (periodic task and after
+bulk finance operations), so readers are never blocked.
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers
+revision: str = "018_receivables_aging"
+down_revision: str | None = "017_audit_indexes"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Create receivables aging materialized view."""
+
+    op.execute("""
+        CREATE MATERIALIZED VIEW finance.receivables_aging AS
+        WITH open_invoices AS (
+            SELECT i.student_id,
+                   s.course_id,
+                   i.term_id,
+                   i.amount,
+                   CURRENT_DATE - i.due_date AS days_overdue
+            FROM finance.invoices i
+            JOIN academics.students s ON s.user_id = i.student_id
+            WHERE i.status IN ('PENDING', 'OVERDUE')
+        )
+        SELECT student_id,
+               course_id,
+               term_id,
+               COUNT(*)::int AS open_count,
+               (COUNT(*) FILTER (WHERE days_overdue > 0))::int AS overdue_count,
+               COALESCE(SUM(amount), 0)::numeric(14,2) AS open_amount,
+               COALESCE(SUM(amount) FILTER (WHERE days_overdue <= 0), 0)::numeric(14,2)
+                   AS current_amount,
+               COALESCE(SUM(amount) FILTER (WHERE days_overdue BETWEEN 1 AND 30), 0)::numeric(14,2)
+                   AS days_0_30,
+               COALESCE(SUM(amount) FILTER (WHERE days_overdue BETWEEN 31 AND 60), 0)::numeric(14,2)
+                   AS days_31_60,
+               COALESCE(SUM(amount) FILTER (WHERE days_overdue BETWEEN 61 AND 90), 0)::numeric(14,2)
+                   AS days_61_90,
+               COALESCE(SUM(amount) FILTER (WHERE days_overdue > 90), 0)::numeric(14,2)
+                   AS days_over_90,
+               COALESCE(SUM(amount) FILTER (WHERE days_overdue > 0), 0)::numeric(14,2)
+                   AS overdue_amount,
+               GREATEST(MAX(days_overdue), 0)::int AS max_days_overdue,
+               CURRENT_DATE AS as_of,
+               now() AS refreshed_at
+        FROM open_invoices
+        GROUP BY student_id, course_id, term_id
+        WITH DATA
+    """)
+
+    # Required by REFRESH ... CONCURRENTLY (one row per student/term, NULL term included)
+    op.execute("""
+        CREATE UNIQUE INDEX uq_receivables_aging_student_term
+        ON finance.receivables_aging(student_id, term_id) NULLS NOT DISTINCT
+    """)
+    op.execute(
+        "CREATE INDEX idx_receivables_aging_course_term "
+        "ON finance.receivables_aging(course_id, term_id)"
+    )
+    op.execute(
+        "CREATE INDEX idx_receivables_aging_term ON finance.receivables_aging(term_id)"
+    )
+
+    # Supports the open-invoice scan behind each refresh
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS idx_invoices_open_student
+        ON finance.invoices(student_id, term_id)
+        WHERE status IN ('PENDING', 'OVERDUE')
+    """)
+
+
+def downgrade() -> None:
+    """Drop receivables aging materialized view."""
+    op.execute("DROP INDEX IF EXISTS finance.idx_invoices_open_student")
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS finance.receivables_aging")
@@ -0,0 +1,62 @@
+"""Negotiation plans
+
+Revision ID: 019_negotiation_plans
+Revises: 018_receivables_aging
+Create Date: 2026-10-19
+
+Persists executed negotiation plans (finance.negotiation_plans) and links the
+installment invoices they create through finance.invoices.negotiation_plan_id.
+The invoices a plan canceled are kept in canceled_invoice_ids.
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers
+revision: str = "019_negotiation_plans"
+down_revision: str | None = "018_receivables_aging"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Create negotiation plans table and link installments to it."""
+
+    op.execute("""
+        CREATE TABLE finance.negotiation_plans (
+          id                   uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+          student_id           uuid NOT NULL REFERENCES academics.students(user_id) ON DELETE CASCADE,
+          term_id              uuid REFERENCES academics.terms(id) ON DELETE SET NULL,
+          created_by           uuid REFERENCES auth.users(id) ON DELETE SET NULL,
+          total_amount         numeric(12,2) NOT NULL CHECK (total_amount >= 0),
+          canceled_amount      numeric(12,2) NOT NULL DEFAULT 0,
+          num_installments     integer NOT NULL CHECK (num_installments >= 1),
+          fine_rate            numeric(5,2) NOT NULL,
+          interest_rate        numeric(5,2) NOT NULL,
+          canceled_invoice_ids uuid[] NOT NULL DEFAULT '{}',
+          created_at           timestamptz NOT NULL DEFAULT now()
+        )
+    """)
+    op.execute(
+        "CREATE INDEX idx_negotiation_plans_student "
+        "ON finance.negotiation_plans(student_id, created_at DESC)"
+    )
+
+    op.execute("""
+        ALTER TABLE finance.invoices
+        ADD COLUMN IF NOT EXISTS negotiation_plan_id uuid
+            REFERENCES finance.negotiation_plans(id) ON DELETE SET NULL
+    """)
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS idx_invoices_negotiation_plan
+        ON finance.invoices(negotiation_plan_id)
+        WHERE negotiation_plan_id IS NOT NULL
+    """)
+
+
+def downgrade() -> None:
+    """Drop negotiation plans."""
+    op.execute("DROP INDEX IF EXISTS finance.idx_invoices_negotiation_plan")
+    op.execute("ALTER TABLE finance.invoices DROP COLUMN IF EXISTS negotiation_plan_id")
+    op.execute("DROP TABLE IF EXISTS finance.negotiation_plans")
@@ -0,0 +1,37 @@
+"""Notification audience indexes
+
+Revision ID: 020_audience_indexes
+Revises: 019_negotiation_plans
+Create Date: 2026-10-19
+
+Supports compiled notification audiences: students filtered by course and
+status, and the per-student absence lookup on final grades.
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers
+revision: str = "020_audience_indexes"
+down_revision: str | None = "019_negotiation_plans"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Create audience targeting indexes."""
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_students_course_status "
+        "ON academics.students(course_id, status)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_final_grades_student_absences "
+        "ON academics.final_grades(student_id, absences_pct)"
+    )
+
+
+def downgrade() -> None:
+    """Drop audience targeting indexes."""
+    op.execute("DROP INDEX IF EXISTS academics.idx_final_grades_student_absences")
+    op.execute("DROP INDEX IF EXISTS academics.idx_students_course_status")
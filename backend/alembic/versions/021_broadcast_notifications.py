@@ -0,0 +1,41 @@
+"""Broadcast notifications
+
+Revision ID: 021_broadcast_notifications
+Revises: 020_audience_indexes
+Create Date: 2026-10-19
+
+Adds fan-out-on-read broadcasts: comm.notifications stores the audience spec
+(JSONB) and publication time, and student inboxes evaluate it on read.
+comm.user_notifications rows for a broadcast are only created when a student
+reads, unreads or archives it.
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers
+revision: str = "021_broadcast_notifications"
+down_revision: str | None = "020_audience_indexes"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Add broadcast columns to comm.notifications."""
+    op.execute("ALTER TABLE comm.notifications ADD COLUMN audience JSONB")
+    op.execute("ALTER TABLE comm.notifications ADD COLUMN published_at TIMESTAMPTZ")
+
+    # Live broadcasts are looked up on every inbox read
+    op.execute("""
+        CREATE INDEX idx_notifications_live_broadcasts
+        ON comm.notifications(published_at DESC)
+        WHERE audience IS NOT NULL AND is_archived = false
+    """)
+
+
+def downgrade() -> None:
+    """Remove broadcast columns."""
+    op.execute("DROP INDEX IF EXISTS comm.idx_notifications_live_broadcasts")
+    op.execute("ALTER TABLE comm.notifications DROP COLUMN IF EXISTS published_at")
+    op.execute("ALTER TABLE comm.notifications DROP COLUMN IF EXISTS audience")
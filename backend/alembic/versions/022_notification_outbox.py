@@ -0,0 +1,72 @@
+"""Notification outbox (EMAIL/SMS)
+
+Revision ID: 022_notification_outbox
+Revises: 021_broadcast_notifications
+Create Date: 2026-10-19
+
+Creates comm.outbox_messages, filled when EMAIL/SMS notifications are
+delivered and drained by the outbox worker (python -m app.workers.outbox).
+Rows move PENDING -> SENDING -> SENT, back to PENDING with a backoff delay on
+failure, or to DEAD once attempts run out. Also adds the SMS phone number to
+comm.notification_preferences.
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers
+revision: str = "022_notification_outbox"
+down_revision: str | None = "021_broadcast_notifications"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Create outbox table."""
+
+    op.execute("""
+        DO $$ BEGIN
+          CREATE TYPE comm.outbox_status AS ENUM ('PENDING', 'SENDING', 'SENT', 'DEAD');
+        EXCEPTION WHEN duplicate_object THEN NULL; END $$
+    """)
+
+    op.execute("""
+        CREATE TABLE comm.outbox_messages (
+          id              uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+          notification_id uuid NOT NULL REFERENCES comm.notifications(id) ON DELETE CASCADE,
+          user_id         uuid NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+          channel         comm.notification_channel NOT NULL,
+          recipient       text NOT NULL,
+          status          comm.outbox_status NOT NULL DEFAULT 'PENDING',
+          attempts        int NOT NULL DEFAULT 0,
+          next_attempt_at timestamptz NOT NULL DEFAULT now(),
+          locked_until    timestamptz,
+          last_error      text,
+          created_at      timestamptz NOT NULL DEFAULT now(),
+          sent_at         timestamptz,
+          CONSTRAINT uq_outbox_messages_notification_user UNIQUE (notification_id, user_id),
+          CONSTRAINT ck_outbox_messages_channel CHECK (channel IN ('EMAIL', 'SMS'))
+        )
+    """)
+
+    # Worker claim scan: due rows per channel
+    op.execute("""
+        CREATE INDEX idx_outbox_messages_due
+        ON comm.outbox_messages(channel, next_attempt_at)
+        WHERE status IN ('PENDING', 'SENDING')
+    """)
+    op.execute("""
+        CREATE INDEX idx_outbox_messages_dead
+        ON comm.outbox_messages(channel, created_at)
+        WHERE status = 'DEAD'
+    """)
+
+    op.execute("ALTER TABLE comm.notification_preferences ADD COLUMN phone varchar(20)")
+
+
+def downgrade() -> None:
+    """Drop outbox table."""
+    op.execute("ALTER TABLE comm.notification_preferences DROP COLUMN IF EXISTS phone")
+    op.execute("DROP TABLE IF EXISTS comm.outbox_messages CASCADE")
+    op.execute("DROP TYPE IF EXISTS comm.outbox_status")
@@ -0,0 +1,108 @@
+"""Scheduled notifications (durable timer queue)
+
+Revision ID: 023_scheduled_notifications
+Revises: 022_notification_outbox
+Create Date: 2026-10-19
+
+Adds send_at/recurrence to comm.notifications and comm.scheduled_jobs, the
+timer queue run by the API's scheduler loop: each due job is locked with
+FOR UPDATE SKIP LOCKED and executed in the same transaction that advances
+it, so several instances can poll the queue concurrently.
+comm.invoice_reminders records which invoices already got a due reminder
+for a given lead time, so reminder runs are idempotent.
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers
+revision: str = "023_scheduled_notifications"
+down_revision: str | None = "022_notification_outbox"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Create timer queue tables."""
+
+    op.execute("""
+        ALTER TABLE comm.notifications
+          ADD COLUMN send_at     timestamptz,
+          ADD COLUMN recurrence  varchar(100),
+          ADD COLUMN template_id uuid REFERENCES comm.notifications(id) ON DELETE SET NULL
+    """)
+
+    op.execute("""
+        DO $$ BEGIN
+          CREATE TYPE comm.scheduled_job_kind AS ENUM ('NOTIFICATION', 'INVOICE_DUE_REMINDER');
+        EXCEPTION WHEN duplicate_object THEN NULL; END $$
+    """)
+    op.execute("""
+        DO $$ BEGIN
+          CREATE TYPE comm.scheduled_job_status AS ENUM
+            ('SCHEDULED', 'DONE', 'FAILED', 'CANCELED');
+        EXCEPTION WHEN duplicate_object THEN NULL; END $$
+    """)
+
+    op.execute("""
+        CREATE TABLE comm.scheduled_jobs (
+          id              uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+          kind            comm.scheduled_job_kind NOT NULL,
+          notification_id uuid REFERENCES comm.notifications(id) ON DELETE CASCADE,
+          payload         jsonb NOT NULL DEFAULT '{}'::jsonb,
+          starts_at       timestamptz NOT NULL,
+          run_at          timestamptz NOT NULL,
+          recurrence      varchar(100),
+          status          comm.scheduled_job_status NOT NULL DEFAULT 'SCHEDULED',
+          attempts        int NOT NULL DEFAULT 0,
+          runs_count      int NOT NULL DEFAULT 0,
+          last_run_at     timestamptz,
+          last_error      text,
+          created_at      timestamptz NOT NULL DEFAULT now(),
+          CONSTRAINT ck_scheduled_jobs_notification CHECK (
+            (kind = 'NOTIFICATION') = (notification_id IS NOT NULL)
+          )
+        )
+    """)
+
+    # Scheduler claim scan
+    op.execute("""
+        CREATE INDEX idx_scheduled_jobs_due
+        ON comm.scheduled_jobs(run_at)
+        WHERE status = 'SCHEDULED'
+    """)
+    # At most one live schedule per notification
+    op.execute("""
+        CREATE UNIQUE INDEX uq_scheduled_jobs_live_notification
+        ON comm.scheduled_jobs(notification_id)
+        WHERE status = 'SCHEDULED'
+    """)
+
+    op.execute("""
+        CREATE TABLE comm.invoice_reminders (
+          invoice_id      uuid NOT NULL REFERENCES finance.invoices(id) ON DELETE CASCADE,
+          days_before     int NOT NULL,
+          notification_id uuid NOT NULL REFERENCES comm.notifications(id) ON DELETE CASCADE,
+          sent_at         timestamptz NOT NULL DEFAULT now(),
+          PRIMARY KEY (invoice_id, days_before)
+        )
+    """)
+    op.execute(
+        "CREATE INDEX idx_invoice_reminders_notification "
+        "ON comm.invoice_reminders(notification_id)"
+    )
+
+
+def downgrade() -> None:
+    """Drop timer queue tables."""
+    op.execute("DROP TABLE IF EXISTS comm.invoice_reminders CASCADE")
+    op.execute("DROP TABLE IF EXISTS comm.scheduled_jobs CASCADE")
+    op.execute("DROP TYPE IF EXISTS comm.scheduled_job_status")
+    op.execute("DROP TYPE IF EXISTS comm.scheduled_job_kind")
+    op.execute("""
+        ALTER TABLE comm.notifications
+          DROP COLUMN IF EXISTS template_id,
+          DROP COLUMN IF EXISTS recurrence,
+          DROP COLUMN IF EXISTS send_at
+    """)
@@ -0,0 +1,161 @@
+"""Notification counters
+
+Revision ID: 024_notification_counters
+Revises: 023_scheduled_notifications
+Create Date: 2026-10-19
+
+Counter caches for comm.user_notifications:
+- comm.user_notification_counters.unread_count: per-user unread, non-archived rows;
+- comm.notifications.read_count: per-notification rows with read_at set.
+
+Both are maintained by statement-level triggers with transition tables, so
+every write path (fan-out, mark read/unread, archive, bulk updates, cascaded
+deletes) adjusts them in the same transaction with one grouped UPDATE per
+statement. services.notifications.reconcile_notification_counters repairs
+drift periodically.
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers
+revision: str = "024_notification_counters"
+down_revision: str | None = "023_scheduled_notifications"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Create counter table, triggers and backfill."""
+
+    op.execute("""
+        CREATE TABLE comm.user_notification_counters (
+          user_id      uuid PRIMARY KEY REFERENCES auth.users(id) ON DELETE CASCADE,
+          unread_count int NOT NULL DEFAULT 0,
+          updated_at   timestamptz NOT NULL DEFAULT now()
+        )
+    """)
+
+    # Applies signed deltas; rows are touched in user_id order to avoid deadlocks
+    # between concurrent fan-outs sharing users.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION comm.apply_notification_counter_deltas(
+          user_deltas jsonb, read_deltas jsonb
+        ) RETURNS void
+        LANGUAGE sql AS $$
+          INSERT INTO comm.user_notification_counters AS c (user_id, unread_count)
+          SELECT key::uuid, value::int
+          FROM jsonb_each_text(user_deltas)
+          ORDER BY key::uuid
+          ON CONFLICT (user_id) DO UPDATE
+            SET unread_count = c.unread_count + EXCLUDED.unread_count,
+                updated_at = now();
+
+          UPDATE comm.notifications n
+          SET read_count = n.read_count + d.value::int
+          FROM jsonb_each_text(read_deltas) d
+          WHERE n.id = d.key::uuid;
+        $$
+    """)
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION comm.user_notifications_counters_ins() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+          PERFORM comm.apply_notification_counter_deltas(
+            (SELECT COALESCE(jsonb_object_agg(user_id, n), '{}') FROM (
+               SELECT user_id, count(*) AS n FROM new_rows
+               WHERE read_at IS NULL AND archived_at IS NULL GROUP BY user_id) u),
+            (SELECT COALESCE(jsonb_object_agg(notification_id, n), '{}') FROM (
+               SELECT notification_id, count(*) AS n FROM new_rows
+               WHERE read_at IS NOT NULL GROUP BY notification_id) r)
+          );
+          RETURN NULL;
+        END $$
+    """)
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION comm.user_notifications_counters_upd() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+          PERFORM comm.apply_notification_counter_deltas(
+            (SELECT COALESCE(jsonb_object_agg(user_id, n), '{}') FROM (
+               SELECT user_id, sum(d) AS n FROM (
+                 SELECT user_id, 1 AS d FROM new_rows
+                 WHERE read_at IS NULL AND archived_at IS NULL
+                 UNION ALL
+                 SELECT user_id, -1 FROM old_rows
+                 WHERE read_at IS NULL AND archived_at IS NULL
+               ) x GROUP BY user_id HAVING sum(d) <> 0) u),
+            (SELECT COALESCE(jsonb_object_agg(notification_id, n), '{}') FROM (
+               SELECT notification_id, sum(d) AS n FROM (
+                 SELECT notification_id, 1 AS d FROM new_rows WHERE read_at IS NOT NULL
+                 UNION ALL
+                 SELECT notification_id, -1 FROM old_rows WHERE read_at IS NOT NULL
+               ) x GROUP BY notification_id HAVING sum(d) <> 0) r)
+          );
+          RETURN NULL;
+        END $$
+    """)
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION comm.user_notifications_counters_del() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+          PERFORM comm.apply_notification_counter_deltas(
+            (SELECT COALESCE(jsonb_object_agg(user_id, -n), '{}') FROM (
+               SELECT user_id, count(*) AS n FROM old_rows
+               WHERE read_at IS NULL AND archived_at IS NULL GROUP BY user_id) u),
+            (SELECT COALESCE(jsonb_object_agg(notification_id, -n), '{}') FROM (
+               SELECT notification_id, count(*) AS n FROM old_rows
+               WHERE read_at IS NOT NULL GROUP BY notification_id) r)
+          );
+          RETURN NULL;
+        END $$
+    """)
+
+    op.execute("""
+        CREATE TRIGGER trg_user_notifications_counters_ins
+        AFTER INSERT ON comm.user_notifications
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION comm.user_notifications_counters_ins()
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_user_notifications_counters_upd
+        AFTER UPDATE ON comm.user_notifications
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION comm.user_notifications_counters_upd()
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_user_notifications_counters_del
+        AFTER DELETE ON comm.user_notifications
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION comm.user_notifications_counters_del()
+    """)
+
+    # Backfill from current data
+    op.execute("""
+        INSERT INTO comm.user_notification_counters (user_id, unread_count)
+        SELECT user_id, count(*) FILTER (WHERE read_at IS NULL AND archived_at IS NULL)
+        FROM comm.user_notifications
+        GROUP BY user_id
+    """)
+    op.execute("""
+        UPDATE comm.notifications n
+        SET read_count = COALESCE(
+          (SELECT count(*) FROM comm.user_notifications un
+           WHERE un.notification_id = n.id AND un.read_at IS NOT NULL), 0)
+    """)
+
+
+def downgrade() -> None:
+    """Drop counter triggers and table."""
+    for op_name in ("ins", "upd", "del"):
+        op.execute(
+            f"DROP TRIGGER IF EXISTS trg_user_notifications_counters_{op_name} "
+            "ON comm.user_notifications"
+        )
+        op.execute(f"DROP FUNCTION IF EXISTS comm.user_notifications_counters_{op_name}()")
+    op.execute("DROP FUNCTION IF EXISTS comm.apply_notification_counter_deltas(jsonb, jsonb)")
+    op.execute("DROP TABLE IF EXISTS comm.user_notification_counters")
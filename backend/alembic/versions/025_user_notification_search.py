@@ -0,0 +1,51 @@
+"""User notification listing indexes
+
+Revision ID: 025_user_notification_search
+Revises: 024_notification_counters
+Create Date: 2026-10-19
+
+Supports the admin delivery listing as one joined query:
+- trigram GIN indexes for substring search on student names and user emails;
+- newest-first ordering for the unfiltered and per-notification listings
+  (the latter also speeds up ON DELETE CASCADE from comm.notifications).
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers
+revision: str = "025_user_notification_search"
+down_revision: str | None = "024_notification_counters"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Create pg_trgm and listing indexes."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_students_full_name_trgm "
+        "ON academics.students USING gin (full_name gin_trgm_ops)"
+    )
+    # citext has no trigram opclass: index (and search) the text cast
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_users_email_trgm "
+        "ON auth.users USING gin ((email::text) gin_trgm_ops)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_user_notifications_delivered "
+        "ON comm.user_notifications(delivered_at DESC, id)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_user_notifications_notification "
+        "ON comm.user_notifications(notification_id, delivered_at DESC)"
+    )
+
+
+def downgrade() -> None:
+    """Drop listing indexes (pg_trgm is left installed)."""
+    op.execute("DROP INDEX IF EXISTS comm.idx_user_notifications_notification")
+    op.execute("DROP INDEX IF EXISTS comm.idx_user_notifications_delivered")
+    op.execute("DROP INDEX IF EXISTS auth.idx_users_email_trgm")
+    op.execute("DROP INDEX IF EXISTS academics.idx_students_full_name_trgm")
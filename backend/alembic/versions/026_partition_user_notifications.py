@@ -0,0 +1,215 @@
+"""Partition comm.user_notifications by month
+
+Revision ID: 026_partition_user_notifications
+Revises: 025_user_notification_search
+Create Date: 2026-10-19
+
+comm.user_notifications becomes RANGE-partitioned on delivered_at, one
+partition per month (user_notifications_pYYYYMM). Existing data is not
+copied: the current table is attached as the partition for everything
+before next month (user_notifications_legacy), so the switch only holds an
+exclusive lock for a few catalog updates:
+
+1. outside the migration transaction, build the index the parent needs
+   CONCURRENTLY and prove the partition bound with a CHECK constraint
+   validated under SHARE UPDATE EXCLUSIVE (writes keep flowing);
+2. in one short transaction, rename the table, create the partitioned
+   parent with the same columns and indexes (existing ones are adopted on
+   ATTACH, no rebuild, no scan), attach it and create the monthly
+   partitions ahead.
+
+common.ensure_monthly_partitions creates future partitions (called by the
+maintenance job, see services.notification_retention). The retention job
+archives partitions past the retention window to compressed NDJSON and
+drops them; the legacy partition ages out the same way.
+
+A partitioned table cannot enforce UNIQUE (user_id, notification_id)
+without the partition key, so deliveries are deduplicated by the writers
+(advisory lock + anti-join). There is no table-wide primary key either:
+ids are random UUIDs, looked up through the per-partition (id) index.
+"""
+
+from collections.abc import Sequence
+from datetime import UTC, datetime
+
+from alembic import op
+
+# revision identifiers
+revision: str = "026_partition_user_notifications"
+down_revision: str | None = "025_user_notification_search"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+COUNTER_TRIGGERS = {
+    "ins": "AFTER INSERT ON {table} REFERENCING NEW TABLE AS new_rows",
+    "upd": "AFTER UPDATE ON {table} REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows",
+    "del": "AFTER DELETE ON {table} REFERENCING OLD TABLE AS old_rows",
+}
+
+# name suffix -> definition, shared by the parent and the adopted legacy table
+INDEXES = {
+    "id": "(id)",
+    "user": "(user_id, delivered_at DESC)",
+    "unread": "(user_id) WHERE read_at IS NULL",
+    "read": "(read_at)",
+    "archived": "(archived_at)",
+    "delivered": "(delivered_at DESC, id)",
+    "notification": "(notification_id, delivered_at DESC)",
+}
+
+
+def _next_month_start() -> str:
+    now = datetime.now(UTC)
+    year, month = (now.year + 1, 1) if now.month == 12 else (now.year, now.month + 1)
+    return datetime(year, month, 1, tzinfo=UTC).isoformat()
+
+
+def _create_counter_triggers(table: str) -> None:
+    for name, timing in COUNTER_TRIGGERS.items():
+        op.execute(
+            f"CREATE TRIGGER trg_user_notifications_counters_{name} "
+            f"{timing.format(table=table)} "
+            f"FOR EACH STATEMENT EXECUTE FUNCTION comm.user_notifications_counters_{name}()"
+        )
+
+
+def _drop_counter_triggers(table: str) -> None:
+    for name in COUNTER_TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS trg_user_notifications_counters_{name} ON {table}")
+
+
+def upgrade() -> None:
+    """Switch comm.user_notifications to monthly range partitions."""
+    boundary = _next_month_start()
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION common.ensure_monthly_partitions(
+          parent regclass, months_ahead int
+        ) RETURNS int
+        LANGUAGE plpgsql AS $$
+        DECLARE
+          parent_schema text;
+          parent_name   text;
+          month_start   timestamptz;
+          partition     text;
+          created       int := 0;
+        BEGIN
+          SELECT n.nspname, c.relname INTO parent_schema, parent_name
+          FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+          WHERE c.oid = parent;
+
+          FOR i IN 0..months_ahead LOOP
+            month_start := date_trunc('month', now() AT TIME ZONE 'UTC')
+                           AT TIME ZONE 'UTC' + make_interval(months => i);
+            partition := format('%s_p%s', parent_name,
+                                to_char(month_start AT TIME ZONE 'UTC', 'YYYYMM'));
+            CONTINUE WHEN to_regclass(format('%I.%I', parent_schema, partition)) IS NOT NULL;
+            BEGIN
+              EXECUTE format(
+                'CREATE TABLE %I.%I PARTITION OF %s FOR VALUES FROM (%L) TO (%L)',
+                parent_schema, partition, parent,
+                month_start, month_start + interval '1 month'
+              );
+              created := created + 1;
+            EXCEPTION WHEN invalid_object_definition THEN
+              NULL;  -- Range already covered (e.g. by an attached legacy table)
+            END;
+          END LOOP;
+          RETURN created;
+        END $$
+    """)
+
+    # 1. Online preparation (no long exclusive locks)
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_user_notifications_id "
+            "ON comm.user_notifications(id)"
+        )
+        op.execute(
+            "ALTER TABLE comm.user_notifications "
+            "ADD CONSTRAINT user_notifications_legacy_range "
+            f"CHECK (delivered_at < '{boundary}') NOT VALID"
+        )
+        op.execute(
+            "ALTER TABLE comm.user_notifications VALIDATE CONSTRAINT user_notifications_legacy_range"
+        )
+
+    # 2. Catalog-only switch
+    op.execute("SET LOCAL lock_timeout = '10s'")
+    op.execute("LOCK TABLE comm.user_notifications IN ACCESS EXCLUSIVE MODE")
+    _drop_counter_triggers("comm.user_notifications")
+    op.execute("ALTER TABLE comm.user_notifications RENAME TO user_notifications_legacy")
+    for suffix in INDEXES:
+        op.execute(
+            f"ALTER INDEX comm.idx_user_notifications_{suffix} "
+            f"RENAME TO idx_user_notifications_legacy_{suffix}"
+        )
+
+    op.execute("""
+        CREATE TABLE comm.user_notifications (
+          id              uuid NOT NULL DEFAULT gen_random_uuid(),
+          user_id         uuid NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+          notification_id uuid NOT NULL REFERENCES comm.notifications(id) ON DELETE CASCADE,
+          delivered_at    timestamptz NOT NULL DEFAULT now(),
+          read_at         timestamptz,
+          archived_at     timestamptz,
+          extra_data      jsonb NOT NULL DEFAULT '{}'::jsonb,
+          action_url      varchar,
+          action_label    varchar(100)
+        ) PARTITION BY RANGE (delivered_at)
+    """)
+    for suffix, definition in INDEXES.items():
+        op.execute(
+            f"CREATE INDEX idx_user_notifications_{suffix} ON comm.user_notifications {definition}"
+        )
+
+    op.execute(
+        "ALTER TABLE comm.user_notifications ATTACH PARTITION comm.user_notifications_legacy "
+        f"FOR VALUES FROM (MINVALUE) TO ('{boundary}')"
+    )
+    op.execute("SELECT common.ensure_monthly_partitions('comm.user_notifications', 3)")
+    _create_counter_triggers("comm.user_notifications")
+
+
+def downgrade() -> None:
+    """Copy rows back into a plain table (offline: blocks writes while copying)."""
+    op.execute("LOCK TABLE comm.user_notifications IN ACCESS EXCLUSIVE MODE")
+    _drop_counter_triggers("comm.user_notifications")
+    op.execute("ALTER TABLE comm.user_notifications RENAME TO user_notifications_partitioned")
+    for suffix in INDEXES:
+        op.execute(
+            f"ALTER INDEX comm.idx_user_notifications_{suffix} "
+            f"RENAME TO idx_user_notifications_partitioned_{suffix}"
+        )
+
+    op.execute("""
+        CREATE TABLE comm.user_notifications (
+          id              uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+          user_id         uuid NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+          notification_id uuid NOT NULL REFERENCES comm.notifications(id) ON DELETE CASCADE,
+          delivered_at    timestamptz NOT NULL DEFAULT now(),
+          read_at         timestamptz,
+          archived_at     timestamptz,
+          extra_data      jsonb NOT NULL DEFAULT '{}'::jsonb,
+          action_url      varchar,
+          action_label    varchar(100),
+          UNIQUE (user_id, notification_id)
+        )
+    """)
+    op.execute("""
+        INSERT INTO comm.user_notifications
+        SELECT DISTINCT ON (user_id, notification_id)
+               id, user_id, notification_id, delivered_at, read_at, archived_at,
+               extra_data, action_url, action_label
+        FROM comm.user_notifications_partitioned
+        ORDER BY user_id, notification_id, delivered_at
+    """)
+    op.execute("DROP TABLE comm.user_notifications_partitioned")  # Drops its partitions
+    for suffix, definition in INDEXES.items():
+        if suffix != "id":
+            op.execute(
+                f"CREATE INDEX idx_user_notifications_{suffix} "
+                f"ON comm.user_notifications {definition}"
+            )
+    _create_counter_triggers("comm.user_notifications")
+    op.execute("DROP FUNCTION IF EXISTS common.ensure_monthly_partitions(regclass, int)")
@@ -0,0 +1,66 @@
+"""Document generation job queue
+
+Revision ID: 027_document_jobs
+Revises: 026_partition_user_notifications
+Create Date: 2026-10-19
+
+Creates documents.document_jobs, filled when a student or an admin requests
+a document and drained by the document worker pool
+(python -m app.workers.documents). Jobs move PENDING -> RUNNING -> DONE,
+back to PENDING with a backoff delay on failure, or to FAILED once attempts
+run out (the document then shows status ERROR). At most one PENDING/RUNNING
+job exists per document.
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers
+revision: str = "027_document_jobs"
+down_revision: str | None = "026_partition_user_notifications"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Create document job queue."""
+
+    op.execute("""
+        DO $$ BEGIN
+          CREATE TYPE documents.document_job_status AS ENUM ('PENDING', 'RUNNING', 'DONE', 'FAILED');
+        EXCEPTION WHEN duplicate_object THEN NULL; END $$
+    """)
+
+    op.execute("""
+        CREATE TABLE documents.document_jobs (
+          id              uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+          document_id     uuid NOT NULL REFERENCES documents.student_documents(id) ON DELETE CASCADE,
+          status          documents.document_job_status NOT NULL DEFAULT 'PENDING',
+          attempts        int NOT NULL DEFAULT 0,
+          next_attempt_at timestamptz NOT NULL DEFAULT now(),
+          locked_until    timestamptz,
+          last_error      text,
+          created_at      timestamptz NOT NULL DEFAULT now(),
+          finished_at     timestamptz
+        )
+    """)
+
+    # One active job per document: repeated requests collapse into it
+    op.execute("""
+        CREATE UNIQUE INDEX uq_document_jobs_active
+        ON documents.document_jobs(document_id)
+        WHERE status IN ('PENDING', 'RUNNING')
+    """)
+    # Worker claim scan: due rows
+    op.execute("""
+        CREATE INDEX idx_document_jobs_due
+        ON documents.document_jobs(next_attempt_at)
+        WHERE status IN ('PENDING', 'RUNNING')
+    """)
+
+
+def downgrade() -> None:
+    """Drop document job queue."""
+    op.execute("DROP TABLE IF EXISTS documents.document_jobs CASCADE")
+    op.execute("DROP TYPE IF EXISTS documents.document_job_status")
@@ -0,0 +1,51 @@
+"""Content-addressed document files
+
+Revision ID: 028_document_content_hash
+Revises: 027_document_jobs
+Create Date: 2026-10-19
+
+Adds documents.student_documents.content_hash, the SHA-256 of the generated
+file. It is the file's key in the content-addressed document storage
+(identical renders share one file) and the ETag of downloads.
+
+Documents marked AVAILABLE before this revision have no stored file, so they
+are handled like a new request (services.documents.enqueue_generation): back
+to GENERATING without file columns, with a document job queued for the
+document workers to render them.
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers
+revision: str = "028_document_content_hash"
+down_revision: str | None = "027_document_jobs"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Add content hash to student documents and queue the ones without a file."""
+    op.execute("ALTER TABLE documents.student_documents ADD COLUMN content_hash varchar(64)")
+    op.execute("""
+        ALTER TABLE documents.student_documents
+        ADD CONSTRAINT ck_student_documents_content_hash
+        CHECK (content_hash ~ '^[0-9a-f]{64}$')
+    """)
+    op.execute("""
+        WITH unstored AS (
+          UPDATE documents.student_documents
+          SET status = 'GENERATING', file_url = NULL, file_size = NULL, file_type = NULL
+          WHERE status = 'AVAILABLE' AND content_hash IS NULL
+          RETURNING id
+        )
+        INSERT INTO documents.document_jobs (document_id)
+        SELECT id FROM unstored
+        ON CONFLICT (document_id) WHERE status IN ('PENDING', 'RUNNING') DO NOTHING
+    """)
+
+
+def downgrade() -> None:
+    """Drop content hash from student documents."""
+    op.execute("ALTER TABLE documents.student_documents DROP COLUMN IF EXISTS content_hash")
@@ -0,0 +1,76 @@
+"""Bulk document generation batches
+
+Revision ID: 029_document_batches
+Revises: 028_document_content_hash
+Create Date: 2026-10-19
+
+Creates documents.document_batches (one bulk generation request: a document
+type for every active student of a course and/or term) and
+documents.document_batch_chunks, the batch split into ranges of student ids.
+Chunks are claimed by the document worker pool like document jobs (lease,
+backoff, PENDING -> RUNNING -> DONE/FAILED), so a batch progresses in
+parallel, survives worker restarts and can be resumed after failures.
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers
+revision: str = "029_document_batches"
+down_revision: str | None = "028_document_content_hash"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Create document batches and their chunks."""
+
+    op.execute("""
+        CREATE TABLE documents.document_batches (
+          id             uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+          doc_type       documents.document_type NOT NULL,
+          course_id      uuid REFERENCES academics.courses(id) ON DELETE SET NULL,
+          term_id        uuid REFERENCES academics.terms(id) ON DELETE SET NULL,
+          status         documents.document_job_status NOT NULL DEFAULT 'PENDING',
+          total_students int NOT NULL DEFAULT 0,
+          total_chunks   int NOT NULL DEFAULT 0,
+          done_chunks    int NOT NULL DEFAULT 0,
+          generated      int NOT NULL DEFAULT 0,
+          failed         int NOT NULL DEFAULT 0,
+          requested_by   uuid REFERENCES auth.users(id) ON DELETE SET NULL,
+          created_at     timestamptz NOT NULL DEFAULT now(),
+          finished_at    timestamptz
+        )
+    """)
+
+    op.execute("""
+        CREATE TABLE documents.document_batch_chunks (
+          batch_id         uuid NOT NULL REFERENCES documents.document_batches(id) ON DELETE CASCADE,
+          seq              int NOT NULL,
+          first_student_id uuid NOT NULL,
+          last_student_id  uuid NOT NULL,
+          size             int NOT NULL,
+          status           documents.document_job_status NOT NULL DEFAULT 'PENDING',
+          attempts         int NOT NULL DEFAULT 0,
+          next_attempt_at  timestamptz NOT NULL DEFAULT now(),
+          locked_until     timestamptz,
+          last_error       text,
+          generated        int NOT NULL DEFAULT 0,
+          failed           int NOT NULL DEFAULT 0,
+          finished_at      timestamptz,
+          PRIMARY KEY (batch_id, seq)
+        )
+    """)
+    # Worker claim scan: due rows
+    op.execute("""
+        CREATE INDEX idx_document_batch_chunks_due
+        ON documents.document_batch_chunks(next_attempt_at)
+        WHERE status IN ('PENDING', 'RUNNING')
+    """)
+
+
+def downgrade() -> None:
+    """Drop document batches."""
+    op.execute("DROP TABLE IF EXISTS documents.document_batch_chunks")
+    op.execute("DROP TABLE IF EXISTS documents.document_batches")
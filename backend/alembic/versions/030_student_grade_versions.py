@@ -0,0 +1,117 @@
+"""Student grade versions
+
+Revision ID: 030_student_grade_versions
+Revises: 029_document_batches
+Create Date: 2026-10-19
+
+academics.student_grade_versions.version is a per-student stamp bumped by
+statement-level triggers whenever the student's academics.final_grades rows
+are inserted, deleted, or updated in a way the transcript shows (score,
+status, section). Transcript artifacts (the /me/transcript JSON and the
+TRANSCRIPT PDF, see documents.student_documents.grade_version) are cached
+under it. A student without a row is at version 0.
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers
+revision: str = "030_student_grade_versions"
+down_revision: str | None = "029_document_batches"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Create grade versions, their triggers and the document column."""
+
+    op.execute("""
+        CREATE TABLE academics.student_grade_versions (
+          student_id uuid PRIMARY KEY REFERENCES academics.students(user_id) ON DELETE CASCADE,
+          version    bigint NOT NULL DEFAULT 1,
+          updated_at timestamptz NOT NULL DEFAULT now()
+        )
+    """)
+
+    # Rows touched in student_id order to avoid deadlocks between concurrent
+    # grade imports. Students deleted in the same statement (cascades) are skipped.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION academics.bump_grade_versions(student_ids uuid[])
+        RETURNS void
+        LANGUAGE sql AS $$
+          INSERT INTO academics.student_grade_versions AS v (student_id)
+          SELECT DISTINCT s.user_id
+          FROM unnest(student_ids) AS ids(id)
+          JOIN academics.students s ON s.user_id = ids.id
+          ORDER BY s.user_id
+          ON CONFLICT (student_id) DO UPDATE
+            SET version = v.version + 1,
+                updated_at = now();
+        $$
+    """)
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION academics.final_grades_version_ins() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+          PERFORM academics.bump_grade_versions(ARRAY(SELECT student_id FROM new_rows));
+          RETURN NULL;
+        END $$
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION academics.final_grades_version_upd() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+          PERFORM academics.bump_grade_versions(ARRAY(
+            SELECT unnest(ARRAY[o.student_id, n.student_id])
+            FROM old_rows o JOIN new_rows n ON n.id = o.id
+            WHERE (o.student_id, o.section_id, o.final_score, o.status)
+                  IS DISTINCT FROM (n.student_id, n.section_id, n.final_score, n.status)
+          ));
+          RETURN NULL;
+        END $$
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION academics.final_grades_version_del() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+          PERFORM academics.bump_grade_versions(ARRAY(SELECT student_id FROM old_rows));
+          RETURN NULL;
+        END $$
+    """)
+
+    op.execute("""
+        CREATE TRIGGER trg_final_grades_version_ins
+        AFTER INSERT ON academics.final_grades
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION academics.final_grades_version_ins()
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_final_grades_version_upd
+        AFTER UPDATE ON academics.final_grades
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION academics.final_grades_version_upd()
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_final_grades_version_del
+        AFTER DELETE ON academics.final_grades
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION academics.final_grades_version_del()
+    """)
+
+    # Grade version a generated file was rendered from (TRANSCRIPT)
+    op.execute("ALTER TABLE documents.student_documents ADD COLUMN grade_version bigint")
+
+
+def downgrade() -> None:
+    """Drop grade versions."""
+    op.execute("ALTER TABLE documents.student_documents DROP COLUMN IF EXISTS grade_version")
+    op.execute("DROP TRIGGER IF EXISTS trg_final_grades_version_del ON academics.final_grades")
+    op.execute("DROP TRIGGER IF EXISTS trg_final_grades_version_upd ON academics.final_grades")
+    op.execute("DROP TRIGGER IF EXISTS trg_final_grades_version_ins ON academics.final_grades")
+    op.execute("DROP FUNCTION IF EXISTS academics.final_grades_version_del()")
+    op.execute("DROP FUNCTION IF EXISTS academics.final_grades_version_upd()")
+    op.execute("DROP FUNCTION IF EXISTS academics.final_grades_version_ins()")
+    op.execute("DROP FUNCTION IF EXISTS academics.bump_grade_versions(uuid[])")
+    op.execute("DROP TABLE IF EXISTS academics.student_grade_versions")
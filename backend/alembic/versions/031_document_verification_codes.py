@@ -0,0 +1,63 @@
+"""Document verification codes
+
+Revision ID: 031_document_verification_codes
+Revises: 030_student_grade_versions
+Create Date: 2026-10-19
+
+Gives every student document a short verification code, printed on the
+generated PDF and looked up by the public verification endpoint
+(GET /api/v1/public/documents/verify/{code}).
+
+Codes are 12 Crockford base32 characters (60 bits) from
+documents.new_verification_code(), drawn from gen_random_uuid() so they are
+not guessable; existing rows get one when the column is added. A code stays
+with its document across regenerations. The unique index is the lookup path.
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers
+revision: str = "031_document_verification_codes"
+down_revision: str | None = "030_student_grade_versions"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Add verification codes to student documents."""
+    # md5 spreads the uuid's fixed version/variant bits; 256 % 32 == 0 keeps it uniform
+    op.execute("""
+        CREATE OR REPLACE FUNCTION documents.new_verification_code() RETURNS text
+        LANGUAGE sql VOLATILE AS $$
+            SELECT string_agg(
+                substr('0123456789ABCDEFGHJKMNPQRSTVWXYZ', get_byte(b, i) % 32 + 1, 1),
+                '' ORDER BY i
+            )
+            FROM (SELECT decode(md5(gen_random_uuid()::text), 'hex') AS b) s,
+                 generate_series(0, 11) AS i
+        $$
+    """)
+    # Volatile default: evaluated per existing row
+    op.execute("""
+        ALTER TABLE documents.student_documents
+        ADD COLUMN verification_code varchar(12) NOT NULL
+            DEFAULT documents.new_verification_code()
+    """)
+    op.execute("""
+        ALTER TABLE documents.student_documents
+        ADD CONSTRAINT ck_student_documents_verification_code
+        CHECK (verification_code ~ '^[0-9A-HJKMNP-TV-Z]{12}$')
+    """)
+    op.execute("""
+        CREATE UNIQUE INDEX uq_student_documents_verification_code
+        ON documents.student_documents (verification_code)
+    """)
+
+
+def downgrade() -> None:
+    """Drop verification codes from student documents."""
+    op.execute("DROP INDEX IF EXISTS documents.uq_student_documents_verification_code")
+    op.execute("ALTER TABLE documents.student_documents DROP COLUMN IF EXISTS verification_code")
+    op.execute("DROP FUNCTION IF EXISTS documents.new_verification_code()")
@@ -0,0 +1,129 @@
+"""Partition audit.audit_log by month
+
+Revision ID: 032_partition_audit_log
+Revises: 031_document_verification_codes
+Create Date: 2026-10-19
+
+audit.audit_log becomes RANGE-partitioned on created_at, one partition per
+month (audit_log_pYYYYMM), the same way as comm.user_notifications
+(migration 026): the current table is attached as the partition for
+everything before next month (audit_log_legacy) after an online CHECK
+validation, so no rows are copied under lock. Its indexes are renamed with
+a _legacy suffix and adopted by the parent's on ATTACH.
+
+Future partitions come from common.ensure_monthly_partitions (maintenance
+job, services.audit_retention), which also archives partitions past the
+retention window to compressed NDJSON and drops them.
+
+A partitioned table cannot have a primary key on id alone. Ids still come
+from audit.audit_log_id_seq, now owned by the parent so that dropping the
+legacy partition keeps it, and are looked up through the per-partition (id)
+index.
+"""
+
+from collections.abc import Sequence
+from datetime import UTC, datetime
+
+from alembic import op
+
+# revision identifiers
+revision: str = "032_partition_audit_log"
+down_revision: str | None = "031_document_verification_codes"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# name -> definition, shared by the parent and the adopted legacy table
+INDEXES = {
+    "idx_audit_log_id": "(id)",
+    "idx_audit_actor_time": "(actor_user_id, created_at DESC)",
+    "idx_audit_log_actor": "(actor_user_id)",
+    "idx_audit_log_action": "(action)",
+    "idx_audit_log_entity": "(entity_type, entity_id)",
+    "idx_audit_log_created_desc": "(created_at DESC)",
+    "idx_audit_log_ip": "(ip)",
+}
+
+
+def _next_month_start() -> str:
+    now = datetime.now(UTC)
+    year, month = (now.year + 1, 1) if now.month == 12 else (now.year, now.month + 1)
+    return datetime(year, month, 1, tzinfo=UTC).isoformat()
+
+
+def upgrade() -> None:
+    """Switch audit.audit_log to monthly range partitions."""
+    boundary = _next_month_start()
+
+    # 1. Online preparation (no long exclusive locks)
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_audit_log_id ON audit.audit_log(id)"
+        )
+        op.execute(
+            "ALTER TABLE audit.audit_log "
+            "ADD CONSTRAINT audit_log_legacy_range "
+            f"CHECK (created_at < '{boundary}') NOT VALID"
+        )
+        op.execute("ALTER TABLE audit.audit_log VALIDATE CONSTRAINT audit_log_legacy_range")
+
+    # 2. Catalog-only switch
+    op.execute("SET LOCAL lock_timeout = '10s'")
+    op.execute("LOCK TABLE audit.audit_log IN ACCESS EXCLUSIVE MODE")
+    op.execute("ALTER TABLE audit.audit_log RENAME TO audit_log_legacy")
+    op.execute(
+        "ALTER TABLE audit.audit_log_legacy RENAME CONSTRAINT audit_log_pkey TO audit_log_legacy_pkey"
+    )
+    for name in INDEXES:
+        op.execute(f"ALTER INDEX audit.{name} RENAME TO {name}_legacy")
+
+    op.execute("""
+        CREATE TABLE audit.audit_log (
+          id            bigint NOT NULL DEFAULT nextval('audit.audit_log_id_seq'),
+          actor_user_id uuid REFERENCES auth.users(id) ON DELETE SET NULL,
+          action        text NOT NULL,
+          entity_type   text,
+          entity_id     uuid,
+          ip            inet,
+          user_agent    text,
+          data          jsonb NOT NULL DEFAULT '{}'::jsonb,
+          created_at    timestamptz NOT NULL DEFAULT now()
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute("ALTER SEQUENCE audit.audit_log_id_seq OWNED BY audit.audit_log.id")
+    op.execute("ALTER TABLE audit.audit_log_legacy ALTER COLUMN id DROP DEFAULT")
+    for name, definition in INDEXES.items():
+        op.execute(f"CREATE INDEX {name} ON audit.audit_log {definition}")
+
+    op.execute(
+        "ALTER TABLE audit.audit_log ATTACH PARTITION audit.audit_log_legacy "
+        f"FOR VALUES FROM (MINVALUE) TO ('{boundary}')"
+    )
+    op.execute("SELECT common.ensure_monthly_partitions('audit.audit_log', 3)")
+
+
+def downgrade() -> None:
+    """Copy rows back into a plain table (offline: blocks writes while copying)."""
+    op.execute("LOCK TABLE audit.audit_log IN ACCESS EXCLUSIVE MODE")
+    op.execute("ALTER TABLE audit.audit_log RENAME TO audit_log_partitioned")
+    for name in INDEXES:
+        op.execute(f"ALTER INDEX audit.{name} RENAME TO {name}_partitioned")
+
+    op.execute("""
+        CREATE TABLE audit.audit_log (
+          id            bigint PRIMARY KEY DEFAULT nextval('audit.audit_log_id_seq'),
+          actor_user_id uuid REFERENCES auth.users(id) ON DELETE SET NULL,
+          action        text NOT NULL,
+          entity_type   text,
+          entity_id     uuid,
+          ip            inet,
+          user_agent    text,
+          data          jsonb NOT NULL DEFAULT '{}'::jsonb,
+          created_at    timestamptz NOT NULL DEFAULT now()
+        )
+    """)
+    op.execute("INSERT INTO audit.audit_log SELECT * FROM audit.audit_log_partitioned")
+    op.execute("ALTER SEQUENCE audit.audit_log_id_seq OWNED BY audit.audit_log.id")
+    op.execute("DROP TABLE audit.audit_log_partitioned")  # Drops its partitions
+    for name, definition in INDEXES.items():
+        if name != "idx_audit_log_id":
+            op.execute(f"CREATE INDEX {name} ON audit.audit_log {definition}")
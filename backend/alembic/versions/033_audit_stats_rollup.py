@@ -0,0 +1,73 @@
+"""Audit stats rollup
+
+Revision ID: 033_audit_stats_rollup
+Revises: 032_partition_audit_log
+Create Date: 2026-10-19
+
+Pre-aggregated audit.audit_log counts for the admin audit summary:
+- audit.audit_stats_hourly: events per UTC hour, action and entity_type;
+- audit.audit_stats_daily_actors: events per UTC day and actor, i.e. the
+  exact set of distinct actors of each day;
+- audit.audit_stats_rollup_state.rolled_up_to: everything before this hour
+  boundary is folded into the two tables above.
+
+services.audit_stats folds closed hours in periodically and the summary
+reads the rollup plus the raw rows from rolled_up_to on. The rollup starts
+90 days back (the longest period the summary serves); older rows are not
+aggregated.
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers
+revision: str = "033_audit_stats_rollup"
+down_revision: str | None = "032_partition_audit_log"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Create rollup tables; the first job run backfills them."""
+    op.execute("""
+        CREATE TABLE audit.audit_stats_hourly (
+          hour        timestamptz NOT NULL,
+          action      text NOT NULL,
+          entity_type text,
+          events      bigint NOT NULL,
+          CONSTRAINT uq_audit_stats_hourly UNIQUE NULLS NOT DISTINCT (hour, action, entity_type)
+        )
+    """)
+
+    # No FK: counts stay with the actor id after the user is deleted
+    op.execute("""
+        CREATE TABLE audit.audit_stats_daily_actors (
+          day           date NOT NULL,
+          actor_user_id uuid NOT NULL,
+          events        bigint NOT NULL,
+          PRIMARY KEY (day, actor_user_id)
+        )
+    """)
+
+    op.execute("""
+        CREATE TABLE audit.audit_stats_rollup_state (
+          singleton    boolean PRIMARY KEY DEFAULT true CHECK (singleton),
+          rolled_up_to timestamptz NOT NULL
+        )
+    """)
+    op.execute("""
+        INSERT INTO audit.audit_stats_rollup_state (rolled_up_to)
+        SELECT GREATEST(
+          date_trunc('day', now() - interval '90 days', 'UTC'),
+          date_trunc('hour', COALESCE(min(created_at), now()), 'UTC')
+        )
+        FROM audit.audit_log
+    """)
+
+
+def downgrade() -> None:
+    """Drop rollup tables."""
+    op.execute("DROP TABLE IF EXISTS audit.audit_stats_rollup_state")
+    op.execute("DROP TABLE IF EXISTS audit.audit_stats_daily_actors")
+    op.execute("DROP TABLE IF EXISTS audit.audit_stats_hourly")
@@ -0,0 +1,75 @@
+"""Audit log data search indexes
+
+Revision ID: 034_audit_log_search
+Revises: 033_audit_stats_rollup
+Create Date: 2026-10-19
+
+GIN indexes on audit.audit_log.data for the admin audit listing:
+- idx_audit_log_data_path (jsonb_path_ops): containment (data @> '{...}'),
+  used by the structured key=value filters;
+- idx_audit_log_data_tsv: full-text search over the string values of data,
+  on the expression jsonb_to_tsvector('simple', data, '["string"]').
+
+The tsvector is an expression index rather than a stored generated column:
+adding a stored column rewrites every partition under an exclusive lock,
+while the index is built online and keeps rows narrow. Queries must use the
+same expression (app.routers.v1.admin_audit).
+
+Indexes on a partitioned table cannot be built CONCURRENTLY, so each is
+created ON ONLY the parent (invalid until complete), built CONCURRENTLY on
+every partition and attached; partitions created later get it from the
+parent.
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers
+revision: str = "034_audit_log_search"
+down_revision: str | None = "033_audit_stats_rollup"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# suffix -> definition
+INDEXES = {
+    "data_path": "USING gin (data jsonb_path_ops)",
+    "data_tsv": "USING gin (jsonb_to_tsvector('simple'::regconfig, data, '[\"string\"]'::jsonb))",
+}
+
+PARTITIONS_SQL = sa.text("""
+    SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = 'audit.audit_log'::regclass
+    ORDER BY c.relname
+""")
+
+
+def upgrade() -> None:
+    """Create the search indexes partition by partition, without blocking writers."""
+    partitions = op.get_bind().execute(PARTITIONS_SQL).scalars().all()
+    for suffix, definition in INDEXES.items():
+        op.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_audit_log_{suffix} ON ONLY audit.audit_log {definition}"
+        )
+
+    with op.get_context().autocommit_block():
+        for partition in partitions:
+            for suffix, definition in INDEXES.items():
+                op.execute(
+                    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {partition}_{suffix} "
+                    f"ON audit.{partition} {definition}"
+                )
+
+    for partition in partitions:
+        for suffix in INDEXES:
+            op.execute(
+                f"ALTER INDEX audit.idx_audit_log_{suffix} ATTACH PARTITION audit.{partition}_{suffix}"
+            )
+
+
+def downgrade() -> None:
+    """Drop the search indexes (with their partition indexes)."""
+    for suffix in INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS audit.idx_audit_log_{suffix}")
@@ -31,6 +31,77 @@ class Settings(BaseSettings):
     # CORS
     cors_origins: str = "http://localhost:3000"
 
+    # Background jobs (seconds; 0 disables the in-process loop)
+    receivables_aging_refresh_seconds: int = 900
+    scheduler_poll_seconds: int = 30  # Timer queue (scheduled notifications/reminders)
+    notification_counters_reconcile_seconds: int = 86400  # Blocks inbox writes while it runs
+    notification_partition_maintenance_seconds: int = 86400  # Runs once at startup too
+
+    # Notification inbox retention (comm.user_notifications monthly partitions)
+    notification_retention_months: int = 12  # Inbox window; older partitions archived (0 = keep)
+    notification_partitions_ahead: int = 3
+    notification_archive_dir: str = "var/archive/notifications"
+
+    # Real-time notification stream (SSE, one LISTEN connection per worker)
+    notification_stream_enabled: bool = True
+    notification_stream_heartbeat_seconds: float = 25.0
+    notification_stream_max_pending: int = 16  # Per connection; oldest events dropped
+
+    # Outbound EMAIL/SMS (python -m app.workers.outbox)
+    smtp_host: str = "localhost"
+    smtp_port: int = 25
+    smtp_username: str | None = None
+    smtp_password: str | None = None
+    smtp_starttls: bool = False
+    email_sender: str = "UniFECAF <no-reply@unifecaf.edu.br>"
+    sms_gateway_url: str | None = None  # SMS worker disabled when unset
+    sms_gateway_token: str | None = None
+    outbox_batch_size: int = 100
+    outbox_email_rate_per_second: float = 10.0
+    outbox_sms_rate_per_second: float = 2.0
+    outbox_max_attempts: int = 6
+    outbox_backoff_base_seconds: float = 30.0
+    outbox_backoff_max_seconds: float = 3600.0
+    outbox_poll_seconds: float = 5.0
+
+    # Audit log writer (per API process; services.audit)
+    audit_buffer_enabled: bool = True  # False: rows written in the request transaction
+    audit_buffer_max_events: int = 10000
+    audit_batch_size: int = 500
+    audit_flush_seconds: float = 1.0
+    audit_enqueue_timeout_seconds: float = 2.0  # Backpressure; then written by the request
+
+    # Audit log retention (audit.audit_log monthly partitions)
+    audit_partition_maintenance_seconds: int = 86400  # Runs once at startup too
+    audit_retention_months: int = 24  # Older partitions archived and dropped (0 = keep)
+    audit_partitions_ahead: int = 3
+    audit_archive_dir: str = "var/archive/audit"
+
+    # Audit summary rollup (services.audit_stats)
+    audit_stats_rollup_seconds: int = 300  # Runs once at startup too (0 = disabled)
+    audit_stats_rollup_lag_seconds: float = 300.0  # Hours are folded this long after they end
+
+    # /me/transcript cache (per API process; entries keyed by grade version)
+    transcript_cache_entries: int = 2048
+
+    # Public document verification (per API process)
+    document_verification_rate_per_minute: float = 30.0  # Per client IP (0 = unlimited)
+    document_verification_burst: int = 10
+    document_verification_cache_entries: int = 10000
+    document_verification_cache_seconds: float = 300.0
+    document_verification_negative_cache_seconds: float = 60.0  # Unknown codes
+
+    # Document generation (python -m app.workers.documents)
+    documents_storage_backend: str = "local"  # services.storage.STORAGE_BACKENDS
+    documents_storage_dir: str = "var/documents"
+    document_workers: int = 2  # Processes; rendering is CPU-bound
+    document_batch_size: int = 4
+    document_max_attempts: int = 3
+    document_backoff_base_seconds: float = 10.0
+    document_backoff_max_seconds: float = 600.0
+    document_poll_seconds: float = 1.0
+    document_bulk_chunk_size: int = 500  # Students per bulk generation chunk
+
     # App
     app_name: str = "UniFECAF Portal do Aluno"
     debug: bool = False
@@ -1,5 +1,5 @@
 """
-UniFECAF Portal do Aluno - FastAPI dependencies (auth, RBAC, pagination).
+UniFECAF Portal do Aluno - FastAPI dependencies (auth, RBAC, pagination, storage).
 """
 
 from __future__ import annotations
@@ -18,6 +18,7 @@ from app.core.errors import raise_api_error
 from app.core.security import TokenPayload, verify_access_token
 from app.models.auth import JwtSession
 from app.models.user import User, UserRole, UserStatus
+from app.services.storage import DocumentStorage, build_document_storage
 
 settings = get_settings()
 
@@ -113,3 +114,12 @@ def pagination_params(
     offset: Annotated[int, Query(ge=0, description="Offset para paginação.")] = 0,
 ) -> dict[str, int]:
     return {"limit": limit, "offset": offset}
+
+
+def get_document_storage() -> DocumentStorage:
+    return build_document_storage(
+        settings.documents_storage_backend, settings.documents_storage_dir
+    )
+
+
+DocumentStore = Annotated[DocumentStorage, Depends(get_document_storage)]
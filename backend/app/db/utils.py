@@ -4,6 +4,8 @@ UniFECAF Portal do Aluno - DB helpers (pagination, common CRUD patterns).
 
 from __future__ import annotations
 
+import base64
+from collections.abc import Sequence
 from typing import Any, TypeVar
 
 from sqlalchemy import func, select
@@ -22,8 +24,9 @@ def get_or_404(
     *,
     code: str = "NOT_FOUND",
     message: str = "Recurso não encontrado.",
+    options: Sequence[Any] | None = None,
 ) -> TModel:
-    obj = db.get(model, entity_id)
+    obj = db.get(model, entity_id, options=options)
     if obj is None:
         raise_api_error(status_code=status.HTTP_404_NOT_FOUND, code=code, message=message)
     return obj
@@ -37,7 +40,40 @@ def apply_update(obj: Any, data: dict[str, Any]) -> Any:
     return obj
 
 
+def _count_stmt(db: Session, stmt) -> int:
+    return int(db.execute(select(func.count()).select_from(stmt.order_by(None).subquery())).scalar_one())
+
+
 def paginate_stmt(db: Session, stmt, *, limit: int, offset: int) -> tuple[list[Any], int]:
-    total = db.execute(select(func.count()).select_from(stmt.subquery())).scalar_one()
+    total = _count_stmt(db, stmt)
     items = db.execute(stmt.limit(limit).offset(offset)).scalars().all()
-    return items, int(total)
+    return items, total
+
+
+def paginate_rows(db: Session, stmt, *, limit: int, offset: int) -> tuple[list[Any], int]:
+    """Like `paginate_stmt`, for column projections: returns rows instead of scalars."""
+    total = _count_stmt(db, stmt)
+    items = db.execute(stmt.limit(limit).offset(offset)).all()
+    return list(items), total
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode keyset pagination values into an opaque URL-safe cursor."""
+    raw = "|".join("" if v is None else str(v) for v in values)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list[str]:
+    """Decode a cursor produced by `encode_cursor` into its raw string parts."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        parts = base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+    except (ValueError, UnicodeDecodeError):
+        parts = []
+    if len(parts) != size:
+        raise_api_error(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            code="INVALID_CURSOR",
+            message="Cursor de paginação inválido.",
+        )
+    return parts
@@ -2,8 +2,10 @@
 UniFECAF Portal do Aluno - FastAPI Application
 """
 
+import asyncio
 import logging
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
+from pathlib import Path
 
 from fastapi import FastAPI
 from fastapi.exceptions import RequestValidationError
@@ -28,10 +30,19 @@ from app.routers.v1 import (
     admin_finance_router,
     admin_users_router,
     me_router,
+    public_router,
 )
 from app.routers.v1 import (
     auth_router as v1_auth_router,
 )
+from app.services.audit import audit_sink
+from app.services.audit_retention import run_periodic_audit_partition_maintenance
+from app.services.audit_stats import run_periodic_audit_stats_rollup
+from app.services.notification_counters import run_periodic_counter_reconciliation
+from app.services.notification_retention import run_periodic_partition_maintenance
+from app.services.notification_stream import NotificationHub
+from app.services.receivables_aging import run_periodic_aging_refresh
+from app.services.scheduler import run_scheduler_loop
 
 # Configure logging
 logging.basicConfig(
@@ -48,8 +59,92 @@ async def lifespan(app: FastAPI):
     """Application lifespan manager."""
     logger.info("Starting UniFECAF Portal do Aluno API...")
     logger.info(f"CORS origins: {settings.cors_origins_list}")
+
+    background_tasks: list[asyncio.Task] = []
+    if settings.receivables_aging_refresh_seconds > 0:
+        background_tasks.append(
+            asyncio.create_task(
+                run_periodic_aging_refresh(settings.receivables_aging_refresh_seconds)
+            )
+        )
+
+    if settings.scheduler_poll_seconds > 0:
+        background_tasks.append(
+            asyncio.create_task(run_scheduler_loop(settings.scheduler_poll_seconds))
+        )
+
+    if settings.notification_counters_reconcile_seconds > 0:
+        background_tasks.append(
+            asyncio.create_task(
+                run_periodic_counter_reconciliation(
+                    settings.notification_counters_reconcile_seconds,
+                    retention_months=settings.notification_retention_months,
+                )
+            )
+        )
+
+    if settings.notification_partition_maintenance_seconds > 0:
+        background_tasks.append(
+            asyncio.create_task(
+                run_periodic_partition_maintenance(
+                    settings.notification_partition_maintenance_seconds,
+                    months_ahead=settings.notification_partitions_ahead,
+                    retention_months=settings.notification_retention_months,
+                    archive_dir=Path(settings.notification_archive_dir),
+                )
+            )
+        )
+
+    if settings.audit_partition_maintenance_seconds > 0:
+        background_tasks.append(
+            asyncio.create_task(
+                run_periodic_audit_partition_maintenance(
+                    settings.audit_partition_maintenance_seconds,
+                    months_ahead=settings.audit_partitions_ahead,
+                    retention_months=settings.audit_retention_months,
+                    archive_dir=Path(settings.audit_archive_dir),
+                )
+            )
+        )
+
+    if settings.audit_stats_rollup_seconds > 0:
+        background_tasks.append(
+            asyncio.create_task(
+                run_periodic_audit_stats_rollup(
+                    settings.audit_stats_rollup_seconds,
+                    lag_seconds=settings.audit_stats_rollup_lag_seconds,
+                )
+            )
+        )
+
+    if settings.audit_buffer_enabled:
+        audit_sink.start(
+            max_pending=settings.audit_buffer_max_events,
+            batch_size=settings.audit_batch_size,
+            flush_interval_seconds=settings.audit_flush_seconds,
+            enqueue_timeout_seconds=settings.audit_enqueue_timeout_seconds,
+        )
+
+    app.state.notification_hub = None
+    if settings.notification_stream_enabled:
+        app.state.notification_hub = NotificationHub(
+            max_pending=settings.notification_stream_max_pending,
+            retention_months=settings.notification_retention_months,
+        )
+        await app.state.notification_hub.start()
+
     yield
+
     logger.info("Shutting down UniFECAF Portal do Aluno API...")
+    if app.state.notification_hub is not None:
+        await app.state.notification_hub.stop()
+    for task in background_tasks:
+        task.cancel()
+    for task in background_tasks:
+        with suppress(asyncio.CancelledError):
+            await task
+    # After the background tasks, which may still audit
+    await asyncio.to_thread(audit_sink.stop)
 
 
 # Create FastAPI application
@@ -80,6 +175,7 @@ app = FastAPI(
         {"name": "Admin - Comm", "description": "Notificações e preferências."},
         {"name": "Admin - Documents", "description": "Documentos de alunos."},
         {"name": "Admin - Audit", "description": "Logs de auditoria do sistema."},
+        {"name": "Public", "description": "Verificação pública de documentos (sem login)."},
     ],
 )
 
@@ -109,6 +205,7 @@ app.include_router(admin_comm_router)
 app.include_router(admin_documents_router)
 app.include_router(admin_audit_router)
 app.include_router(admin_dashboard_router)
+app.include_router(public_router)
 
 
 @app.get("/")
@@ -14,17 +14,22 @@ from app.models.academics import (
     SectionEnrollment,
     SectionMeeting,
     Student,
+    StudentGradeVersion,
     Subject,
     Term,
 )
 from app.models.audit import AuditLog
 from app.models.auth import JwtSession
-from app.models.documents import StudentDocument
-from app.models.finance import Invoice, Payment
+from app.models.documents import DocumentBatch, DocumentBatchChunk, DocumentJob, StudentDocument
+from app.models.finance import Invoice, NegotiationPlan, Payment
 from app.models.notifications import (
+    InvoiceReminder,
     Notification,
     NotificationPreference,
+    OutboxMessage,
+    ScheduledJob,
     UserNotification,
+    UserNotificationCounter,
 )
 from app.models.user import User
 
@@ -46,15 +51,24 @@ __all__ = [
     "Assessment",
     "AssessmentGrade",
     "FinalGrade",
+    "StudentGradeVersion",
     # Finance
     "Invoice",
     "Payment",
+    "NegotiationPlan",
     # Notifications
     "Notification",
     "UserNotification",
     "NotificationPreference",
+    "UserNotificationCounter",
+    "OutboxMessage",
+    "ScheduledJob",
+    "InvoiceReminder",
     # Documents
     "StudentDocument",
+    "DocumentJob",
+    "DocumentBatch",
+    "DocumentBatchChunk",
     # Audit
     "AuditLog",
 ]
@@ -8,6 +8,7 @@ from datetime import date, datetime, time
 from decimal import Decimal
 
 from sqlalchemy import (
+    BigInteger,
     Boolean,
     CheckConstraint,
     Date,
@@ -510,3 +511,23 @@ class FinalGrade(Base):
     # Relationships
     section: Mapped[Section] = relationship("Section", back_populates="final_grades")
     student: Mapped[Student] = relationship("Student", back_populates="final_grades")
+
+
+class StudentGradeVersion(Base):
+    """
+    Per-student stamp of the final grades, bumped by database triggers on
+    every change a transcript would show (missing row = version 0).
+    """
+
+    __tablename__ = "student_grade_versions"
+    __table_args__ = {"schema": "academics"}
+
+    student_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("academics.students.user_id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, default=1)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
@@ -15,6 +15,14 @@ from app.core.database import Base
 
 
 class AuditLog(Base):
+    """
+    Audit trail entry.
+
+    The table is partitioned by month on created_at (migration 032), so `id`
+    (from audit.audit_log_id_seq) is not enforced unique by the database;
+    filter on created_at to let PostgreSQL skip partitions.
+    """
+
     __tablename__ = "audit_log"
     __table_args__ = {"schema": "audit"}
 
@@ -6,7 +6,20 @@ import enum
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, Enum, ForeignKey, Integer, String, Text, UniqueConstraint, func
+from sqlalchemy import (
+    BigInteger,
+    CheckConstraint,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+    func,
+    text,
+)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -35,6 +48,14 @@ class StudentDocument(Base):
     __tablename__ = "student_documents"
     __table_args__ = (
         UniqueConstraint("student_id", "doc_type", name="uq_student_documents_student_type"),
+        CheckConstraint(
+            "content_hash ~ '^[0-9a-f]{64}$'", name="ck_student_documents_content_hash"
+        ),
+        CheckConstraint(
+            "verification_code ~ '^[0-9A-HJKMNP-TV-Z]{12}$'",
+            name="ck_student_documents_verification_code",
+        ),
+        Index("uq_student_documents_verification_code", "verification_code", unique=True),
         {"schema": "documents"},
     )
 
@@ -58,6 +79,16 @@ class StudentDocument(Base):
     file_url: Mapped[str | None] = mapped_column(String, nullable=True)
     file_size: Mapped[int | None] = mapped_column(Integer, nullable=True)
     file_type: Mapped[str | None] = mapped_column(String(50), nullable=True)
+    # SHA-256 of the stored file: its key in the document storage and its ETag
+    content_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    # StudentGradeVersion the file was rendered from (TRANSCRIPT)
+    grade_version: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    # Printed on the PDF; public lookup key (services.document_verification)
+    verification_code: Mapped[str] = mapped_column(
+        String(12),
+        nullable=False,
+        server_default=text("documents.new_verification_code()"),
+    )
     generated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     requested_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     requested_by: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
@@ -67,3 +98,107 @@ class StudentDocument(Base):
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
     )
+
+
+class DocumentJobStatus(str, enum.Enum):
+    """Document generation job status."""
+
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    DONE = "DONE"
+    FAILED = "FAILED"
+
+
+class DocumentJob(Base):
+    """Queued generation of a student document (drained by the document workers)."""
+
+    __tablename__ = "document_jobs"
+    __table_args__ = {"schema": "documents"}
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    document_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("documents.student_documents.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    status: Mapped[DocumentJobStatus] = mapped_column(
+        Enum(DocumentJobStatus, name="document_job_status", schema="documents"),
+        nullable=False,
+        default=DocumentJobStatus.PENDING,
+    )
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    locked_until: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class DocumentBatch(Base):
+    """Bulk generation of one document type for a course and/or term."""
+
+    __tablename__ = "document_batches"
+    __table_args__ = {"schema": "documents"}
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    doc_type: Mapped[DocumentType] = mapped_column(
+        Enum(DocumentType, name="document_type", schema="documents"), nullable=False
+    )
+    course_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("academics.courses.id", ondelete="SET NULL"), nullable=True
+    )
+    term_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("academics.terms.id", ondelete="SET NULL"), nullable=True
+    )
+    status: Mapped[DocumentJobStatus] = mapped_column(
+        Enum(DocumentJobStatus, name="document_job_status", schema="documents"),
+        nullable=False,
+        default=DocumentJobStatus.PENDING,
+    )
+    total_students: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    total_chunks: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    done_chunks: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    generated: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    failed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    requested_by: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("auth.users.id", ondelete="SET NULL"), nullable=True
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class DocumentBatchChunk(Base):
+    """A range of students of a batch, claimed by one document worker at a time."""
+
+    __tablename__ = "document_batch_chunks"
+    __table_args__ = {"schema": "documents"}
+
+    batch_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("documents.document_batches.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    seq: Mapped[int] = mapped_column(Integer, primary_key=True)
+    first_student_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    last_student_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    size: Mapped[int] = mapped_column(Integer, nullable=False)
+    status: Mapped[DocumentJobStatus] = mapped_column(
+        Enum(DocumentJobStatus, name="document_job_status", schema="documents"),
+        nullable=False,
+        default=DocumentJobStatus.PENDING,
+    )
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    locked_until: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    generated: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    failed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -7,8 +7,20 @@ import uuid
 from datetime import date, datetime
 from decimal import Decimal
 
-from sqlalchemy import Date, DateTime, Enum, ForeignKey, Integer, Numeric, String, func
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import (
+    Column,
+    Date,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Integer,
+    MetaData,
+    Numeric,
+    String,
+    Table,
+    func,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database import Base
@@ -61,6 +73,11 @@ class Invoice(Base):
     )
     installment_number: Mapped[int | None] = mapped_column(Integer, nullable=True)
     installment_total: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    negotiation_plan_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("finance.negotiation_plans.id", ondelete="SET NULL"),
+        nullable=True,
+    )
     status: Mapped[InvoiceStatus] = mapped_column(
         Enum(InvoiceStatus, name="invoice_status", schema="finance"),
         nullable=False,
@@ -73,10 +90,11 @@ class Invoice(Base):
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
     )
 
-    # Relationships
+    # Relationships (lazy: list endpoints use column projections, detail views
+    # request joinedload() explicitly)
     payments: Mapped[list["Payment"]] = relationship("Payment", back_populates="invoice")
-    student: Mapped["Student"] = relationship("Student", back_populates="invoices", lazy="joined")
-    term: Mapped["Term"] = relationship("Term", lazy="joined")
+    student: Mapped["Student"] = relationship("Student", back_populates="invoices")
+    term: Mapped["Term"] = relationship("Term")
 
 
 # Import for type hints - avoid circular import
@@ -113,4 +131,64 @@ class Payment(Base):
     )
 
     # Relationships
-    invoice: Mapped[Invoice] = relationship("Invoice", back_populates="payments", lazy="joined")
+    invoice: Mapped[Invoice] = relationship("Invoice", back_populates="payments")
+
+
+class NegotiationPlan(Base):
+    """Executed negotiation plan (installments link back via Invoice.negotiation_plan_id)."""
+
+    __tablename__ = "negotiation_plans"
+    __table_args__ = {"schema": "finance"}
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    student_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("academics.students.user_id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    term_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("academics.terms.id", ondelete="SET NULL"),
+        nullable=True,
+    )
+    created_by: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("auth.users.id", ondelete="SET NULL"),
+        nullable=True,
+    )
+    total_amount: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
+    canceled_amount: Mapped[Decimal] = mapped_column(
+        Numeric(12, 2), nullable=False, default=Decimal("0.00")
+    )
+    num_installments: Mapped[int] = mapped_column(Integer, nullable=False)
+    fine_rate: Mapped[Decimal] = mapped_column(Numeric(5, 2), nullable=False)
+    interest_rate: Mapped[Decimal] = mapped_column(Numeric(5, 2), nullable=False)
+    canceled_invoice_ids: Mapped[list[uuid.UUID]] = mapped_column(
+        ARRAY(UUID(as_uuid=True)), nullable=False, default=list
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+# Read-only materialized view (migration 018), kept out of Base.metadata on purpose.
+receivables_aging = Table(
+    "receivables_aging",
+    MetaData(),
+    Column("student_id", UUID(as_uuid=True), nullable=False),
+    Column("course_id", UUID(as_uuid=True), nullable=False),
+    Column("term_id", UUID(as_uuid=True), nullable=True),
+    Column("open_count", Integer, nullable=False),
+    Column("overdue_count", Integer, nullable=False),
+    Column("open_amount", Numeric(14, 2), nullable=False),
+    Column("current_amount", Numeric(14, 2), nullable=False),
+    Column("days_0_30", Numeric(14, 2), nullable=False),
+    Column("days_31_60", Numeric(14, 2), nullable=False),
+    Column("days_61_90", Numeric(14, 2), nullable=False),
+    Column("days_over_90", Numeric(14, 2), nullable=False),
+    Column("overdue_amount", Numeric(14, 2), nullable=False),
+    Column("max_days_overdue", Integer, nullable=False),
+    Column("as_of", Date, nullable=False),
+    Column("refreshed_at", DateTime(timezone=True), nullable=False),
+    schema="finance",
+)
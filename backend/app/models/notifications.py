@@ -37,6 +37,31 @@ class NotificationPriority(str, enum.Enum):
     HIGH = "HIGH"
 
 
+class OutboxStatus(str, enum.Enum):
+    """Outbound message status."""
+
+    PENDING = "PENDING"
+    SENDING = "SENDING"
+    SENT = "SENT"
+    DEAD = "DEAD"
+
+
+class ScheduledJobKind(str, enum.Enum):
+    """Timer queue job kind."""
+
+    NOTIFICATION = "NOTIFICATION"
+    INVOICE_DUE_REMINDER = "INVOICE_DUE_REMINDER"
+
+
+class ScheduledJobStatus(str, enum.Enum):
+    """Timer queue job status."""
+
+    SCHEDULED = "SCHEDULED"
+    DONE = "DONE"
+    FAILED = "FAILED"
+    CANCELED = "CANCELED"
+
+
 class Notification(Base):
     """Notification model."""
 
@@ -64,6 +89,18 @@ class Notification(Base):
     is_archived: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
     delivered_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
     read_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Broadcast mode: audience spec evaluated on read, no per-user rows up front
+    audience: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
+    published_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Scheduling: first run and optional recurrence rule (see services.scheduler)
+    send_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    recurrence: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    # Occurrence of a recurring notification: the notification it was copied from
+    template_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("comm.notifications.id", ondelete="SET NULL"),
+        nullable=True,
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
@@ -75,13 +112,16 @@ class Notification(Base):
 
 
 class UserNotification(Base):
-    """User notification delivery record."""
+    """
+    User notification delivery record.
+
+    The table is partitioned by month on delivered_at (migration 026), so
+    neither `id` nor (user_id, notification_id) is enforced unique by the
+    database: writers deduplicate deliveries (see services.notifications).
+    """
 
     __tablename__ = "user_notifications"
-    __table_args__ = (
-        UniqueConstraint("user_id", "notification_id", name="uq_user_notifications_user_notif"),
-        {"schema": "comm"},
-    )
+    __table_args__ = {"schema": "comm"}
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id: Mapped[uuid.UUID] = mapped_column(
@@ -124,9 +164,126 @@ class NotificationPreference(Base):
     in_app_enabled: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
     email_enabled: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
     sms_enabled: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    phone: Mapped[str | None] = mapped_column(String(20), nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
     )
+
+
+class UserNotificationCounter(Base):
+    """Per-user unread counter, maintained by triggers on comm.user_notifications."""
+
+    __tablename__ = "user_notification_counters"
+    __table_args__ = {"schema": "comm"}
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("auth.users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    unread_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+class OutboxMessage(Base):
+    """Outbound EMAIL/SMS message awaiting (or done with) delivery."""
+
+    __tablename__ = "outbox_messages"
+    __table_args__ = (
+        UniqueConstraint(
+            "notification_id", "user_id", name="uq_outbox_messages_notification_user"
+        ),
+        {"schema": "comm"},
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    notification_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("comm.notifications.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("auth.users.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    channel: Mapped[NotificationChannel] = mapped_column(
+        Enum(NotificationChannel, name="notification_channel", schema="comm"),
+        nullable=False,
+    )
+    recipient: Mapped[str] = mapped_column(Text, nullable=False)
+    status: Mapped[OutboxStatus] = mapped_column(
+        Enum(OutboxStatus, name="outbox_status", schema="comm"),
+        nullable=False,
+        default=OutboxStatus.PENDING,
+    )
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    locked_until: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    sent_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class ScheduledJob(Base):
+    """Durable timer queue entry (scheduled deliveries, automated reminders)."""
+
+    __tablename__ = "scheduled_jobs"
+    __table_args__ = {"schema": "comm"}
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    kind: Mapped[ScheduledJobKind] = mapped_column(
+        Enum(ScheduledJobKind, name="scheduled_job_kind", schema="comm"), nullable=False
+    )
+    notification_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("comm.notifications.id", ondelete="CASCADE"),
+        nullable=True,
+    )
+    payload: Mapped[dict] = mapped_column(JSONB, nullable=False, default=dict)
+    starts_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    run_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    recurrence: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    status: Mapped[ScheduledJobStatus] = mapped_column(
+        Enum(ScheduledJobStatus, name="scheduled_job_status", schema="comm"),
+        nullable=False,
+        default=ScheduledJobStatus.SCHEDULED,
+    )
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    runs_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_run_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+class InvoiceReminder(Base):
+    """Invoice due reminder already sent (one per invoice and lead time)."""
+
+    __tablename__ = "invoice_reminders"
+    __table_args__ = {"schema": "comm"}
+
+    invoice_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("finance.invoices.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    days_before: Mapped[int] = mapped_column(Integer, primary_key=True)
+    notification_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("comm.notifications.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    sent_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
@@ -11,6 +11,7 @@ from app.routers.v1.admin_finance import router as admin_finance_router
 from app.routers.v1.admin_users import router as admin_users_router
 from app.routers.v1.auth import router as auth_router
 from app.routers.v1.me import router as me_router
+from app.routers.v1.public import router as public_router
 
 __all__ = [
     "auth_router",
@@ -22,4 +23,5 @@ __all__ = [
     "admin_documents_router",
     "admin_audit_router",
     "admin_dashboard_router",
+    "public_router",
 ]
@@ -75,6 +75,7 @@ from app.schemas.admin_academics import (
     TermUpdateRequest,
 )
 from app.schemas.common import PaginatedResponse
+from app.services.audit import AuditEvent, record_audit
 
 router = APIRouter(prefix="/api/v1/admin", tags=["Admin - Academics"])
 
@@ -282,22 +283,24 @@ def _create_course_audit_log(
     db: Session, request: Request, course: Course, action: str, extra_data: dict | None = None
 ) -> None:
     """Create audit log entry for course operations."""
-    from app.models.audit import AuditLog
-
     data = {"course_id": str(course.id), "course_code": course.code, "course_name": course.name}
     if extra_data:
         data.update(extra_data)
 
-    audit = AuditLog(
-        actor_user_id=request.state.current_user.id if hasattr(request.state, "current_user") else None,
-        action=action,
-        entity_type="Course",
-        entity_id=course.id,
-        ip=request.client.host if request.client else None,
-        user_agent=request.headers.get("user-agent"),
-        data=data,
+    record_audit(
+        db,
+        AuditEvent(
+            actor_user_id=(
+                request.state.current_user.id if hasattr(request.state, "current_user") else None
+            ),
+            action=action,
+            entity_type="Course",
+            entity_id=course.id,
+            ip=request.client.host if request.client else None,
+            user_agent=request.headers.get("user-agent"),
+            data=data,
+        ),
     )
-    db.add(audit)
 
 
 @router.get("/courses", response_model=PaginatedResponse[CourseResponse], summary="Listar cursos")
@@ -549,22 +552,24 @@ def _create_subject_audit_log(
     db: Session, request: Request, subject: Subject, action: str, extra_data: dict | None = None
 ) -> None:
     """Create audit log entry for subject operations."""
-    from app.models.audit import AuditLog
-
     data = {"subject_id": str(subject.id), "subject_code": subject.code, "subject_name": subject.name}
     if extra_data:
         data.update(extra_data)
 
-    audit = AuditLog(
-        actor_user_id=request.state.current_user.id if hasattr(request.state, "current_user") else None,
-        action=action,
-        entity_type="Subject",
-        entity_id=subject.id,
-        ip=request.client.host if request.client else None,
-        user_agent=request.headers.get("user-agent"),
-        data=data,
+    record_audit(
+        db,
+        AuditEvent(
+            actor_user_id=(
+                request.state.current_user.id if hasattr(request.state, "current_user") else None
+            ),
+            action=action,
+            entity_type="Subject",
+            entity_id=subject.id,
+            ip=request.client.host if request.client else None,
+            user_agent=request.headers.get("user-agent"),
+            data=data,
+        ),
     )
-    db.add(audit)
 
 
 @router.get(
@@ -1188,7 +1193,6 @@ def generate_sessions(
 # Import additional models and modules for student business rules
 import re
 from app.models.user import User, UserRole, UserStatus
-from app.models.audit import AuditLog
 
 
 def _generate_next_ra(db: Session) -> str:
@@ -1219,16 +1223,18 @@ def _create_student_audit_log(
     request: Request | None = None,
 ) -> None:
     """Create audit log entry for student operations."""
-    log = AuditLog(
-        actor_user_id=admin.id,
-        action=action,
-        entity_type="STUDENT",
-        entity_id=student_id,
-        data=details,
-        ip=request.client.host if request and request.client else None,
-        user_agent=request.headers.get("user-agent") if request else None,
+    record_audit(
+        db,
+        AuditEvent(
+            actor_user_id=admin.id,
+            action=action,
+            entity_type="STUDENT",
+            entity_id=student_id,
+            data=details,
+            ip=request.client.host if request and request.client else None,
+            user_agent=request.headers.get("user-agent") if request else None,
+        ),
     )
-    db.add(log)
 
 
 @router.get("/students", response_model=PaginatedResponse[StudentResponse], summary="Listar alunos")
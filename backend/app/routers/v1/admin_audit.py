@@ -4,11 +4,12 @@ UniFECAF Portal do Aluno - API v1 Admin Audit Router.
 
 from __future__ import annotations
 
-from datetime import datetime
+import json
+from datetime import UTC, datetime
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, Query, Request
-from sqlalchemy import Text, func, select
+from sqlalchemy import func, literal_column, select
 from sqlalchemy.orm import Session
 from starlette import status
 
@@ -23,24 +24,89 @@ from app.schemas.admin_audit import (
     AdminAuditSummaryResponse,
 )
 from app.schemas.common import PaginatedResponse
+from app.services.audit import AuditEvent, audit_sink
+from app.services.audit_stats import AUDIT_STATS_MAX_DAYS, audit_stats_since, audit_stats_stmt
 
 router = APIRouter(prefix="/api/v1/admin", tags=["Admin - Audit"])
 
 
+def _as_utc(value: datetime) -> datetime:
+    """Naive query-string datetimes are UTC (an aware bound lets the planner prune partitions)."""
+    return value if value.tzinfo is not None else value.replace(tzinfo=UTC)
+
+
+# Same expression as the idx_audit_log_data_tsv GIN index (migration 034)
+_SEARCH_CONFIG = literal_column("'simple'::regconfig")
+_DATA_TSVECTOR = func.jsonb_to_tsvector(
+    _SEARCH_CONFIG, AuditLog.data, literal_column("""'["string"]'::jsonb""")
+)
+
+
+def _data_search_clause(search: str):
+    """Full-text match on data's string values (websearch syntax: "frase", -termo, OR)."""
+    return _DATA_TSVECTOR.bool_op("@@")(func.websearch_to_tsquery(_SEARCH_CONFIG, search))
+
+
+def _parse_data_filters(data: list[str], data_contains: str | None) -> list[dict]:
+    """
+    Containment documents for `data @> ...` (idx_audit_log_data_path).
+
+    `data` items are `key=value`, dotted keys for nested objects
+    (`filters.action=USER_CREATED`); values are read as JSON when they parse
+    (`count=3`, `active=true`) and as text otherwise. `data_contains` is a JSON
+    object used as is.
+    """
+    documents: list[dict] = []
+    for item in data:
+        key, sep, raw = item.partition("=")
+        if not sep or not key or any(not part for part in key.split(".")):
+            raise_api_error(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                code="VALIDATION_ERROR",
+                message="Filtro de dados inválido: use chave=valor.",
+                details={"data": item},
+            )
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            value = raw
+        for part in reversed(key.split(".")):
+            value = {part: value}
+        documents.append(value)
+    if data_contains:
+        try:
+            document = json.loads(data_contains)
+        except ValueError:
+            document = None
+        if not isinstance(document, dict):
+            raise_api_error(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                code="VALIDATION_ERROR",
+                message="data_contains deve ser um objeto JSON.",
+            )
+        documents.append(document)
+    return documents
+
+
+def _audit_log_list_stmt():
+    """Listing order; filter on created_at so only the matching monthly partitions are read."""
+    return select(AuditLog).order_by(AuditLog.created_at.desc(), AuditLog.id.desc())
+
+
 def _create_audit_meta_log(
-    db: Session, admin: User, action: str, request: Request, data: dict | None = None
+    admin: User, action: str, request: Request, data: dict | None = None
 ) -> None:
-    """Create meta-audit log for audit access."""
-    log = AuditLog(
-        actor_user_id=admin.id,
-        action=action,
-        entity_type="AuditLog",
-        ip=request.client.host if request.client else None,
-        user_agent=request.headers.get("user-agent"),
-        data=data or {},
+    """Create meta-audit log for audit access (buffered, outside the read transaction)."""
+    audit_sink.emit(
+        AuditEvent(
+            actor_user_id=admin.id,
+            action=action,
+            entity_type="AuditLog",
+            ip=request.client.host if request.client else None,
+            user_agent=request.headers.get("user-agent"),
+            data=data or {},
+        )
     )
-    db.add(log)
-    db.commit()
 
 
 @router.get(
@@ -60,14 +126,22 @@ def list_audit_logs(
     ip: str | None = Query(None, description="Filtrar por IP"),
     date_from: datetime | None = Query(None, description="Data inicial"),
     date_to: datetime | None = Query(None, description="Data final"),
-    search: str | None = Query(None, description="Busca textual no campo data"),
+    search: str | None = Query(
+        None, description='Busca textual nos valores do campo data ("frase", -termo, OR)'
+    ),
+    data: list[str] = Query(
+        [], description="Filtro estruturado chave=valor no campo data (repetível; a.b=valor)"
+    ),
+    data_contains: str | None = Query(
+        None, description='Objeto JSON contido no campo data, ex.: {"filters": {"action": "X"}}'
+    ),
 ) -> PaginatedResponse[AdminAuditLogResponse]:
     """
     Lista logs de auditoria com filtros avançados.
 
     Acesso restrito a administradores.
     """
-    stmt = select(AuditLog).order_by(AuditLog.created_at.desc())
+    stmt = _audit_log_list_stmt()
 
     # Apply filters
     if actor_user_id:
@@ -81,12 +155,13 @@ def list_audit_logs(
     if ip:
         stmt = stmt.where(AuditLog.ip == ip)
     if date_from:
-        stmt = stmt.where(AuditLog.created_at >= date_from)
+        stmt = stmt.where(AuditLog.created_at >= _as_utc(date_from))
     if date_to:
-        stmt = stmt.where(AuditLog.created_at <= date_to)
+        stmt = stmt.where(AuditLog.created_at <= _as_utc(date_to))
+    for document in _parse_data_filters(data, data_contains):
+        stmt = stmt.where(AuditLog.data.contains(document))
     if search:
-        # JSONB text search - convert to text for ILIKE search
-        stmt = stmt.where(AuditLog.data.cast(Text).ilike(f"%{search}%"))
+        stmt = stmt.where(_data_search_clause(search))
 
     items, total = paginate_stmt(db, stmt, limit=pagination["limit"], offset=pagination["offset"])
 
@@ -105,7 +180,7 @@ def list_audit_logs(
 
     # Meta-audit: log that admin viewed audit logs
     _create_audit_meta_log(
-        db, admin, "AUDIT_LOG_VIEWED", request,
+        admin, "AUDIT_LOG_VIEWED", request,
         {"filters": {"actor_user_id": str(actor_user_id) if actor_user_id else None,
                      "action": action, "entity_type": entity_type}}
     )
@@ -159,94 +234,17 @@ def list_entity_types(
 def get_audit_stats(
     admin: AdminUser,
     db: Session = Depends(get_db),
-    period_days: int = Query(30, ge=1, le=90, description="Dias para análise"),
+    period_days: int = Query(
+        30, ge=1, le=AUDIT_STATS_MAX_DAYS, description="Dias para análise (UTC, incluindo hoje)"
+    ),
 ) -> AdminAuditSummaryResponse:
-    """Retorna estatísticas resumidas dos últimos N dias."""
-    from datetime import timedelta
-
-    cutoff = datetime.utcnow() - timedelta(days=period_days)
-
-    # Total logs in period
-    total = db.query(func.count(AuditLog.id)).filter(
-        AuditLog.created_at >= cutoff
-    ).scalar() or 0
-
-    # Unique actions
-    unique_actions = db.query(func.count(func.distinct(AuditLog.action))).filter(
-        AuditLog.created_at >= cutoff
-    ).scalar() or 0
-
-    # Unique actors
-    unique_actors = db.query(func.count(func.distinct(AuditLog.actor_user_id))).filter(
-        AuditLog.created_at >= cutoff,
-        AuditLog.actor_user_id.isnot(None)
-    ).scalar() or 0
-
-    # Login failures
-    login_failures = db.query(func.count(AuditLog.id)).filter(
-        AuditLog.created_at >= cutoff,
-        AuditLog.action == "USER_LOGIN_FAILED"
-    ).scalar() or 0
-
-    # Top actions
-    top_actions_query = (
-        db.query(AuditLog.action, func.count(AuditLog.id).label("count"))
-        .filter(AuditLog.created_at >= cutoff)
-        .group_by(AuditLog.action)
-        .order_by(func.count(AuditLog.id).desc())
-        .limit(10)
-        .all()
-    )
-    top_actions = [{"action": a.action, "count": a.count} for a in top_actions_query]
-
-    # Top actors
-    top_actors_query = (
-        db.query(AuditLog.actor_user_id, func.count(AuditLog.id).label("count"))
-        .filter(AuditLog.created_at >= cutoff, AuditLog.actor_user_id.isnot(None))
-        .group_by(AuditLog.actor_user_id)
-        .order_by(func.count(AuditLog.id).desc())
-        .limit(10)
-        .all()
-    )
-
-    # Get actor emails
-    actor_ids = [a.actor_user_id for a in top_actors_query]
-    actors = {}
-    if actor_ids:
-        actor_users = db.query(User.id, User.email).filter(User.id.in_(actor_ids)).all()
-        actors = {u.id: u.email for u in actor_users}
+    """
+    Retorna estatísticas resumidas dos últimos N dias.
 
-    top_actors = [
-        {"user_id": str(a.actor_user_id), "email": actors.get(a.actor_user_id, "Unknown"), "count": a.count}
-        for a in top_actors_query
-    ]
-
-    # Unique actions count
-    unique_actions = db.query(func.count(func.distinct(AuditLog.action))).filter(
-        AuditLog.created_at >= cutoff
-    ).scalar() or 0
-
-    # Unique actors count
-    unique_actors = db.query(func.count(func.distinct(AuditLog.actor_user_id))).filter(
-        AuditLog.created_at >= cutoff,
-        AuditLog.actor_user_id.isnot(None)
-    ).scalar() or 0
-
-    # Login failures (security metric)
-    login_failures = db.query(func.count(AuditLog.id)).filter(
-        AuditLog.created_at >= cutoff,
-        AuditLog.action == "USER_LOGIN_FAILED"
-    ).scalar() or 0
-
-    return AdminAuditSummaryResponse(
-        period_days=period_days,
-        total_logs=total,
-        unique_actions=unique_actions,
-        unique_actors=unique_actors,
-        login_failures=login_failures,
-        top_actions=top_actions,
-        top_actors=top_actors,
-    )
+    Lidas do rollup horário de auditoria (services.audit_stats) em uma única consulta.
+    """
+    summary = db.execute(audit_stats_stmt(audit_stats_since(period_days))).one()
+    return AdminAuditSummaryResponse(period_days=period_days, **summary._mapping)
 
 
 @router.get(
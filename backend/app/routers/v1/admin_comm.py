@@ -4,27 +4,34 @@ UniFECAF Portal do Aluno - API v1 Admin Communications Router.
 
 from __future__ import annotations
 
+from datetime import UTC, datetime
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import func, select
-from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import CTE, Text, cast, delete, func, select, tuple_, union, update
+from sqlalchemy.orm import Session
 from starlette import status
 
+from app.core.config import get_settings
 from app.core.database import get_db
 from app.core.deps import AdminUser, pagination_params
 from app.core.errors import raise_api_error
-from app.db.utils import apply_update, get_or_404, paginate_stmt
+from app.db.utils import apply_update, get_or_404, paginate_rows, paginate_stmt
+from app.models.academics import Student
 from app.models.notifications import (
     Notification,
     NotificationChannel,
     NotificationPreference,
     NotificationPriority,
     NotificationType,
+    OutboxMessage,
+    OutboxStatus,
+    ScheduledJob,
+    ScheduledJobKind,
+    ScheduledJobStatus,
     UserNotification,
 )
-from app.models.user import User, UserRole
+from app.models.user import User
 from app.schemas.admin_comm import (
     AdminNotificationCreateRequest,
     AdminNotificationPreferencesResponse,
@@ -33,10 +40,40 @@ from app.schemas.admin_comm import (
     AdminNotificationStatsResponse,
     AdminNotificationUpdateRequest,
     AdminUserNotificationResponse,
+    AudienceCountResponse,
+    BulkOperationResponse,
     DeliverNotificationRequest,
     DeliverNotificationResponse,
+    InvoiceReminderScheduleRequest,
+    NotificationAudience,
+    NotificationBulkFilter,
+    NotificationCountersReconcileResponse,
+    OutboxRequeueResponse,
+    OutboxStatsResponse,
+    ScheduledJobResponse,
+    ScheduleNotificationRequest,
+    UserNotificationBulkFilter,
 )
 from app.schemas.common import PaginatedResponse
+from app.services.notification_counters import reconcile_notification_counters
+from app.services.notifications import (
+    all_students_audience,
+    audience_from_spec,
+    count_audience,
+    fan_out_notification,
+    notifies_cte,
+    publish_broadcast,
+    user_ids_audience,
+)
+from app.services.outbox import requeue_dead_letters
+from app.services.scheduler import (
+    cancel_notification_schedule,
+    parse_recurrence,
+    schedule_invoice_reminders,
+    schedule_notification,
+)
+
+settings = get_settings()
 
 router = APIRouter(prefix="/api/v1/admin", tags=["Admin - Comm"])
 
@@ -51,42 +88,44 @@ def get_notification_stats(
     _: AdminUser,
     db: Session = Depends(get_db),
 ) -> AdminNotificationStatsResponse:
-    """Get notification statistics."""
-    # Totals
-    total = db.query(func.count(Notification.id)).scalar() or 0
-    active = db.query(func.count(Notification.id)).filter(Notification.is_archived == False).scalar() or 0  # noqa: E712
-    archived = db.query(func.count(Notification.id)).filter(Notification.is_archived == True).scalar() or 0  # noqa: E712
-
-    # Deliveries and reads
-    total_deliveries = db.query(func.sum(Notification.delivered_count)).scalar() or 0
-    total_reads = db.query(func.sum(Notification.read_count)).scalar() or 0
+    """
+    Get notification statistics in one query.
+
+    GROUPING SETS yield the totals row plus the per type/channel/priority
+    breakdowns; deliveries and reads come from the counters on
+    comm.notifications (read_count is trigger-maintained).
+    """
+    dimensions = (Notification.type, Notification.channel, Notification.priority)
+    rows = db.execute(
+        select(
+            func.grouping(*dimensions).label("grouping"),
+            *dimensions,
+            func.count().label("total"),
+            func.count().filter(Notification.is_archived.is_(False)).label("active"),
+            func.coalesce(func.sum(Notification.delivered_count), 0).label("deliveries"),
+            func.coalesce(func.sum(Notification.read_count), 0).label("reads"),
+        ).group_by(func.grouping_sets(tuple_(), *(tuple_(d) for d in dimensions)))
+    ).all()
+
+    # grouping() sets one bit per rolled-up column: type=4, channel=2, priority=1
+    by_type: dict[str, int] = {}
+    by_channel: dict[str, int] = {}
+    by_priority: dict[str, int] = {}
+    total = active = total_deliveries = total_reads = 0
+    for row in rows:
+        if row.grouping == 0b111:
+            total, active = row.total, row.active
+            total_deliveries, total_reads = int(row.deliveries), int(row.reads)
+        elif row.grouping == 0b011:
+            by_type[row.type.value] = row.total
+        elif row.grouping == 0b101:
+            by_channel[row.channel.value] = row.total
+        elif row.grouping == 0b110:
+            by_priority[row.priority.value] = row.total
+    archived = total - active
 
     read_rate = (total_reads / total_deliveries * 100) if total_deliveries > 0 else 0.0
 
-    # By type
-    by_type_rows = (
-        db.query(Notification.type, func.count(Notification.id))
-        .group_by(Notification.type)
-        .all()
-    )
-    by_type = {str(row[0].value): row[1] for row in by_type_rows}
-
-    # By channel
-    by_channel_rows = (
-        db.query(Notification.channel, func.count(Notification.id))
-        .group_by(Notification.channel)
-        .all()
-    )
-    by_channel = {str(row[0].value): row[1] for row in by_channel_rows}
-
-    # By priority
-    by_priority_rows = (
-        db.query(Notification.priority, func.count(Notification.id))
-        .group_by(Notification.priority)
-        .all()
-    )
-    by_priority = {str(row[0].value): row[1] for row in by_priority_rows}
-
     return AdminNotificationStatsResponse(
         total_notifications=total,
         active_notifications=active,
@@ -100,6 +139,23 @@ def get_notification_stats(
     )
 
 
+@router.post(
+    "/notifications/counters/reconcile",
+    response_model=NotificationCountersReconcileResponse,
+    summary="Reconciliar contadores de notificações (não lidas / leituras)",
+)
+def reconcile_counters(
+    _: AdminUser,
+    db: Session = Depends(get_db),
+) -> NotificationCountersReconcileResponse:
+    repair = reconcile_notification_counters(db, settings.notification_retention_months)
+    if repair is None:
+        return NotificationCountersReconcileResponse(reconciled=False)
+    return NotificationCountersReconcileResponse(
+        reconciled=True, users_fixed=repair.users, notifications_fixed=repair.notifications
+    )
+
+
 @router.get(
     "/notifications",
     response_model=PaginatedResponse[AdminNotificationResponse],
@@ -179,6 +235,165 @@ def create_notification(
     return AdminNotificationResponse.model_validate(notif)
 
 
+@router.post(
+    "/notifications/audience/count",
+    response_model=AudienceCountResponse,
+    summary="Simular público-alvo (contagem)",
+)
+def count_notification_audience(
+    payload: NotificationAudience, _: AdminUser, db: Session = Depends(get_db)
+) -> AudienceCountResponse:
+    """Dry run: how many students an audience spec would reach."""
+    return AudienceCountResponse(total=count_audience(db, audience_from_spec(payload)))
+
+
+# --- Bulk operations (one UPDATE/DELETE each) ---
+
+
+def _require_filter(conditions: list) -> None:
+    if not conditions:
+        raise_api_error(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            code="BULK_FILTER_REQUIRED",
+            message="Informe ao menos um filtro.",
+        )
+
+
+def _notification_bulk_conditions(spec: NotificationBulkFilter) -> list:
+    conditions = []
+    try:
+        if spec.type:
+            conditions.append(Notification.type == NotificationType(spec.type))
+        if spec.channel:
+            conditions.append(Notification.channel == NotificationChannel(spec.channel))
+        if spec.priority:
+            conditions.append(Notification.priority == NotificationPriority(spec.priority))
+    except ValueError:
+        raise_api_error(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            code="VALIDATION_ERROR",
+            message="Campos inválidos.",
+        )
+    if spec.ids:
+        conditions.append(Notification.id.in_(spec.ids))
+    if spec.is_archived is not None:
+        conditions.append(Notification.is_archived.is_(spec.is_archived))
+    if spec.created_before:
+        conditions.append(Notification.created_at < spec.created_before)
+    if spec.search:
+        search_term = f"%{spec.search}%"
+        conditions.append(
+            Notification.title.ilike(search_term) | Notification.body.ilike(search_term)
+        )
+    _require_filter(conditions)
+    return conditions
+
+
+def _user_notification_bulk_conditions(spec: UserNotificationBulkFilter) -> list:
+    conditions = []
+    if spec.user_id:
+        conditions.append(UserNotification.user_id == spec.user_id)
+    if spec.notification_id:
+        conditions.append(UserNotification.notification_id == spec.notification_id)
+    if spec.read is not None:
+        read_at = UserNotification.read_at
+        conditions.append(read_at.is_not(None) if spec.read else read_at.is_(None))
+    if spec.delivered_before:
+        conditions.append(UserNotification.delivered_at < spec.delivered_before)
+    _require_filter(conditions)
+    return conditions
+
+
+@router.post(
+    "/notifications/bulk-archive",
+    response_model=BulkOperationResponse,
+    summary="Arquivar notificações em lote (por filtro)",
+)
+def bulk_archive_notifications(
+    payload: NotificationBulkFilter, _: AdminUser, db: Session = Depends(get_db)
+) -> BulkOperationResponse:
+    result = db.execute(
+        update(Notification)
+        .where(*_notification_bulk_conditions(payload), Notification.is_archived.is_(False))
+        .values(is_archived=True)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return BulkOperationResponse(affected=result.rowcount)
+
+
+@router.post(
+    "/notifications/bulk-delete",
+    response_model=BulkOperationResponse,
+    summary="Remover notificações em lote (por filtro)",
+)
+def bulk_delete_notifications(
+    payload: NotificationBulkFilter, _: AdminUser, db: Session = Depends(get_db)
+) -> BulkOperationResponse:
+    """Deliveries, outbox messages and schedules go with them (ON DELETE CASCADE)."""
+    result = db.execute(
+        delete(Notification)
+        .where(*_notification_bulk_conditions(payload))
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return BulkOperationResponse(affected=result.rowcount)
+
+
+def _announce_inbox_changes(db: Session, changed: CTE) -> int:
+    """
+    Run `changed` (a bulk UPDATE/DELETE ... RETURNING user_id) and NOTIFY each
+    affected user's stream in the same statement. Returns rows changed.
+    """
+    notified = notifies_cte("user_id", changed.c.user_id)
+    affected, _ = db.execute(
+        select(
+            select(func.count()).select_from(changed).scalar_subquery(),
+            select(func.count()).select_from(notified).scalar_subquery(),
+        )
+    ).one()
+    return affected
+
+
+@router.post(
+    "/user-notifications/bulk-archive",
+    response_model=BulkOperationResponse,
+    summary="Arquivar entregas em lote (por filtro)",
+)
+def bulk_archive_user_notifications(
+    payload: UserNotificationBulkFilter, _: AdminUser, db: Session = Depends(get_db)
+) -> BulkOperationResponse:
+    changed = (
+        update(UserNotification)
+        .where(*_user_notification_bulk_conditions(payload), UserNotification.archived_at.is_(None))
+        .values(archived_at=func.now())
+        .returning(UserNotification.user_id)
+        .cte("changed")
+    )
+    affected = _announce_inbox_changes(db, changed)
+    db.commit()
+    return BulkOperationResponse(affected=affected)
+
+
+@router.post(
+    "/user-notifications/bulk-delete",
+    response_model=BulkOperationResponse,
+    summary="Remover entregas em lote (por filtro)",
+)
+def bulk_delete_user_notifications(
+    payload: UserNotificationBulkFilter, _: AdminUser, db: Session = Depends(get_db)
+) -> BulkOperationResponse:
+    changed = (
+        delete(UserNotification)
+        .where(*_user_notification_bulk_conditions(payload))
+        .returning(UserNotification.user_id)
+        .cte("changed")
+    )
+    affected = _announce_inbox_changes(db, changed)
+    db.commit()
+    return BulkOperationResponse(affected=affected)
+
+
 @router.get(
     "/notifications/{notification_id}",
     response_model=AdminNotificationResponse,
@@ -283,63 +498,285 @@ def deliver_notification(
 ) -> DeliverNotificationResponse:
     notif = get_or_404(db, Notification, notification_id, message="Notificação não encontrada.")
 
+    explicit_ids = not payload.all_students and payload.audience is None
     if payload.all_students:
-        user_ids = [row[0] for row in db.query(User.id).filter(User.role == UserRole.STUDENT).all()]
+        audience = all_students_audience()
+    elif payload.audience is not None:
+        audience = audience_from_spec(payload.audience)
     else:
-        user_ids = payload.user_ids
-
-    delivered = 0
-    skipped = 0
+        audience = user_ids_audience(payload.user_ids)
 
-    for uid in user_ids:
-        un = UserNotification(user_id=uid, notification_id=notif.id)
-        db.add(un)
-        try:
-            db.commit()
-            delivered += 1
-        except IntegrityError:
-            db.rollback()
-            skipped += 1
-
-    # Update counters
-    notif.delivered_count = (notif.delivered_count or 0) + delivered
+    # Single INSERT ... SELECT skipping existing deliveries (+ delivered_count bump)
+    result = fan_out_notification(db, notif.id, audience)
     db.commit()
 
+    # Explicit ids that match no user are reported as skipped too
+    targeted = len(set(payload.user_ids)) if explicit_ids else result.targeted
+
     return DeliverNotificationResponse(
-        notification_id=notif.id, delivered=delivered, skipped_existing=skipped
+        notification_id=notif.id,
+        delivered=result.delivered,
+        skipped_existing=targeted - result.delivered,
     )
 
 
-def _enrich_user_notification(un: UserNotification, db: Session) -> dict:
-    """Enrich user notification with user and notification data."""
-    data = {
-        "id": un.id,
-        "user_id": un.user_id,
-        "notification_id": un.notification_id,
-        "delivered_at": un.delivered_at,
-        "read_at": un.read_at,
-        "archived_at": un.archived_at,
-        "action_url": un.action_url,
-        "action_label": un.action_label,
-    }
+@router.post(
+    "/notifications/{notification_id}/broadcast",
+    response_model=AdminNotificationResponse,
+    summary="Publicar notificação como broadcast",
+)
+def broadcast_notification(
+    notification_id: UUID,
+    payload: NotificationAudience,
+    _: AdminUser,
+    db: Session = Depends(get_db),
+) -> AdminNotificationResponse:
+    """
+    Publish to an audience without per-user rows (fan-out-on-read).
 
-    # Enrich with user data
-    user = db.query(User).filter(User.id == un.user_id).first()
-    if user:
-        data["user_email"] = user.email
-        # Get student name from Student table
-        from app.models.academics import Student
-        student = db.query(Student).filter(Student.user_id == user.id).first()
-        if student:
-            data["user_name"] = student.full_name
-        else:
-            data["user_name"] = user.email.split('@')[0]  # Fallback to email prefix
+    Students see the notification while it is not archived; their read and
+    archive state is stored on first interaction. Publishing again replaces
+    the audience.
+    """
+    notif = get_or_404(db, Notification, notification_id, message="Notificação não encontrada.")
+    publish_broadcast(db, notif, payload)
+    db.commit()
+    db.refresh(notif)
+    return AdminNotificationResponse.model_validate(notif)
+
+
+# ==================== SCHEDULING ENDPOINTS ====================
+
+
+def _check_recurrence(rule: str | None) -> None:
+    if rule is None:
+        return
+    try:
+        parse_recurrence(rule)
+    except ValueError as exc:
+        raise_api_error(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            code="VALIDATION_ERROR",
+            message="Regra de recorrência inválida.",
+            details={"recurrence": str(exc)},
+        )
+
+
+@router.post(
+    "/notifications/{notification_id}/schedule",
+    response_model=ScheduledJobResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Agendar entrega de notificação",
+)
+def schedule_notification_delivery(
+    notification_id: UUID,
+    payload: ScheduleNotificationRequest,
+    _: AdminUser,
+    db: Session = Depends(get_db),
+) -> ScheduledJobResponse:
+    """Schedule (or reschedule) delivery; recurring schedules send a copy per occurrence."""
+    notif = get_or_404(db, Notification, notification_id, message="Notificação não encontrada.")
+    _check_recurrence(payload.recurrence)
+    job = schedule_notification(
+        db,
+        notif,
+        send_at=payload.send_at,
+        recurrence=payload.recurrence,
+        audience=payload.audience,
+        broadcast=payload.broadcast,
+    )
+    db.commit()
+    db.refresh(job)
+    return ScheduledJobResponse.model_validate(job)
+
+
+@router.delete(
+    "/notifications/{notification_id}/schedule",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Cancelar agendamento de notificação",
+)
+def unschedule_notification(
+    notification_id: UUID, _: AdminUser, db: Session = Depends(get_db)
+) -> None:
+    notif = get_or_404(db, Notification, notification_id, message="Notificação não encontrada.")
+    if not cancel_notification_schedule(db, notif.id):
+        raise_api_error(
+            status_code=status.HTTP_404_NOT_FOUND,
+            code="SCHEDULE_NOT_FOUND",
+            message="Notificação não possui agendamento ativo.",
+        )
+    notif.send_at = None
+    notif.recurrence = None
+    db.commit()
+
+
+@router.get(
+    "/scheduled-jobs",
+    response_model=PaginatedResponse[ScheduledJobResponse],
+    summary="Listar agendamentos",
+)
+def list_scheduled_jobs(
+    _: AdminUser,
+    db: Session = Depends(get_db),
+    pagination: dict[str, int] = Depends(pagination_params),
+    status_filter: ScheduledJobStatus | None = Query(None, alias="status"),
+    kind: ScheduledJobKind | None = Query(None),
+) -> PaginatedResponse[ScheduledJobResponse]:
+    stmt = select(ScheduledJob).order_by(ScheduledJob.run_at)
+    if status_filter:
+        stmt = stmt.where(ScheduledJob.status == status_filter)
+    if kind:
+        stmt = stmt.where(ScheduledJob.kind == kind)
+
+    items, total = paginate_stmt(db, stmt, limit=pagination["limit"], offset=pagination["offset"])
+    return PaginatedResponse[ScheduledJobResponse](
+        items=[ScheduledJobResponse.model_validate(j) for j in items],
+        limit=pagination["limit"],
+        offset=pagination["offset"],
+        total=total,
+    )
+
+
+@router.post(
+    "/scheduled-jobs/invoice-reminders",
+    response_model=ScheduledJobResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Agendar lembretes de vencimento de faturas",
+)
+def create_invoice_reminder_job(
+    payload: InvoiceReminderScheduleRequest, _: AdminUser, db: Session = Depends(get_db)
+) -> ScheduledJobResponse:
+    _check_recurrence(payload.recurrence)
+    try:
+        type_, channel, priority = (
+            NotificationType(payload.type),
+            NotificationChannel(payload.channel),
+            NotificationPriority(payload.priority),
+        )
+    except ValueError:
+        raise_api_error(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            code="VALIDATION_ERROR",
+            message="Campos inválidos.",
+        )
+    job = schedule_invoice_reminders(
+        db,
+        run_at=payload.run_at or datetime.now(UTC),
+        recurrence=payload.recurrence,
+        days_before=payload.days_before,
+        title_template=payload.title_template,
+        body_template=payload.body_template,
+        type=type_,
+        channel=channel,
+        priority=priority,
+    )
+    db.commit()
+    db.refresh(job)
+    return ScheduledJobResponse.model_validate(job)
+
+
+@router.post(
+    "/scheduled-jobs/{job_id}/cancel",
+    response_model=ScheduledJobResponse,
+    summary="Cancelar agendamento",
+)
+def cancel_scheduled_job(job_id: UUID, _: AdminUser, db: Session = Depends(get_db)) -> ScheduledJobResponse:
+    job = get_or_404(
+        db, ScheduledJob, job_id, code="SCHEDULE_NOT_FOUND", message="Agendamento não encontrado."
+    )
+    if job.status != ScheduledJobStatus.SCHEDULED:
+        raise_api_error(
+            status_code=status.HTTP_409_CONFLICT,
+            code="SCHEDULE_NOT_ACTIVE",
+            message="Agendamento não está ativo.",
+        )
+    job.status = ScheduledJobStatus.CANCELED
+    db.commit()
+    db.refresh(job)
+    return ScheduledJobResponse.model_validate(job)
+
+
+# ==================== OUTBOX ENDPOINTS ====================
+
+
+@router.get(
+    "/outbox/stats",
+    response_model=OutboxStatsResponse,
+    summary="Estatísticas da fila de envio (email/SMS)",
+)
+def get_outbox_stats(_: AdminUser, db: Session = Depends(get_db)) -> OutboxStatsResponse:
+    rows = db.execute(
+        select(OutboxMessage.channel, OutboxMessage.status, func.count())
+        .group_by(OutboxMessage.channel, OutboxMessage.status)
+    ).all()
+    by_channel: dict[str, dict[str, int]] = {}
+    for channel, status_, count in rows:
+        by_channel.setdefault(channel.value, {})[status_.value] = count
+
+    oldest_pending_at = db.execute(
+        select(func.min(OutboxMessage.created_at)).where(
+            OutboxMessage.status.in_([OutboxStatus.PENDING, OutboxStatus.SENDING])
+        )
+    ).scalar()
+    return OutboxStatsResponse(by_channel=by_channel, oldest_pending_at=oldest_pending_at)
+
+
+@router.post(
+    "/outbox/dead-letters/requeue",
+    response_model=OutboxRequeueResponse,
+    summary="Reenfileirar mensagens com falha definitiva",
+)
+def requeue_outbox_dead_letters(
+    _: AdminUser,
+    db: Session = Depends(get_db),
+    channel: str | None = Query(None, description="Filtrar por canal (EMAIL, SMS)"),
+) -> OutboxRequeueResponse:
+    try:
+        channel_filter = NotificationChannel(channel) if channel else None
+    except ValueError:
+        raise_api_error(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            code="VALIDATION_ERROR",
+            message="Canal inválido.",
+        )
+    requeued = requeue_dead_letters(db, channel_filter)
+    db.commit()
+    return OutboxRequeueResponse(requeued=requeued)
+
+
+def _user_notification_list_stmt():
+    """Column projection for the delivery listing (notification/user/student joined in SQL)."""
+    return (
+        select(
+            UserNotification.id,
+            UserNotification.user_id,
+            UserNotification.notification_id,
+            UserNotification.delivered_at,
+            UserNotification.read_at,
+            UserNotification.archived_at,
+            UserNotification.action_url,
+            UserNotification.action_label,
+            Notification.title.label("notification_title"),
+            cast(User.email, Text).label("user_email"),
+            # Non-students fall back to the email prefix
+            func.coalesce(Student.full_name, func.split_part(cast(User.email, Text), "@", 1)).label(
+                "user_name"
+            ),
+        )
+        .select_from(UserNotification)
+        .join(Notification, Notification.id == UserNotification.notification_id)
+        .join(User, User.id == UserNotification.user_id)
+        .outerjoin(Student, Student.user_id == UserNotification.user_id)
+    )
 
-    # Enrich with notification data
-    if un.notification:
-        data["notification_title"] = un.notification.title
 
-    return data
+def _user_search_ids(search: str):
+    """User ids whose student name or email contains `search` (trigram-indexed)."""
+    pattern = f"%{search}%"
+    return union(
+        select(User.id).where(cast(User.email, Text).ilike(pattern)),
+        select(Student.user_id).where(Student.full_name.ilike(pattern)),
+    )
 
 
 @router.get(
@@ -355,11 +792,12 @@ def list_user_notifications(
     notification_id: UUID | None = Query(None, description="Filtrar por notificação"),
     unread_only: bool = Query(False, description="Apenas não lidas"),
     search: str | None = Query(None, description="Busca por nome ou email do usuário"),
+    delivered_from: datetime | None = Query(None, description="Entregues a partir de"),
+    delivered_to: datetime | None = Query(None, description="Entregues antes de"),
 ) -> PaginatedResponse[AdminUserNotificationResponse]:
-    stmt = (
-        select(UserNotification)
-        .options(joinedload(UserNotification.notification))
-        .order_by(UserNotification.delivered_at.desc())
+    """The delivery window limits the scan to the matching monthly partitions."""
+    stmt = _user_notification_list_stmt().order_by(
+        UserNotification.delivered_at.desc(), UserNotification.id
     )
 
     if user_id:
@@ -368,35 +806,17 @@ def list_user_notifications(
         stmt = stmt.where(UserNotification.notification_id == notification_id)
     if unread_only:
         stmt = stmt.where(UserNotification.read_at.is_(None))
-
-    # Search by user name or email
     if search:
-        user_ids = [
-            row[0] for row in db.query(User.id)
-            .filter((User.name.ilike(f"%{search}%")) | (User.email.ilike(f"%{search}%")))
-            .all()
-        ]
-        if user_ids:
-            stmt = stmt.where(UserNotification.user_id.in_(user_ids))
-        else:
-            # No users match, return empty
-            return PaginatedResponse[AdminUserNotificationResponse](
-                items=[],
-                limit=pagination["limit"],
-                offset=pagination["offset"],
-                total=0,
-            )
-
-    items, total = paginate_stmt(db, stmt, limit=pagination["limit"], offset=pagination["offset"])
+        stmt = stmt.where(UserNotification.user_id.in_(_user_search_ids(search)))
+    if delivered_from:
+        stmt = stmt.where(UserNotification.delivered_at >= delivered_from)
+    if delivered_to:
+        stmt = stmt.where(UserNotification.delivered_at < delivered_to)
 
-    # Enrich each item
-    enriched_items = [
-        AdminUserNotificationResponse(**_enrich_user_notification(un, db))
-        for un in items
-    ]
+    rows, total = paginate_rows(db, stmt, limit=pagination["limit"], offset=pagination["offset"])
 
     return PaginatedResponse[AdminUserNotificationResponse](
-        items=enriched_items,
+        items=[AdminUserNotificationResponse(**row._mapping) for row in rows],
         limit=pagination["limit"],
         offset=pagination["offset"],
         total=total,
@@ -427,6 +847,7 @@ def get_preferences(
         "in_app_enabled": pref.in_app_enabled,
         "email_enabled": pref.email_enabled,
         "sms_enabled": pref.sms_enabled,
+        "phone": pref.phone,
         "created_at": pref.created_at,
         "updated_at": pref.updated_at,
     }
@@ -466,6 +887,7 @@ def patch_preferences(
         "in_app_enabled": pref.in_app_enabled,
         "email_enabled": pref.email_enabled,
         "sms_enabled": pref.sms_enabled,
+        "phone": pref.phone,
         "created_at": pref.created_at,
         "updated_at": pref.updated_at,
     }
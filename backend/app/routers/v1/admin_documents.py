@@ -8,19 +8,23 @@ from datetime import UTC, datetime, timedelta
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import func, select
+from sqlalchemy import Text, cast, func, or_, select, tuple_
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, aliased
 from starlette import status
 
+from app.core.config import get_settings
 from app.core.database import get_db
 from app.core.deps import AdminUser, CurrentUser, pagination_params
 from app.core.errors import raise_api_error
-from app.db.utils import apply_update, get_or_404, paginate_stmt
-from app.models.academics import Student
-from app.models.documents import DocumentStatus, DocumentType, StudentDocument
+from app.db.utils import apply_update, get_or_404, paginate_rows, paginate_stmt
+from app.models.academics import Course, Student, Term
+from app.models.documents import DocumentBatch, DocumentStatus, DocumentType, StudentDocument
 from app.models.user import User
+from app.routers.v1.public import forget_verification
 from app.schemas.admin_documents import (
+    AdminDocumentBatchCreateRequest,
+    AdminDocumentBatchResponse,
     AdminDocumentStatsResponse,
     AdminStudentDocumentCreateRequest,
     AdminStudentDocumentGenerateRequest,
@@ -28,8 +32,11 @@ from app.schemas.admin_documents import (
     AdminStudentDocumentUpdateRequest,
 )
 from app.schemas.common import PaginatedResponse
+from app.services.document_batches import BATCH_DOCUMENT_TYPES, create_batch, resume_batch
+from app.services.documents import enqueue_generation
 
 router = APIRouter(prefix="/api/v1/admin", tags=["Admin - Documents"])
+settings = get_settings()
 
 
 def _parse_doc_type(value: str) -> DocumentType:
@@ -56,43 +63,48 @@ def _parse_doc_status(value: str) -> DocumentStatus:
         )
 
 
-def _enrich_document(doc: StudentDocument, db: Session) -> dict:
-    """Enrich document with student data."""
-    data = {
-        "id": doc.id,
-        "student_id": doc.student_id,
-        "doc_type": doc.doc_type.value if doc.doc_type else None,
-        "status": doc.status.value if doc.status else None,
-        "title": doc.title,
-        "description": doc.description,
-        "file_url": doc.file_url,
-        "file_size": doc.file_size,
-        "file_type": doc.file_type,
-        "generated_at": doc.generated_at,
-        "requested_at": doc.requested_at,
-        "requested_by": doc.requested_by,
-        "created_at": doc.created_at,
-        "updated_at": doc.updated_at,
-    }
-
-    # Enrich with student data
-    student = db.query(Student).filter(Student.user_id == doc.student_id).first()
-    if student:
-        data["student_name"] = student.full_name
-        data["student_ra"] = student.ra
-
-    # Enrich with requester name
-    if doc.requested_by:
-        requester_student = db.query(Student).filter(Student.user_id == doc.requested_by).first()
-        if requester_student:
-            data["requested_by_name"] = requester_student.full_name
-        else:
-            # Fallback to email for admin users
-            requester_user = db.query(User).filter(User.id == doc.requested_by).first()
-            if requester_user:
-                data["requested_by_name"] = requester_user.email.split('@')[0]
+def _student_document_list_stmt():
+    """Column projection for document responses (student and requester joined in SQL)."""
+    requester = aliased(Student)
+    return (
+        select(
+            StudentDocument.id,
+            StudentDocument.student_id,
+            Student.full_name.label("student_name"),
+            Student.ra.label("student_ra"),
+            cast(StudentDocument.doc_type, Text).label("doc_type"),
+            cast(StudentDocument.status, Text).label("status"),
+            StudentDocument.title,
+            StudentDocument.description,
+            StudentDocument.file_url,
+            StudentDocument.file_size,
+            StudentDocument.file_type,
+            StudentDocument.generated_at,
+            StudentDocument.requested_at,
+            StudentDocument.requested_by,
+            # Admin requesters fall back to the email prefix
+            func.coalesce(
+                requester.full_name, func.split_part(cast(User.email, Text), "@", 1)
+            ).label("requested_by_name"),
+            StudentDocument.created_at,
+            StudentDocument.updated_at,
+        )
+        .select_from(StudentDocument)
+        .outerjoin(Student, Student.user_id == StudentDocument.student_id)
+        .outerjoin(requester, requester.user_id == StudentDocument.requested_by)
+        .outerjoin(User, User.id == StudentDocument.requested_by)
+    )
 
-    return data
+
+def _document_response(db: Session, doc_id: UUID) -> AdminStudentDocumentResponse:
+    row = db.execute(_student_document_list_stmt().where(StudentDocument.id == doc_id)).first()
+    if row is None:
+        raise_api_error(
+            status_code=status.HTTP_404_NOT_FOUND,
+            code="NOT_FOUND",
+            message="Documento não encontrado.",
+        )
+    return AdminStudentDocumentResponse(**row._mapping)
 
 
 # --- Statistics endpoint ---
@@ -105,46 +117,43 @@ def get_document_stats(
     _: AdminUser,
     db: Session = Depends(get_db),
 ) -> AdminDocumentStatsResponse:
-    """Get document statistics."""
-    total = db.query(func.count(StudentDocument.id)).scalar() or 0
-
-    # By status
-    by_status_rows = (
-        db.query(StudentDocument.status, func.count(StudentDocument.id))
-        .group_by(StudentDocument.status)
-        .all()
-    )
-    by_status = {str(row[0].value): row[1] for row in by_status_rows}
-
-    # By type
-    by_type_rows = (
-        db.query(StudentDocument.doc_type, func.count(StudentDocument.id))
-        .group_by(StudentDocument.doc_type)
-        .all()
-    )
-    by_type = {str(row[0].value): row[1] for row in by_type_rows}
-
-    # Counts
-    generating = db.query(func.count(StudentDocument.id)).filter(
-        StudentDocument.status == DocumentStatus.GENERATING
-    ).scalar() or 0
-
-    error = db.query(func.count(StudentDocument.id)).filter(
-        StudentDocument.status == DocumentStatus.ERROR
-    ).scalar() or 0
-
-    # Recent requests (last 7 days)
+    """
+    Document statistics in one statement: GROUPING SETS count per status, per
+    type and overall; recent requests (last 7 days) FILTER the overall row.
+    """
     seven_days_ago = datetime.now(UTC) - timedelta(days=7)
-    recent = db.query(func.count(StudentDocument.id)).filter(
-        StudentDocument.requested_at >= seven_days_ago
-    ).scalar() or 0
+    rows = db.execute(
+        select(
+            StudentDocument.status,
+            StudentDocument.doc_type,
+            # Bit 1: status aggregated away, bit 0: doc_type aggregated away
+            func.grouping(StudentDocument.status, StudentDocument.doc_type).label("grouping"),
+            func.count().label("total"),
+            func.count().filter(StudentDocument.requested_at >= seven_days_ago).label("recent"),
+        ).group_by(
+            func.grouping_sets(
+                tuple_(StudentDocument.status), tuple_(StudentDocument.doc_type), tuple_()
+            )
+        )
+    ).all()
+
+    by_status: dict[str, int] = {}
+    by_type: dict[str, int] = {}
+    total = recent = 0
+    for row in rows:
+        if row.grouping == 1:
+            by_status[row.status.value] = row.total
+        elif row.grouping == 2:
+            by_type[row.doc_type.value] = row.total
+        else:
+            total, recent = row.total, row.recent
 
     return AdminDocumentStatsResponse(
         total_documents=total,
         by_status=by_status,
         by_type=by_type,
-        generating_count=generating,
-        error_count=error,
+        generating_count=by_status.get(DocumentStatus.GENERATING.value, 0),
+        error_count=by_status.get(DocumentStatus.ERROR.value, 0),
         recent_requests=recent,
     )
 
@@ -163,7 +172,9 @@ def list_student_documents(
     status: str | None = Query(None, description="Filtrar por status (AVAILABLE, GENERATING, ERROR)"),
     search: str | None = Query(None, description="Busca em title, description ou nome do aluno"),
 ) -> PaginatedResponse[AdminStudentDocumentResponse]:
-    stmt = select(StudentDocument).order_by(StudentDocument.created_at.desc())
+    stmt = _student_document_list_stmt().order_by(
+        StudentDocument.created_at.desc(), StudentDocument.id
+    )
 
     # Apply filters
     if student_id:
@@ -182,37 +193,18 @@ def list_student_documents(
     # Search filter (title, description, or student name)
     if search:
         search_term = f"%{search}%"
-        # Get student IDs matching the search
-        matching_students = (
-            db.query(Student.user_id)
-            .join(User, Student.user_id == User.id)
-            .filter(User.name.ilike(search_term))
-            .all()
-        )
-        student_ids = [s[0] for s in matching_students]
-
-        if student_ids:
-            stmt = stmt.where(
-                (StudentDocument.title.ilike(search_term)) |
-                (StudentDocument.description.ilike(search_term)) |
-                (StudentDocument.student_id.in_(student_ids))
+        stmt = stmt.where(
+            or_(
+                StudentDocument.title.ilike(search_term),
+                StudentDocument.description.ilike(search_term),
+                Student.full_name.ilike(search_term),
             )
-        else:
-            stmt = stmt.where(
-                (StudentDocument.title.ilike(search_term)) |
-                (StudentDocument.description.ilike(search_term))
-            )
-
-    items, total = paginate_stmt(db, stmt, limit=pagination["limit"], offset=pagination["offset"])
+        )
 
-    # Enrich each item
-    enriched_items = [
-        AdminStudentDocumentResponse(**_enrich_document(doc, db))
-        for doc in items
-    ]
+    rows, total = paginate_rows(db, stmt, limit=pagination["limit"], offset=pagination["offset"])
 
     return PaginatedResponse[AdminStudentDocumentResponse](
-        items=enriched_items,
+        items=[AdminStudentDocumentResponse(**row._mapping) for row in rows],
         limit=pagination["limit"],
         offset=pagination["offset"],
         total=total,
@@ -253,14 +245,13 @@ def create_student_document(
             code="STUDENT_DOCUMENT_CONFLICT",
             message="Conflito ao criar documento (student+doc_type deve ser único).",
         )
-    db.refresh(doc)
-    return AdminStudentDocumentResponse(**_enrich_document(doc, db))
+    return _document_response(db, doc.id)
 
 
 @router.post(
     "/student-documents/generate",
     response_model=AdminStudentDocumentResponse,
-    status_code=status.HTTP_201_CREATED,
+    status_code=status.HTTP_202_ACCEPTED,
     summary="Solicitar geração de documento",
 )
 def generate_student_document(
@@ -269,8 +260,9 @@ def generate_student_document(
     db: Session = Depends(get_db),
 ) -> AdminStudentDocumentResponse:
     """
-    Request generation of a new document for a student.
-    Creates the document with GENERATING status.
+    Request generation of a new document for a student (202).
+    Creates the document with GENERATING status and queues it for the
+    document worker pool.
     """
     # Check if student exists
     student = db.query(Student).filter(Student.user_id == payload.student_id).first()
@@ -292,7 +284,7 @@ def generate_student_document(
     )
     db.add(doc)
     try:
-        db.commit()
+        db.flush()
     except IntegrityError:
         db.rollback()
         raise_api_error(
@@ -300,8 +292,135 @@ def generate_student_document(
             code="STUDENT_DOCUMENT_CONFLICT",
             message="Documento deste tipo já existe para o aluno.",
         )
-    db.refresh(doc)
-    return AdminStudentDocumentResponse(**_enrich_document(doc, db))
+    enqueue_generation(db, doc)
+    db.commit()
+    return _document_response(db, doc.id)
+
+
+# ==================== BULK GENERATION ====================
+
+
+def _batch_response(batch: DocumentBatch) -> AdminDocumentBatchResponse:
+    processed = batch.generated + batch.failed
+    return AdminDocumentBatchResponse(
+        id=batch.id,
+        doc_type=batch.doc_type.value,
+        course_id=batch.course_id,
+        term_id=batch.term_id,
+        status=batch.status.value,
+        total_students=batch.total_students,
+        total_chunks=batch.total_chunks,
+        done_chunks=batch.done_chunks,
+        generated=batch.generated,
+        failed=batch.failed,
+        progress=(
+            round(100 * processed / batch.total_students, 1) if batch.total_students else 100.0
+        ),
+        requested_by=batch.requested_by,
+        created_at=batch.created_at,
+        finished_at=batch.finished_at,
+    )
+
+
+@router.post(
+    "/student-documents/batches",
+    response_model=AdminDocumentBatchResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Gerar documentos em lote (curso e/ou período)",
+)
+def create_document_batch(
+    admin: AdminUser,
+    payload: AdminDocumentBatchCreateRequest,
+    db: Session = Depends(get_db),
+) -> AdminDocumentBatchResponse:
+    """
+    Queue STUDENT_CARD or DECLARATION generation for every active student of
+    the course and/or enrolled in the term (202). The document worker pool
+    processes the batch in chunks; follow it with GET .../batches/{id}.
+    """
+    doc_type = _parse_doc_type(payload.doc_type)
+    if doc_type not in BATCH_DOCUMENT_TYPES:
+        raise_api_error(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            code="VALIDATION_ERROR",
+            message="Geração em lote disponível apenas para carteirinhas e declarações.",
+            details={"allowed": sorted(d.value for d in BATCH_DOCUMENT_TYPES)},
+        )
+    if not payload.course_id and not payload.term_id:
+        raise_api_error(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            code="VALIDATION_ERROR",
+            message="Informe course_id e/ou term_id.",
+        )
+    if payload.course_id:
+        get_or_404(
+            db, Course, payload.course_id, code="COURSE_NOT_FOUND", message="Curso não encontrado."
+        )
+    if payload.term_id:
+        get_or_404(
+            db, Term, payload.term_id, code="TERM_NOT_FOUND", message="Período não encontrado."
+        )
+
+    batch = create_batch(
+        db,
+        doc_type=doc_type,
+        course_id=payload.course_id,
+        term_id=payload.term_id,
+        requested_by=admin.id,
+        chunk_size=settings.document_bulk_chunk_size,
+    )
+    db.commit()
+    db.refresh(batch)
+    return _batch_response(batch)
+
+
+@router.get(
+    "/student-documents/batches",
+    response_model=PaginatedResponse[AdminDocumentBatchResponse],
+    summary="Listar lotes de geração de documentos",
+)
+def list_document_batches(
+    _: AdminUser,
+    db: Session = Depends(get_db),
+    pagination: dict[str, int] = Depends(pagination_params),
+) -> PaginatedResponse[AdminDocumentBatchResponse]:
+    stmt = select(DocumentBatch).order_by(DocumentBatch.created_at.desc(), DocumentBatch.id)
+    items, total = paginate_stmt(db, stmt, limit=pagination["limit"], offset=pagination["offset"])
+    return PaginatedResponse[AdminDocumentBatchResponse](
+        items=[_batch_response(batch) for batch in items],
+        limit=pagination["limit"],
+        offset=pagination["offset"],
+        total=total,
+    )
+
+
+@router.get(
+    "/student-documents/batches/{batch_id}",
+    response_model=AdminDocumentBatchResponse,
+    summary="Progresso de um lote de geração",
+)
+def get_document_batch(
+    batch_id: UUID, _: AdminUser, db: Session = Depends(get_db)
+) -> AdminDocumentBatchResponse:
+    batch = get_or_404(db, DocumentBatch, batch_id, message="Lote não encontrado.")
+    return _batch_response(batch)
+
+
+@router.post(
+    "/student-documents/batches/{batch_id}/resume",
+    response_model=AdminDocumentBatchResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Retomar lote (reprocessa falhas)",
+)
+def resume_document_batch(
+    batch_id: UUID, _: AdminUser, db: Session = Depends(get_db)
+) -> AdminDocumentBatchResponse:
+    """Requeue the chunks that failed, or that had students fail to render."""
+    batch = get_or_404(db, DocumentBatch, batch_id, message="Lote não encontrado.")
+    resume_batch(db, batch)
+    db.commit()
+    db.refresh(batch)
+    return _batch_response(batch)
 
 
 @router.get(
@@ -312,8 +431,7 @@ def generate_student_document(
 def get_student_document(
     doc_id: UUID, _: AdminUser, db: Session = Depends(get_db)
 ) -> AdminStudentDocumentResponse:
-    doc = get_or_404(db, StudentDocument, doc_id, message="Documento não encontrado.")
-    return AdminStudentDocumentResponse(**_enrich_document(doc, db))
+    return _document_response(db, doc_id)
 
 
 @router.patch(
@@ -333,8 +451,8 @@ def patch_student_document(
         data["status"] = _parse_doc_status(data["status"])
     apply_update(doc, data)
     db.commit()
-    db.refresh(doc)
-    return AdminStudentDocumentResponse(**_enrich_document(doc, db))
+    forget_verification(doc.verification_code)
+    return _document_response(db, doc.id)
 
 
 @router.delete(
@@ -344,5 +462,7 @@ def patch_student_document(
 )
 def delete_student_document(doc_id: UUID, _: AdminUser, db: Session = Depends(get_db)) -> None:
     doc = get_or_404(db, StudentDocument, doc_id, message="Documento não encontrado.")
+    code = doc.verification_code
     db.delete(doc)
     db.commit()
+    forget_verification(code)
@@ -5,20 +5,36 @@ UniFECAF Portal do Aluno - API v1 Admin Finance Router.
 from __future__ import annotations
 
 from datetime import UTC, date, datetime
-from decimal import Decimal
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from typing import Literal
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy import case, func, select
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, case, func, or_, select, tuple_
+from sqlalchemy.orm import Session, joinedload
 from starlette import status
 
 from app.core.database import get_db
 from app.core.deps import AdminUser, pagination_params
 from app.core.errors import raise_api_error
-from app.db.utils import apply_update, get_or_404, paginate_stmt
-from app.models.academics import Student, StudentStatus, Term, SectionEnrollment
-from app.models.finance import Invoice, InvoiceStatus, Payment, PaymentStatus
+from app.db.utils import (
+    apply_update,
+    decode_cursor,
+    encode_cursor,
+    get_or_404,
+    paginate_rows,
+    paginate_stmt,
+)
+from app.models.academics import Course, Student, StudentStatus, Term, SectionEnrollment
+from app.models.finance import (
+    Invoice,
+    InvoiceStatus,
+    NegotiationPlan,
+    Payment,
+    PaymentStatus,
+    receivables_aging,
+)
 from app.schemas.admin_finance import (
     AdminInvoiceCreateRequest,
     AdminInvoiceResponse,
@@ -26,17 +42,42 @@ from app.schemas.admin_finance import (
     AdminPaymentCreateRequest,
     AdminPaymentResponse,
     AdminPaymentUpdateRequest,
+    AgingBuckets,
     InvoiceSummaryResponse,
     MarkInvoicePaidResponse,
     NegotiationExecuteRequest,
     NegotiationExecuteResponse,
     NegotiationInstallment,
+    NegotiationPlanRecordResponse,
     NegotiationPlanRequest,
     NegotiationPlanResponse,
     PaymentSummaryResponse,
+    PortfolioProjectionResponse,
+    ReceivablesAgingRefreshResponse,
+    ReceivablesAgingResponse,
+    ReceivablesAgingRow,
+    ReceivablesAgingStudentItem,
     StudentDebtSummary,
 )
-from app.schemas.common import PaginatedResponse
+from app.schemas.common import CursorPaginatedResponse, PaginatedResponse
+from app.services.exports import (
+    EXPORT_MEDIA_TYPES,
+    ExportColumn,
+    ExportFormat,
+    parquet_available,
+    stream_export,
+)
+from app.services.fees import (
+    calculate_amount_due,
+    calculate_amounts_due,
+    micros_to_decimal,
+    project_portfolio,
+)
+from app.services.negotiation import execute_negotiation
+from app.services.receivables_aging import (
+    refresh_receivables_aging,
+    refresh_receivables_aging_job,
+)
 
 router = APIRouter(prefix="/api/v1/admin", tags=["Admin - Finance"])
 
@@ -46,22 +87,14 @@ router = APIRouter(prefix="/api/v1/admin", tags=["Admin - Finance"])
 
 def _calculate_amount_due(invoice: Invoice) -> Decimal:
     """Calculate amount due with fine and interest if overdue."""
-    if invoice.status in (InvoiceStatus.PAID, InvoiceStatus.CANCELED):
-        return invoice.amount
-
-    today = date.today()
-    if invoice.due_date >= today:
-        return invoice.amount
-
-    # Calculate days/months overdue
-    days_overdue = (today - invoice.due_date).days
-    months_overdue = max(1, days_overdue // 30)
-
-    # Single fine + monthly interest
-    fine = invoice.amount * (invoice.fine_rate / Decimal("100"))
-    interest = invoice.amount * (invoice.interest_rate / Decimal("100")) * months_overdue
-
-    return invoice.amount + fine + interest
+    return calculate_amount_due(
+        invoice.amount,
+        invoice.fine_rate,
+        invoice.interest_rate,
+        invoice.due_date,
+        invoice.status,
+        date.today(),
+    )
 
 
 def _get_effective_status(invoice: Invoice) -> InvoiceStatus:
@@ -147,6 +180,167 @@ def _build_payment_response(db: Session, payment: Payment) -> AdminPaymentRespon
     )
 
 
+def _invoice_list_stmt():
+    """Column projection for invoice list views (no Invoice/Student/Term hydration)."""
+    payments_count = (
+        select(func.count(Payment.id))
+        .where(Payment.invoice_id == Invoice.id)
+        .correlate(Invoice)
+        .scalar_subquery()
+    )
+    return (
+        select(
+            Invoice.id,
+            Invoice.reference,
+            Invoice.student_id,
+            Invoice.term_id,
+            Invoice.description,
+            Invoice.due_date,
+            Invoice.amount,
+            Invoice.fine_rate,
+            Invoice.interest_rate,
+            Invoice.installment_number,
+            Invoice.installment_total,
+            Invoice.status,
+            Invoice.created_at,
+            Invoice.updated_at,
+            Student.full_name.label("student_name"),
+            Student.ra.label("student_ra"),
+            Term.code.label("term_code"),
+            payments_count.label("payments_count"),
+        )
+        .select_from(Invoice)
+        .outerjoin(Student, Student.user_id == Invoice.student_id)
+        .outerjoin(Term, Term.id == Invoice.term_id)
+    )
+
+
+def _invoice_row_to_response(row) -> AdminInvoiceResponse:
+    """Build invoice response from a `_invoice_list_stmt` row."""
+    return AdminInvoiceResponse(
+        id=row.id,
+        reference=row.reference,
+        student_id=row.student_id,
+        student_name=row.student_name,
+        student_ra=row.student_ra,
+        term_id=row.term_id,
+        term_code=row.term_code,
+        description=row.description,
+        due_date=row.due_date,
+        amount=row.amount,
+        fine_rate=row.fine_rate,
+        interest_rate=row.interest_rate,
+        amount_due=_calculate_amount_due(row),
+        installment_number=row.installment_number,
+        installment_total=row.installment_total,
+        status=_get_effective_status(row).value,
+        payments_count=row.payments_count or 0,
+        created_at=row.created_at,
+        updated_at=row.updated_at,
+    )
+
+
+def _invoice_responses_by_ids(db: Session, invoice_ids: list[UUID]) -> list[AdminInvoiceResponse]:
+    """Build responses for a batch of invoices in a single projection query."""
+    if not invoice_ids:
+        return []
+    rows = db.execute(
+        _invoice_list_stmt()
+        .where(Invoice.id.in_(invoice_ids))
+        .order_by(Invoice.due_date, Invoice.installment_number)
+    ).all()
+    return [_invoice_row_to_response(row) for row in rows]
+
+
+def _payment_list_stmt():
+    """Column projection for payment list views (invoice/student columns joined in SQL)."""
+    return (
+        select(
+            Payment.id,
+            Payment.invoice_id,
+            Payment.amount,
+            Payment.status,
+            Payment.method,
+            Payment.provider,
+            Payment.provider_ref,
+            Payment.paid_at,
+            Payment.created_at,
+            Payment.updated_at,
+            Invoice.reference.label("invoice_reference"),
+            Student.full_name.label("student_name"),
+            Student.ra.label("student_ra"),
+        )
+        .select_from(Payment)
+        .join(Invoice, Invoice.id == Payment.invoice_id)
+        .outerjoin(Student, Student.user_id == Invoice.student_id)
+    )
+
+
+def _payment_row_to_response(row) -> AdminPaymentResponse:
+    """Build payment response from a `_payment_list_stmt` row."""
+    return AdminPaymentResponse(
+        id=row.id,
+        invoice_id=row.invoice_id,
+        invoice_reference=row.invoice_reference,
+        student_name=row.student_name,
+        student_ra=row.student_ra,
+        amount=row.amount,
+        status=row.status.value,
+        method=row.method,
+        provider=row.provider,
+        provider_ref=row.provider_ref,
+        paid_at=row.paid_at,
+        created_at=row.created_at,
+        updated_at=row.updated_at,
+    )
+
+
+def _invoice_filters(
+    student_id: UUID | None,
+    status_filter: InvoiceStatus | None,
+    due_date_from: date | None,
+    due_date_to: date | None,
+    search: str | None,
+) -> list:
+    """Filters shared by the invoice list and export endpoints."""
+    conditions = []
+    if student_id:
+        conditions.append(Invoice.student_id == student_id)
+    if status_filter:
+        conditions.append(Invoice.status == status_filter)
+    if due_date_from:
+        conditions.append(Invoice.due_date >= due_date_from)
+    if due_date_to:
+        conditions.append(Invoice.due_date <= due_date_to)
+    if search:
+        # Search in reference and description
+        search_pattern = f"%{search}%"
+        conditions.append(
+            Invoice.reference.ilike(search_pattern) | Invoice.description.ilike(search_pattern)
+        )
+    return conditions
+
+
+def _payment_filters(
+    invoice_id: UUID | None,
+    student_id: UUID | None,
+    status_filter: PaymentStatus | None,
+    search: str | None,
+) -> list:
+    """Filters shared by the payment list and export endpoints (Invoice is joined)."""
+    conditions = []
+    if invoice_id:
+        conditions.append(Payment.invoice_id == invoice_id)
+    if student_id:
+        conditions.append(Invoice.student_id == student_id)
+    if status_filter:
+        conditions.append(Payment.status == status_filter)
+    if search:
+        # Search in invoice reference
+        conditions.append(Invoice.reference.ilike(f"%{search}%"))
+    return conditions
+
+
 def _check_invoice_editable(invoice: Invoice, allow_paid_description: bool = False) -> None:
     """Check if invoice can be edited."""
     if invoice.status == InvoiceStatus.CANCELED:
@@ -200,6 +394,93 @@ def _update_invoice_status_from_payments(db: Session, invoice: Invoice) -> None:
             invoice.status = InvoiceStatus.PENDING
 
 
+# ==================== EXPORT HELPERS ====================
+
+_INVOICE_EXPORT_COLUMNS = [
+    ExportColumn("id"),
+    ExportColumn("reference"),
+    ExportColumn("student_id"),
+    ExportColumn("student_name"),
+    ExportColumn("student_ra"),
+    ExportColumn("term_id"),
+    ExportColumn("term_code"),
+    ExportColumn("description"),
+    ExportColumn("due_date", "date"),
+    ExportColumn("amount", "money"),
+    ExportColumn("fine_rate", "money"),
+    ExportColumn("interest_rate", "money"),
+    ExportColumn("amount_due", "money"),
+    ExportColumn("installment_number", "int"),
+    ExportColumn("installment_total", "int"),
+    ExportColumn("status"),
+    ExportColumn("payments_count", "int"),
+    ExportColumn("created_at", "datetime"),
+    ExportColumn("updated_at", "datetime"),
+]
+
+_PAYMENT_EXPORT_COLUMNS = [
+    ExportColumn("id"),
+    ExportColumn("invoice_id"),
+    ExportColumn("invoice_reference"),
+    ExportColumn("student_name"),
+    ExportColumn("student_ra"),
+    ExportColumn("amount", "money"),
+    ExportColumn("status"),
+    ExportColumn("method"),
+    ExportColumn("provider"),
+    ExportColumn("provider_ref"),
+    ExportColumn("paid_at", "datetime"),
+    ExportColumn("created_at", "datetime"),
+    ExportColumn("updated_at", "datetime"),
+]
+
+
+def _invoice_export_rows(rows):
+    """Add amount_due (batch fee calculation, rounded to cents) and effective status."""
+    today = date.today()
+    cent = Decimal("0.01")
+    for row, amount_due in zip(rows, calculate_amounts_due(rows, today), strict=True):
+        yield (
+            row.id,
+            row.reference,
+            row.student_id,
+            row.student_name,
+            row.student_ra,
+            row.term_id,
+            row.term_code,
+            row.description,
+            row.due_date,
+            row.amount,
+            row.fine_rate,
+            row.interest_rate,
+            amount_due.quantize(cent, rounding=ROUND_HALF_UP),
+            row.installment_number,
+            row.installment_total,
+            _get_effective_status(row),
+            row.payments_count or 0,
+            row.created_at,
+            row.updated_at,
+        )
+
+
+def _check_export_format(export_format: ExportFormat) -> None:
+    if export_format == "parquet" and not parquet_available():
+        raise_api_error(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            code="EXPORT_FORMAT_UNAVAILABLE",
+            message="Exportação em Parquet indisponível neste servidor.",
+        )
+
+
+def _export_response(body, name: str, export_format: ExportFormat) -> StreamingResponse:
+    filename = f"{name}-{date.today():%Y%m%d}.{export_format}"
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 # ==================== INVOICE ENDPOINTS ====================
 
 
@@ -216,33 +497,49 @@ def list_invoices(
     due_date_to: date | None = Query(None),
     search: str | None = Query(None),
 ) -> PaginatedResponse[AdminInvoiceResponse]:
-    stmt = select(Invoice).order_by(Invoice.due_date.desc())
-
-    if student_id:
-        stmt = stmt.where(Invoice.student_id == student_id)
-    if status_filter:
-        stmt = stmt.where(Invoice.status == status_filter)
-    if due_date_from:
-        stmt = stmt.where(Invoice.due_date >= due_date_from)
-    if due_date_to:
-        stmt = stmt.where(Invoice.due_date <= due_date_to)
-    if search:
-        # Search in reference and description
-        search_pattern = f"%{search}%"
-        stmt = stmt.where(
-            Invoice.reference.ilike(search_pattern) | Invoice.description.ilike(search_pattern)
-        )
-
-    items, total = paginate_stmt(db, stmt, limit=pagination["limit"], offset=pagination["offset"])
+    stmt = (
+        _invoice_list_stmt()
+        .where(*_invoice_filters(student_id, status_filter, due_date_from, due_date_to, search))
+        .order_by(Invoice.due_date.desc())
+    )
+    rows, total = paginate_rows(db, stmt, limit=pagination["limit"], offset=pagination["offset"])
 
     return PaginatedResponse[AdminInvoiceResponse](
-        items=[_build_invoice_response(db, i) for i in items],
+        items=[_invoice_row_to_response(row) for row in rows],
         limit=pagination["limit"],
         offset=pagination["offset"],
         total=total,
     )
 
 
+@router.get(
+    "/invoices/export",
+    response_class=StreamingResponse,
+    summary="Exportar invoices (CSV, NDJSON ou Parquet, em streaming)",
+)
+def export_invoices(
+    _: AdminUser,
+    export_format: ExportFormat = Query("csv", alias="format"),
+    student_id: UUID | None = Query(None),
+    status_filter: InvoiceStatus | None = Query(None, alias="status"),
+    due_date_from: date | None = Query(None),
+    due_date_to: date | None = Query(None),
+    search: str | None = Query(None),
+) -> StreamingResponse:
+    """Stream every invoice matching the `list_invoices` filters."""
+    _check_export_format(export_format)
+    stmt = (
+        _invoice_list_stmt()
+        .where(*_invoice_filters(student_id, status_filter, due_date_from, due_date_to, search))
+        .order_by(Invoice.due_date.desc(), Invoice.id)
+    )
+    return _export_response(
+        stream_export(stmt, _INVOICE_EXPORT_COLUMNS, export_format, transform=_invoice_export_rows),
+        "invoices",
+        export_format,
+    )
+
+
 @router.get(
     "/invoices/summary",
     response_model=InvoiceSummaryResponse,
@@ -419,7 +716,13 @@ def create_invoice(
 def get_invoice(
     invoice_id: UUID, _: AdminUser, db: Session = Depends(get_db)
 ) -> AdminInvoiceResponse:
-    invoice = get_or_404(db, Invoice, invoice_id, message="Fatura não encontrada.")
+    invoice = get_or_404(
+        db,
+        Invoice,
+        invoice_id,
+        message="Fatura não encontrada.",
+        options=[joinedload(Invoice.student), joinedload(Invoice.term)],
+    )
     return _build_invoice_response(db, invoice)
 
 
@@ -599,34 +902,48 @@ def list_payments(
     status_filter: PaymentStatus | None = Query(None, alias="status"),
     search: str | None = Query(None),
 ) -> PaginatedResponse[AdminPaymentResponse]:
-    stmt = select(Payment).order_by(Payment.created_at.desc())
-    
-    # Track if we already joined Invoice
-    has_joined_invoice = False
-
-    if invoice_id:
-        stmt = stmt.where(Payment.invoice_id == invoice_id)
-    if student_id:
-        stmt = stmt.join(Invoice).where(Invoice.student_id == student_id)
-        has_joined_invoice = True
-    if status_filter:
-        stmt = stmt.where(Payment.status == status_filter)
-    if search:
-        # Search in invoice reference
-        if not has_joined_invoice:
-            stmt = stmt.join(Invoice)
-        stmt = stmt.where(Invoice.reference.ilike(f"%{search}%"))
-
-    items, total = paginate_stmt(db, stmt, limit=pagination["limit"], offset=pagination["offset"])
+    stmt = (
+        _payment_list_stmt()
+        .where(*_payment_filters(invoice_id, student_id, status_filter, search))
+        .order_by(Payment.created_at.desc())
+    )
+    rows, total = paginate_rows(db, stmt, limit=pagination["limit"], offset=pagination["offset"])
 
     return PaginatedResponse[AdminPaymentResponse](
-        items=[_build_payment_response(db, p) for p in items],
+        items=[_payment_row_to_response(row) for row in rows],
         limit=pagination["limit"],
         offset=pagination["offset"],
         total=total,
     )
 
 
+@router.get(
+    "/payments/export",
+    response_class=StreamingResponse,
+    summary="Exportar payments (CSV, NDJSON ou Parquet, em streaming)",
+)
+def export_payments(
+    _: AdminUser,
+    export_format: ExportFormat = Query("csv", alias="format"),
+    invoice_id: UUID | None = Query(None),
+    student_id: UUID | None = Query(None),
+    status_filter: PaymentStatus | None = Query(None, alias="status"),
+    search: str | None = Query(None),
+) -> StreamingResponse:
+    """Stream every payment matching the `list_payments` filters."""
+    _check_export_format(export_format)
+    stmt = (
+        _payment_list_stmt()
+        .where(*_payment_filters(invoice_id, student_id, status_filter, search))
+        .order_by(Payment.created_at.desc(), Payment.id)
+    )
+    return _export_response(
+        stream_export(stmt, _PAYMENT_EXPORT_COLUMNS, export_format),
+        "payments",
+        export_format,
+    )
+
+
 @router.get(
     "/payments/summary",
     response_model=PaymentSummaryResponse,
@@ -770,7 +1087,13 @@ def create_payment(
 def get_payment(
     payment_id: UUID, _: AdminUser, db: Session = Depends(get_db)
 ) -> AdminPaymentResponse:
-    payment = get_or_404(db, Payment, payment_id, message="Pagamento não encontrado.")
+    payment = get_or_404(
+        db,
+        Payment,
+        payment_id,
+        message="Pagamento não encontrado.",
+        options=[joinedload(Payment.invoice).joinedload(Invoice.student)],
+    )
     return _build_payment_response(db, payment)
 
 
@@ -915,22 +1238,18 @@ def get_student_debt_summary(
     
     # Get pending/overdue invoices
     today = date.today()
-    pending_invoices = db.scalars(
-        select(Invoice)
+    pending_invoices = db.execute(
+        _invoice_list_stmt()
         .where(
             Invoice.student_id == student_id,
             Invoice.status.in_([InvoiceStatus.PENDING, InvoiceStatus.OVERDUE]),
         )
         .order_by(Invoice.due_date)
     ).all()
-    
+
     # Calculate totals
-    total_pending = Decimal("0")
-    total_with_fees = Decimal("0")
-    
-    for inv in pending_invoices:
-        total_pending += inv.amount
-        total_with_fees += _calculate_amount_due(inv)
+    total_pending = sum((inv.amount for inv in pending_invoices), Decimal("0"))
+    total_with_fees = sum(calculate_amounts_due(pending_invoices, today), Decimal("0"))
     
     # Check if student has current term enrollment
     current_term = db.scalar(
@@ -952,7 +1271,7 @@ def get_student_debt_summary(
         ) or 0
         has_enrollment = enrollment_count > 0
     
-    invoice_responses = [_build_invoice_response(db, inv) for inv in pending_invoices]
+    invoice_responses = [_invoice_row_to_response(inv) for inv in pending_invoices]
     
     return StudentDebtSummary(
         student_id=student_id,
@@ -1059,10 +1378,15 @@ def preview_negotiation_plan(
 )
 def execute_negotiation_plan(
     payload: NegotiationExecuteRequest,
-    _: AdminUser,
+    admin: AdminUser,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
 ) -> NegotiationExecuteResponse:
-    """Execute a negotiation plan: create new invoices and cancel old ones."""
+    """Execute a negotiation plan: create new invoices and cancel old ones.
+
+    Runs as one transaction holding row locks on the student's open invoices,
+    so concurrent negotiations for the same student cannot both succeed.
+    """
     student = get_or_404(db, Student, payload.student_id, message="Aluno não encontrado.")
     
     if student.status == StudentStatus.DELETED:
@@ -1082,53 +1406,111 @@ def execute_negotiation_plan(
                 message=f"Parcela {inst.installment_number} tem data de vencimento no passado.",
             )
     
-    # Cancel old pending invoices
-    canceled_ids: list[UUID] = []
-    if payload.cancel_pending_ids:
-        for inv_id in payload.cancel_pending_ids:
-            invoice = db.get(Invoice, inv_id)
-            if invoice and invoice.student_id == payload.student_id:
-                if invoice.status in (InvoiceStatus.PENDING, InvoiceStatus.OVERDUE):
-                    # Check no payments
-                    payments_count = db.scalar(
-                        select(func.count()).where(Payment.invoice_id == inv_id)
-                    ) or 0
-                    if payments_count == 0:
-                        invoice.status = InvoiceStatus.CANCELED
-                        canceled_ids.append(inv_id)
-    
-    # Create new invoices
-    created_invoices: list[Invoice] = []
-    num_installments = len(payload.installments)
-    
-    for inst in payload.installments:
-        invoice = Invoice(
-            student_id=payload.student_id,
-            term_id=payload.term_id,
-            description=inst.description,
-            due_date=inst.due_date,
-            amount=inst.amount,
-            fine_rate=payload.fine_rate,
-            interest_rate=payload.interest_rate,
-            installment_number=inst.installment_number,
-            installment_total=num_installments,
-            status=InvoiceStatus.PENDING,
-        )
-        db.add(invoice)
-        created_invoices.append(invoice)
-    
+    result = execute_negotiation(
+        db,
+        student_id=payload.student_id,
+        term_id=payload.term_id,
+        installments=payload.installments,
+        cancel_invoice_ids=payload.cancel_pending_ids,
+        fine_rate=payload.fine_rate,
+        interest_rate=payload.interest_rate,
+        created_by=admin.id,
+    )
+    plan_id = result.plan.id
     db.commit()
-    
-    # Refresh to get generated IDs
-    for inv in created_invoices:
-        db.refresh(inv)
-    
+
+    background_tasks.add_task(refresh_receivables_aging_job)
+
     return NegotiationExecuteResponse(
         student_id=payload.student_id,
-        created_invoices=[_build_invoice_response(db, inv) for inv in created_invoices],
-        canceled_invoices=canceled_ids,
-        total_created=len(created_invoices),
-        total_canceled=len(canceled_ids),
+        plan_id=plan_id,
+        created_invoices=_invoice_responses_by_ids(db, result.created_invoice_ids),
+        canceled_invoices=result.canceled_invoice_ids,
+        total_created=len(result.created_invoice_ids),
+        total_canceled=len(result.canceled_invoice_ids),
+    )
+
+
+def _build_negotiation_plan_response(
+    db: Session, plan: NegotiationPlan, *, student_name: str | None, with_installments: bool
+) -> NegotiationPlanRecordResponse:
+    installments: list[AdminInvoiceResponse] = []
+    if with_installments:
+        rows = db.execute(
+            _invoice_list_stmt()
+            .where(Invoice.negotiation_plan_id == plan.id)
+            .order_by(Invoice.installment_number)
+        ).all()
+        installments = [_invoice_row_to_response(row) for row in rows]
+
+    return NegotiationPlanRecordResponse(
+        id=plan.id,
+        student_id=plan.student_id,
+        student_name=student_name,
+        term_id=plan.term_id,
+        created_by=plan.created_by,
+        total_amount=plan.total_amount,
+        canceled_amount=plan.canceled_amount,
+        num_installments=plan.num_installments,
+        fine_rate=plan.fine_rate,
+        interest_rate=plan.interest_rate,
+        canceled_invoice_ids=plan.canceled_invoice_ids,
+        installments=installments,
+        created_at=plan.created_at,
+    )
+
+
+@router.get(
+    "/negotiation-plans/{plan_id}",
+    response_model=NegotiationPlanRecordResponse,
+    summary="Detalhar plano de negociação executado",
+)
+def get_negotiation_plan(
+    plan_id: UUID,
+    _: AdminUser,
+    db: Session = Depends(get_db),
+) -> NegotiationPlanRecordResponse:
+    plan = get_or_404(
+        db,
+        NegotiationPlan,
+        plan_id,
+        code="NEGOTIATION_PLAN_NOT_FOUND",
+        message="Plano de negociação não encontrado.",
+    )
+    student_name = db.scalar(select(Student.full_name).where(Student.user_id == plan.student_id))
+    return _build_negotiation_plan_response(
+        db, plan, student_name=student_name, with_installments=True
+    )
+
+
+@router.get(
+    "/students/{student_id}/negotiation-plans",
+    response_model=PaginatedResponse[NegotiationPlanRecordResponse],
+    summary="Listar planos de negociação de um aluno",
+)
+def list_student_negotiation_plans(
+    student_id: UUID,
+    _: AdminUser,
+    db: Session = Depends(get_db),
+    pagination: dict[str, int] = Depends(pagination_params),
+) -> PaginatedResponse[NegotiationPlanRecordResponse]:
+    student = get_or_404(db, Student, student_id, message="Aluno não encontrado.")
+    stmt = (
+        select(NegotiationPlan)
+        .where(NegotiationPlan.student_id == student_id)
+        .order_by(NegotiationPlan.created_at.desc())
+    )
+    plans, total = paginate_stmt(db, stmt, limit=pagination["limit"], offset=pagination["offset"])
+    return PaginatedResponse[NegotiationPlanRecordResponse](
+        items=[
+            _build_negotiation_plan_response(
+                db, plan, student_name=student.full_name, with_installments=False
+            )
+            for plan in plans
+        ],
+        limit=pagination["limit"],
+        offset=pagination["offset"],
+        total=total,
     )
 
 
@@ -1140,6 +1522,7 @@ def execute_negotiation_plan(
 def generate_term_invoices(
     student_id: UUID,
     _: AdminUser,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     term_id: UUID | None = Query(None, description="ID do termo (usa o atual se não informado)"),
     num_installments: int = Query(6, ge=1, le=12, description="Número de parcelas"),
@@ -1226,15 +1609,281 @@ def generate_term_invoices(
                 last_day = calendar.monthrange(current_date.year, next_month)[1]
                 current_date = date(current_date.year, next_month, last_day)
     
+    db.flush()
+    created_ids = [inv.id for inv in created_invoices]
     db.commit()
-    
-    for inv in created_invoices:
-        db.refresh(inv)
+
+    background_tasks.add_task(refresh_receivables_aging_job)
     
     return NegotiationExecuteResponse(
         student_id=student_id,
-        created_invoices=[_build_invoice_response(db, inv) for inv in created_invoices],
+        created_invoices=_invoice_responses_by_ids(db, created_ids),
         canceled_invoices=[],
         total_created=len(created_invoices),
         total_canceled=0,
     )
+
+
+# ==================== RECEIVABLES AGING ENDPOINTS ====================
+
+
+AgingBucket = Literal["open", "overdue", "current", "0-30", "31-60", "61-90", "90+"]
+
+# Bucket name -> aggregated column label (see _aging_sums)
+_AGING_SORT_COLUMNS: dict[str, str] = {
+    "open": "open_amount",
+    "overdue": "overdue_amount",
+    "current": "current_amount",
+    "0-30": "days_0_30",
+    "31-60": "days_31_60",
+    "61-90": "days_61_90",
+    "90+": "days_over_90",
+}
+
+
+def _aging_filters(course_id: UUID | None, term_id: UUID | None) -> list:
+    conditions = []
+    if course_id:
+        conditions.append(receivables_aging.c.course_id == course_id)
+    if term_id:
+        conditions.append(receivables_aging.c.term_id == term_id)
+    return conditions
+
+
+def _aging_sums() -> list:
+    mv = receivables_aging.c
+    return [
+        func.sum(mv.open_count).label("open_count"),
+        func.sum(mv.overdue_count).label("overdue_count"),
+        func.sum(mv.open_amount).label("open_amount"),
+        func.sum(mv.current_amount).label("current_amount"),
+        func.sum(mv.days_0_30).label("days_0_30"),
+        func.sum(mv.days_31_60).label("days_31_60"),
+        func.sum(mv.days_61_90).label("days_61_90"),
+        func.sum(mv.days_over_90).label("days_over_90"),
+        func.sum(mv.overdue_amount).label("overdue_amount"),
+    ]
+
+
+def _aging_buckets(row) -> AgingBuckets:
+    zero = Decimal("0.00")
+    return AgingBuckets(
+        current=row.current_amount or zero,
+        days_0_30=row.days_0_30 or zero,
+        days_31_60=row.days_31_60 or zero,
+        days_61_90=row.days_61_90 or zero,
+        days_over_90=row.days_over_90 or zero,
+        total_overdue=row.overdue_amount or zero,
+        total_open=row.open_amount or zero,
+    )
+
+
+@router.get(
+    "/receivables/aging",
+    response_model=ReceivablesAgingResponse,
+    summary="Aging de recebíveis por curso e período (0-30/31-60/61-90/90+)",
+)
+def get_receivables_aging(
+    _: AdminUser,
+    db: Session = Depends(get_db),
+    course_id: UUID | None = Query(None),
+    term_id: UUID | None = Query(None),
+) -> ReceivablesAgingResponse:
+    """Aging report read from the finance.receivables_aging materialized view.
+
+    Course/term rows and the grand total come from a single GROUPING SETS
+    query, so latency depends on the number of students with open invoices,
+    not on invoice volume.
+    """
+    mv = receivables_aging.c
+    grouped = (
+        select(
+            mv.course_id,
+            mv.term_id,
+            func.grouping(mv.course_id, mv.term_id).label("grouping_level"),
+            func.count(func.distinct(mv.student_id)).label("students_count"),
+            func.count(func.distinct(mv.student_id))
+            .filter(mv.overdue_amount > 0)
+            .label("delinquent_students_count"),
+            *_aging_sums(),
+            func.max(mv.as_of).label("as_of"),
+            func.max(mv.refreshed_at).label("refreshed_at"),
+        )
+        .where(*_aging_filters(course_id, term_id))
+        .group_by(func.grouping_sets(tuple_(mv.course_id, mv.term_id), tuple_()))
+    ).subquery()
+
+    stmt = (
+        select(grouped, Course.name.label("course_name"), Term.code.label("term_code"))
+        .outerjoin(Course, Course.id == grouped.c.course_id)
+        .outerjoin(Term, Term.id == grouped.c.term_id)
+        .order_by(grouped.c.grouping_level, Course.name, Term.start_date.desc())
+    )
+
+    rows: list[ReceivablesAgingRow] = []
+    total_row = None
+    for row in db.execute(stmt).all():
+        if row.grouping_level:
+            total_row = row
+            continue
+        rows.append(
+            ReceivablesAgingRow(
+                course_id=row.course_id,
+                course_name=row.course_name,
+                term_id=row.term_id,
+                term_code=row.term_code,
+                students_count=row.students_count or 0,
+                delinquent_students_count=row.delinquent_students_count or 0,
+                open_invoices_count=row.open_count or 0,
+                buckets=_aging_buckets(row),
+            )
+        )
+
+    if total_row is None:
+        return ReceivablesAgingResponse(rows=rows, totals=AgingBuckets())
+
+    return ReceivablesAgingResponse(
+        as_of=total_row.as_of,
+        refreshed_at=total_row.refreshed_at,
+        rows=rows,
+        totals=_aging_buckets(total_row),
+        students_count=total_row.students_count or 0,
+        delinquent_students_count=total_row.delinquent_students_count or 0,
+    )
+
+
+@router.get(
+    "/receivables/aging/students",
+    response_model=CursorPaginatedResponse[ReceivablesAgingStudentItem],
+    summary="Aging de recebíveis - alunos (paginação por cursor)",
+)
+def list_receivables_aging_students(
+    _: AdminUser,
+    db: Session = Depends(get_db),
+    course_id: UUID | None = Query(None),
+    term_id: UUID | None = Query(None),
+    bucket: AgingBucket = Query("overdue", description="Faixa usada para filtrar e ordenar."),
+    limit: int = Query(20, ge=1, le=500, description="Número máximo de itens."),
+    cursor: str | None = Query(None, description="Cursor retornado em next_cursor."),
+) -> CursorPaginatedResponse[ReceivablesAgingStudentItem]:
+    """Students with a positive amount in `bucket`, largest first.
+
+    Keyset pagination on (amount DESC, student_id) keeps deep pages as cheap
+    as the first one.
+    """
+    mv = receivables_aging.c
+    per_student = (
+        select(
+            mv.student_id,
+            *_aging_sums(),
+            func.max(mv.max_days_overdue).label("max_days_overdue"),
+        )
+        .where(*_aging_filters(course_id, term_id))
+        .group_by(mv.student_id)
+    ).subquery()
+    sort_col = per_student.c[_AGING_SORT_COLUMNS[bucket]]
+
+    stmt = (
+        select(per_student, Student.full_name, Student.ra)
+        .join(Student, Student.user_id == per_student.c.student_id)
+        .where(sort_col > 0)
+    )
+    if cursor:
+        raw_amount, raw_student_id = decode_cursor(cursor, 2)
+        try:
+            after_amount = Decimal(raw_amount)
+            after_student_id = UUID(raw_student_id)
+        except (InvalidOperation, ValueError):
+            raise_api_error(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                code="INVALID_CURSOR",
+                message="Cursor de paginação inválido.",
+            )
+        stmt = stmt.where(
+            or_(
+                sort_col < after_amount,
+                and_(sort_col == after_amount, per_student.c.student_id > after_student_id),
+            )
+        )
+
+    rows = db.execute(
+        stmt.order_by(sort_col.desc(), per_student.c.student_id).limit(limit + 1)
+    ).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, _AGING_SORT_COLUMNS[bucket]), last.student_id)
+
+    return CursorPaginatedResponse[ReceivablesAgingStudentItem](
+        items=[
+            ReceivablesAgingStudentItem(
+                student_id=row.student_id,
+                student_name=row.full_name,
+                student_ra=row.ra,
+                open_invoices_count=row.open_count or 0,
+                overdue_invoices_count=row.overdue_count or 0,
+                max_days_overdue=row.max_days_overdue or 0,
+                buckets=_aging_buckets(row),
+            )
+            for row in rows
+        ],
+        limit=limit,
+        next_cursor=next_cursor,
+    )
+
+
+@router.post(
+    "/receivables/aging/refresh",
+    response_model=ReceivablesAgingRefreshResponse,
+    summary="Atualizar aging de recebíveis (refresh concorrente)",
+)
+def refresh_receivables_aging_view(
+    _: AdminUser,
+    db: Session = Depends(get_db),
+) -> ReceivablesAgingRefreshResponse:
+    refreshed = refresh_receivables_aging(db)
+    refreshed_at = db.scalar(select(func.max(receivables_aging.c.refreshed_at)))
+    return ReceivablesAgingRefreshResponse(refreshed=refreshed, refreshed_at=refreshed_at)
+
+
+# ==================== PORTFOLIO PROJECTION ENDPOINTS ====================
+
+
+@router.get(
+    "/receivables/projection",
+    response_model=PortfolioProjectionResponse,
+    summary="Projeção da carteira em aberto com multa e juros em uma data",
+)
+def get_portfolio_projection(
+    _: AdminUser,
+    db: Session = Depends(get_db),
+    as_of: date | None = Query(None, description="Data da projeção (padrão: hoje)."),
+    course_id: UUID | None = Query(None),
+    term_id: UUID | None = Query(None),
+    student_id: UUID | None = Query(None),
+) -> PortfolioProjectionResponse:
+    """Total open debt with fees on `as_of` (past or future dates).
+
+    Computed live from finance.invoices with the vectorized fee calculator,
+    using the same rule as each invoice's amount_due.
+    """
+    projection = project_portfolio(
+        db,
+        as_of=as_of or date.today(),
+        course_id=course_id,
+        term_id=term_id,
+        student_id=student_id,
+    )
+    return PortfolioProjectionResponse(
+        as_of=projection.as_of,
+        invoices_count=projection.invoices_count,
+        overdue_count=projection.overdue_count,
+        max_days_overdue=projection.max_days_overdue,
+        total_principal=micros_to_decimal(projection.principal),
+        overdue_principal=micros_to_decimal(projection.overdue_principal),
+        total_fine=micros_to_decimal(projection.fine),
+        total_interest=micros_to_decimal(projection.interest),
+        total_due=micros_to_decimal(projection.total_due),
+    )
@@ -27,7 +27,6 @@ from app.core.errors import raise_api_error
 from app.core.security import get_password_hash
 from app.db.utils import apply_update, get_or_404, paginate_stmt
 from app.models.academics import Student, StudentStatus
-from app.models.audit import AuditLog
 from app.models.notifications import NotificationPreference, UserNotification
 from app.models.user import User, UserRole, UserStatus
 from app.schemas.admin_users import (
@@ -36,6 +35,7 @@ from app.schemas.admin_users import (
     AdminUserUpdateRequest,
 )
 from app.schemas.common import PaginatedResponse
+from app.services.audit import AuditEvent, record_audit
 
 router = APIRouter(prefix="/api/v1/admin/users", tags=["Admin - Users"])
 
@@ -118,17 +118,19 @@ def _create_audit_log(
     data: dict,
     request: Request | None = None,
 ) -> None:
-    """Cria registro de auditoria."""
-    log = AuditLog(
-        actor_user_id=actor.id,
-        action=action,
-        entity_type="USER",
-        entity_id=entity_id,
-        ip=request.client.host if request and request.client else None,
-        user_agent=request.headers.get("user-agent") if request else None,
-        data=data,
+    """Cria registro de auditoria (gravado no commit; ver services.audit)."""
+    record_audit(
+        db,
+        AuditEvent(
+            actor_user_id=actor.id,
+            action=action,
+            entity_type="USER",
+            entity_id=entity_id,
+            ip=request.client.host if request and request.client else None,
+            user_agent=request.headers.get("user-agent") if request else None,
+            data=data,
+        ),
     )
-    db.add(log)
 
 
 # ==================== ENDPOINTS ====================
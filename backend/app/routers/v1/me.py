@@ -8,15 +8,17 @@ from datetime import UTC, date, datetime, timedelta
 from decimal import Decimal
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from sqlalchemy import func, select
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session
 from starlette import status
 
+from app.core.config import get_settings
 from app.core.database import get_db
-from app.core.deps import CurrentUser, pagination_params
+from app.core.deps import CurrentUser, DocumentStore, pagination_params
 from app.core.errors import raise_api_error
-from app.db.utils import get_or_404, paginate_stmt
+from app.db.utils import get_or_404, paginate_rows
 from app.models.academics import (
     ClassSession,
     Course,
@@ -29,7 +31,7 @@ from app.models.academics import (
     Subject,
     Term,
 )
-from app.models.documents import DocumentStatus, DocumentType, StudentDocument
+from app.models.documents import DocumentType, StudentDocument
 from app.models.finance import Invoice, InvoiceStatus, Payment, PaymentStatus
 from app.models.notifications import UserNotification
 from app.models.user import UserRole
@@ -41,7 +43,6 @@ from app.schemas.me import (
     MeAttendanceSessionInfo,
     MeAttendanceSubjectInfo,
     MeCourseInfo,
-    MeDocumentDownloadResponse,
     MeDocumentInfo,
     MeDocumentRequestResponse,
     MeEnrollmentInfo,
@@ -51,6 +52,9 @@ from app.schemas.me import (
     MeGradeDetailInfo,
     MeGradesResponse,
     MeInvoiceInfo,
+    MeNotificationArchiveRequest,
+    MeNotificationBulkResponse,
+    MeNotificationIdsRequest,
     MeNotificationInfo,
     MePayMockResponse,
     MeProfileResponse,
@@ -63,10 +67,30 @@ from app.schemas.me import (
     MeTodayClassInfo,
     MeTodayClassResponse,
     MeTranscriptResponse,
-    MeTranscriptSubjectInfo,
-    MeTranscriptTermInfo,
     MeUnreadCountResponse,
 )
+from app.services.document_rendering import DOCUMENT_FILE_TYPE
+from app.services.documents import enqueue_generation
+from app.services.notification_stream import stream_events
+from app.services.notifications import (
+    archive_inbox_before,
+    count_unread,
+    inbox_window_start,
+    live_broadcast_ids,
+    mark_inbox_read,
+    materialize_broadcast_state,
+    notify_user_state,
+    user_inbox_stmt,
+)
+from app.services.transcripts import (
+    TranscriptCache,
+    build_transcript,
+    transcript_is_current,
+    transcript_key,
+)
+
+settings = get_settings()
+transcript_cache = TranscriptCache(settings.transcript_cache_entries)
 
 router = APIRouter(prefix="/api/v1/me", tags=["Me"])
 
@@ -301,6 +325,13 @@ def academic_summary(
     )
 
 
+def _invoice_info_stmt(student_id: UUID):
+    """Column projection for MeInvoiceInfo (no ORM entity hydration)."""
+    return select(
+        Invoice.id, Invoice.description, Invoice.due_date, Invoice.amount, Invoice.status
+    ).where(Invoice.student_id == student_id)
+
+
 def _invoice_to_info(inv: Invoice) -> MeInvoiceInfo:
     today = date.today()
     is_overdue = inv.status == InvoiceStatus.PENDING and inv.due_date < today
@@ -326,28 +357,36 @@ def financial_summary(
 ) -> MeFinancialSummaryResponse:
     student = _get_active_student(current_user, db)
 
-    invoices = (
-        db.query(Invoice)
-        .filter(Invoice.student_id == student.user_id)
-        .order_by(Invoice.due_date.asc())
-        .all()
-    )
-
-    pending = [inv for inv in invoices if inv.status == InvoiceStatus.PENDING]
-    paid = [inv for inv in invoices if inv.status == InvoiceStatus.PAID]
-
-    next_pending = min(pending, key=lambda i: i.due_date) if pending else None
-    last_paid = max(paid, key=lambda i: i.due_date) if paid else None
-
-    total_pending = Decimal("0.00")
-    total_overdue = Decimal("0.00")
     today = date.today()
+    zero = Decimal("0.00")
+    is_pending = Invoice.status == InvoiceStatus.PENDING
+
+    totals = db.execute(
+        select(
+            func.coalesce(
+                func.sum(Invoice.amount).filter(is_pending, Invoice.due_date >= today), zero
+            ).label("total_pending"),
+            func.coalesce(
+                func.sum(Invoice.amount).filter(is_pending, Invoice.due_date < today), zero
+            ).label("total_overdue"),
+        ).where(Invoice.student_id == student.user_id)
+    ).one()
+
+    next_pending = db.execute(
+        _invoice_info_stmt(student.user_id)
+        .where(is_pending)
+        .order_by(Invoice.due_date.asc())
+        .limit(1)
+    ).first()
+    last_paid = db.execute(
+        _invoice_info_stmt(student.user_id)
+        .where(Invoice.status == InvoiceStatus.PAID)
+        .order_by(Invoice.due_date.desc())
+        .limit(1)
+    ).first()
 
-    for inv in pending:
-        if inv.due_date < today:
-            total_overdue += inv.amount
-        else:
-            total_pending += inv.amount
+    total_pending = totals.total_pending
+    total_overdue = totals.total_overdue
 
     return MeFinancialSummaryResponse(
         next_invoice=_invoice_to_info(next_pending) if next_pending else None,
@@ -373,19 +412,15 @@ def financial_invoices(
 ) -> PaginatedResponse[MeInvoiceInfo]:
     student = _get_active_student(current_user, db)
 
-    stmt = (
-        select(Invoice)
-        .where(Invoice.student_id == student.user_id)
-        .order_by(Invoice.due_date.desc())
-    )
+    stmt = _invoice_info_stmt(student.user_id).order_by(Invoice.due_date.desc())
     if status_filter is not None:
         stmt = stmt.where(Invoice.status == status_filter)
     if term_id is not None:
         stmt = stmt.where(Invoice.term_id == term_id)
 
-    items, total = paginate_stmt(db, stmt, limit=pagination["limit"], offset=pagination["offset"])
+    rows, total = paginate_rows(db, stmt, limit=pagination["limit"], offset=pagination["offset"])
     return PaginatedResponse[MeInvoiceInfo](
-        items=[_invoice_to_info(inv) for inv in items],
+        items=[_invoice_to_info(row) for row in rows],
         limit=pagination["limit"],
         offset=pagination["offset"],
         total=total,
@@ -462,6 +497,36 @@ def pay_mock(
     )
 
 
+def _inbox_since() -> datetime | None:
+    """Start of the inbox window (older deliveries are being archived)."""
+    return inbox_window_start(settings.notification_retention_months)
+
+
+def _get_user_notification(
+    db: Session, student: Student, user_notification_id: UUID
+) -> UserNotification:
+    """Resolve an inbox id: a user_notifications row, or a broadcast's notification id."""
+    since = _inbox_since()
+    stmt = select(UserNotification).where(UserNotification.id == user_notification_id)
+    if since is not None:
+        stmt = stmt.where(UserNotification.delivered_at >= since)
+    un = db.execute(stmt).scalar_one_or_none()
+    if un is None:
+        # First interaction with a broadcast creates the student's state row
+        un = materialize_broadcast_state(db, student.user_id, user_notification_id, since)
+    if un is None:
+        raise_api_error(
+            status_code=status.HTTP_404_NOT_FOUND,
+            code="NOTIFICATION_NOT_FOUND",
+            message="Notificação não encontrada.",
+        )
+    if un.user_id != student.user_id:
+        raise_api_error(
+            status_code=status.HTTP_403_FORBIDDEN, code="AUTH_FORBIDDEN", message="Acesso negado."
+        )
+    return un
+
+
 @router.get(
     "/notifications",
     response_model=PaginatedResponse[MeNotificationInfo],
@@ -475,36 +540,28 @@ def notifications(
 ) -> PaginatedResponse[MeNotificationInfo]:
     student = _get_active_student(current_user, db)
 
-    stmt = (
-        select(UserNotification)
-        .options(joinedload(UserNotification.notification))
-        .where(UserNotification.user_id == student.user_id)
-        .where(UserNotification.archived_at.is_(None))
-        .order_by(UserNotification.delivered_at.desc())
-    )
-    if unread_only:
-        stmt = stmt.where(UserNotification.read_at.is_(None))
-
-    items, total = paginate_stmt(db, stmt, limit=pagination["limit"], offset=pagination["offset"])
-
-    result_items: list[MeNotificationInfo] = []
-    for un in items:
-        notif = un.notification
-        is_read = un.read_at is not None
-        result_items.append(
-            MeNotificationInfo(
-                id=un.id,
-                notification_id=notif.id,
-                type=notif.type.value,
-                priority=notif.priority.value,
-                title=notif.title,
-                body=notif.body,
-                delivered_at=un.delivered_at,
-                read_at=un.read_at,
-                archived_at=un.archived_at,
-                is_read=is_read,
-            )
+    # Direct deliveries merged with live broadcasts targeting this student
+    since = _inbox_since()
+    broadcast_ids = live_broadcast_ids(db, student.user_id, since)
+    stmt = user_inbox_stmt(student.user_id, broadcast_ids, unread_only=unread_only, since=since)
+
+    rows, total = paginate_rows(db, stmt, limit=pagination["limit"], offset=pagination["offset"])
+
+    result_items = [
+        MeNotificationInfo(
+            id=row.id,
+            notification_id=row.notification_id,
+            type=row.type.value,
+            priority=row.priority.value,
+            title=row.title,
+            body=row.body,
+            delivered_at=row.delivered_at,
+            read_at=row.read_at,
+            archived_at=row.archived_at,
+            is_read=row.read_at is not None,
         )
+        for row in rows
+    ]
 
     return PaginatedResponse[MeNotificationInfo](
         items=result_items,
@@ -522,14 +579,47 @@ def notifications(
 def unread_count(current_user: CurrentUser, db: Session = Depends(get_db)) -> MeUnreadCountResponse:
     student = _get_active_student(current_user, db)
 
-    count = (
-        db.query(func.count(UserNotification.id))
-        .filter(UserNotification.user_id == student.user_id)
-        .filter(UserNotification.archived_at.is_(None))
-        .filter(UserNotification.read_at.is_(None))
-        .scalar()
+    broadcast_ids = live_broadcast_ids(db, student.user_id, _inbox_since())
+    count = count_unread(db, student.user_id, broadcast_ids)
+    return MeUnreadCountResponse(unread_count=count)
+
+
+@router.get(
+    "/notifications/stream",
+    response_class=StreamingResponse,
+    summary="Eventos de notificações em tempo real (SSE)",
+)
+def notification_stream(
+    request: Request, current_user: CurrentUser, db: Session = Depends(get_db)
+) -> StreamingResponse:
+    """
+    Server-Sent Events: `unread-count` on connect and whenever it changes,
+    `notification` for each new delivery. Replaces polling unread-count.
+    """
+    hub = request.app.state.notification_hub
+    if hub is None:
+        raise_api_error(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            code="NOTIFICATION_STREAM_DISABLED",
+            message="Notificações em tempo real indisponíveis.",
+        )
+    student = _get_active_student(current_user, db)
+    user_id = student.user_id
+    initial_unread = count_unread(db, user_id, live_broadcast_ids(db, user_id, _inbox_since()))
+    # The stream outlives the request's session: give the connection back now
+    db.close()
+
+    subscription = hub.subscribe(user_id)
+    return StreamingResponse(
+        stream_events(
+            hub,
+            subscription,
+            initial_unread=initial_unread,
+            heartbeat=settings.notification_stream_heartbeat_seconds,
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
-    return MeUnreadCountResponse(unread_count=int(count or 0))
 
 
 @router.post(
@@ -542,20 +632,11 @@ def mark_read(
 ) -> None:
     student = _get_active_student(current_user, db)
 
-    un = get_or_404(
-        db,
-        UserNotification,
-        user_notification_id,
-        code="NOTIFICATION_NOT_FOUND",
-        message="Notificação não encontrada.",
-    )
-    if un.user_id != student.user_id:
-        raise_api_error(
-            status_code=status.HTTP_403_FORBIDDEN, code="AUTH_FORBIDDEN", message="Acesso negado."
-        )
+    un = _get_user_notification(db, student, user_notification_id)
 
     if un.read_at is None:
         un.read_at = datetime.now(UTC)
+        notify_user_state(db, student.user_id)
         db.commit()
 
 
@@ -569,20 +650,11 @@ def mark_unread(
 ) -> None:
     student = _get_active_student(current_user, db)
 
-    un = get_or_404(
-        db,
-        UserNotification,
-        user_notification_id,
-        code="NOTIFICATION_NOT_FOUND",
-        message="Notificação não encontrada.",
-    )
-    if un.user_id != student.user_id:
-        raise_api_error(
-            status_code=status.HTTP_403_FORBIDDEN, code="AUTH_FORBIDDEN", message="Acesso negado."
-        )
+    un = _get_user_notification(db, student, user_notification_id)
 
     if un.read_at is not None:
         un.read_at = None
+        notify_user_state(db, student.user_id)
         db.commit()
 
 
@@ -596,23 +668,79 @@ def archive(
 ) -> None:
     student = _get_active_student(current_user, db)
 
-    un = get_or_404(
-        db,
-        UserNotification,
-        user_notification_id,
-        code="NOTIFICATION_NOT_FOUND",
-        message="Notificação não encontrada.",
-    )
-    if un.user_id != student.user_id:
-        raise_api_error(
-            status_code=status.HTTP_403_FORBIDDEN, code="AUTH_FORBIDDEN", message="Acesso negado."
-        )
+    un = _get_user_notification(db, student, user_notification_id)
 
     if un.archived_at is None:
         un.archived_at = datetime.now(UTC)
+        notify_user_state(db, student.user_id)
         db.commit()
 
 
+@router.post(
+    "/notifications/read-all",
+    response_model=MeNotificationBulkResponse,
+    summary="Marcar todas as notificações como lidas",
+)
+def mark_all_read(
+    current_user: CurrentUser, db: Session = Depends(get_db)
+) -> MeNotificationBulkResponse:
+    student = _get_active_student(current_user, db)
+
+    since = _inbox_since()
+    affected = mark_inbox_read(
+        db, student.user_id, live_broadcast_ids(db, student.user_id, since), since=since
+    )
+    if affected:
+        notify_user_state(db, student.user_id)
+    db.commit()
+    return MeNotificationBulkResponse(affected=affected)
+
+
+@router.post(
+    "/notifications/read",
+    response_model=MeNotificationBulkResponse,
+    summary="Marcar notificações selecionadas como lidas",
+)
+def mark_many_read(
+    payload: MeNotificationIdsRequest, current_user: CurrentUser, db: Session = Depends(get_db)
+) -> MeNotificationBulkResponse:
+    """Ids outside the student's inbox are ignored (not counted)."""
+    student = _get_active_student(current_user, db)
+
+    since = _inbox_since()
+    affected = mark_inbox_read(
+        db,
+        student.user_id,
+        live_broadcast_ids(db, student.user_id, since),
+        ids=payload.ids,
+        since=since,
+    )
+    if affected:
+        notify_user_state(db, student.user_id)
+    db.commit()
+    return MeNotificationBulkResponse(affected=affected)
+
+
+@router.post(
+    "/notifications/archive",
+    response_model=MeNotificationBulkResponse,
+    summary="Arquivar notificações anteriores a uma data",
+)
+def archive_older(
+    payload: MeNotificationArchiveRequest, current_user: CurrentUser, db: Session = Depends(get_db)
+) -> MeNotificationBulkResponse:
+    student = _get_active_student(current_user, db)
+
+    since = _inbox_since()
+    affected = archive_inbox_before(
+        db, student.user_id, live_broadcast_ids(db, student.user_id, since), payload.before, since
+    )
+    if affected:
+        notify_user_state(db, student.user_id)
+    db.commit()
+    return MeNotificationBulkResponse(affected=affected)
+
+
 @router.get("/documents", response_model=list[MeDocumentInfo], summary="Documentos do aluno")
 def documents(current_user: CurrentUser, db: Session = Depends(get_db)) -> list[MeDocumentInfo]:
     student = _get_active_student(current_user, db)
@@ -629,7 +757,7 @@ def documents(current_user: CurrentUser, db: Session = Depends(get_db)) -> list[
             doc_type=d.doc_type.value,
             status=d.status.value,
             title=d.title,
-            file_url=d.file_url,
+            file_url=d.file_url if d.content_hash else None,  # Only a stored file downloads
             generated_at=d.generated_at,
         )
         for d in docs
@@ -639,13 +767,22 @@ def documents(current_user: CurrentUser, db: Session = Depends(get_db)) -> list[
 @router.post(
     "/documents/{doc_type}/request",
     response_model=MeDocumentRequestResponse,
-    summary="Solicitar documento (mock)",
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Solicitar documento",
 )
 def request_document(
     doc_type: DocumentType,
+    response: Response,
     current_user: CurrentUser,
     db: Session = Depends(get_db),
 ) -> MeDocumentRequestResponse:
+    """
+    Queue the document for generation (202). The document worker pool renders
+    the PDF and sets status AVAILABLE (or ERROR); poll GET /me/documents. A
+    document that already has a file keeps serving it until then.
+    A transcript already rendered from the current grades is returned as is
+    (200).
+    """
     student = _get_active_student(current_user, db)
 
     doc = (
@@ -656,34 +793,53 @@ def request_document(
     if not doc:
         doc = StudentDocument(student_id=student.user_id, doc_type=doc_type)
         db.add(doc)
-        db.flush()
-
-    now = datetime.now(UTC)
-    doc.status = DocumentStatus.GENERATING
-    doc.title = doc.title or doc_type.value.replace("_", " ").title()
-    doc.file_url = f"/api/v1/me/documents/{doc_type.value}/download"
-    doc.generated_at = now
-    doc.status = DocumentStatus.AVAILABLE
-    db.commit()
+
+    if doc_type == DocumentType.TRANSCRIPT and doc.id and transcript_is_current(db, doc):
+        response.status_code = status.HTTP_200_OK
+    else:
+        enqueue_generation(db, doc)
+        db.commit()
 
     return MeDocumentRequestResponse(
         doc_type=doc.doc_type.value,
         status=doc.status.value,
-        file_url=doc.file_url,
+        file_url=doc.file_url if doc.content_hash else None,
         generated_at=doc.generated_at,
     )
 
 
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 requires for it)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+
+
 @router.get(
     "/documents/{doc_type}/download",
-    response_model=MeDocumentDownloadResponse,
-    summary="Download de documento (mock)",
+    response_class=FileResponse,
+    summary="Download de documento",
+    responses={
+        200: {"content": {DOCUMENT_FILE_TYPE: {}}, "description": "Arquivo do documento."},
+        206: {"description": "Intervalo solicitado (Range)."},
+        304: {"description": "Não modificado (If-None-Match)."},
+    },
 )
 def download_document(
     doc_type: DocumentType,
+    request: Request,
     current_user: CurrentUser,
+    storage: DocumentStore,
     db: Session = Depends(get_db),
-) -> MeDocumentDownloadResponse:
+) -> Response:
+    """
+    Stream the stored file (sendfile where the server supports it). Range
+    requests answer 206; the ETag is the content hash, so If-None-Match
+    answers 304 until the document is generated with different content.
+    The current file is served while a regeneration is queued.
+    """
     student = _get_active_student(current_user, db)
 
     doc = (
@@ -691,14 +847,25 @@ def download_document(
         .filter(StudentDocument.student_id == student.user_id, StudentDocument.doc_type == doc_type)
         .first()
     )
-    if not doc or doc.status != DocumentStatus.AVAILABLE or not doc.file_url:
+    path = None
+    if doc and doc.content_hash:
+        path = storage.local_path(doc.content_hash)
+    if path is None:
         raise_api_error(
             status_code=status.HTTP_404_NOT_FOUND,
             code="DOCUMENT_NOT_AVAILABLE",
             message="Documento não disponível.",
         )
 
-    return MeDocumentDownloadResponse(doc_type=doc.doc_type.value, file_url=doc.file_url)
+    headers = {"ETag": f'"{doc.content_hash}"', "Cache-Control": "private, no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return FileResponse(
+        path,
+        media_type=doc.file_type or DOCUMENT_FILE_TYPE,
+        filename=f"{doc_type.value.lower()}.pdf",
+        headers=headers,
+    )
 
 
 # =========== Schedule / Horários ===========
@@ -1102,91 +1269,28 @@ def attendance(
     "/transcript",
     response_model=MeTranscriptResponse,
     summary="Histórico acadêmico completo",
+    responses={304: {"description": "Não modificado (If-None-Match)."}},
 )
 def transcript(
+    request: Request,
     current_user: CurrentUser,
     db: Session = Depends(get_db),
-) -> MeTranscriptResponse:
-    """Retorna o histórico acadêmico completo do aluno."""
-    student = _get_active_student(current_user, db)
-
-    course = db.query(Course).filter(Course.id == student.course_id).first()
-
-    # Busca todas as notas finais do aluno
-    all_grades = (
-        db.query(FinalGrade)
-        .join(Section, Section.id == FinalGrade.section_id)
-        .join(Subject, Subject.id == Section.subject_id)
-        .join(Term, Term.id == Section.term_id)
-        .filter(FinalGrade.student_id == student.user_id)
-        .order_by(Term.start_date.asc())
-        .all()
-    )
-
-    # Agrupa por termo
-    terms_dict: dict[str, MeTranscriptTermInfo] = {}
-    total_credits_completed = 0
-    all_scores: list[Decimal] = []
-
-    for fg in all_grades:
-        section = fg.section
-        subject = section.subject
-        term = section.term
-
-        if term.code not in terms_dict:
-            terms_dict[term.code] = MeTranscriptTermInfo(
-                term_code=term.code,
-                term_name=term.code,  # Using code as name since Term model doesn't have a name field
-                subjects=[],
-                term_average=None,
-                term_credits=0,
-            )
-
-        status_str = fg.status.value
-        if fg.final_score is not None and fg.final_score >= Decimal("6.0"):
-            status_str = "APPROVED"
-        elif fg.final_score is not None and fg.final_score < Decimal("6.0"):
-            status_str = "FAILED"
-
-        terms_dict[term.code].subjects.append(
-            MeTranscriptSubjectInfo(
-                subject_id=subject.id,
-                subject_code=subject.code,
-                subject_name=subject.name,
-                credits=subject.credits,
-                final_score=fg.final_score,
-                status=status_str,
-                term_code=term.code,
-            )
-        )
-
-        if status_str == "APPROVED":
-            total_credits_completed += subject.credits
-
-        if fg.final_score is not None:
-            all_scores.append(fg.final_score)
-
-    # Calcula médias por termo
-    terms_list: list[MeTranscriptTermInfo] = []
-    for term_info in terms_dict.values():
-        term_scores = [s.final_score for s in term_info.subjects if s.final_score is not None]
-        if term_scores:
-            term_info.term_average = sum(term_scores) / len(term_scores)
-        term_info.term_credits = sum(s.credits for s in term_info.subjects if s.status == "APPROVED")
-        terms_list.append(term_info)
+) -> Response:
+    """
+    Retorna o histórico acadêmico completo do aluno.
 
-    cumulative_average = (sum(all_scores) / len(all_scores)) if all_scores else None
+    Cached per student and grade version; the ETag changes only when the
+    transcript can, so If-None-Match answers 304 otherwise.
+    """
+    student = _get_active_student(current_user, db)
 
-    # Total de créditos do curso (estimativa)
-    total_credits_required = 200  # Valor default, idealmente viria do Course
+    key = transcript_key(db, student)
+    headers = {"ETag": key.etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), key.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
 
-    return MeTranscriptResponse(
-        student_name=student.full_name,
-        ra=student.ra,
-        course_name=course.name if course else "Curso não encontrado",
-        terms=terms_list,
-        total_credits_completed=total_credits_completed,
-        total_credits_required=total_credits_required,
-        cumulative_average=cumulative_average,
-        progress_pct=student.total_progress,
-    )
+    body = transcript_cache.get(key)
+    if body is None:
+        body = build_transcript(db, student).model_dump_json().encode()
+        transcript_cache.put(key, body)
+    return Response(content=body, media_type="application/json", headers=headers)
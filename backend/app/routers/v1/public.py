@@ -0,0 +1,94 @@
+"""
+UniFECAF Portal do Aluno - API v1 Public Router (no authentication).
+"""
+
+from __future__ import annotations
+
+import math
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import Response
+from sqlalchemy.orm import Session
+from starlette import status
+
+from app.core.config import get_settings
+from app.core.database import get_db
+from app.core.errors import ApiErrorEnvelope, raise_api_error
+from app.schemas.public import PublicDocumentVerificationResponse
+from app.services.document_verification import (
+    ClientRateLimiter,
+    VerificationCache,
+    lookup_document,
+    normalize_verification_code,
+)
+
+router = APIRouter(prefix="/api/v1/public", tags=["Public"])
+settings = get_settings()
+
+verification_cache = VerificationCache(
+    settings.document_verification_cache_entries,
+    ttl_seconds=settings.document_verification_cache_seconds,
+    negative_ttl_seconds=settings.document_verification_negative_cache_seconds,
+)
+verification_limiter = ClientRateLimiter(
+    settings.document_verification_rate_per_minute / 60,
+    burst=settings.document_verification_burst,
+)
+
+
+def forget_verification(code: str) -> None:
+    """Evict a document's cached verification (its status or content changed)."""
+    verification_cache.discard(code)
+
+
+@router.get(
+    "/documents/verify/{code}",
+    response_model=PublicDocumentVerificationResponse,
+    summary="Verificar autenticidade de documento",
+    description=(
+        "Confere o código de verificação impresso em declarações, históricos e carteirinhas. "
+        "Não exige login; limitado por IP. Respostas ficam em cache por até "
+        f"{int(settings.document_verification_cache_seconds)} s: alterações feitas pelo portal "
+        "valem na hora neste servidor, mas uma reemissão pode levar esse tempo para aparecer."
+    ),
+    responses={
+        404: {"model": ApiErrorEnvelope, "description": "Código inválido ou desconhecido"},
+        429: {"model": ApiErrorEnvelope, "description": "Limite de consultas excedido"},
+    },
+)
+def verify_document(code: str, request: Request, db: Session = Depends(get_db)) -> Response:
+    """
+    Cache hits (including unknown codes) answer without touching the
+    database; a miss is one lookup on the unique index.
+    """
+    client = request.client.host if request.client else "unknown"
+    retry_after = verification_limiter.acquire(client)
+    if retry_after:
+        raise_api_error(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            code="RATE_LIMITED",
+            message="Muitas consultas. Tente novamente em instantes.",
+            details={"retry_after_seconds": math.ceil(retry_after)},
+        )
+
+    body = None
+    normalized = normalize_verification_code(code)
+    if normalized is not None:
+        hit, body = verification_cache.get(normalized)
+        if not hit:
+            document = lookup_document(db, normalized)
+            body = document.model_dump_json().encode() if document else None
+            verification_cache.put(normalized, body)
+    if body is None:
+        raise_api_error(
+            status_code=status.HTTP_404_NOT_FOUND,
+            code="DOCUMENT_NOT_VERIFIED",
+            message="Código de verificação inválido ou documento não encontrado.",
+        )
+
+    max_age = int(settings.document_verification_cache_seconds)
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"Cache-Control": f"public, max-age={max_age}"},
+    )
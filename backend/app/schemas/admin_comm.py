@@ -5,10 +5,13 @@ UniFECAF Portal do Aluno - Admin schemas (communications).
 from __future__ import annotations
 
 from datetime import datetime
+from decimal import Decimal
 from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict, Field
 
+from app.models.academics import StudentStatus
+
 
 class AdminNotificationResponse(BaseModel):
     """Notification response with enriched statistics."""
@@ -24,6 +27,8 @@ class AdminNotificationResponse(BaseModel):
     is_archived: bool = False
     delivered_count: int = 0
     read_count: int = 0
+    audience: dict | None = None
+    published_at: datetime | None = None
     created_at: datetime
 
 
@@ -48,10 +53,37 @@ class AdminNotificationUpdateRequest(BaseModel):
     is_archived: bool | None = None
 
 
+class NotificationAudience(BaseModel):
+    """
+    Declarative audience: students matching every given criterion.
+
+    List criteria match any of their values; `term_id` also scopes the
+    section and absence criteria to that term.
+    """
+
+    course_ids: list[UUID] = Field(default_factory=list)
+    term_id: UUID | None = None
+    section_ids: list[UUID] = Field(default_factory=list)
+    student_statuses: list[StudentStatus] = Field(
+        default_factory=list, description="Vazio = todos exceto DELETED"
+    )
+    has_overdue_invoices: bool | None = None
+    min_absences_pct: Decimal | None = Field(
+        None, ge=0, le=100, description="Faltas acima deste percentual em alguma disciplina"
+    )
+
+
+class AudienceCountResponse(BaseModel):
+    """Dry-run result for an audience."""
+
+    total: int = Field(..., ge=0)
+
+
 class DeliverNotificationRequest(BaseModel):
     """Request to deliver notification to users."""
 
     all_students: bool = False
+    audience: NotificationAudience | None = None
     user_ids: list[UUID] = Field(default_factory=list)
 
 
@@ -63,6 +95,104 @@ class DeliverNotificationResponse(BaseModel):
     skipped_existing: int = Field(..., ge=0)
 
 
+class ScheduleNotificationRequest(BaseModel):
+    """Schedule a notification delivery (optionally recurring)."""
+
+    send_at: datetime
+    recurrence: str | None = Field(
+        None,
+        max_length=100,
+        description="RRULE: FREQ=DAILY|WEEKLY|MONTHLY[;INTERVAL=n][;COUNT=n][;UNTIL=AAAAMMDD]",
+    )
+    audience: NotificationAudience = Field(default_factory=NotificationAudience)
+    broadcast: bool = False
+
+
+class InvoiceReminderScheduleRequest(BaseModel):
+    """Automated reminder for invoices due within `days_before` days."""
+
+    days_before: int = Field(3, ge=0, le=60)
+    run_at: datetime | None = Field(None, description="Primeira execução (padrão: agora)")
+    recurrence: str | None = Field("FREQ=DAILY", max_length=100)
+    title_template: str = Field("Fatura {reference} vence em {days} dia(s)", min_length=1)
+    body_template: str = Field(
+        "Sua fatura {reference} ({description}) de R$ {amount} vence em {due_date}.",
+        min_length=1,
+        description="Campos: {reference}, {description}, {amount}, {due_date}, {days}",
+    )
+    type: str = Field("FINANCIAL", description="ACADEMIC | FINANCIAL | ADMIN")
+    channel: str = Field("IN_APP", description="IN_APP | EMAIL | SMS")
+    priority: str = Field("NORMAL", description="LOW | NORMAL | HIGH")
+
+
+class ScheduledJobResponse(BaseModel):
+    """Timer queue job."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    kind: str
+    notification_id: UUID | None = None
+    payload: dict
+    starts_at: datetime
+    run_at: datetime
+    recurrence: str | None = None
+    status: str
+    attempts: int
+    runs_count: int
+    last_run_at: datetime | None = None
+    last_error: str | None = None
+    created_at: datetime
+
+
+class OutboxStatsResponse(BaseModel):
+    """Outbound message counts per channel and status."""
+
+    by_channel: dict[str, dict[str, int]]
+    oldest_pending_at: datetime | None = None
+
+
+class OutboxRequeueResponse(BaseModel):
+    """Dead letters moved back to the queue."""
+
+    requeued: int = Field(..., ge=0)
+
+
+class NotificationCountersReconcileResponse(BaseModel):
+    """Counter rows rewritten by a reconciliation run."""
+
+    reconciled: bool  # False when another run held the lock
+    users_fixed: int = Field(0, ge=0)
+    notifications_fixed: int = Field(0, ge=0)
+
+
+class NotificationBulkFilter(BaseModel):
+    """Filter for bulk archive/delete of notifications (at least one criterion)."""
+
+    ids: list[UUID] | None = Field(None, max_length=1000)
+    type: str | None = Field(None, description="ACADEMIC | FINANCIAL | ADMIN")
+    channel: str | None = Field(None, description="IN_APP | EMAIL | SMS")
+    priority: str | None = Field(None, description="LOW | NORMAL | HIGH")
+    is_archived: bool | None = None
+    created_before: datetime | None = None
+    search: str | None = Field(None, min_length=1, description="Busca em title e body")
+
+
+class UserNotificationBulkFilter(BaseModel):
+    """Filter for bulk archive/delete of deliveries (at least one criterion)."""
+
+    user_id: UUID | None = None
+    notification_id: UUID | None = None
+    read: bool | None = Field(None, description="true: lidas, false: não lidas")
+    delivered_before: datetime | None = None
+
+
+class BulkOperationResponse(BaseModel):
+    """Rows affected by a bulk operation."""
+
+    affected: int = Field(..., ge=0)
+
+
 class AdminUserNotificationResponse(BaseModel):
     """User notification delivery record."""
 
@@ -92,6 +222,7 @@ class AdminNotificationPreferencesResponse(BaseModel):
     in_app_enabled: bool
     email_enabled: bool
     sms_enabled: bool
+    phone: str | None = None
     created_at: datetime
     updated_at: datetime
 
@@ -102,6 +233,7 @@ class AdminNotificationPreferencesUpdateRequest(BaseModel):
     in_app_enabled: bool | None = None
     email_enabled: bool | None = None
     sms_enabled: bool | None = None
+    phone: str | None = Field(None, max_length=20, pattern=r"^\+?[0-9]{8,19}$")
 
 
 # Statistics responses
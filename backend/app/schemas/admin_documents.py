@@ -69,6 +69,33 @@ class AdminStudentDocumentGenerateRequest(BaseModel):
     description: str | None = None
 
 
+class AdminDocumentBatchCreateRequest(BaseModel):
+    """Bulk generation for the active students of a course and/or term."""
+
+    doc_type: str = Field(..., description="STUDENT_CARD | DECLARATION")
+    course_id: UUID | None = None
+    term_id: UUID | None = None
+
+
+class AdminDocumentBatchResponse(BaseModel):
+    """Bulk generation batch with its progress."""
+
+    id: UUID
+    doc_type: str
+    course_id: UUID | None = None
+    term_id: UUID | None = None
+    status: str  # PENDING | RUNNING | DONE | FAILED
+    total_students: int
+    total_chunks: int
+    done_chunks: int
+    generated: int
+    failed: int
+    progress: float  # Processed students, 0-100
+    requested_by: UUID | None = None
+    created_at: datetime
+    finished_at: datetime | None = None
+
+
 # Statistics responses
 class AdminDocumentStatsResponse(BaseModel):
     """Statistics for documents module."""
@@ -193,7 +193,7 @@ class NegotiationExecuteRequest(BaseModel):
     
     student_id: UUID
     term_id: UUID | None = None
-    installments: list[NegotiationInstallment]
+    installments: list[NegotiationInstallment] = Field(..., min_length=1)
     cancel_pending_ids: list[UUID] = Field(default_factory=list)
     fine_rate: Decimal = Field(default=Decimal("2.00"), ge=0, le=100)
     interest_rate: Decimal = Field(default=Decimal("1.00"), ge=0, le=100)
@@ -203,7 +203,98 @@ class NegotiationExecuteResponse(BaseModel):
     """Response after executing a negotiation plan."""
     
     student_id: UUID
+    plan_id: UUID | None = None  # Set when created by a negotiation plan
     created_invoices: list["AdminInvoiceResponse"]
     canceled_invoices: list[UUID]
     total_created: int
     total_canceled: int
+
+
+class NegotiationPlanRecordResponse(BaseModel):
+    """Persisted negotiation plan."""
+
+    id: UUID
+    student_id: UUID
+    student_name: str | None = None
+    term_id: UUID | None = None
+    created_by: UUID | None = None
+    total_amount: Decimal
+    canceled_amount: Decimal
+    num_installments: int
+    fine_rate: Decimal
+    interest_rate: Decimal
+    canceled_invoice_ids: list[UUID]
+    installments: list["AdminInvoiceResponse"] = Field(default_factory=list)
+    created_at: datetime
+
+
+# ==================== RECEIVABLES AGING ====================
+
+
+class AgingBuckets(BaseModel):
+    """Open amounts bucketed by days overdue."""
+
+    current: Decimal = Decimal("0.00")  # Not yet due
+    days_0_30: Decimal = Decimal("0.00")
+    days_31_60: Decimal = Decimal("0.00")
+    days_61_90: Decimal = Decimal("0.00")
+    days_over_90: Decimal = Decimal("0.00")
+    total_overdue: Decimal = Decimal("0.00")
+    total_open: Decimal = Decimal("0.00")
+
+
+class ReceivablesAgingRow(BaseModel):
+    """Aging buckets for one course/term pair."""
+
+    course_id: UUID
+    course_name: str | None = None
+    term_id: UUID | None = None
+    term_code: str | None = None
+    students_count: int = 0
+    delinquent_students_count: int = 0
+    open_invoices_count: int = 0
+    buckets: AgingBuckets
+
+
+class ReceivablesAgingResponse(BaseModel):
+    """Receivables aging report (served from finance.receivables_aging)."""
+
+    as_of: date | None = None
+    refreshed_at: datetime | None = None
+    rows: list[ReceivablesAgingRow]
+    totals: AgingBuckets
+    students_count: int = 0
+    delinquent_students_count: int = 0
+
+
+class ReceivablesAgingStudentItem(BaseModel):
+    """Drilldown row: one student's aging buckets."""
+
+    student_id: UUID
+    student_name: str | None = None
+    student_ra: str | None = None
+    open_invoices_count: int = 0
+    overdue_invoices_count: int = 0
+    max_days_overdue: int = 0
+    buckets: AgingBuckets
+
+
+class ReceivablesAgingRefreshResponse(BaseModel):
+    """Result of a manual aging refresh."""
+
+    refreshed: bool  # False if another refresh was already running
+    refreshed_at: datetime | None = None
+
+
+class PortfolioProjectionResponse(BaseModel):
+    """Open portfolio (PENDING/OVERDUE invoices) projected to a date."""
+
+    as_of: date
+    invoices_count: int = 0
+    overdue_count: int = 0
+    max_days_overdue: int = 0
+    total_principal: Decimal
+    overdue_principal: Decimal
+    total_fine: Decimal
+    total_interest: Decimal
+    total_due: Decimal  # principal + fine + interest
@@ -16,3 +16,11 @@ class PaginatedResponse(BaseModel, Generic[T]):
     limit: int = Field(..., ge=1, le=500)
     offset: int = Field(..., ge=0)
     total: int = Field(..., ge=0)
+
+
+class CursorPaginatedResponse(BaseModel, Generic[T]):
+    """Keyset-paginated page: pass `next_cursor` back as `cursor` to fetch the next page."""
+
+    items: list[T] = Field(default_factory=list)
+    limit: int = Field(..., ge=1, le=500)
+    next_cursor: str | None = None
@@ -115,6 +115,18 @@ class MeUnreadCountResponse(BaseModel):
     unread_count: int = Field(..., ge=0)
 
 
+class MeNotificationIdsRequest(BaseModel):
+    ids: list[UUID] = Field(..., min_length=1, max_length=500, description="Ids da caixa de entrada")
+
+
+class MeNotificationArchiveRequest(BaseModel):
+    before: datetime = Field(..., description="Arquiva as entregues antes desta data")
+
+
+class MeNotificationBulkResponse(BaseModel):
+    affected: int = Field(..., ge=0)
+
+
 class MeDocumentInfo(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -133,11 +145,6 @@ class MeDocumentRequestResponse(BaseModel):
     generated_at: datetime | None = None
 
 
-class MeDocumentDownloadResponse(BaseModel):
-    doc_type: str
-    file_url: str
-
-
 # =========== Schedule / Horários ===========
 
 
@@ -0,0 +1,21 @@
+"""
+UniFECAF Portal do Aluno - Public (unauthenticated) endpoint schemas.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+
+class PublicDocumentVerificationResponse(BaseModel):
+    verification_code: str = Field(..., examples=["7K2M-9QXA-4TBC"])
+    doc_type: str
+    title: str | None = None
+    student_name: str
+    ra: str = Field(..., description="Registro Acadêmico (apenas os 4 últimos dígitos)")
+    course_name: str
+    student_status: str
+    generated_at: datetime | None = None
+    content_hash: str | None = Field(None, description="SHA-256 do PDF emitido")
@@ -0,0 +1,3 @@
+"""
+UniFECAF Portal do Aluno - Domain services shared by routers and background jobs.
+"""
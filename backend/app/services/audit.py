@@ -0,0 +1,228 @@
+"""
+UniFECAF Portal do Aluno - Audit log writer (audit.audit_log).
+
+Audit rows used to be inserted one by one inside request transactions. They
+now go through `audit_sink`, an in-process buffer drained by a background
+thread:
+
+- `record_audit(db, event)` ties an event to the caller's transaction: it is
+  buffered when the session commits and dropped if it rolls back. Actions in
+  `CRITICAL_AUDIT_ACTIONS` (or `critical=True`) are still inserted in the
+  transaction itself, so they commit or fail with the change they describe;
+- `audit_sink.emit(event)` buffers an event that belongs to no transaction
+  (e.g. the meta-audit of someone reading the audit log);
+- the buffer is flushed with multi-row INSERTs when it holds `batch_size`
+  events or every `flush_interval_seconds`;
+- memory is bounded by `max_pending`: a full buffer blocks the emitting
+  request for up to `enqueue_timeout_seconds` (backpressure), after which
+  the request writes its events itself rather than drop them;
+- `stop()` (API lifespan shutdown) flushes everything still buffered.
+
+Until `start()` is called (scripts, workers, sink disabled) events are
+written synchronously. `created_at` is taken when the event is recorded, not
+when it is flushed.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from typing import Any
+
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.models.audit import AuditLog
+
+logger = logging.getLogger(__name__)
+
+# Written in the request transaction even when the sink is running
+CRITICAL_AUDIT_ACTIONS = frozenset(
+    {
+        "USER_DELETED",
+        "USER_SUSPENDED",
+        "USER_PASSWORD_RESET",
+        "STUDENT_DELETED",
+        "COURSE_DELETED",
+    }
+)
+
+_PENDING_KEY = "pending_audit_events"
+
+
+@dataclass(frozen=True)
+class AuditEvent:
+    action: str
+    actor_user_id: uuid.UUID | None = None
+    entity_type: str | None = None
+    entity_id: uuid.UUID | None = None
+    ip: str | None = None
+    user_agent: str | None = None
+    data: dict[str, Any] = field(default_factory=dict)
+    created_at: datetime = field(default_factory=lambda: datetime.now(UTC))
+
+
+@dataclass
+class AuditSinkStats:
+    written: int = 0  # Rows inserted by the flusher
+    direct: int = 0  # Rows inserted by emitters (sink stopped or buffer full)
+    failed_flushes: int = 0
+
+
+def write_audit_events(db: Session, events: list[AuditEvent]) -> None:
+    """Insert `events` in `db`'s transaction (one multi-row INSERT)."""
+    if events:
+        db.execute(insert(AuditLog), [asdict(e) for e in events])
+
+
+class AuditSink:
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal) -> None:
+        self.session_factory = session_factory
+        self.max_pending = 10_000
+        self.batch_size = 500
+        self.flush_interval_seconds = 1.0
+        self.enqueue_timeout_seconds = 2.0
+        self.stats = AuditSinkStats()
+        self._pending: deque[AuditEvent] = deque()
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._stopping = False
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def start(
+        self,
+        *,
+        max_pending: int = 10_000,
+        batch_size: int = 500,
+        flush_interval_seconds: float = 1.0,
+        enqueue_timeout_seconds: float = 2.0,
+    ) -> None:
+        """Start buffering; events are written synchronously until then."""
+        if self._thread is not None:
+            return
+        self.max_pending = max(max_pending, 1)
+        self.batch_size = max(min(batch_size, self.max_pending), 1)
+        self.flush_interval_seconds = flush_interval_seconds
+        self.enqueue_timeout_seconds = enqueue_timeout_seconds
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="audit-sink", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Flush everything buffered, then stop the flusher thread."""
+        thread = self._thread
+        if thread is None:
+            return
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        thread.join()
+        self._thread = None
+
+    def emit(self, *events: AuditEvent) -> None:
+        if not events:
+            return
+        if self.running:
+            deadline = time.monotonic() + self.enqueue_timeout_seconds
+            with self._cond:
+                while len(self._pending) + len(events) > self.max_pending:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or self._stopping:
+                        break
+                    self._cond.wait(remaining)
+                else:
+                    self._pending.extend(events)
+                    if len(self._pending) >= self.batch_size:
+                        self._cond.notify_all()
+                    return
+        # Not running, or still full after the timeout: write them here
+        with self.session_factory() as db:
+            write_audit_events(db, list(events))
+            db.commit()
+        self.stats.direct += len(events)
+
+    def flush(self) -> int:
+        """Write up to `batch_size` buffered events now; returns how many."""
+        with self._cond:
+            batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self)))]
+            self._cond.notify_all()  # Room for blocked emitters
+        if not batch:
+            return 0
+        try:
+            with self.session_factory() as db:
+                write_audit_events(db, batch)
+                db.commit()
+        except Exception:
+            with self._cond:
+                self._pending.extendleft(reversed(batch))
+            self.stats.failed_flushes += 1
+            raise
+        self.stats.written += len(batch)
+        return len(batch)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._stopping or len(self._pending) >= self.batch_size,
+                    timeout=self.flush_interval_seconds,
+                )
+                stopping = self._stopping
+            try:
+                flushed = self.flush()
+            except Exception:
+                logger.exception("Audit sink: flush of %s buffered events failed", len(self))
+                if stopping:
+                    self._discard_on_shutdown()
+                    return
+                time.sleep(self.flush_interval_seconds)
+                continue
+            if stopping and not flushed and not self._pending:
+                return
+
+    def _discard_on_shutdown(self) -> None:
+        with self._cond:
+            lost = list(self._pending)
+            self._pending.clear()
+        for e in lost:
+            logger.error("Audit event not written: %r", e)
+
+
+audit_sink = AuditSink()  # Started by the API lifespan (app.main)
+
+
+def record_audit(db: Session, entry: AuditEvent, *, critical: bool = False) -> None:
+    """Audit `entry` as part of `db`'s current transaction."""
+    if critical or entry.action in CRITICAL_AUDIT_ACTIONS or not audit_sink.running:
+        write_audit_events(db, [entry])
+        return
+    if not db.in_transaction():
+        db.begin()  # So a rollback before any query still ends it (and drops the event)
+    db.info.setdefault(_PENDING_KEY, []).append(entry)
+
+
+@event.listens_for(Session, "after_commit")
+def _emit_committed_events(session: Session) -> None:
+    events = session.info.pop(_PENDING_KEY, None)
+    if events:
+        audit_sink.emit(*events)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _drop_uncommitted_events(session: Session, transaction) -> None:
+    # Runs after after_commit: whatever is left was rolled back or discarded
+    if transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
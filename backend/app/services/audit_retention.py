@@ -0,0 +1,102 @@
+"""
+UniFECAF Portal do Aluno - Audit log partition maintenance and retention.
+
+audit.audit_log is partitioned by month on created_at (migration 032). This
+job keeps `months_ahead` partitions created ahead of time and, when a
+retention is configured, archives every partition that ended before the
+first day of the month `retention_months` ago:
+
+1. DETACH PARTITION ... CONCURRENTLY (the audit writers keep going);
+2. COPY the rows to `<archive_dir>/<partition>.ndjson.gz` (fsynced, atomic
+   rename) and DROP the table.
+
+The archives are the cold copy of the audit trail: nothing reads them back,
+so keep them wherever the compliance policy requires. The legacy partition
+(rows from before the migration) ages out the same way. The run itself
+(advisory lock, detach, leftovers) is
+services.partitions.maintain_monthly_partitions.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import UTC, datetime
+from functools import partial
+from pathlib import Path
+
+from sqlalchemy import text
+
+from app.core.database import SessionLocal
+from app.services.partitions import (
+    Partition,
+    PartitionMaintenance,
+    export_ndjson,
+    maintain_monthly_partitions,
+    month_start,
+)
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary application-wide key for pg_try_advisory_lock.
+AUDIT_PARTITIONS_LOCK_KEY = 7_301_048
+
+PARENT_TABLE = "audit.audit_log"
+
+
+def audit_retention_cutoff(retention_months: int, now: datetime | None = None) -> datetime | None:
+    """Rows before this instant are archived; None when retention is disabled (0)."""
+    if retention_months <= 0:
+        return None
+    return month_start(now or datetime.now(UTC), -retention_months)
+
+
+def _archive_and_drop(partition: Partition, archive_dir: Path) -> tuple[str, int]:
+    """Export a detached partition and drop it."""
+    path = archive_dir / f"{partition.name}.ndjson.gz"
+    with SessionLocal() as db:
+        rows = export_ndjson(db, f"SELECT * FROM {partition.qualified} ORDER BY id", path)
+        db.execute(text(f"DROP TABLE {partition.qualified}"))
+        db.commit()
+    logger.info("Archived %s (%d rows) to %s", partition.name, rows, path)
+    return str(path), rows
+
+
+def maintain_audit_partitions(
+    *,
+    months_ahead: int,
+    retention_months: int,
+    archive_dir: Path,
+    now: datetime | None = None,
+) -> PartitionMaintenance | None:
+    """Create future partitions and archive expired ones. None if already running."""
+    return maintain_monthly_partitions(
+        PARENT_TABLE,
+        lock_key=AUDIT_PARTITIONS_LOCK_KEY,
+        months_ahead=months_ahead,
+        cutoff=audit_retention_cutoff(retention_months, now),
+        archive=partial(_archive_and_drop, archive_dir=archive_dir),
+    )
+
+
+def maintain_audit_partitions_job(**kwargs) -> None:
+    """Standalone maintenance run (periodic loop); failures are logged."""
+    try:
+        result = maintain_audit_partitions(**kwargs)
+    except Exception:
+        logger.exception("Audit partition maintenance failed")
+        return
+    if result and (result.created or result.archived):
+        logger.info(
+            "Audit partitions: %d created, %d archived", result.created, len(result.archived)
+        )
+
+
+async def run_periodic_audit_partition_maintenance(interval_seconds: int, **kwargs) -> None:
+    """
+    Maintain partitions now and then every `interval_seconds` until cancelled
+    (the first run makes sure the current month's partition exists).
+    """
+    while True:
+        await asyncio.to_thread(maintain_audit_partitions_job, **kwargs)
+        await asyncio.sleep(interval_seconds)
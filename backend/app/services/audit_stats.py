@@ -0,0 +1,173 @@
+"""
+UniFECAF Portal do Aluno - Audit stats rollup (admin audit summary).
+
+The admin audit summary used to aggregate up to 90 days of raw
+audit.audit_log rows on every request. It now reads the rollup tables of
+migration 033, maintained by a periodic job:
+
+- `roll_up_audit_stats` folds every closed hour (older than `lag_seconds`,
+  so buffered audit writes have landed) into audit.audit_stats_hourly
+  (events per hour, action and entity_type) and
+  audit.audit_stats_daily_actors (events per day and actor: the exact
+  distinct actors of each day), one day per transaction, and advances
+  audit_stats_rollup_state.rolled_up_to with it. Each hour is folded
+  exactly once;
+- `audit_stats_stmt` answers the summary in one query: the rollup rows of
+  the period plus the raw rows from rolled_up_to on (at most the last hour
+  and the lag while the job keeps up, one partition).
+
+Periods are whole UTC days, today included. A row inserted with a
+created_at already folded (more than `lag_seconds` late) is not counted.
+Rollup rows older than `AUDIT_STATS_MAX_DAYS` are pruned.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+AUDIT_STATS_MAX_DAYS = 90  # Longest summary period (also the rollup's history)
+
+ROLLUP_CHUNK = timedelta(days=1)
+
+# Row lock instead of an advisory lock: a concurrent run skips the state row
+# and stops, and a run committing each chunk keeps its position.
+ROLLUP_STATE_SQL = text("""
+    SELECT rolled_up_to FROM audit.audit_stats_rollup_state FOR UPDATE SKIP LOCKED
+""")
+
+FOLD_HOURLY_SQL = text("""
+    INSERT INTO audit.audit_stats_hourly AS s (hour, action, entity_type, events)
+    SELECT date_trunc('hour', created_at, 'UTC'), action, entity_type, count(*)
+    FROM audit.audit_log
+    WHERE created_at >= :start AND created_at < :end
+    GROUP BY 1, 2, 3
+    ON CONFLICT (hour, action, entity_type) DO UPDATE SET events = s.events + EXCLUDED.events
+""")
+
+FOLD_DAILY_ACTORS_SQL = text("""
+    INSERT INTO audit.audit_stats_daily_actors AS d (day, actor_user_id, events)
+    SELECT CAST(created_at AT TIME ZONE 'UTC' AS date), actor_user_id, count(*)
+    FROM audit.audit_log
+    WHERE created_at >= :start AND created_at < :end AND actor_user_id IS NOT NULL
+    GROUP BY 1, 2
+    ON CONFLICT (day, actor_user_id) DO UPDATE SET events = d.events + EXCLUDED.events
+""")
+
+ADVANCE_STATE_SQL = text("UPDATE audit.audit_stats_rollup_state SET rolled_up_to = :end")
+
+PRUNE_SQL = (
+    text("DELETE FROM audit.audit_stats_hourly WHERE hour < :keep_from"),
+    text("DELETE FROM audit.audit_stats_daily_actors WHERE day < :keep_day"),
+)
+
+# The tail repeats `created_at >= :since` so the planner prunes partitions
+# before the period; rolled_up_to itself is only known at execution.
+AUDIT_STATS_SQL = text("""
+    WITH tail AS (
+      SELECT action, actor_user_id FROM audit.audit_log
+      WHERE created_at >= :since
+        AND created_at >= (SELECT rolled_up_to FROM audit.audit_stats_rollup_state)
+    ), per_action AS (
+      SELECT action, CAST(sum(events) AS bigint) AS events FROM (
+        SELECT action, events FROM audit.audit_stats_hourly WHERE hour >= :since
+        UNION ALL
+        SELECT action, count(*) FROM tail GROUP BY action
+      ) a GROUP BY action
+    ), per_actor AS (
+      SELECT actor_user_id, CAST(sum(events) AS bigint) AS events FROM (
+        SELECT actor_user_id, events FROM audit.audit_stats_daily_actors
+        WHERE day >= :since_day
+        UNION ALL
+        SELECT actor_user_id, count(*) FROM tail
+        WHERE actor_user_id IS NOT NULL GROUP BY actor_user_id
+      ) a GROUP BY actor_user_id
+    )
+    SELECT
+      (SELECT COALESCE(sum(events), 0) FROM per_action) AS total_logs,
+      (SELECT count(*) FROM per_action) AS unique_actions,
+      (SELECT count(*) FROM per_actor) AS unique_actors,
+      (SELECT COALESCE(sum(events), 0) FROM per_action
+       WHERE action = 'USER_LOGIN_FAILED') AS login_failures,
+      (SELECT COALESCE(json_agg(json_build_object('action', action, 'count', events)
+                                ORDER BY events DESC, action), '[]')
+       FROM (SELECT * FROM per_action ORDER BY events DESC, action LIMIT :top) t
+      ) AS top_actions,
+      (SELECT COALESCE(json_agg(json_build_object(
+                'user_id', t.actor_user_id,
+                'email', COALESCE(CAST(u.email AS text), 'Unknown'),
+                'count', t.events) ORDER BY t.events DESC, t.actor_user_id), '[]')
+       FROM (SELECT * FROM per_actor ORDER BY events DESC, actor_user_id LIMIT :top) t
+       LEFT JOIN auth.users u ON u.id = t.actor_user_id
+      ) AS top_actors
+""")
+
+
+def audit_stats_since(period_days: int, now: datetime | None = None) -> datetime:
+    """Start of a `period_days` summary: UTC midnight, today being the last day."""
+    today = (now or datetime.now(UTC)).astimezone(UTC)
+    midnight = today.replace(hour=0, minute=0, second=0, microsecond=0)
+    return midnight - timedelta(days=period_days - 1)
+
+
+def audit_stats_stmt(since: datetime, top: int = 10):
+    """One-row summary from `since` (UTC midnight) to now."""
+    return AUDIT_STATS_SQL.bindparams(since=since, since_day=since.date(), top=top)
+
+
+def roll_up_audit_stats(
+    db: Session, *, lag_seconds: float = 300, now: datetime | None = None
+) -> int | None:
+    """Fold closed hours into the rollup. Returns hours folded, None if already running."""
+    now = now or datetime.now(UTC)
+    closed = (now - timedelta(seconds=lag_seconds)).astimezone(UTC)
+    end = closed.replace(minute=0, second=0, microsecond=0)
+    folded = 0
+    while True:
+        start = db.execute(ROLLUP_STATE_SQL).scalar()
+        if start is None:
+            db.rollback()
+            return folded or None
+        if start >= end:
+            break
+        chunk_end = min(start + ROLLUP_CHUNK, end)
+        params = {"start": start, "end": chunk_end}
+        db.execute(FOLD_HOURLY_SQL, params)
+        db.execute(FOLD_DAILY_ACTORS_SQL, params)
+        db.execute(ADVANCE_STATE_SQL, params)
+        db.commit()
+        folded += int((chunk_end - start) / timedelta(hours=1))
+
+    keep_from = audit_stats_since(AUDIT_STATS_MAX_DAYS, now)
+    for stmt in PRUNE_SQL:
+        db.execute(stmt, {"keep_from": keep_from, "keep_day": keep_from.date()})
+    db.commit()
+    return folded
+
+
+def roll_up_audit_stats_job(lag_seconds: float = 300) -> None:
+    """Standalone rollup with its own session (periodic loop)."""
+    with SessionLocal() as db:
+        try:
+            folded = roll_up_audit_stats(db, lag_seconds=lag_seconds)
+        except Exception:
+            db.rollback()
+            logger.exception("Audit stats rollup failed")
+            return
+    if folded:
+        logger.info("Audit stats rollup: %d hours folded", folded)
+
+
+async def run_periodic_audit_stats_rollup(interval_seconds: int, lag_seconds: float = 300) -> None:
+    """Roll up now and then every `interval_seconds` until cancelled (catches up at startup)."""
+    while True:
+        await asyncio.to_thread(roll_up_audit_stats_job, lag_seconds)
+        await asyncio.sleep(interval_seconds)
@@ -0,0 +1,422 @@
+"""
+UniFECAF Portal do Aluno - Bulk document generation (documents.document_batches).
+
+A batch generates one document type (student card or declaration) for every
+active student of a course and/or term, e.g. the cards of all students at
+semester start. `create_batch` splits the selected students, ordered by id,
+into chunks of `chunk_size` consecutive ids (one INSERT ... SELECT), and the
+document worker pool processes the chunks in parallel:
+
+- a chunk is claimed like a document job (FOR UPDATE SKIP LOCKED + lease,
+  services.queue);
+- its students are loaded in one query, rendered without further queries
+  (services.document_rendering), written to the document storage and
+  upserted into documents.student_documents with one multi-row
+  INSERT ... ON CONFLICT DO UPDATE;
+- the chunk and the batch counters are updated in the same transaction, so
+  `generated` / `failed` / `done_chunks` always reflect committed work.
+
+A crashed worker's chunk is claimed again when its lease expires and a chunk
+that keeps failing ends FAILED; `resume_batch` requeues FAILED chunks and
+chunks with failed students. Upserts make reprocessing a chunk harmless.
+"""
+
+from __future__ import annotations
+
+import logging
+import uuid
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, timedelta
+
+from sqlalchemy import and_, case, exists, func, literal, or_, select, update
+from sqlalchemy.dialects.postgresql import aggregate_order_by, array_agg, insert
+from sqlalchemy.orm import Session
+
+from app.models.academics import Section, SectionEnrollment, Student, StudentStatus
+from app.models.documents import (
+    DocumentBatch,
+    DocumentBatchChunk,
+    DocumentJobStatus,
+    DocumentStatus,
+    DocumentType,
+    StudentDocument,
+)
+from app.services.document_rendering import (
+    DOCUMENT_FILE_TYPE,
+    DOCUMENT_TITLES,
+    RECORD_RENDERERS,
+    document_download_url,
+    load_term,
+    student_record,
+    student_records_stmt,
+)
+from app.services.queue import MAX_ERROR_LENGTH, backoff_delay, lease_due_stmt
+from app.services.storage import DocumentStorage
+
+logger = logging.getLogger(__name__)
+
+BATCH_DOCUMENT_TYPES = frozenset(RECORD_RENDERERS)
+_FILE_COLUMNS = ("file_url", "file_size", "file_type", "content_hash", "generated_at")
+
+
+@dataclass(frozen=True)
+class ChunkTask:
+    batch_id: uuid.UUID
+    seq: int
+    first_student_id: uuid.UUID
+    last_student_id: uuid.UUID
+    attempts: int  # Including the current one
+    doc_type: DocumentType
+    course_id: uuid.UUID | None
+    term_id: uuid.UUID | None
+    requested_by: uuid.UUID | None
+
+
+def batch_student_filters(course_id: uuid.UUID | None, term_id: uuid.UUID | None) -> list:
+    """Active students of the course and/or enrolled in a section of the term."""
+    filters = [Student.status == StudentStatus.ACTIVE, Student.deleted_at.is_(None)]
+    if course_id:
+        filters.append(Student.course_id == course_id)
+    if term_id:
+        filters.append(
+            exists()
+            .where(
+                SectionEnrollment.student_id == Student.user_id,
+                SectionEnrollment.section_id == Section.id,
+                Section.term_id == term_id,
+            )
+            .correlate(Student)
+        )
+    return filters
+
+
+def create_batch(
+    db: Session,
+    *,
+    doc_type: DocumentType,
+    course_id: uuid.UUID | None,
+    term_id: uuid.UUID | None,
+    requested_by: uuid.UUID | None,
+    chunk_size: int,
+) -> DocumentBatch:
+    """Create the batch and its chunks (caller commits)."""
+    batch = DocumentBatch(
+        doc_type=doc_type, course_id=course_id, term_id=term_id, requested_by=requested_by
+    )
+    db.add(batch)
+    db.flush()
+
+    numbered = (
+        select(
+            Student.user_id,
+            ((func.row_number().over(order_by=Student.user_id) - 1) // chunk_size).label("seq"),
+        )
+        .where(*batch_student_filters(course_id, term_id))
+        .subquery()
+    )
+    # No min()/max() for uuid: first and last element of the ordered ids
+    ids = array_agg(aggregate_order_by(numbered.c.user_id, numbered.c.user_id))
+    size = func.count()
+    db.execute(
+        insert(DocumentBatchChunk).from_select(
+            ["batch_id", "seq", "first_student_id", "last_student_id", "size"],
+            select(literal(batch.id), numbered.c.seq, ids[1], ids[size], size).group_by(
+                numbered.c.seq
+            ),
+        )
+    )
+    totals = db.execute(
+        select(func.count(), func.coalesce(func.sum(DocumentBatchChunk.size), 0)).where(
+            DocumentBatchChunk.batch_id == batch.id
+        )
+    ).one()
+    batch.total_chunks, batch.total_students = totals
+    if not batch.total_chunks:
+        batch.status = DocumentJobStatus.DONE
+        batch.finished_at = datetime.now(UTC)
+    db.flush()
+    return batch
+
+
+def resume_batch(db: Session, batch: DocumentBatch) -> int:
+    """Requeue FAILED chunks and chunks with failed students (caller commits)."""
+    retry = (
+        DocumentBatchChunk.batch_id == batch.id,
+        or_(
+            DocumentBatchChunk.status == DocumentJobStatus.FAILED,
+            and_(
+                DocumentBatchChunk.status == DocumentJobStatus.DONE, DocumentBatchChunk.failed > 0
+            ),
+        ),
+    )
+    counts = db.execute(
+        select(
+            func.count(),
+            func.coalesce(func.sum(DocumentBatchChunk.generated), 0),
+            func.coalesce(func.sum(DocumentBatchChunk.failed), 0),
+        ).where(*retry)
+    ).one()
+    chunks, generated, failed = counts
+    if not chunks:
+        return 0
+    db.execute(
+        update(DocumentBatchChunk)
+        .where(*retry)
+        .values(
+            status=DocumentJobStatus.PENDING,
+            attempts=0,
+            next_attempt_at=func.now(),
+            last_error=None,
+            generated=0,
+            failed=0,
+            finished_at=None,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    batch.done_chunks -= chunks
+    batch.generated -= generated
+    batch.failed -= failed
+    batch.status = DocumentJobStatus.RUNNING
+    batch.finished_at = None
+    db.flush()
+    return chunks
+
+
+# ==================== WORKER SIDE ====================
+
+
+def claim_chunk(db: Session, *, lease_seconds: int) -> ChunkTask | None:
+    """Lease the next due chunk (commits the claim)."""
+    row = db.execute(
+        lease_due_stmt(
+            DocumentBatchChunk,
+            pending=DocumentJobStatus.PENDING,
+            leased=DocumentJobStatus.RUNNING,
+            limit=1,
+            lease_seconds=lease_seconds,
+            key=(DocumentBatchChunk.batch_id, DocumentBatchChunk.seq),
+            order_by=[DocumentBatchChunk.seq],
+        )
+        .where(DocumentBatchChunk.batch_id == DocumentBatch.id)
+        .returning(
+            DocumentBatchChunk.batch_id,
+            DocumentBatchChunk.seq,
+            DocumentBatchChunk.first_student_id,
+            DocumentBatchChunk.last_student_id,
+            DocumentBatchChunk.attempts,
+            DocumentBatch.doc_type,
+            DocumentBatch.course_id,
+            DocumentBatch.term_id,
+            DocumentBatch.requested_by,
+        )
+    ).first()
+    if row is not None:
+        db.execute(
+            update(DocumentBatch)
+            .where(
+                DocumentBatch.id == row.batch_id, DocumentBatch.status == DocumentJobStatus.PENDING
+            )
+            .values(status=DocumentJobStatus.RUNNING)
+            .execution_options(synchronize_session=False)
+        )
+    db.commit()
+    return ChunkTask(**row._asdict()) if row is not None else None
+
+
+def _finish_chunk(
+    db: Session, chunk: ChunkTask, values: dict, *, generated: int, failed: int
+) -> None:
+    """Close the chunk and add it to the batch counters, then commit."""
+    db.execute(
+        update(DocumentBatchChunk)
+        .where(DocumentBatchChunk.batch_id == chunk.batch_id, DocumentBatchChunk.seq == chunk.seq)
+        .values(
+            locked_until=None,
+            generated=generated,
+            failed=failed,
+            finished_at=func.now(),
+            **values,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    # The row lock taken here serializes workers finishing chunks of the
+    # same batch: whoever brings done_chunks to total_chunks closes it.
+    done, total = db.execute(
+        update(DocumentBatch)
+        .where(DocumentBatch.id == chunk.batch_id)
+        .values(
+            done_chunks=DocumentBatch.done_chunks + 1,
+            generated=DocumentBatch.generated + generated,
+            failed=DocumentBatch.failed + failed,
+        )
+        .returning(DocumentBatch.done_chunks, DocumentBatch.total_chunks)
+        .execution_options(synchronize_session=False)
+    ).one()
+    if done >= total:
+        any_failed = db.execute(
+            select(
+                exists().where(
+                    DocumentBatchChunk.batch_id == chunk.batch_id,
+                    DocumentBatchChunk.status == DocumentJobStatus.FAILED,
+                )
+            )
+        ).scalar()
+        db.execute(
+            update(DocumentBatch)
+            .where(DocumentBatch.id == chunk.batch_id)
+            .values(
+                status=DocumentJobStatus.FAILED if any_failed else DocumentJobStatus.DONE,
+                finished_at=func.now(),
+            )
+            .execution_options(synchronize_session=False)
+        )
+    db.commit()
+
+
+def process_chunk(
+    db: Session, storage: DocumentStorage, chunk: ChunkTask, today: date | None = None
+) -> tuple[int, int]:
+    """Render, store and upsert the chunk's documents; returns (generated, failed)."""
+    today = today or datetime.now(UTC).date()
+    render = RECORD_RENDERERS[chunk.doc_type]
+    term = load_term(db, chunk.term_id)
+    students = db.execute(
+        student_records_stmt()
+        # Existing documents keep their code; new ones get theirs before rendering
+        .add_columns(
+            func.coalesce(
+                StudentDocument.verification_code, func.documents.new_verification_code()
+            ).label("verification_code")
+        )
+        .outerjoin(
+            StudentDocument,
+            and_(
+                StudentDocument.student_id == Student.user_id,
+                StudentDocument.doc_type == chunk.doc_type,
+            ),
+        )
+        .where(
+            *batch_student_filters(chunk.course_id, chunk.term_id),
+            Student.user_id.between(chunk.first_student_id, chunk.last_student_id),
+        )
+        .order_by(Student.user_id)
+    ).all()
+
+    now = datetime.now(UTC)
+    rows = []
+    failed = 0
+    for row in students:
+        record = student_record(row)
+        document = {
+            "student_id": record.user_id,
+            "doc_type": chunk.doc_type,
+            "status": DocumentStatus.AVAILABLE,
+            "title": DOCUMENT_TITLES[chunk.doc_type],
+            "requested_at": now,
+            "requested_by": chunk.requested_by,
+            "verification_code": row.verification_code,
+            **dict.fromkeys(_FILE_COLUMNS),
+        }
+        try:
+            stored = storage.put(render(record, term, today, row.verification_code))
+        except Exception:
+            logger.exception("Document batch %s: student %s failed", chunk.batch_id, record.user_id)
+            failed += 1
+            document["status"] = DocumentStatus.ERROR
+        else:
+            document.update(
+                file_url=document_download_url(chunk.doc_type),
+                file_size=stored.size,
+                file_type=DOCUMENT_FILE_TYPE,
+                content_hash=stored.key,
+                generated_at=now,
+            )
+        rows.append(document)
+
+    if rows:
+        stmt = insert(StudentDocument)
+        # Same keys in every row, so this runs as multi-row INSERTs. ERROR rows
+        # carry no file columns: a document with a previous file keeps it and
+        # its status.
+        kept = and_(stmt.excluded.content_hash.is_(None), StudentDocument.content_hash.is_not(None))
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[StudentDocument.student_id, StudentDocument.doc_type],
+                set_={
+                    "status": case((kept, StudentDocument.status), else_=stmt.excluded.status),
+                    "title": stmt.excluded.title,
+                    "requested_at": stmt.excluded.requested_at,
+                    "requested_by": stmt.excluded.requested_by,
+                    "updated_at": func.now(),
+                    **{
+                        column: func.coalesce(
+                            stmt.excluded[column], getattr(StudentDocument, column)
+                        )
+                        for column in _FILE_COLUMNS
+                    },
+                },
+            ),
+            rows,
+        )
+    return len(rows) - failed, failed
+
+
+def run_chunk(
+    db: Session,
+    storage: DocumentStorage,
+    chunk: ChunkTask,
+    *,
+    max_attempts: int,
+    backoff_base_seconds: float,
+    backoff_max_seconds: float,
+) -> bool:
+    """Process a claimed chunk and record the outcome. Returns False if it failed."""
+    try:
+        generated, failed = process_chunk(db, storage, chunk)
+    except Exception as exc:
+        db.rollback()
+        logger.warning("Document batch %s chunk %d failed: %r", chunk.batch_id, chunk.seq, exc)
+        error = repr(exc)[:MAX_ERROR_LENGTH]
+        if chunk.attempts >= max_attempts:
+            size = db.execute(
+                select(DocumentBatchChunk.size).where(
+                    DocumentBatchChunk.batch_id == chunk.batch_id,
+                    DocumentBatchChunk.seq == chunk.seq,
+                )
+            ).scalar_one()
+            _finish_chunk(
+                db,
+                chunk,
+                {"status": DocumentJobStatus.FAILED, "last_error": error},
+                generated=0,
+                failed=size,
+            )
+        else:
+            delay = backoff_delay(
+                chunk.attempts, base_seconds=backoff_base_seconds, max_seconds=backoff_max_seconds
+            )
+            db.execute(
+                update(DocumentBatchChunk)
+                .where(
+                    DocumentBatchChunk.batch_id == chunk.batch_id,
+                    DocumentBatchChunk.seq == chunk.seq,
+                )
+                .values(
+                    status=DocumentJobStatus.PENDING,
+                    locked_until=None,
+                    last_error=error,
+                    next_attempt_at=datetime.now(UTC) + timedelta(seconds=delay),
+                )
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+        return False
+
+    _finish_chunk(
+        db,
+        chunk,
+        {"status": DocumentJobStatus.DONE, "last_error": None},
+        generated=generated,
+        failed=failed,
+    )
+    return True
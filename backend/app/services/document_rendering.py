@@ -0,0 +1,229 @@
+"""
+UniFECAF Portal do Aluno - Student document rendering.
+
+Declarations and student cards are rendered from plain records
+(`StudentRecord`, `TermRecord`) so bulk generation can load a whole chunk of
+students in one query and render without touching the database; the
+transcript also reads the student's final grades. Each document prints its
+verification code (services.document_verification) when given one.
+"""
+
+from __future__ import annotations
+
+import uuid
+from dataclasses import dataclass
+from datetime import UTC, date, datetime
+from decimal import Decimal
+
+from sqlalchemy import Select, select
+from sqlalchemy.orm import Session
+
+from app.models.academics import Course, FinalGrade, Section, Student, Subject, Term
+from app.models.documents import DocumentType
+from app.services.document_verification import VERIFICATION_PATH, format_verification_code
+from app.services.pdf import ID_CARD, PdfBuilder
+
+DOCUMENT_FILE_TYPE = "application/pdf"
+
+DOCUMENT_TITLES = {
+    DocumentType.DECLARATION: "Declaração de Matrícula",
+    DocumentType.TRANSCRIPT: "Histórico Escolar",
+    DocumentType.STUDENT_CARD: "Carteirinha de Estudante",
+}
+
+_STUDENT_STATUS_LABELS = {
+    "ACTIVE": "regularmente matriculado(a)",
+    "LOCKED": "com matrícula trancada",
+    "GRADUATED": "formado(a)",
+}
+_GRADE_STATUS_LABELS = {"APPROVED": "Aprovado", "FAILED": "Reprovado", "IN_PROGRESS": "Cursando"}
+
+
+@dataclass(frozen=True)
+class StudentRecord:
+    user_id: uuid.UUID
+    full_name: str
+    ra: str
+    status: str
+    course_name: str
+
+
+@dataclass(frozen=True)
+class TermRecord:
+    code: str
+    end_date: date
+
+
+def document_download_url(doc_type: DocumentType) -> str:
+    return f"/api/v1/me/documents/{doc_type.value}/download"
+
+
+def student_records_stmt() -> Select:
+    """Columns of `StudentRecord`; callers add the filters."""
+    return select(
+        Student.user_id,
+        Student.full_name,
+        Student.ra,
+        Student.status,
+        Course.name.label("course_name"),
+    ).join(Course, Course.id == Student.course_id)
+
+
+def student_record(row) -> StudentRecord:
+    return StudentRecord(
+        user_id=row.user_id,
+        full_name=row.full_name,
+        ra=row.ra,
+        status=row.status.value,
+        course_name=row.course_name,
+    )
+
+
+def load_term(db: Session, term_id: uuid.UUID | None = None) -> TermRecord | None:
+    """`term_id`, or the current term when None."""
+    condition = Term.id == term_id if term_id else Term.is_current.is_(True)
+    row = db.execute(select(Term.code, Term.end_date).where(condition)).first()
+    return TermRecord(code=row.code, end_date=row.end_date) if row else None
+
+
+# ==================== RENDERERS ====================
+
+
+def _format_date(value: date) -> str:
+    return value.strftime("%d/%m/%Y")
+
+
+def _grade_status(grade: FinalGrade) -> str:
+    """Same rule as /me/transcript: a final score decides over the stored status."""
+    if grade.final_score is not None:
+        return "APPROVED" if grade.final_score >= Decimal("6.0") else "FAILED"
+    return grade.status.value
+
+
+def _verification_footer(pdf: PdfBuilder, code: str | None, *, size: float = 9) -> None:
+    if code:
+        pdf.line(f"Código de verificação: {format_verification_code(code)}", size=size)
+        pdf.line(f"Verifique a autenticidade em {VERIFICATION_PATH}", size=size)
+
+
+def render_declaration(
+    student: StudentRecord,
+    term: TermRecord | None,
+    today: date,
+    verification_code: str | None = None,
+) -> bytes:
+    pdf = PdfBuilder(DOCUMENT_TITLES[DocumentType.DECLARATION])
+    pdf.line("UniFECAF - Centro Universitário", size=12, bold=True)
+    pdf.gap(24)
+    pdf.line(DOCUMENT_TITLES[DocumentType.DECLARATION].upper(), size=16, bold=True)
+    pdf.gap(18)
+    situation = _STUDENT_STATUS_LABELS.get(student.status, student.status.lower())
+    pdf.paragraph(
+        f"Declaramos, para os devidos fins, que {student.full_name}, RA {student.ra}, "
+        f"encontra-se {situation} no curso de {student.course_name}"
+        + (f", no período letivo {term.code}." if term else ".")
+    )
+    pdf.gap(18)
+    pdf.line(f"Emitido em {_format_date(today)}.")
+    pdf.gap(18)
+    _verification_footer(pdf, verification_code)
+    return pdf.render()
+
+
+def render_student_card(
+    student: StudentRecord,
+    term: TermRecord | None,
+    today: date,
+    verification_code: str | None = None,
+) -> bytes:
+    valid_until = term.end_date if term else date(today.year, 12, 31)
+    pdf = PdfBuilder(DOCUMENT_TITLES[DocumentType.STUDENT_CARD], page_size=ID_CARD, margin=12)
+    pdf.line("UniFECAF", size=11, bold=True)
+    pdf.line("Carteirinha de Estudante", size=7)
+    pdf.gap(8)
+    pdf.line(student.full_name, size=9, bold=True)
+    pdf.line(f"RA {student.ra}", size=8)
+    pdf.line(student.course_name, size=7)
+    pdf.gap(6)
+    pdf.line(f"Válida até {_format_date(valid_until)}", size=7)
+    if verification_code:
+        pdf.line(f"Verificação: {format_verification_code(verification_code)}", size=6)
+    return pdf.render()
+
+
+def render_transcript(
+    db: Session, student: StudentRecord, today: date, verification_code: str | None = None
+) -> bytes:
+    grades = db.execute(
+        select(FinalGrade, Subject.code, Subject.name, Subject.credits, Term.code.label("term"))
+        .join(Section, Section.id == FinalGrade.section_id)
+        .join(Subject, Subject.id == Section.subject_id)
+        .join(Term, Term.id == Section.term_id)
+        .where(FinalGrade.student_id == student.user_id)
+        .order_by(Term.start_date, Subject.code)
+    ).all()
+
+    pdf = PdfBuilder(DOCUMENT_TITLES[DocumentType.TRANSCRIPT])
+    pdf.line(DOCUMENT_TITLES[DocumentType.TRANSCRIPT].upper(), size=16, bold=True)
+    pdf.line(f"{student.full_name} - RA {student.ra}", size=11)
+    pdf.line(student.course_name, size=11)
+    columns = [0.0, 0.14, 0.68, 0.78, 0.88]
+
+    current_term = None
+    scores: list[Decimal] = []
+    credits = 0
+    for row in grades:
+        if row.term != current_term:
+            current_term = row.term
+            pdf.gap(10)
+            pdf.line(f"Período {current_term}", size=11, bold=True)
+            pdf.row(["Código", "Disciplina", "Créditos", "Nota", "Situação"], columns, bold=True)
+        status = _grade_status(row.FinalGrade)
+        score = row.FinalGrade.final_score
+        pdf.row(
+            [
+                row.code,
+                row.name,
+                str(row.credits),
+                f"{score:.1f}".replace(".", ",") if score is not None else "-",
+                _GRADE_STATUS_LABELS.get(status, status),
+            ],
+            columns,
+        )
+        if score is not None:
+            scores.append(score)
+        if status == "APPROVED":
+            credits += row.credits
+
+    pdf.gap(14)
+    if scores:
+        average = f"{sum(scores) / len(scores):.2f}".replace(".", ",")
+        pdf.line(f"Média geral: {average}", bold=True)
+    pdf.line(f"Créditos concluídos: {credits}")
+    pdf.line(f"Emitido em {_format_date(today)}.", size=9)
+    _verification_footer(pdf, verification_code)
+    return pdf.render()
+
+
+# Documents that render from records alone (bulk generation)
+RECORD_RENDERERS = {
+    DocumentType.DECLARATION: render_declaration,
+    DocumentType.STUDENT_CARD: render_student_card,
+}
+
+
+def render_document(
+    db: Session,
+    student_id: uuid.UUID,
+    doc_type: DocumentType,
+    today: date | None = None,
+    verification_code: str | None = None,
+) -> bytes:
+    """PDF bytes of a student's document from current data."""
+    today = today or datetime.now(UTC).date()
+    student = student_record(
+        db.execute(student_records_stmt().where(Student.user_id == student_id)).one()
+    )
+    if doc_type == DocumentType.TRANSCRIPT:
+        return render_transcript(db, student, today, verification_code)
+    return RECORD_RENDERERS[doc_type](student, load_term(db), today, verification_code)
@@ -0,0 +1,182 @@
+"""
+UniFECAF Portal do Aluno - Public document verification.
+
+Every student document carries a verification code (migration 031) that is
+printed on its PDF. Anyone holding the document can check it, without
+logging in, at GET /api/v1/public/documents/verify/{code}. That endpoint
+is open to scraping, so:
+
+- codes are normalized and validated before touching the database, and a
+  valid one is resolved with one lookup on the unique index;
+- results are kept in `VerificationCache`, a bounded TTL cache of serialized
+  responses. Unknown codes are cached too, with a shorter TTL, so repeated
+  guesses do not reach the database;
+- `ClientRateLimiter` gives each client a token bucket.
+
+Both live in the API process, so limits and cache entries are per worker.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.academics import Course, Student
+from app.models.documents import DocumentStatus, StudentDocument
+from app.schemas.public import PublicDocumentVerificationResponse
+
+# Crockford base32: no I, L, O or U
+VERIFICATION_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+VERIFICATION_CODE_LENGTH = 12
+VERIFICATION_PATH = "/api/v1/public/documents/verify"
+
+_CONFUSABLES = str.maketrans("OIL", "011")
+_ALPHABET = frozenset(VERIFICATION_ALPHABET)
+
+
+def normalize_verification_code(value: str) -> str | None:
+    """Canonical form of a typed code (case, dashes, O/I/L), or None if malformed."""
+    code = "".join(value.split()).replace("-", "").upper().translate(_CONFUSABLES)
+    if len(code) != VERIFICATION_CODE_LENGTH or not _ALPHABET.issuperset(code):
+        return None
+    return code
+
+
+def format_verification_code(code: str) -> str:
+    """XXXX-XXXX-XXXX, as printed on documents."""
+    return "-".join(code[i : i + 4] for i in range(0, len(code), 4))
+
+
+def _mask_ra(ra: str) -> str:
+    return "*" * max(len(ra) - 4, 0) + ra[-4:]
+
+
+def lookup_document(db: Session, code: str) -> PublicDocumentVerificationResponse | None:
+    """The available document with `code` (normalized), or None."""
+    row = db.execute(
+        select(
+            StudentDocument.doc_type,
+            StudentDocument.title,
+            StudentDocument.content_hash,
+            StudentDocument.generated_at,
+            Student.full_name,
+            Student.ra,
+            Student.status,
+            Course.name.label("course_name"),
+        )
+        .join(Student, Student.user_id == StudentDocument.student_id)
+        .join(Course, Course.id == Student.course_id)
+        .where(
+            StudentDocument.verification_code == code,
+            StudentDocument.status == DocumentStatus.AVAILABLE,
+        )
+    ).first()
+    if row is None:
+        return None
+    return PublicDocumentVerificationResponse(
+        verification_code=format_verification_code(code),
+        doc_type=row.doc_type.value,
+        title=row.title,
+        student_name=row.full_name,
+        ra=_mask_ra(row.ra),
+        course_name=row.course_name,
+        student_status=row.status.value,
+        generated_at=row.generated_at,
+        content_hash=row.content_hash,
+    )
+
+
+class VerificationCache:
+    """Thread-safe LRU of serialized lookups with expiry; None marks an unknown code."""
+
+    def __init__(
+        self,
+        max_entries: int,
+        *,
+        ttl_seconds: float,
+        negative_ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[float, bytes | None]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, code: str) -> tuple[bool, bytes | None]:
+        """(hit, body); a hit with body None is a cached miss."""
+        with self._lock:
+            entry = self._entries.get(code)
+            if entry is None:
+                return False, None
+            expires, body = entry
+            if expires <= self._clock():
+                del self._entries[code]
+                return False, None
+            self._entries.move_to_end(code)
+            return True, body
+
+    def discard(self, code: str) -> None:
+        """Forget `code`, e.g. after its document changed or was removed."""
+        with self._lock:
+            self._entries.pop(code, None)
+
+    def put(self, code: str, body: bytes | None) -> None:
+        ttl = self.ttl_seconds if body is not None else self.negative_ttl_seconds
+        if self.max_entries <= 0 or ttl <= 0:
+            return
+        with self._lock:
+            self._entries[code] = (self._clock() + ttl, body)
+            self._entries.move_to_end(code)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ClientRateLimiter:
+    """
+    Non-blocking token bucket per client: `rate_per_second` sustained, up to
+    `burst` at once. Only the `max_clients` most recent clients are tracked;
+    an evicted client starts over with a full bucket.
+    """
+
+    def __init__(
+        self,
+        rate_per_second: float,
+        burst: int = 1,
+        *,
+        max_clients: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.rate = rate_per_second
+        self.burst = max(burst, 1)
+        self.max_clients = max_clients
+        self._clock = clock
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()  # tokens, updated
+        self._lock = threading.Lock()
+
+    def acquire(self, client: str) -> float:
+        """Take a token: 0 if allowed, else seconds until the next one."""
+        if self.rate <= 0:  # Unlimited
+            return 0.0
+        now = self._clock()
+        with self._lock:
+            tokens, updated = self._buckets.pop(client, (float(self.burst), now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / self.rate
+            self._buckets[client] = (tokens, now)
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+            return wait
@@ -0,0 +1,298 @@
+"""
+UniFECAF Portal do Aluno - Student document generation (documents.document_jobs).
+
+Requesting a document only queues a job (`enqueue_generation`); a document
+without a file shows GENERATING meanwhile, one with a file stays AVAILABLE
+and keeps serving it until the new one replaces it. `DocumentWorker`s, run
+as a process pool by python -m app.workers.documents, do the actual work:
+
+- a batch of due jobs is claimed with FOR UPDATE SKIP LOCKED and leased
+  (status RUNNING, `locked_until`; services.queue), so workers never render the same job and
+  a crashed worker's jobs become due again when the lease expires;
+- each document is rendered to PDF (services.document_rendering) from the
+  student's current data, put in the document storage (services.storage,
+  content-addressed) and marked AVAILABLE with its content_hash /
+  file_size / file_type, one commit per job;
+- failures are retried with exponential backoff; once attempts run out the
+  job is FAILED and a document without a previous file shows status ERROR.
+
+Workers also process bulk generation chunks (services.document_batches)
+when the job queue leaves them spare capacity. Rendering is CPU-bound, so
+throughput scales with the number of worker processes rather than threads.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import uuid
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import func, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.models.documents import (
+    DocumentJob,
+    DocumentJobStatus,
+    DocumentStatus,
+    DocumentType,
+    StudentDocument,
+)
+from app.services.document_batches import claim_chunk, run_chunk
+from app.services.document_rendering import (
+    DOCUMENT_FILE_TYPE,
+    DOCUMENT_TITLES,
+    document_download_url,
+    render_document,
+)
+from app.services.queue import MAX_ERROR_LENGTH, backoff_delay, lease_due_stmt
+from app.services.storage import DocumentStorage, StoredFile
+from app.services.transcripts import grade_version
+
+logger = logging.getLogger(__name__)
+
+_ACTIVE_JOB = [DocumentJobStatus.PENDING, DocumentJobStatus.RUNNING]
+
+
+@dataclass(frozen=True)
+class DocumentTask:
+    job_id: uuid.UUID
+    document_id: uuid.UUID
+    student_id: uuid.UUID
+    doc_type: DocumentType
+    verification_code: str
+    attempts: int  # Including the current one
+
+
+@dataclass
+class GenerationStats:
+    claimed: int = 0
+    done: int = 0
+    retried: int = 0
+    failed: int = 0
+    chunks: int = 0  # Bulk generation chunks processed (services.document_batches)
+
+
+def enqueue_generation(db: Session, doc: StudentDocument) -> None:
+    """Queue `doc`'s job (no-op if one is already queued); GENERATING if it has no file yet."""
+    if doc.content_hash is None:
+        doc.status = DocumentStatus.GENERATING
+    doc.title = doc.title or DOCUMENT_TITLES[doc.doc_type]
+    db.flush()
+    db.execute(
+        insert(DocumentJob)
+        .values(document_id=doc.id)
+        .on_conflict_do_nothing(
+            index_elements=["document_id"], index_where=DocumentJob.status.in_(_ACTIVE_JOB)
+        )
+    )
+
+
+# ==================== QUEUE OPERATIONS ====================
+
+
+def claim_jobs(db: Session, *, limit: int, lease_seconds: int) -> list[DocumentTask]:
+    """Lease up to `limit` due jobs (commits the claim)."""
+    rows = db.execute(
+        lease_due_stmt(
+            DocumentJob,
+            pending=DocumentJobStatus.PENDING,
+            leased=DocumentJobStatus.RUNNING,
+            limit=limit,
+            lease_seconds=lease_seconds,
+        )
+        .where(DocumentJob.document_id == StudentDocument.id)
+        .returning(
+            DocumentJob.id,
+            DocumentJob.document_id,
+            DocumentJob.attempts,
+            StudentDocument.student_id,
+            StudentDocument.doc_type,
+            StudentDocument.verification_code,
+        )
+    ).all()
+    db.commit()
+    return [
+        DocumentTask(
+            job_id=r.id,
+            document_id=r.document_id,
+            student_id=r.student_id,
+            doc_type=r.doc_type,
+            verification_code=r.verification_code,
+            attempts=r.attempts,
+        )
+        for r in rows
+    ]
+
+
+def complete_job(
+    db: Session, task: DocumentTask, stored: StoredFile, *, grade_version: int | None = None
+) -> None:
+    """Mark the document AVAILABLE with its file metadata and the job DONE."""
+    db.execute(
+        update(StudentDocument)
+        .where(StudentDocument.id == task.document_id)
+        .values(
+            status=DocumentStatus.AVAILABLE,
+            file_url=document_download_url(task.doc_type),
+            content_hash=stored.key,
+            grade_version=grade_version,
+            file_size=stored.size,
+            file_type=DOCUMENT_FILE_TYPE,
+            generated_at=func.now(),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.execute(
+        update(DocumentJob)
+        .where(DocumentJob.id == task.job_id)
+        .values(
+            status=DocumentJobStatus.DONE,
+            locked_until=None,
+            last_error=None,
+            finished_at=func.now(),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def fail_job(
+    db: Session,
+    task: DocumentTask,
+    error: str,
+    *,
+    max_attempts: int,
+    backoff_base_seconds: float,
+    backoff_max_seconds: float,
+) -> bool:
+    """Reschedule the job, or give up. Returns True if it gave up.
+
+    Giving up marks the document ERROR only if it has no file; otherwise it
+    stays AVAILABLE with the previous one.
+    """
+    gave_up = task.attempts >= max_attempts
+    values: dict = {"locked_until": None, "last_error": error[:MAX_ERROR_LENGTH]}
+    if gave_up:
+        values.update(status=DocumentJobStatus.FAILED, finished_at=func.now())
+        db.execute(
+            update(StudentDocument)
+            .where(StudentDocument.id == task.document_id, StudentDocument.content_hash.is_(None))
+            .values(status=DocumentStatus.ERROR)
+            .execution_options(synchronize_session=False)
+        )
+    else:
+        delay = backoff_delay(
+            task.attempts, base_seconds=backoff_base_seconds, max_seconds=backoff_max_seconds
+        )
+        values.update(
+            status=DocumentJobStatus.PENDING,
+            next_attempt_at=datetime.now(UTC) + timedelta(seconds=delay),
+        )
+    db.execute(
+        update(DocumentJob)
+        .where(DocumentJob.id == task.job_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return gave_up
+
+
+# ==================== WORKER ====================
+
+
+class DocumentWorker:
+    """Renders queued documents; run one per process."""
+
+    def __init__(
+        self,
+        storage: DocumentStorage,
+        *,
+        batch_size: int = 4,
+        max_attempts: int = 3,
+        backoff_base_seconds: float = 30.0,
+        backoff_max_seconds: float = 600.0,
+        lease_seconds: int = 300,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ) -> None:
+        self.storage = storage
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.lease_seconds = lease_seconds
+        self.session_factory = session_factory
+
+    def _generate(self, db: Session, task: DocumentTask) -> StoredFile:
+        return self.storage.put(
+            render_document(
+                db, task.student_id, task.doc_type, verification_code=task.verification_code
+            )
+        )
+
+    def _grade_version(self, db: Session, task: DocumentTask) -> int | None:
+        """Read before rendering: a change meanwhile leaves the file marked stale."""
+        if task.doc_type != DocumentType.TRANSCRIPT:
+            return None
+        return grade_version(db, task.student_id)
+
+    def process_once(self) -> GenerationStats:
+        """Claim and generate a batch of jobs, then at most one bulk chunk."""
+        with self.session_factory() as db:
+            tasks = claim_jobs(db, limit=self.batch_size, lease_seconds=self.lease_seconds)
+            stats = GenerationStats(claimed=len(tasks))
+            for task in tasks:
+                try:
+                    version = self._grade_version(db, task)
+                    stored = self._generate(db, task)
+                except Exception as exc:
+                    db.rollback()
+                    logger.warning("Document job %s failed: %r", task.job_id, exc)
+                    gave_up = fail_job(
+                        db,
+                        task,
+                        repr(exc),
+                        max_attempts=self.max_attempts,
+                        backoff_base_seconds=self.backoff_base_seconds,
+                        backoff_max_seconds=self.backoff_max_seconds,
+                    )
+                    if gave_up:
+                        stats.failed += 1
+                    else:
+                        stats.retried += 1
+                else:
+                    complete_job(db, task, stored, grade_version=version)
+                    stats.done += 1
+
+            # Single requests first; spare capacity goes to bulk generation
+            if len(tasks) < self.batch_size:
+                chunk = claim_chunk(db, lease_seconds=self.lease_seconds)
+                if chunk is not None:
+                    run_chunk(
+                        db,
+                        self.storage,
+                        chunk,
+                        max_attempts=self.max_attempts,
+                        backoff_base_seconds=self.backoff_base_seconds,
+                        backoff_max_seconds=self.backoff_max_seconds,
+                    )
+                    stats.chunks += 1
+        if stats.failed:
+            logger.error("%d document job(s) failed permanently", stats.failed)
+        return stats
+
+    def run(self, stop: threading.Event, *, poll_seconds: float = 1.0) -> None:
+        """Generate until `stop` is set; polls again at once while there is work."""
+        while not stop.is_set():
+            try:
+                stats = self.process_once()
+            except Exception:
+                logger.exception("Document batch failed")
+                stats = GenerationStats()
+            if stats.claimed < self.batch_size and not stats.chunks:
+                stop.wait(poll_seconds)
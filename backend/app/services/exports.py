@@ -0,0 +1,192 @@
+"""
+UniFECAF Portal do Aluno - Streaming tabular exports (CSV, NDJSON, Parquet).
+
+Rows are read from a server-side cursor (`yield_per`) and encoded one chunk
+at a time, so memory is bounded by the chunk size whatever the export size.
+Exports open their own session: the response body is produced after the
+endpoint returns.
+"""
+
+from __future__ import annotations
+
+import csv
+import enum
+import io
+import json
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Literal
+from uuid import UUID
+
+from sqlalchemy import Select
+
+from app.core.database import SessionLocal
+
+ExportFormat = Literal["csv", "ndjson", "parquet"]
+
+EXPORT_MEDIA_TYPES: dict[str, str] = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# Column kinds understood by every encoder
+ColumnKind = Literal["str", "int", "money", "date", "datetime"]
+
+
+@dataclass(frozen=True)
+class ExportColumn:
+    name: str
+    kind: ColumnKind = "str"
+
+
+# Optional per-chunk transform: receives the fetched rows, returns rows as tuples
+# in `columns` order (e.g. to add computed columns).
+ChunkTransform = Callable[[Sequence[Any]], Iterable[Sequence[Any]]]
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def _text(value: Any) -> str:
+    value = _plain(value)
+    if value is None:
+        return ""
+    if isinstance(value, date | datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, date | datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)  # Keep exact amounts
+    return str(value)
+
+
+# ==================== ENCODERS ====================
+
+
+def _encode_csv(columns: Sequence[ExportColumn], chunks: Iterator[list[Sequence[Any]]]):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([c.name for c in columns])
+    for chunk in chunks:
+        writer.writerows([[_text(v) for v in row] for row in chunk])
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():  # Header-only export
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _encode_ndjson(columns: Sequence[ExportColumn], chunks: Iterator[list[Sequence[Any]]]):
+    names = [c.name for c in columns]
+    for chunk in chunks:
+        lines = [
+            json.dumps(
+                dict(zip(names, (_plain(v) for v in row), strict=True)),
+                default=_json_default,
+                ensure_ascii=False,
+            )
+            for row in chunk
+        ]
+        if lines:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+class _DrainableSink(io.RawIOBase):
+    """Write-only file that hands written bytes back to the caller."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._parts: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self._parts.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def _arrow_schema(columns: Sequence[ExportColumn]):
+    import pyarrow as pa
+
+    types = {
+        "str": pa.string(),
+        "int": pa.int64(),
+        "money": pa.decimal128(14, 2),
+        "date": pa.date32(),
+        "datetime": pa.timestamp("us", tz="UTC"),
+    }
+    return pa.schema([(c.name, types[c.kind]) for c in columns])
+
+
+def _encode_parquet(columns: Sequence[ExportColumn], chunks: Iterator[list[Sequence[Any]]]):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _arrow_schema(columns)
+    sink = _DrainableSink()
+    # One row group per chunk keeps the writer's buffers bounded too
+    with pq.ParquetWriter(sink, schema, compression="zstd") as writer:
+        for chunk in chunks:
+            if not chunk:
+                continue
+            arrays = [
+                pa.array([_plain(row[i]) for row in chunk], type=schema.field(i).type)
+                for i in range(len(columns))
+            ]
+            writer.write_batch(pa.record_batch(arrays, schema=schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+_ENCODERS = {"csv": _encode_csv, "ndjson": _encode_ndjson, "parquet": _encode_parquet}
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def stream_export(
+    stmt: Select,
+    columns: Sequence[ExportColumn],
+    fmt: ExportFormat,
+    *,
+    transform: ChunkTransform | None = None,
+    chunk_size: int = 5_000,
+) -> Iterator[bytes]:
+    """Yield the encoded export of `stmt` chunk by chunk."""
+
+    def chunks() -> Iterator[list[Sequence[Any]]]:
+        with SessionLocal() as db:
+            result = db.execute(stmt.execution_options(yield_per=chunk_size))
+            for partition in result.partitions():
+                yield list(transform(partition)) if transform else partition
+
+    yield from _ENCODERS[fmt](columns, chunks())
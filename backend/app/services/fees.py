@@ -0,0 +1,246 @@
+"""
+UniFECAF Portal do Aluno - Invoice fine/interest calculation.
+
+`calculate_amount_due` is the reference rule for one invoice. The batch path
+applies the same rule to whole columns at once with numpy, in exact integer
+arithmetic: amounts are held in cents, rates in basis points (hundredths of a
+percent), so every result is an integer number of micro-units (1e-6 BRL) and
+matches the Decimal rule exactly, not just to the cent.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from itertools import chain
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import BigInteger, Date, Integer, Select, case, cast, literal, select
+from sqlalchemy.orm import Session
+
+from app.models.academics import Student
+from app.models.finance import Invoice, InvoiceStatus
+
+OPEN_STATUSES = (InvoiceStatus.PENDING, InvoiceStatus.OVERDUE)
+
+# amount (cents) * (10_000 + rate_bp) -> micro-units
+_MICROS_PER_CENT = 10_000
+_INT64_SAFE = 2**62
+_EPOCH = date(1970, 1, 1)
+
+
+def calculate_amount_due(
+    amount: Decimal,
+    fine_rate: Decimal,
+    interest_rate: Decimal,
+    due_date: date,
+    status: InvoiceStatus,
+    as_of: date,
+) -> Decimal:
+    """Amount due on `as_of`: single fine + monthly interest once past due."""
+    if status in (InvoiceStatus.PAID, InvoiceStatus.CANCELED):
+        return amount
+
+    if due_date >= as_of:
+        return amount
+
+    # Calculate days/months overdue
+    days_overdue = (as_of - due_date).days
+    months_overdue = max(1, days_overdue // 30)
+
+    # Single fine + monthly interest
+    fine = amount * (fine_rate / Decimal("100"))
+    interest = amount * (interest_rate / Decimal("100")) * months_overdue
+
+    return amount + fine + interest
+
+
+def micros_to_decimal(value: int) -> Decimal:
+    """Convert an integer amount of micro-units to Decimal BRL."""
+    return Decimal(int(value)).scaleb(-6)
+
+
+# ==================== BATCH CALCULATION ====================
+
+
+@dataclass(frozen=True)
+class InvoiceArrays:
+    """Column arrays for a batch of invoices (integer units, see module docstring)."""
+
+    amount_cents: np.ndarray
+    fine_bp: np.ndarray
+    interest_bp: np.ndarray
+    due_day: np.ndarray  # days since 1970-01-01
+    is_open: np.ndarray  # bool: PENDING/OVERDUE
+
+    def __len__(self) -> int:
+        return len(self.amount_cents)
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Sequence[int]]) -> InvoiceArrays:
+        """Build from (amount_cents, fine_bp, interest_bp, due_day, is_open) rows."""
+        data = np.fromiter(
+            chain.from_iterable(rows), dtype=np.int64, count=len(rows) * 5
+        ).reshape(-1, 5)
+        return cls(
+            amount_cents=data[:, 0],
+            fine_bp=data[:, 1],
+            interest_bp=data[:, 2],
+            due_day=data[:, 3],
+            is_open=data[:, 4].astype(bool),
+        )
+
+    @classmethod
+    def from_invoices(cls, invoices: Iterable[Invoice]) -> InvoiceArrays:
+        """Build from loaded Invoice objects."""
+        return cls.from_rows(
+            [
+                (
+                    int(inv.amount * 100),
+                    int(inv.fine_rate * 100),
+                    int(inv.interest_rate * 100),
+                    (inv.due_date - _EPOCH).days,
+                    int(inv.status in OPEN_STATUSES),
+                )
+                for inv in invoices
+            ]
+        )
+
+
+@dataclass(frozen=True)
+class FeeArrays:
+    """Per-invoice results in micro-units."""
+
+    principal: np.ndarray
+    fine: np.ndarray
+    interest: np.ndarray
+    is_overdue: np.ndarray
+    days_overdue: np.ndarray
+
+    @property
+    def amount_due(self) -> np.ndarray:
+        return self.principal + self.fine + self.interest
+
+
+def calculate_fees(arrays: InvoiceArrays, as_of: date) -> FeeArrays:
+    """Vectorized `calculate_amount_due` for every invoice in `arrays`."""
+    days_overdue = np.int64((as_of - _EPOCH).days) - arrays.due_day
+    is_overdue = arrays.is_open & (days_overdue > 0)
+    months_overdue = np.maximum(1, days_overdue // 30)
+
+    amount = arrays.amount_cents
+    fine_bp = arrays.fine_bp
+    interest_bp = arrays.interest_bp
+
+    # Numeric(12,2) amounts with large rates over many months can leave int64;
+    # fall back to Python ints (object arrays) for such batches.
+    if len(arrays) and _exceeds_int64(arrays, months_overdue, is_overdue):
+        amount = amount.astype(object)
+        fine_bp = fine_bp.astype(object)
+        interest_bp = interest_bp.astype(object)
+        months_overdue = months_overdue.astype(object)
+
+    zero = np.zeros_like(amount)
+    fine = np.where(is_overdue, amount * fine_bp, zero)
+    interest = np.where(is_overdue, amount * interest_bp * months_overdue, zero)
+
+    return FeeArrays(
+        principal=amount * _MICROS_PER_CENT,
+        fine=fine,
+        interest=interest,
+        is_overdue=is_overdue,
+        days_overdue=np.where(is_overdue, days_overdue, 0),
+    )
+
+
+def _exceeds_int64(
+    arrays: InvoiceArrays, months_overdue: np.ndarray, is_overdue: np.ndarray
+) -> bool:
+    max_months = int(months_overdue[is_overdue].max()) if is_overdue.any() else 0
+    bound = int(np.abs(arrays.amount_cents).max()) * (
+        _MICROS_PER_CENT + int(arrays.fine_bp.max()) + int(arrays.interest_bp.max()) * max_months
+    )
+    return bound * len(arrays) >= _INT64_SAFE
+
+
+def calculate_amounts_due(invoices: Sequence[Invoice], as_of: date) -> list[Decimal]:
+    """Batch `calculate_amount_due` over loaded invoices."""
+    fees = calculate_fees(InvoiceArrays.from_invoices(invoices), as_of)
+    return [micros_to_decimal(value) for value in fees.amount_due.tolist()]
+
+
+# ==================== PORTFOLIO PROJECTION ====================
+
+
+@dataclass
+class PortfolioProjection:
+    """Open portfolio totals on a given date (money in micro-units)."""
+
+    as_of: date
+    invoices_count: int = 0
+    overdue_count: int = 0
+    principal: int = 0
+    overdue_principal: int = 0
+    fine: int = 0
+    interest: int = 0
+    max_days_overdue: int = 0
+
+    @property
+    def total_due(self) -> int:
+        return self.principal + self.fine + self.interest
+
+    def add(self, fees: FeeArrays) -> None:
+        self.invoices_count += len(fees.principal)
+        self.overdue_count += int(fees.is_overdue.sum())
+        self.principal += int(fees.principal.sum())
+        self.overdue_principal += int(fees.principal[fees.is_overdue].sum())
+        self.fine += int(fees.fine.sum())
+        self.interest += int(fees.interest.sum())
+        if len(fees.days_overdue):
+            self.max_days_overdue = max(self.max_days_overdue, int(fees.days_overdue.max()))
+
+
+def _invoice_columns_stmt() -> Select:
+    """Invoice columns pre-converted to integer units by Postgres."""
+    return select(
+        cast(Invoice.amount * 100, BigInteger),
+        cast(Invoice.fine_rate * 100, Integer),
+        cast(Invoice.interest_rate * 100, Integer),
+        Invoice.due_date - literal(_EPOCH, Date),
+        case((Invoice.status.in_(OPEN_STATUSES), 1), else_=0),
+    )
+
+
+def project_portfolio(
+    db: Session,
+    *,
+    as_of: date,
+    course_id: UUID | None = None,
+    term_id: UUID | None = None,
+    student_id: UUID | None = None,
+    chunk_size: int = 50_000,
+) -> PortfolioProjection:
+    """
+    Project open invoices (PENDING/OVERDUE) with fees as of `as_of`.
+
+    Rows are streamed with a server-side cursor and reduced chunk by chunk, so
+    memory stays bounded by `chunk_size` regardless of portfolio size.
+    """
+    stmt = _invoice_columns_stmt().where(Invoice.status.in_(OPEN_STATUSES))
+    if course_id:
+        stmt = stmt.join(Student, Student.user_id == Invoice.student_id).where(
+            Student.course_id == course_id
+        )
+    if term_id:
+        stmt = stmt.where(Invoice.term_id == term_id)
+    if student_id:
+        stmt = stmt.where(Invoice.student_id == student_id)
+
+    projection = PortfolioProjection(as_of=as_of)
+    result = db.execute(stmt.execution_options(stream_results=True, yield_per=chunk_size))
+    for chunk in result.partitions():
+        projection.add(calculate_fees(InvoiceArrays.from_rows(chunk), as_of))
+    return projection
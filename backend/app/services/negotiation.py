@@ -0,0 +1,140 @@
+"""
+UniFECAF Portal do Aluno - Negotiation plan execution.
+
+Everything runs in the caller's transaction, in three set-based steps:
+
+1. lock the student's open invoices (one SELECT ... FOR UPDATE);
+2. cancel the requested invoices that have no payments (one UPDATE
+   anti-joined against finance.payments);
+3. record the plan and insert all installments (one multi-row
+   INSERT ... RETURNING).
+
+A concurrent negotiation for the same student blocks on step 1 and then finds
+the invoices already canceled, so it is rejected instead of creating a
+duplicate plan.
+"""
+
+from __future__ import annotations
+
+import uuid
+from collections.abc import Sequence
+from dataclasses import dataclass
+from decimal import Decimal
+
+from sqlalchemy import exists, insert, select, update
+from sqlalchemy.orm import Session
+from starlette import status
+
+from app.core.errors import raise_api_error
+from app.models.finance import Invoice, InvoiceStatus, NegotiationPlan, Payment
+from app.schemas.admin_finance import NegotiationInstallment
+from app.services.fees import OPEN_STATUSES
+
+
+@dataclass(frozen=True)
+class NegotiationResult:
+    plan: NegotiationPlan
+    created_invoice_ids: list[uuid.UUID]
+    canceled_invoice_ids: list[uuid.UUID]
+
+
+def lock_open_invoices(db: Session, student_id: uuid.UUID) -> set[uuid.UUID]:
+    """Row-lock the student's PENDING/OVERDUE invoices until commit/rollback."""
+    return set(
+        db.scalars(
+            select(Invoice.id)
+            .where(Invoice.student_id == student_id, Invoice.status.in_(OPEN_STATUSES))
+            .order_by(Invoice.id)
+            .with_for_update()
+        ).all()
+    )
+
+
+def execute_negotiation(
+    db: Session,
+    *,
+    student_id: uuid.UUID,
+    term_id: uuid.UUID | None,
+    installments: Sequence[NegotiationInstallment],
+    cancel_invoice_ids: Sequence[uuid.UUID],
+    fine_rate: Decimal,
+    interest_rate: Decimal,
+    created_by: uuid.UUID | None,
+) -> NegotiationResult:
+    """Cancel the selected open invoices and create the plan's installments."""
+    requested = set(cancel_invoice_ids)
+    open_ids = lock_open_invoices(db, student_id)
+
+    stale = requested - open_ids
+    if stale:
+        raise_api_error(
+            status_code=status.HTTP_409_CONFLICT,
+            code="NEGOTIATION_CONFLICT",
+            message="Algumas faturas selecionadas não estão mais em aberto para este aluno.",
+            details={"invoice_ids": sorted(str(i) for i in stale)},
+        )
+
+    canceled: list[tuple[uuid.UUID, Decimal]] = []
+    if requested:
+        has_payments = exists().where(Payment.invoice_id == Invoice.id)
+        canceled = [
+            (row.id, row.amount)
+            for row in db.execute(
+                update(Invoice)
+                .where(
+                    Invoice.id.in_(requested),
+                    Invoice.student_id == student_id,
+                    Invoice.status.in_(OPEN_STATUSES),
+                    ~has_payments,
+                )
+                .values(status=InvoiceStatus.CANCELED)
+                .returning(Invoice.id, Invoice.amount)
+                .execution_options(synchronize_session=False)
+            ).all()
+        ]
+
+    plan = NegotiationPlan(
+        id=uuid.uuid4(),
+        student_id=student_id,
+        term_id=term_id,
+        created_by=created_by,
+        total_amount=sum((inst.amount for inst in installments), Decimal("0.00")),
+        canceled_amount=sum((amount for _, amount in canceled), Decimal("0.00")),
+        num_installments=len(installments),
+        fine_rate=fine_rate,
+        interest_rate=interest_rate,
+        canceled_invoice_ids=[invoice_id for invoice_id, _ in canceled],
+    )
+    db.add(plan)
+    db.flush()
+
+    num_installments = len(installments)
+    created_ids = db.scalars(
+        insert(Invoice)
+        .values(
+            [
+                {
+                    "id": uuid.uuid4(),
+                    "student_id": student_id,
+                    "term_id": term_id,
+                    "description": inst.description,
+                    "due_date": inst.due_date,
+                    "amount": inst.amount,
+                    "fine_rate": fine_rate,
+                    "interest_rate": interest_rate,
+                    "installment_number": inst.installment_number,
+                    "installment_total": num_installments,
+                    "status": InvoiceStatus.PENDING,
+                    "negotiation_plan_id": plan.id,
+                }
+                for inst in installments
+            ]
+        )
+        .returning(Invoice.id)
+    ).all()
+
+    return NegotiationResult(
+        plan=plan,
+        created_invoice_ids=list(created_ids),
+        canceled_invoice_ids=plan.canceled_invoice_ids,
+    )
@@ -0,0 +1,116 @@
+"""
+UniFECAF Portal do Aluno - Notification counter reconciliation.
+
+comm.user_notification_counters.unread_count and comm.notifications.read_count
+are kept in step with comm.user_notifications by statement-level triggers
+(migration 024). Anything that bypasses them (disabled triggers during a bulk
+load, manual fixes, restores) leaves drift behind; this job recomputes both
+counters set-based and rewrites only the rows that disagree.
+
+Notifications created before the retention cutoff may have had deliveries
+archived with their partition (services.notification_retention); their
+read_count is historical and left alone.
+
+Writers to comm.user_notifications wait on a SHARE lock while the recount
+runs, so no trigger delta can land between the count and the fix. A
+transaction-scoped advisory lock collapses concurrent runs into one.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass
+
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.services.notifications import inbox_window_start
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary application-wide key for pg_try_advisory_xact_lock.
+NOTIFICATION_COUNTERS_LOCK_KEY = 7_301_036
+
+REPAIR_UNREAD_COUNTERS_SQL = text("""
+    WITH actual AS (
+      SELECT user_id,
+             count(*) FILTER (WHERE read_at IS NULL AND archived_at IS NULL) AS unread
+      FROM comm.user_notifications
+      GROUP BY user_id
+    )
+    INSERT INTO comm.user_notification_counters AS c (user_id, unread_count)
+    SELECT user_id, COALESCE(a.unread, 0)
+    FROM actual a
+    FULL JOIN comm.user_notification_counters cur USING (user_id)
+    WHERE COALESCE(a.unread, 0) <> COALESCE(cur.unread_count, 0)
+    ORDER BY user_id
+    ON CONFLICT (user_id) DO UPDATE
+      SET unread_count = EXCLUDED.unread_count, updated_at = now()
+""")
+
+REPAIR_READ_COUNTS_SQL = text("""
+    UPDATE comm.notifications n
+    SET read_count = COALESCE(a.reads, 0)
+    FROM comm.notifications cur
+    LEFT JOIN (
+      SELECT notification_id, count(*) AS reads
+      FROM comm.user_notifications
+      WHERE read_at IS NOT NULL
+      GROUP BY notification_id
+    ) a ON a.notification_id = cur.id
+    WHERE n.id = cur.id AND n.read_count <> COALESCE(a.reads, 0)
+      AND (CAST(:since AS timestamptz) IS NULL OR cur.created_at >= :since)
+""")
+
+
+@dataclass(frozen=True)
+class CounterRepair:
+    users: int  # Unread counters rewritten
+    notifications: int  # read_count values rewritten
+
+
+def reconcile_notification_counters(
+    db: Session, retention_months: int = 0
+) -> CounterRepair | None:
+    """Repair counter drift. Returns None if another reconciliation is running."""
+    acquired = db.execute(
+        select(func.pg_try_advisory_xact_lock(NOTIFICATION_COUNTERS_LOCK_KEY))
+    ).scalar()
+    if not acquired:
+        db.rollback()
+        return None
+
+    db.execute(text("LOCK TABLE comm.user_notifications IN SHARE MODE"))
+    users = db.execute(REPAIR_UNREAD_COUNTERS_SQL).rowcount
+    since = inbox_window_start(retention_months)
+    notifications = db.execute(REPAIR_READ_COUNTS_SQL, {"since": since}).rowcount
+    db.commit()
+    return CounterRepair(users=users, notifications=notifications)
+
+
+def reconcile_notification_counters_job(retention_months: int = 0) -> None:
+    """Standalone reconciliation with its own session (periodic loop)."""
+    with SessionLocal() as db:
+        try:
+            repair = reconcile_notification_counters(db, retention_months)
+        except Exception:
+            db.rollback()
+            logger.exception("Notification counter reconciliation failed")
+            return
+    if repair and (repair.users or repair.notifications):
+        logger.warning(
+            "Notification counter drift repaired: %d users, %d notifications",
+            repair.users,
+            repair.notifications,
+        )
+
+
+async def run_periodic_counter_reconciliation(
+    interval_seconds: int, retention_months: int = 0
+) -> None:
+    """Reconcile notification counters every `interval_seconds` until cancelled."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        await asyncio.to_thread(reconcile_notification_counters_job, retention_months)
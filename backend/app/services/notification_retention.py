@@ -0,0 +1,112 @@
+"""
+UniFECAF Portal do Aluno - Notification partition maintenance and retention.
+
+comm.user_notifications is partitioned by month on delivered_at (migration
+026). This job keeps `months_ahead` partitions created ahead of time and,
+when a retention is configured, archives every partition that ended before
+the retention cutoff (`inbox_window_start`):
+
+1. DETACH PARTITION ... CONCURRENTLY (readers and writers keep going);
+2. COPY the rows to `<archive_dir>/<partition>.ndjson.gz` (fsynced, atomic
+   rename);
+3. in the same transaction, subtract the partition's unread rows from
+   comm.user_notification_counters and DROP the table.
+
+Dropping a table fires no DELETE trigger, hence the explicit counter update;
+comm.notifications.read_count is historical and left as is. A run
+interrupted after step 1 leaves a detached table behind, which the next run
+archives first. The legacy partition (rows from before the migration) is
+archived the same way once its whole range is past the cutoff.
+
+The run itself (advisory lock, detach, leftovers) is
+services.partitions.maintain_monthly_partitions.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+
+from sqlalchemy import text
+
+from app.core.database import SessionLocal
+from app.services.notifications import inbox_window_start
+from app.services.partitions import (
+    Partition,
+    PartitionMaintenance,
+    export_ndjson,
+    maintain_monthly_partitions,
+)
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary application-wide key for pg_try_advisory_lock.
+NOTIFICATION_PARTITIONS_LOCK_KEY = 7_301_040
+
+PARENT_TABLE = "comm.user_notifications"
+
+SUBTRACT_UNREAD_SQL = """
+    SELECT comm.apply_notification_counter_deltas(
+      (SELECT COALESCE(jsonb_object_agg(user_id, -n), '{{}}') FROM (
+         SELECT user_id, count(*) AS n FROM {table}
+         WHERE read_at IS NULL AND archived_at IS NULL GROUP BY user_id) u),
+      '{{}}'::jsonb
+    )
+"""
+
+
+def _archive_and_drop(partition: Partition, archive_dir: Path) -> tuple[str, int]:
+    """Export a detached partition, fix the unread counters and drop it."""
+    path = archive_dir / f"{partition.name}.ndjson.gz"
+    with SessionLocal() as db:
+        rows = export_ndjson(db, f"SELECT * FROM {partition.qualified}", path)
+        db.execute(text(SUBTRACT_UNREAD_SQL.format(table=partition.qualified)))
+        db.execute(text(f"DROP TABLE {partition.qualified}"))
+        db.commit()
+    logger.info("Archived %s (%d rows) to %s", partition.name, rows, path)
+    return str(path), rows
+
+
+def maintain_notification_partitions(
+    *,
+    months_ahead: int,
+    retention_months: int,
+    archive_dir: Path,
+    now: datetime | None = None,
+) -> PartitionMaintenance | None:
+    """Create future partitions and archive expired ones. None if already running."""
+    return maintain_monthly_partitions(
+        PARENT_TABLE,
+        lock_key=NOTIFICATION_PARTITIONS_LOCK_KEY,
+        months_ahead=months_ahead,
+        cutoff=inbox_window_start(retention_months, now),
+        archive=partial(_archive_and_drop, archive_dir=archive_dir),
+    )
+
+
+def maintain_notification_partitions_job(**kwargs) -> None:
+    """Standalone maintenance run (periodic loop); failures are logged."""
+    try:
+        result = maintain_notification_partitions(**kwargs)
+    except Exception:
+        logger.exception("Notification partition maintenance failed")
+        return
+    if result and (result.created or result.archived):
+        logger.info(
+            "Notification partitions: %d created, %d archived",
+            result.created,
+            len(result.archived),
+        )
+
+
+async def run_periodic_partition_maintenance(interval_seconds: int, **kwargs) -> None:
+    """
+    Maintain partitions now and then every `interval_seconds` until cancelled
+    (the first run makes sure the current month's partition exists).
+    """
+    while True:
+        await asyncio.to_thread(maintain_notification_partitions_job, **kwargs)
+        await asyncio.sleep(interval_seconds)
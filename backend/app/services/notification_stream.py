@@ -0,0 +1,257 @@
+"""
+UniFECAF Portal do Aluno - Real-time notification stream (SSE).
+
+Each API worker runs one `NotificationHub`: a single dedicated Postgres
+connection LISTENs on the `comm_notifications` channel (see
+services.notifications.notify_delivery / notify_user_state) and the hub
+multiplexes those events onto every open /me/notifications/stream
+connection of that worker. Idle connections cost a small `Subscription`
+(bounded deque + asyncio.Event) and no database connection.
+
+Notifications arriving in a burst are coalesced: one dispatch resolves
+which connected users are affected and their unread counts in a worker
+thread, with at most four set-based queries (the notifications, their
+recipients among the connected users, live broadcasts and unread counts)
+however many payloads it drains.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import uuid
+from collections import deque
+from collections.abc import AsyncIterator, Iterable
+from datetime import datetime
+
+import psycopg2
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from sqlalchemy import select
+
+from app.core.database import SessionLocal, engine
+from app.models.notifications import Notification
+from app.services.notifications import (
+    NOTIFY_CHANNEL,
+    count_unread_many,
+    inbox_window_start,
+    recipients_among,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def format_event(event: str, data: dict) -> str:
+    """Encode one SSE event."""
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+def unread_count_event(count: int) -> str:
+    return format_event("unread-count", {"unread_count": count})
+
+
+class Subscription:
+    """One open stream: pending events, oldest dropped when the client lags."""
+
+    __slots__ = ("user_id", "_events", "_ready")
+
+    def __init__(self, user_id: uuid.UUID, *, max_pending: int) -> None:
+        self.user_id = user_id
+        self._events: deque[str] = deque(maxlen=max_pending)
+        self._ready = asyncio.Event()
+
+    def push(self, event: str) -> None:
+        self._events.append(event)
+        self._ready.set()
+
+    async def next_event(self, timeout: float) -> str | None:
+        """Next pending event, or None after `timeout` seconds without one."""
+        if not self._events:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except TimeoutError:
+                return None
+        return self._events.popleft()
+
+
+def _resolve_events(
+    payloads: list[dict], user_ids: list[uuid.UUID], since: datetime | None = None
+) -> list[tuple[uuid.UUID, str]]:
+    """
+    Events per connected user for a batch of NOTIFY payloads (runs in a
+    thread). `since` is the inbox window, as in /me/notifications.
+    """
+    connected = set(user_ids)
+    affected: set[uuid.UUID] = set()
+    notification_ids: set[uuid.UUID] = set()
+    for payload in payloads:
+        if "user_id" in payload:
+            user_id = uuid.UUID(payload["user_id"])
+            if user_id in connected:
+                affected.add(user_id)
+        else:
+            notification_ids.add(uuid.UUID(payload["notification_id"]))
+
+    events: list[tuple[uuid.UUID, str]] = []
+    with SessionLocal() as db:
+        if notification_ids:
+            notifications = db.execute(
+                select(
+                    Notification.id,
+                    Notification.type,
+                    Notification.priority,
+                    Notification.title,
+                    Notification.audience,
+                    Notification.is_archived,
+                    Notification.published_at,
+                ).where(Notification.id.in_(notification_ids))
+            ).all()
+            notification_events = {
+                n.id: format_event(
+                    "notification",
+                    {
+                        "notification_id": str(n.id),
+                        "type": n.type.value,
+                        "priority": n.priority.value,
+                        "title": n.title,
+                    },
+                )
+                for n in notifications
+            }
+            for user_id, notification_id in recipients_among(db, notifications, user_ids, since):
+                events.append((user_id, notification_events[notification_id]))
+                affected.add(user_id)
+
+        counts = count_unread_many(db, sorted(affected), since)
+    events.extend((user_id, unread_count_event(count)) for user_id, count in counts.items())
+    return events
+
+
+class NotificationHub:
+    """Per-worker LISTEN connection fanned out to in-process subscriptions."""
+
+    def __init__(
+        self, *, max_pending: int = 16, reconnect_seconds: float = 5.0, retention_months: int = 0
+    ) -> None:
+        self.max_pending = max_pending
+        self.reconnect_seconds = reconnect_seconds
+        self.retention_months = retention_months
+        self._subscriptions: dict[uuid.UUID, set[Subscription]] = {}
+        self._pending: list[dict] = []
+        self._dispatcher: asyncio.Task | None = None
+        self._connector: asyncio.Task | None = None
+        self._conn = None
+        self._fd: int | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def connections(self) -> int:
+        return sum(len(subs) for subs in self._subscriptions.values())
+
+    # --- Subscriptions ---
+
+    def subscribe(self, user_id: uuid.UUID) -> Subscription:
+        subscription = Subscription(user_id, max_pending=self.max_pending)
+        self._subscriptions.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subs = self._subscriptions.get(subscription.user_id)
+        if subs is not None:
+            subs.discard(subscription)
+            if not subs:
+                del self._subscriptions[subscription.user_id]
+
+    def publish(self, events: Iterable[tuple[uuid.UUID, str]]) -> None:
+        """Push pre-encoded events to every stream of each user."""
+        for user_id, event in events:
+            for subscription in self._subscriptions.get(user_id, ()):
+                subscription.push(event)
+
+    # --- LISTEN connection ---
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._connector = asyncio.create_task(self._connect_forever())
+
+    async def stop(self) -> None:
+        for task in (self._connector, self._dispatcher):
+            if task is not None:
+                task.cancel()
+        self._close()
+
+    async def _connect_forever(self) -> None:
+        while self._conn is None:
+            try:
+                conn = await asyncio.to_thread(self._open_listen_connection)
+            except psycopg2.Error:
+                logger.exception("Notification stream LISTEN connection failed")
+                await asyncio.sleep(self.reconnect_seconds)
+                continue
+            self._conn, self._fd = conn, conn.fileno()
+            self._loop.add_reader(self._fd, self._on_readable)
+            logger.info("Notification stream listening on %s", NOTIFY_CHANNEL)
+        # Events may have been missed while disconnected: resync every open stream
+        self._enqueue({"user_id": str(user_id)} for user_id in list(self._subscriptions))
+
+    @staticmethod
+    def _open_listen_connection():
+        dsn = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        conn = psycopg2.connect(dsn)
+        conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        with conn.cursor() as cur:
+            cur.execute(f"LISTEN {NOTIFY_CHANNEL}")
+        return conn
+
+    def _close(self) -> None:
+        if self._conn is not None:
+            self._loop.remove_reader(self._fd)
+            self._conn.close()
+            self._conn = self._fd = None
+
+    def _on_readable(self) -> None:
+        try:
+            self._conn.poll()
+        except psycopg2.Error:
+            logger.warning("Notification stream LISTEN connection lost; reconnecting")
+            self._close()
+            self._connector = self._loop.create_task(self._connect_forever())
+            return
+        notifies = list(self._conn.notifies)
+        self._conn.notifies.clear()
+        self._enqueue(json.loads(n.payload) for n in notifies)
+
+    # --- Dispatch ---
+
+    def _enqueue(self, payloads: Iterable[dict]) -> None:
+        self._pending.extend(payloads)
+        if self._pending and (self._dispatcher is None or self._dispatcher.done()):
+            self._dispatcher = self._loop.create_task(self._dispatch())
+
+    async def _dispatch(self) -> None:
+        while self._pending:
+            payloads, self._pending = self._pending, []
+            user_ids = list(self._subscriptions)
+            if not user_ids:
+                continue
+            try:
+                since = inbox_window_start(self.retention_months)
+                events = await asyncio.to_thread(_resolve_events, payloads, user_ids, since)
+            except Exception:
+                logger.exception("Notification stream dispatch failed")
+                continue
+            self.publish(events)
+
+
+async def stream_events(
+    hub: NotificationHub, subscription: Subscription, *, initial_unread: int, heartbeat: float
+) -> AsyncIterator[str]:
+    """SSE body: current unread count, then pushed events and keep-alive comments."""
+    try:
+        yield f"retry: {int(hub.reconnect_seconds * 1000)}\n" + unread_count_event(initial_unread)
+        while True:
+            event = await subscription.next_event(heartbeat)
+            yield event if event is not None else ": keep-alive\n\n"
+    finally:
+        hub.unsubscribe(subscription)
@@ -0,0 +1,691 @@
+"""
+UniFECAF Portal do Aluno - Notification delivery (fan-out).
+
+Delivery is one statement: the audience SELECT feeds an anti-joined
+INSERT into comm.user_notifications, and the notification's delivered_count
+is bumped by the number of inserted rows in a sibling CTE. EMAIL/SMS
+notifications also queue comm.outbox_messages rows for the new deliveries in
+the same statement, filtered by each user's channel preferences through a
+join. No user ids travel through Python and the whole fan-out commits (or
+fails) atomically.
+
+Audiences are plain SELECTs of user ids; `audience_from_spec` compiles a
+declarative `NotificationAudience` into one such SELECT (EXISTS subqueries
+per criterion), so targeting and dry-run counts never materialize ids.
+
+Broadcasts are the fan-out-on-read alternative: the notification keeps its
+audience spec and each inbox read checks membership. A user_notifications
+row only appears once the student reads, unreads or archives the broadcast.
+
+Per-user unread counts and per-notification read counts are maintained by
+triggers on comm.user_notifications (see services.notification_counters), so
+every path here only writes the state rows.
+
+comm.user_notifications is partitioned by month on delivered_at, which rules
+out a UNIQUE (user_id, notification_id) constraint. Every insert of state
+rows for a notification first takes a transaction-scoped advisory lock on
+that notification id (`_lock_deliveries`) and skips users that already have
+a row, so concurrent deliveries still produce one row per user. Inbox
+queries are bounded by `inbox_window_start` (the retention window), which
+lets Postgres prune the partitions outside it.
+
+Deliveries and inbox state changes are announced on the `comm_notifications`
+LISTEN/NOTIFY channel (delivered on commit) for the real-time stream in
+services.notification_stream.
+"""
+
+from __future__ import annotations
+
+import json
+import uuid
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import UTC, datetime
+
+from sqlalchemy import (
+    CTE,
+    ColumnElement,
+    DateTime,
+    Row,
+    Select,
+    Subquery,
+    Text,
+    and_,
+    any_,
+    case,
+    cast,
+    exists,
+    false,
+    func,
+    literal,
+    null,
+    or_,
+    select,
+    true,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, UUID, insert
+from sqlalchemy.orm import Session
+
+from app.models.academics import (
+    EnrollmentStatus,
+    FinalGrade,
+    Section,
+    SectionEnrollment,
+    Student,
+    StudentStatus,
+)
+from app.models.finance import Invoice
+from app.models.notifications import (
+    Notification,
+    NotificationChannel,
+    NotificationPreference,
+    OutboxMessage,
+    UserNotification,
+    UserNotificationCounter,
+)
+from app.models.user import User, UserRole
+from app.schemas.admin_comm import NotificationAudience
+from app.services.fees import OPEN_STATUSES
+from app.services.partitions import month_start
+
+# Advisory lock namespace (first key) for inserts of a notification's state rows.
+DELIVERY_LOCK_NAMESPACE = 7_301_040
+
+
+@dataclass(frozen=True)
+class FanOutResult:
+    targeted: int  # Distinct users selected by the audience
+    delivered: int  # New user_notifications rows
+    queued: int = 0  # New outbox rows (EMAIL/SMS channels)
+
+    @property
+    def skipped(self) -> int:
+        return self.targeted - self.delivered
+
+
+def inbox_window_start(retention_months: int, now: datetime | None = None) -> datetime | None:
+    """
+    Oldest delivered_at still in the inbox: the start of the month
+    `retention_months` before the current one (None keeps everything).
+
+    It matches the retention cutoff, so inbox queries only touch partitions
+    the retention job has not archived yet.
+    """
+    if retention_months <= 0:
+        return None
+    return month_start(now or datetime.now(UTC), -retention_months)
+
+
+def _lock_deliveries(db: Session, notification_ids: Sequence[uuid.UUID]) -> None:
+    """Serialize inserts of state rows for these notifications until commit."""
+    for notification_id in sorted(set(notification_ids)):  # Fixed order: no deadlocks
+        db.execute(
+            select(
+                func.pg_advisory_xact_lock(
+                    DELIVERY_LOCK_NAMESPACE, func.hashtext(str(notification_id))
+                )
+            )
+        )
+
+
+def _has_state(user_id, notification_id):
+    """EXISTS: the user already has a state row for the notification."""
+    return exists().where(
+        UserNotification.user_id == user_id,
+        UserNotification.notification_id == notification_id,
+    )
+
+
+def all_students_audience() -> Select:
+    """Audience: every student user."""
+    return select(User.id).where(User.role == UserRole.STUDENT)
+
+
+def _uuid_array(ids: Sequence[uuid.UUID]):
+    """Bind a list of ids as a single uuid[] parameter."""
+    return any_(literal(list(ids), ARRAY(UUID(as_uuid=True))))
+
+
+def user_ids_audience(user_ids: Sequence[uuid.UUID]) -> Select:
+    """Audience: explicit user ids (unknown ids are ignored), bound as one array."""
+    return select(User.id).where(User.id == _uuid_array(user_ids))
+
+
+def _section_scope(section_id_col, spec: NotificationAudience) -> list:
+    """Restrict a section_id column to the spec's term and sections."""
+    conditions = []
+    if spec.section_ids:
+        conditions.append(section_id_col == _uuid_array(spec.section_ids))
+    if spec.term_id:
+        conditions.append(
+            section_id_col.in_(select(Section.id).where(Section.term_id == spec.term_id))
+        )
+    return conditions
+
+
+def audience_from_spec(spec: NotificationAudience) -> Select:
+    """Compile an audience spec into a SELECT of student user ids."""
+    stmt = select(Student.user_id)
+
+    if spec.student_statuses:
+        stmt = stmt.where(Student.status.in_(spec.student_statuses))
+    else:
+        stmt = stmt.where(Student.status != StudentStatus.DELETED)
+
+    if spec.course_ids:
+        stmt = stmt.where(Student.course_id == _uuid_array(spec.course_ids))
+
+    if spec.term_id or spec.section_ids:
+        stmt = stmt.where(
+            exists().where(
+                SectionEnrollment.student_id == Student.user_id,
+                SectionEnrollment.status != EnrollmentStatus.DROPPED,
+                *_section_scope(SectionEnrollment.section_id, spec),
+            )
+        )
+
+    if spec.has_overdue_invoices is not None:
+        # Open and past due, whether or not the status job already flagged it OVERDUE
+        overdue = exists().where(
+            Invoice.student_id == Student.user_id,
+            Invoice.status.in_(OPEN_STATUSES),
+            Invoice.due_date < func.current_date(),
+        )
+        stmt = stmt.where(overdue if spec.has_overdue_invoices else ~overdue)
+
+    if spec.min_absences_pct is not None:
+        stmt = stmt.where(
+            exists().where(
+                FinalGrade.student_id == Student.user_id,
+                FinalGrade.absences_pct > spec.min_absences_pct,
+                *_section_scope(FinalGrade.section_id, spec),
+            )
+        )
+
+    return stmt
+
+
+def count_audience(db: Session, audience: Select) -> int:
+    """Number of distinct users an audience selects (dry run)."""
+    targets = audience.distinct().subquery()
+    return db.execute(select(func.count()).select_from(targets)).scalar_one()
+
+
+def outbox_insert(notification_id, user_id_col):
+    """
+    INSERT of outbox rows for `user_id_col`'s users that accept the channel.
+
+    `notification_id` is a notification id, or a column of the same source as
+    `user_id_col` pairing each user with their notification.
+    """
+    recipient = case(
+        (Notification.channel == NotificationChannel.EMAIL, User.email),
+        else_=NotificationPreference.phone,
+    )
+    # Users without a preferences row get the column defaults (email on, SMS off)
+    accepts_channel = or_(
+        and_(
+            Notification.channel == NotificationChannel.EMAIL,
+            func.coalesce(NotificationPreference.email_enabled, true()),
+        ),
+        and_(
+            Notification.channel == NotificationChannel.SMS,
+            func.coalesce(NotificationPreference.sms_enabled, false()),
+            NotificationPreference.phone.is_not(None),
+        ),
+    )
+    rows = (
+        select(Notification.id, user_id_col, Notification.channel, recipient)
+        .join(User, User.id == user_id_col)
+        .outerjoin(NotificationPreference, NotificationPreference.user_id == user_id_col)
+        .where(Notification.id == notification_id, accepts_channel)
+    )
+    return (
+        insert(OutboxMessage)
+        .from_select(
+            ["notification_id", "user_id", "channel", "recipient"], rows, include_defaults=False
+        )
+        .on_conflict_do_nothing(index_elements=["notification_id", "user_id"])
+        .returning(OutboxMessage.id)
+    )
+
+
+def fan_out_notification(db: Session, notification_id: uuid.UUID, audience: Select) -> FanOutResult:
+    """Deliver a notification to every user id selected by `audience` (first column)."""
+    _lock_deliveries(db, [notification_id])
+    targets = audience.distinct().cte("targets")
+    user_id_col = next(iter(targets.c))
+
+    inserted = (
+        insert(UserNotification)
+        .from_select(
+            ["user_id", "notification_id"],
+            select(user_id_col, literal(notification_id, UUID(as_uuid=True))).where(
+                ~_has_state(user_id_col, notification_id)
+            ),
+            include_defaults=False,
+        )
+        .returning(UserNotification.user_id)
+        .cte("inserted")
+    )
+    delivered = select(func.count()).select_from(inserted).scalar_subquery()
+
+    bumped = (
+        update(Notification)
+        .where(Notification.id == notification_id)
+        .values(delivered_count=Notification.delivered_count + delivered)
+        .returning(Notification.id)
+        .cte("bumped")
+    )
+    # Only new deliveries are queued, so a replayed fan-out sends nothing twice
+    queued = outbox_insert(notification_id, inserted.c.user_id).cte("queued")
+
+    row = db.execute(
+        select(
+            select(func.count()).select_from(targets).scalar_subquery().label("targeted"),
+            delivered.label("delivered"),
+            select(func.count()).select_from(bumped).scalar_subquery().label("bumped"),
+            select(func.count()).select_from(queued).scalar_subquery().label("queued"),
+        )
+    ).one()
+    if row.delivered:
+        notify_delivery(db, notification_id)
+    return FanOutResult(targeted=row.targeted, delivered=row.delivered, queued=row.queued)
+
+
+def enqueue_outbox(db: Session, notification_id: uuid.UUID, audience: Select) -> int:
+    """Queue EMAIL/SMS messages for an audience (no-op for IN_APP). Returns new rows."""
+    targets = audience.distinct().cte("targets")
+    queued = outbox_insert(notification_id, next(iter(targets.c))).cte("queued")
+    return db.execute(select(func.count()).select_from(queued)).scalar_one()
+
+
+# ==================== REAL-TIME EVENTS (LISTEN/NOTIFY) ====================
+
+NOTIFY_CHANNEL = "comm_notifications"
+
+
+def _notify(db: Session, payload: dict) -> None:
+    db.execute(select(func.pg_notify(NOTIFY_CHANNEL, json.dumps(payload))))
+
+
+def notify_delivery(db: Session, notification_id: uuid.UUID) -> None:
+    """Announce new deliveries (direct or broadcast) of a notification on commit."""
+    _notify(db, {"notification_id": str(notification_id)})
+
+
+def notify_user_state(db: Session, user_id: uuid.UUID) -> None:
+    """Announce a change in the user's inbox state (read/unread/archive) on commit."""
+    _notify(db, {"user_id": str(user_id)})
+
+
+def notifies_cte(key: str, ids: ColumnElement, name: str = "notified") -> CTE:
+    """
+    CTE sending one NOTIFY `{key: id}` per distinct value of `ids` (a column
+    of a sibling CTE), so a statement announces any number of users
+    ("user_id") or notifications ("notification_id") at once. Counting its
+    rows runs it (the NOTIFY is volatile, so the CTE is always materialized).
+    """
+    distinct = select(ids.label("id")).distinct().subquery()
+    payload = cast(func.jsonb_build_object(key, distinct.c.id), Text)
+    return select(func.pg_notify(NOTIFY_CHANNEL, payload).label("sent")).cte(name)
+
+
+def recipients_among(
+    db: Session,
+    notifications: Sequence[Row],
+    user_ids: Sequence[uuid.UUID],
+    since: datetime | None = None,
+) -> list[tuple[uuid.UUID, uuid.UUID]]:
+    """
+    (user_id, notification_id) for the users in `user_ids` that have one of
+    `notifications` (rows with id, audience, is_archived and published_at) in
+    their inbox, in one query: direct deliveries through user_notifications,
+    broadcasts through their audiences.
+    """
+    live = [n for n in notifications if not n.is_archived]
+    if not user_ids or not live:
+        return []
+    parts = []
+    direct_ids = [n.id for n in live if n.audience is None]
+    if direct_ids:
+        direct = select(UserNotification.user_id, UserNotification.notification_id).where(
+            UserNotification.notification_id == _uuid_array(direct_ids),
+            UserNotification.user_id == _uuid_array(user_ids),
+            UserNotification.archived_at.is_(None),
+        )
+        if since is not None:
+            direct = direct.where(UserNotification.delivered_at >= since)
+        parts.append(direct)
+    for n in live:
+        if n.audience is None or (since is not None and n.published_at < since):
+            continue
+        audience = audience_from_spec(NotificationAudience.model_validate(n.audience))
+        parts.append(
+            audience.add_columns(literal(n.id, UUID(as_uuid=True)).label("notification_id")).where(
+                Student.user_id == _uuid_array(user_ids)
+            )
+        )
+    if not parts:
+        return []
+    return [tuple(row) for row in db.execute(union_all(*parts))]
+
+
+def count_unread_many(
+    db: Session, user_ids: Sequence[uuid.UUID], since: datetime | None = None
+) -> dict[uuid.UUID, int]:
+    """`count_unread` for many users at once: counters plus one probe per live broadcast."""
+    if not user_ids:
+        return {}
+    direct = select(
+        UserNotificationCounter.user_id.label("user_id"),
+        UserNotificationCounter.unread_count.label("unread"),
+    ).where(UserNotificationCounter.user_id == _uuid_array(user_ids))
+
+    broadcasts = db.execute(_live_broadcasts_stmt(since)).all()
+    # Members without a state row yet count as unread
+    pending = [
+        audience_from_spec(NotificationAudience.model_validate(row.audience))
+        .add_columns(literal(1).label("unread"))
+        .where(
+            Student.user_id == _uuid_array(user_ids),
+            ~_has_state(Student.user_id, row.id),
+        )
+        for row in broadcasts
+    ]
+    parts = union_all(direct, *pending).subquery("parts")
+    rows = db.execute(
+        select(parts.c.user_id, func.sum(parts.c.unread)).group_by(parts.c.user_id)
+    ).all()
+    counts = dict.fromkeys(user_ids, 0)
+    counts.update({user_id: int(total) for user_id, total in rows})
+    return counts
+
+
+# ==================== BROADCASTS (FAN-OUT-ON-READ) ====================
+
+
+def publish_broadcast(db: Session, notification: Notification, spec: NotificationAudience) -> int:
+    """Store `spec` as the notification's audience; returns its current reach."""
+    notification.audience = spec.model_dump(mode="json")
+    if notification.published_at is None:
+        notification.published_at = datetime.now(UTC)
+    audience = audience_from_spec(spec)
+    # Reach at publication time; actual membership is evaluated on read
+    notification.delivered_count = count_audience(db, audience)
+    # EMAIL/SMS still go out once per member, through the outbox
+    db.flush()
+    enqueue_outbox(db, notification.id, audience)
+    notify_delivery(db, notification.id)
+    return notification.delivered_count
+
+
+def _is_member(spec: dict, user_id: uuid.UUID):
+    audience = audience_from_spec(NotificationAudience.model_validate(spec))
+    return audience.where(Student.user_id == user_id).exists()
+
+
+def _live_broadcasts_stmt(since: datetime | None) -> Select:
+    stmt = select(Notification.id, Notification.audience).where(
+        Notification.audience.is_not(None),
+        Notification.is_archived.is_(False),
+    )
+    if since is not None:
+        stmt = stmt.where(Notification.published_at >= since)
+    return stmt
+
+
+def live_broadcast_ids(
+    db: Session, user_id: uuid.UUID, since: datetime | None = None
+) -> list[uuid.UUID]:
+    """
+    Ids of live (published, not archived) broadcasts whose audience includes
+    the user, published since `since` (the inbox window) when given.
+    """
+    broadcasts = db.execute(_live_broadcasts_stmt(since)).all()
+    if not broadcasts:
+        return []
+
+    # One round trip: one membership probe per broadcast
+    probes = [
+        select(literal(row.id, UUID(as_uuid=True))).where(_is_member(row.audience, user_id))
+        for row in broadcasts
+    ]
+    stmt = probes[0] if len(probes) == 1 else union_all(*probes)
+    return list(db.execute(stmt).scalars())
+
+
+def _inbox(
+    user_id: uuid.UUID,
+    broadcast_ids: Sequence[uuid.UUID],
+    *,
+    unread_only: bool,
+    since: datetime | None,
+) -> Subquery:
+    """Direct deliveries plus broadcasts the user has not interacted with yet."""
+    direct = select(
+        UserNotification.id.label("id"),
+        UserNotification.notification_id.label("notification_id"),
+        UserNotification.delivered_at.label("delivered_at"),
+        UserNotification.read_at.label("read_at"),
+        UserNotification.archived_at.label("archived_at"),
+    ).where(UserNotification.user_id == user_id, UserNotification.archived_at.is_(None))
+    if unread_only:
+        direct = direct.where(UserNotification.read_at.is_(None))
+    if since is not None:
+        # Constant bound: partitions older than the window are pruned at plan time
+        direct = direct.where(UserNotification.delivered_at >= since)
+    if not broadcast_ids:
+        return direct.subquery("inbox")
+
+    # Untouched broadcasts are addressed by their notification id until a state row exists
+    no_timestamp = cast(null(), DateTime(timezone=True))
+    pending = select(
+        Notification.id,
+        Notification.id,
+        Notification.published_at,
+        no_timestamp,
+        no_timestamp,
+    ).where(
+        Notification.id == _uuid_array(broadcast_ids),
+        ~_has_state(user_id, Notification.id),
+    )
+    return union_all(direct, pending).subquery("inbox")
+
+
+def user_inbox_stmt(
+    user_id: uuid.UUID,
+    broadcast_ids: Sequence[uuid.UUID],
+    *,
+    unread_only: bool = False,
+    since: datetime | None = None,
+) -> Select:
+    """Inbox rows (state + notification content) delivered since `since`, newest first."""
+    inbox = _inbox(user_id, broadcast_ids, unread_only=unread_only, since=since)
+    return (
+        select(
+            inbox.c.id,
+            inbox.c.notification_id,
+            inbox.c.delivered_at,
+            inbox.c.read_at,
+            inbox.c.archived_at,
+            Notification.type,
+            Notification.priority,
+            Notification.title,
+            Notification.body,
+        )
+        .join(Notification, Notification.id == inbox.c.notification_id)
+        .order_by(inbox.c.delivered_at.desc(), inbox.c.id)
+    )
+
+
+def count_unread(db: Session, user_id: uuid.UUID, broadcast_ids: Sequence[uuid.UUID]) -> int:
+    """
+    Unread, non-archived inbox entries (direct and broadcast).
+
+    Direct rows come from the trigger-maintained counter (a primary key
+    lookup); only broadcasts without a state row are counted on the fly.
+    """
+    total = func.coalesce(
+        select(UserNotificationCounter.unread_count)
+        .where(UserNotificationCounter.user_id == user_id)
+        .scalar_subquery(),
+        0,
+    )
+    if broadcast_ids:
+        total = total + (
+            select(func.count())
+            .select_from(Notification)
+            .where(
+                Notification.id == _uuid_array(broadcast_ids),
+                ~_has_state(user_id, Notification.id),
+            )
+            .scalar_subquery()
+        )
+    return db.execute(select(total)).scalar_one()
+
+
+def materialize_broadcast_state(
+    db: Session, user_id: uuid.UUID, notification_id: uuid.UUID, since: datetime | None = None
+) -> UserNotification | None:
+    """
+    Get or create the user's state row for a live broadcast.
+
+    Returns None when `notification_id` is not a live broadcast for the user
+    (or was published before the inbox window `since`).
+    """
+    notification = db.get(Notification, notification_id)
+    if notification is None or notification.audience is None or notification.is_archived:
+        return None
+    if since is not None and notification.published_at < since:
+        return None
+    if not db.execute(select(_is_member(notification.audience, user_id))).scalar():
+        return None
+
+    _lock_deliveries(db, [notification_id])
+    db.execute(
+        insert(UserNotification).from_select(
+            ["user_id", "notification_id", "delivered_at"],
+            select(
+                literal(user_id, UUID(as_uuid=True)),
+                literal(notification_id, UUID(as_uuid=True)),
+                literal(notification.published_at, DateTime(timezone=True)),
+            ).where(~_has_state(user_id, notification_id)),
+            include_defaults=False,
+        )
+    )
+    return db.execute(
+        select(UserNotification).where(
+            UserNotification.user_id == user_id,
+            UserNotification.notification_id == notification_id,
+        )
+    ).scalar_one()
+
+
+# ==================== BULK INBOX STATE ====================
+
+
+def _bulk_inbox_update(
+    db: Session,
+    user_id: uuid.UUID,
+    conditions: list,
+    values: dict,
+    pending_broadcasts: Select | None,
+    broadcast_ids: Sequence[uuid.UUID] = (),
+) -> int:
+    """
+    Apply `values` to the user's matching rows in one statement.
+
+    Broadcasts still without a state row (`pending_broadcasts`, a SELECT of
+    Notification rows) get one inserted with the same values in a sibling
+    CTE. `broadcast_ids` are the broadcasts `pending_broadcasts` can select,
+    locked for the insert. Returns rows updated plus rows created.
+    """
+    updated = (
+        update(UserNotification)
+        .where(UserNotification.user_id == user_id, *conditions)
+        .values(**values)
+        .returning(UserNotification.id)
+        .cte("updated")
+    )
+    affected = select(func.count()).select_from(updated).scalar_subquery()
+
+    if pending_broadcasts is not None:
+        _lock_deliveries(db, broadcast_ids)
+        created = (
+            insert(UserNotification)
+            .from_select(
+                ["user_id", "notification_id", "delivered_at", *values],
+                pending_broadcasts.with_only_columns(
+                    literal(user_id, UUID(as_uuid=True)),
+                    Notification.id,
+                    Notification.published_at,
+                    *values.values(),
+                ).where(~_has_state(user_id, Notification.id)),
+                include_defaults=False,
+            )
+            .returning(UserNotification.id)
+            .cte("created")
+        )
+        affected = affected + select(func.count()).select_from(created).scalar_subquery()
+
+    return db.execute(select(affected)).scalar_one()
+
+
+def _pending(broadcast_ids: Sequence[uuid.UUID]) -> Select | None:
+    if not broadcast_ids:
+        return None
+    return select(Notification).where(Notification.id == _uuid_array(broadcast_ids))
+
+
+def _window(since: datetime | None) -> list:
+    return [] if since is None else [UserNotification.delivered_at >= since]
+
+
+def mark_inbox_read(
+    db: Session,
+    user_id: uuid.UUID,
+    broadcast_ids: Sequence[uuid.UUID],
+    ids: Sequence[uuid.UUID] | None = None,
+    since: datetime | None = None,
+) -> int:
+    """Mark the user's unread inbox entries (all, or the given inbox ids) as read."""
+    conditions = [
+        UserNotification.read_at.is_(None),
+        UserNotification.archived_at.is_(None),
+        *_window(since),
+    ]
+    if ids is not None:
+        conditions.append(UserNotification.id == _uuid_array(ids))
+        # Untouched broadcasts are addressed by notification id
+        broadcast_ids = sorted(set(broadcast_ids) & set(ids))
+    return _bulk_inbox_update(
+        db, user_id, conditions, {"read_at": func.now()}, _pending(broadcast_ids), broadcast_ids
+    )
+
+
+def archive_inbox_before(
+    db: Session,
+    user_id: uuid.UUID,
+    broadcast_ids: Sequence[uuid.UUID],
+    before: datetime,
+    since: datetime | None = None,
+) -> int:
+    """Archive the user's inbox entries delivered before `before`."""
+    pending = _pending(broadcast_ids)
+    if pending is not None:
+        pending = pending.where(Notification.published_at < before)
+    return _bulk_inbox_update(
+        db,
+        user_id,
+        [
+            UserNotification.archived_at.is_(None),
+            UserNotification.delivered_at < before,
+            *_window(since),
+        ],
+        {"archived_at": func.now()},
+        pending,
+        broadcast_ids,
+    )
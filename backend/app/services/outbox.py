@@ -0,0 +1,387 @@
+"""
+UniFECAF Portal do Aluno - Outbound EMAIL/SMS delivery (comm.outbox_messages).
+
+Messages are queued at fan-out time (see services.notifications) and drained
+by `OutboxWorker`, one per channel:
+
+- a batch of due rows is claimed with FOR UPDATE SKIP LOCKED and leased
+  (status SENDING, `locked_until`; services.queue), so several workers never
+  send the same row and a crashed worker's batch becomes due again when the
+  lease expires;
+- sends go through one transport connection per batch, paced by a token
+  bucket (rate limits are per worker process);
+- failures are rescheduled with exponential backoff and jitter, and rows
+  that run out of attempts are dead-lettered (status DEAD) for inspection
+  and manual requeue.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import smtplib
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from email.message import EmailMessage
+from http.client import HTTPConnection, HTTPSConnection
+from urllib.parse import urlsplit
+
+from sqlalchemy import any_, func, literal, update
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.models.notifications import Notification, NotificationChannel, OutboxMessage, OutboxStatus
+from app.services.queue import MAX_ERROR_LENGTH, backoff_delay, lease_due_stmt
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_SUBJECT = "UniFECAF - Portal do Aluno"
+
+
+@dataclass(frozen=True)
+class OutboxItem:
+    id: uuid.UUID
+    recipient: str
+    attempts: int  # Including the current one
+    title: str | None
+    body: str
+
+
+@dataclass
+class DrainStats:
+    claimed: int = 0
+    sent: int = 0
+    retried: int = 0
+    dead: int = 0
+
+
+class RateLimiter:
+    """Blocking token bucket: `rate_per_second` sustained, up to `burst` at once."""
+
+    def __init__(
+        self,
+        rate_per_second: float,
+        burst: int = 1,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.rate = rate_per_second
+        self.burst = max(burst, 1)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(self.burst)
+        self._updated = clock()
+
+    def acquire(self) -> None:
+        if self.rate <= 0:  # Unlimited
+            return
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        # Take the token now; a negative balance is paid back by sleeping
+        self._tokens -= 1
+        if self._tokens < 0:
+            self._sleep(-self._tokens / self.rate)
+
+
+# ==================== TRANSPORTS ====================
+
+
+class Transport(ABC):
+    """Sends messages for one channel over a connection opened once per batch."""
+
+    def open(self) -> None:  # noqa: B027 - optional hook
+        pass
+
+    def close(self) -> None:  # noqa: B027 - optional hook
+        pass
+
+    @abstractmethod
+    def send(self, item: OutboxItem) -> None:
+        """Send one message; raise on failure."""
+
+
+class SmtpTransport(Transport):
+    """EMAIL over SMTP (optionally STARTTLS + login)."""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        *,
+        sender: str,
+        username: str | None = None,
+        password: str | None = None,
+        starttls: bool = False,
+        timeout: float = 30.0,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self._smtp: smtplib.SMTP | None = None
+
+    def open(self) -> None:
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.starttls:
+            smtp.starttls()
+        if self.username:
+            smtp.login(self.username, self.password or "")
+        self._smtp = smtp
+
+    def close(self) -> None:
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except smtplib.SMTPException:
+            self._smtp.close()
+        finally:
+            self._smtp = None
+
+    def send(self, item: OutboxItem) -> None:
+        if self._smtp is None:
+            raise RuntimeError("SMTP connection is not open")
+        message = EmailMessage()
+        message["From"] = self.sender
+        message["To"] = item.recipient
+        message["Subject"] = item.title or _DEFAULT_SUBJECT
+        message.set_content(item.body)
+        self._smtp.send_message(message)
+
+
+class HttpSmsTransport(Transport):
+    """SMS through an HTTP gateway: POST {"to", "message"} as JSON, 2xx = accepted."""
+
+    def __init__(self, url: str, *, token: str | None = None, timeout: float = 10.0) -> None:
+        self.url = urlsplit(url)
+        self.token = token
+        self.timeout = timeout
+        self._conn: HTTPConnection | None = None
+
+    def open(self) -> None:
+        conn_cls = HTTPSConnection if self.url.scheme == "https" else HTTPConnection
+        self._conn = conn_cls(self.url.netloc, timeout=self.timeout)  # Keep-alive per batch
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def send(self, item: OutboxItem) -> None:
+        if self._conn is None:
+            raise RuntimeError("SMS gateway connection is not open")
+        text = f"{item.title}: {item.body}" if item.title else item.body
+        headers = {"Content-Type": "application/json"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        self._conn.request(
+            "POST",
+            self.url.path or "/",
+            body=json.dumps({"to": item.recipient, "message": text}),
+            headers=headers,
+        )
+        response = self._conn.getresponse()
+        detail = response.read()
+        if not 200 <= response.status < 300:
+            raise RuntimeError(f"SMS gateway answered {response.status}: {detail[:200]!r}")
+
+
+# ==================== QUEUE OPERATIONS ====================
+
+
+def claim_batch(
+    db: Session, channel: NotificationChannel, *, limit: int, lease_seconds: int
+) -> list[OutboxItem]:
+    """Lease up to `limit` due messages of `channel` (commits the claim)."""
+    rows = db.execute(
+        lease_due_stmt(
+            OutboxMessage,
+            pending=OutboxStatus.PENDING,
+            leased=OutboxStatus.SENDING,
+            limit=limit,
+            lease_seconds=lease_seconds,
+            where=[OutboxMessage.channel == channel],
+        )
+        .where(OutboxMessage.notification_id == Notification.id)
+        .returning(
+            OutboxMessage.id,
+            OutboxMessage.recipient,
+            OutboxMessage.attempts,
+            Notification.title,
+            Notification.body,
+        )
+    ).all()
+    db.commit()
+    return [
+        OutboxItem(id=r.id, recipient=r.recipient, attempts=r.attempts, title=r.title, body=r.body)
+        for r in rows
+    ]
+
+
+def complete_batch(
+    db: Session,
+    sent_ids: list[uuid.UUID],
+    failures: dict[uuid.UUID, tuple[int, str]],
+    *,
+    max_attempts: int,
+    backoff_base_seconds: float,
+    backoff_max_seconds: float,
+) -> DrainStats:
+    """Record a batch outcome: SENT rows in one UPDATE, retries/dead letters by primary key."""
+    stats = DrainStats(sent=len(sent_ids))
+    if sent_ids:
+        db.execute(
+            update(OutboxMessage)
+            .where(OutboxMessage.id == any_(literal(sent_ids, ARRAY(UUID(as_uuid=True)))))
+            .values(
+                status=OutboxStatus.SENT,
+                sent_at=func.now(),
+                locked_until=None,
+                last_error=None,
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    now = datetime.now(UTC)
+    params = []
+    for message_id, (attempts, error) in failures.items():
+        if attempts >= max_attempts:
+            stats.dead += 1
+            params.append(
+                {
+                    "id": message_id,
+                    "status": OutboxStatus.DEAD,
+                    "locked_until": None,
+                    "last_error": error[:MAX_ERROR_LENGTH],
+                }
+            )
+        else:
+            stats.retried += 1
+            delay = backoff_delay(
+                attempts, base_seconds=backoff_base_seconds, max_seconds=backoff_max_seconds
+            )
+            params.append(
+                {
+                    "id": message_id,
+                    "status": OutboxStatus.PENDING,
+                    "next_attempt_at": now + timedelta(seconds=delay),
+                    "locked_until": None,
+                    "last_error": error[:MAX_ERROR_LENGTH],
+                }
+            )
+    if params:
+        db.execute(update(OutboxMessage), params)  # ORM bulk UPDATE by primary key
+    db.commit()
+    return stats
+
+
+def requeue_dead_letters(db: Session, channel: NotificationChannel | None = None) -> int:
+    """Move DEAD messages back to PENDING with a fresh attempt budget. Returns rows moved."""
+    stmt = (
+        update(OutboxMessage)
+        .where(OutboxMessage.status == OutboxStatus.DEAD)
+        .values(
+            status=OutboxStatus.PENDING,
+            attempts=0,
+            next_attempt_at=func.now(),
+            last_error=None,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if channel is not None:
+        stmt = stmt.where(OutboxMessage.channel == channel)
+    return db.execute(stmt).rowcount
+
+
+# ==================== WORKER ====================
+
+
+class OutboxWorker:
+    """Drains one channel of the outbox."""
+
+    def __init__(
+        self,
+        channel: NotificationChannel,
+        transport: Transport,
+        *,
+        rate_per_second: float,
+        batch_size: int = 100,
+        max_attempts: int = 6,
+        backoff_base_seconds: float = 30.0,
+        backoff_max_seconds: float = 3600.0,
+        lease_seconds: int = 300,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ) -> None:
+        self.channel = channel
+        self.transport = transport
+        self.limiter = RateLimiter(rate_per_second, burst=max(1, int(rate_per_second)))
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.lease_seconds = lease_seconds
+        self.session_factory = session_factory
+
+    def drain_once(self) -> DrainStats:
+        """Claim, send and record one batch."""
+        with self.session_factory() as db:
+            items = claim_batch(
+                db, self.channel, limit=self.batch_size, lease_seconds=self.lease_seconds
+            )
+            if not items:
+                return DrainStats()
+
+            sent: list[uuid.UUID] = []
+            failures: dict[uuid.UUID, tuple[int, str]] = {}
+            try:
+                self.transport.open()
+            except Exception as exc:  # Connection-level failure: the whole batch retries
+                logger.warning("%s transport unavailable: %s", self.channel.value, exc)
+                failures = {item.id: (item.attempts, repr(exc)) for item in items}
+            else:
+                try:
+                    for item in items:
+                        self.limiter.acquire()
+                        try:
+                            self.transport.send(item)
+                        except Exception as exc:
+                            failures[item.id] = (item.attempts, repr(exc))
+                        else:
+                            sent.append(item.id)
+                finally:
+                    self.transport.close()
+
+            stats = complete_batch(
+                db,
+                sent,
+                failures,
+                max_attempts=self.max_attempts,
+                backoff_base_seconds=self.backoff_base_seconds,
+                backoff_max_seconds=self.backoff_max_seconds,
+            )
+        stats.claimed = len(items)
+        if stats.dead:
+            logger.error("%d %s message(s) dead-lettered", stats.dead, self.channel.value)
+        return stats
+
+    def run(self, stop: threading.Event, *, poll_seconds: float = 5.0) -> None:
+        """Drain until `stop` is set; full batches are followed immediately by the next."""
+        while not stop.is_set():
+            try:
+                stats = self.drain_once()
+            except Exception:
+                logger.exception("Outbox %s batch failed", self.channel.value)
+                stats = DrainStats()
+            if stats.claimed < self.batch_size:
+                stop.wait(poll_seconds)
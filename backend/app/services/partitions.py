@@ -0,0 +1,228 @@
+"""
+UniFECAF Portal do Aluno - Monthly range partitions.
+
+Helpers shared by tables RANGE-partitioned by month on a timestamptz column
+(partitions named `<table>_pYYYYMM`, created by
+common.ensure_monthly_partitions): list a parent's partitions with their
+bounds, detach the expired ones without blocking writers and archive a
+table's rows to gzip-compressed NDJSON before it is dropped.
+
+`maintain_monthly_partitions` is the retention run built on them (used by
+services.notification_retention and services.audit_retention): create
+partitions ahead, DETACH ... CONCURRENTLY every partition that ended before
+the cutoff, then hand each detached table to the caller's `archive`
+callback, which exports and drops it. A run interrupted after DETACH leaves
+a detached table behind, which the next run archives first.
+
+Detaching CONCURRENTLY cannot run inside a transaction block, so callers
+pass an AUTOCOMMIT connection for it.
+"""
+
+from __future__ import annotations
+
+import gzip
+import os
+import re
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+
+from sqlalchemy import Connection, func, select, text
+from sqlalchemy.orm import Session
+
+from app.core.database import engine
+
+_BOUND_RE = re.compile(r"FOR VALUES FROM \((?P<lower>[^)]*)\) TO \((?P<upper>[^)]*)\)")
+
+PARTITIONS_SQL = text("""
+    SELECT n.nspname AS schema, c.relname AS name,
+           pg_get_expr(c.relpartbound, c.oid) AS bound, i.inhdetachpending AS detach_pending
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE i.inhparent = CAST(:parent AS regclass)
+    ORDER BY c.relname
+""")
+
+ENSURE_PARTITIONS_SQL = text(
+    "SELECT common.ensure_monthly_partitions(CAST(:parent AS regclass), :months_ahead)"
+)
+
+# Tables named like a parent's partitions that are no longer attached to it:
+# left behind by a maintenance run interrupted after DETACH.
+DETACHED_SQL = text("""
+    SELECT n.nspname AS schema, c.relname AS name
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    JOIN pg_class p ON p.oid = CAST(:parent AS regclass) AND p.relnamespace = n.oid
+    WHERE c.relkind = 'r' AND NOT c.relispartition
+      AND c.relname ~ ('^' || p.relname || '_(p[0-9]{6}|legacy)$')
+    ORDER BY c.relname
+""")
+
+
+def month_start(moment: datetime, months: int = 0) -> datetime:
+    """First instant (UTC) of the month `months` away from `moment`'s month."""
+    moment = moment.astimezone(UTC)
+    index = moment.year * 12 + moment.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=UTC)
+
+
+def _parse_bound_value(value: str) -> datetime | None:
+    value = value.strip()
+    if value == "MINVALUE" or value == "MAXVALUE":
+        return None
+    return datetime.fromisoformat(value.strip("'"))
+
+
+@dataclass(frozen=True)
+class Partition:
+    schema: str
+    name: str
+    lower: datetime | None  # None: MINVALUE (or unknown, for a detached table)
+    upper: datetime | None  # None: MAXVALUE (or unknown, for a detached table)
+    detach_pending: bool = False  # A DETACH CONCURRENTLY was interrupted
+
+    @property
+    def qualified(self) -> str:
+        return f'"{self.schema}"."{self.name}"'
+
+    @classmethod
+    def from_bound(
+        cls, schema: str, name: str, bound: str, *, detach_pending: bool = False
+    ) -> Partition:
+        """Build from pg_get_expr(relpartbound) output, e.g. FOR VALUES FROM (..) TO (..)."""
+        match = _BOUND_RE.search(bound)
+        if match is None:
+            raise ValueError(f"Unsupported partition bound for {name}: {bound}")
+        return cls(
+            schema=schema,
+            name=name,
+            lower=_parse_bound_value(match["lower"]),
+            upper=_parse_bound_value(match["upper"]),
+            detach_pending=detach_pending,
+        )
+
+    def expired(self, cutoff: datetime) -> bool:
+        """True when every row of the partition is older than `cutoff`."""
+        return self.upper is not None and self.upper <= cutoff
+
+
+def list_partitions(conn: Connection | Session, parent: str) -> list[Partition]:
+    """Attached partitions of `parent` (schema-qualified name) with their bounds."""
+    rows = conn.execute(PARTITIONS_SQL, {"parent": parent}).all()
+    return [
+        Partition.from_bound(row.schema, row.name, row.bound, detach_pending=row.detach_pending)
+        for row in rows
+    ]
+
+
+def detached_partitions(conn: Connection | Session, parent: str) -> list[Partition]:
+    rows = conn.execute(DETACHED_SQL, {"parent": parent}).all()
+    return [Partition(schema=row.schema, name=row.name, lower=None, upper=None) for row in rows]
+
+
+def ensure_partitions(conn: Connection | Session, parent: str, months_ahead: int) -> int:
+    """Create `parent`'s partitions from this month up to `months_ahead`. Returns new ones."""
+    return conn.execute(
+        ENSURE_PARTITIONS_SQL, {"parent": parent, "months_ahead": months_ahead}
+    ).scalar_one()
+
+
+def detach_partition(autocommit_conn: Connection, parent: str, partition: Partition) -> None:
+    """DETACH ... CONCURRENTLY: readers and writers of `parent` are not blocked."""
+    mode = "FINALIZE" if partition.detach_pending else "CONCURRENTLY"
+    autocommit_conn.execute(
+        text(f"ALTER TABLE {parent} DETACH PARTITION {partition.qualified} {mode}")
+    )
+
+
+class _CountingWriter:
+    """File wrapper counting the NDJSON lines COPY writes through it."""
+
+    def __init__(self, target) -> None:
+        self.target = target
+        self.lines = 0
+
+    def write(self, chunk: bytes | str) -> int:
+        if isinstance(chunk, str):
+            chunk = chunk.encode()
+        self.lines += chunk.count(b"\n")
+        return self.target.write(chunk)
+
+
+def export_ndjson(db: Session, query: str, path: Path) -> int:
+    """
+    Write `query`'s rows as gzip-compressed NDJSON to `path`; returns rows written.
+
+    Rows are streamed by COPY in the session's transaction (a consistent
+    snapshot). The file is written next to `path` and renamed into place only
+    once complete and fsynced, so a crash never leaves a truncated archive.
+    """
+    # CSV with control-character quote/delimiter: the JSON text (which escapes
+    # those and newlines) goes out verbatim, one object per line.
+    copy_sql = (
+        f"COPY (SELECT row_to_json(t) FROM ({query}) t) TO STDOUT "
+        "WITH (FORMAT csv, QUOTE E'\\x01', DELIMITER E'\\x02')"
+    )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(path.name + ".part")
+    with open(partial, "wb") as raw:
+        with gzip.GzipFile(filename=path.stem, mode="wb", fileobj=raw) as compressed:
+            writer = _CountingWriter(compressed)
+            cursor = db.connection().connection.dbapi_connection.cursor()
+            try:
+                cursor.copy_expert(copy_sql, writer)
+            finally:
+                cursor.close()
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(partial, path)
+    return writer.lines
+
+
+@dataclass(frozen=True)
+class PartitionMaintenance:
+    created: int  # Partitions created ahead
+    archived: dict[str, int] = field(default_factory=dict)  # Archive file -> rows
+
+
+def maintain_monthly_partitions(
+    parent: str,
+    *,
+    lock_key: int,
+    months_ahead: int,
+    cutoff: datetime | None,
+    archive: Callable[[Partition], tuple[str, int]],
+) -> PartitionMaintenance | None:
+    """
+    Create `parent`'s future partitions and archive those that ended before
+    `cutoff` (None: keep everything). `archive` exports and drops a detached
+    partition, returning (archive path, rows).
+
+    A session-level advisory lock on `lock_key`, held on a dedicated
+    connection for the whole run, collapses concurrent runs into one: None
+    when another run holds it.
+    """
+    with engine.connect() as conn:
+        conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+        if not conn.execute(select(func.pg_try_advisory_lock(lock_key))).scalar():
+            return None
+        try:
+            result = PartitionMaintenance(created=ensure_partitions(conn, parent, months_ahead))
+            if cutoff is None:
+                return result
+
+            # Leftovers of an interrupted run first: they are already detached
+            expired = detached_partitions(conn, parent)
+            for partition in list_partitions(conn, parent):
+                if partition.expired(cutoff):
+                    detach_partition(conn, parent, partition)
+                    expired.append(partition)
+            for partition in expired:
+                path, rows = archive(partition)
+                result.archived[path] = rows
+            return result
+        finally:
+            conn.execute(select(func.pg_advisory_unlock(lock_key)))
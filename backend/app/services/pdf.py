@@ -0,0 +1,131 @@
+"""
+UniFECAF Portal do Aluno - Minimal PDF writer.
+
+Text-only PDF 1.4 (Helvetica / Helvetica-Bold, WinAnsi encoding, so
+Portuguese accents render without embedding fonts), with automatic page
+breaks and simple column rows. Enough for declarations, transcripts and
+student cards without a rendering dependency.
+
+Output is deterministic (no creation date or random ids): the same content
+always produces the same bytes.
+"""
+
+from __future__ import annotations
+
+import zlib
+from dataclasses import dataclass, field
+
+A4 = (595.28, 841.89)
+ID_CARD = (242.65, 153.07)  # ISO/IEC 7810 ID-1, in points
+
+_FONTS = {False: "F1", True: "F2"}  # bold -> resource name
+
+
+def _escape(text: str) -> bytes:
+    raw = text.encode("cp1252", errors="replace")
+    return raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+@dataclass
+class PdfBuilder:
+    """Lays out lines top to bottom, starting a new page when one is full."""
+
+    title: str
+    page_size: tuple[float, float] = A4
+    margin: float = 56.0
+    line_gap: float = 1.35  # Line height as a multiple of the font size
+    _pages: list[list[bytes]] = field(default_factory=list, init=False)
+    _y: float = field(default=0.0, init=False)
+
+    def __post_init__(self) -> None:
+        self.new_page()
+
+    @property
+    def width(self) -> float:
+        return self.page_size[0] - 2 * self.margin
+
+    def new_page(self) -> None:
+        self._pages.append([])
+        self._y = self.page_size[1] - self.margin
+
+    def _advance(self, height: float) -> None:
+        if self._y - height < self.margin:
+            self.new_page()
+        self._y -= height
+
+    def _draw(self, x: float, text: str, size: float, bold: bool) -> None:
+        self._pages[-1].append(
+            b"BT /%s %.2f Tf %.2f %.2f Td (%s) Tj ET"
+            % (_FONTS[bold].encode(), size, x, self._y, _escape(text))
+        )
+
+    def line(self, text: str = "", *, size: float = 10, bold: bool = False) -> None:
+        """One line of text at the left margin (empty text: blank line)."""
+        self._advance(size * self.line_gap)
+        if text:
+            self._draw(self.margin, text, size, bold)
+
+    def paragraph(self, text: str, *, size: float = 10) -> None:
+        """Word-wrapped text (Helvetica averages ~0.5 em per character)."""
+        per_line = max(int(self.width / (size * 0.5)), 1)
+        current = ""
+        for word in text.split():
+            if current and len(current) + 1 + len(word) > per_line:
+                self.line(current, size=size)
+                current = word
+            else:
+                current = f"{current} {word}" if current else word
+        self.line(current, size=size)
+
+    def row(
+        self, cells: list[str], columns: list[float], *, size: float = 9, bold: bool = False
+    ) -> None:
+        """Cells at x offsets `columns` (fractions of the text width)."""
+        self._advance(size * self.line_gap)
+        for cell, column in zip(cells, columns, strict=True):
+            if cell:
+                self._draw(self.margin + column * self.width, cell, size, bold)
+
+    def gap(self, points: float) -> None:
+        self._advance(points)
+
+    def render(self) -> bytes:
+        width, height = self.page_size
+        objects: list[bytes] = [
+            b"<< /Type /Catalog /Pages 2 0 R >>",
+            b"",  # Pages, filled once page object numbers are known
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+            b"<< /Title (%s) /Producer (UniFECAF Portal do Aluno) >>" % _escape(self.title),
+        ]
+        page_refs = []
+        for operations in self._pages:
+            content = zlib.compress(b"\n".join(operations), 9)
+            objects.append(
+                b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream"
+                % (len(content), content)
+            )
+            objects.append(
+                b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.2f %.2f] "
+                b"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents %d 0 R >>"
+                % (width, height, len(objects))
+            )
+            page_refs.append(b"%d 0 R" % len(objects))
+        objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+            b" ".join(page_refs),
+            len(page_refs),
+        )
+
+        out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(len(out))
+            out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+        xref = len(out)
+        out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+        out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+        out += b"trailer\n<< /Size %d /Root 1 0 R /Info 5 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+            len(objects) + 1,
+            xref,
+        )
+        return bytes(out)
@@ -0,0 +1,79 @@
+"""
+UniFECAF Portal do Aluno - Leased work queues.
+
+Outbound messages (services.outbox), document jobs (services.documents) and
+bulk generation chunks (services.document_batches) are tables drained the
+same way:
+
+- due rows (PENDING with `next_attempt_at` reached, or leased with an
+  expired `locked_until`) are claimed with FOR UPDATE SKIP LOCKED, so
+  concurrent workers never take the same row;
+- a claim is a lease: the row moves to the leased status with `attempts`
+  incremented and `locked_until` set, and becomes due again if the worker
+  dies before recording the outcome;
+- failed rows are rescheduled after `backoff_delay`.
+"""
+
+from __future__ import annotations
+
+import random
+from collections.abc import Sequence
+from datetime import timedelta
+from typing import Any
+
+from sqlalchemy import Update, and_, func, or_, select, tuple_, update
+
+MAX_ERROR_LENGTH = 500  # Stored `last_error` is cut to this
+
+
+def backoff_delay(attempts: int, *, base_seconds: float, max_seconds: float) -> float:
+    """Delay before the next attempt: exponential in `attempts`, capped, half-jittered."""
+    delay = min(max_seconds, base_seconds * 2 ** max(attempts - 1, 0))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def lease_due_stmt(
+    model: Any,
+    *,
+    pending: Any,
+    leased: Any,
+    limit: int,
+    lease_seconds: int,
+    where: Sequence = (),
+    key: Sequence | None = None,
+    order_by: Sequence = (),
+) -> Update:
+    """UPDATE leasing up to `limit` due rows of `model`.
+
+    `model` has status / attempts / next_attempt_at / locked_until columns;
+    `key` is its primary key (default `model.id`) and `order_by` breaks ties
+    after `next_attempt_at`. Callers add RETURNING (and any join condition)
+    and commit the claim.
+    """
+    now = func.now()
+    key = key or (model.id,)
+    due = (
+        select(*key)
+        .where(
+            *where,
+            or_(
+                and_(model.status == pending, model.next_attempt_at <= now),
+                # Lease expired: the worker that claimed it died mid-batch
+                and_(model.status == leased, model.locked_until < now),
+            ),
+        )
+        .order_by(model.next_attempt_at, *order_by)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    claimed = key[0] if len(key) == 1 else tuple_(*key)
+    return (
+        update(model)
+        .where(claimed.in_(due))
+        .values(
+            status=leased,
+            attempts=model.attempts + 1,
+            locked_until=now + timedelta(seconds=lease_seconds),
+        )
+        .execution_options(synchronize_session=False)
+    )
@@ -0,0 +1,55 @@
+"""
+UniFECAF Portal do Aluno - Receivables aging (finance.receivables_aging).
+
+The materialized view is refreshed CONCURRENTLY so the report endpoints keep
+reading the previous snapshot while a refresh runs. A transaction-scoped
+advisory lock makes concurrent refresh requests (several API workers, bulk
+finance jobs) collapse into a single refresh.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary application-wide key for pg_try_advisory_xact_lock.
+AGING_REFRESH_LOCK_KEY = 7_301_026
+
+
+def refresh_receivables_aging(db: Session) -> bool:
+    """Refresh the aging view. Returns False if another refresh is already running."""
+    acquired = db.execute(select(func.pg_try_advisory_xact_lock(AGING_REFRESH_LOCK_KEY))).scalar()
+    if not acquired:
+        db.rollback()
+        return False
+
+    db.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY finance.receivables_aging"))
+    db.commit()
+    return True
+
+
+def refresh_receivables_aging_job() -> None:
+    """Standalone refresh with its own session (BackgroundTasks / periodic loop)."""
+    with SessionLocal() as db:
+        try:
+            refreshed = refresh_receivables_aging(db)
+        except Exception:
+            db.rollback()
+            logger.exception("Receivables aging refresh failed")
+            return
+    if refreshed:
+        logger.info("Receivables aging view refreshed")
+
+
+async def run_periodic_aging_refresh(interval_seconds: int) -> None:
+    """Refresh the aging view every `interval_seconds` until cancelled."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        await asyncio.to_thread(refresh_receivables_aging_job)
@@ -0,0 +1,476 @@
+"""
+UniFECAF Portal do Aluno - Scheduled notifications (comm.scheduled_jobs).
+
+The timer queue lives in Postgres, so schedules survive restarts. Every API
+instance runs the same polling loop: a due job is locked with
+FOR UPDATE SKIP LOCKED and executed in the transaction that also advances it
+(next occurrence, DONE or a retry), so instances never run a job twice and
+a crash mid-run simply leaves the job due.
+
+Recurrence rules are a subset of iCalendar RRULE:
+FREQ=DAILY|WEEKLY|MONTHLY, optional INTERVAL=n, COUNT=n and
+UNTIL=YYYYMMDD[THHMMSSZ]. Occurrences are computed from the job's
+`starts_at`, and occurrences missed while no scheduler ran are skipped
+rather than replayed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import calendar
+import logging
+import uuid
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import Date, Integer, String, cast, exists, func, literal, select
+from sqlalchemy.dialects.postgresql import ARRAY, UUID, insert
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.models.finance import Invoice
+from app.models.notifications import (
+    InvoiceReminder,
+    Notification,
+    NotificationChannel,
+    NotificationPriority,
+    NotificationType,
+    ScheduledJob,
+    ScheduledJobKind,
+    ScheduledJobStatus,
+    UserNotification,
+)
+from app.schemas.admin_comm import NotificationAudience
+from app.services.fees import OPEN_STATUSES
+from app.services.notifications import (
+    audience_from_spec,
+    fan_out_notification,
+    notifies_cte,
+    outbox_insert,
+    publish_broadcast,
+)
+from app.services.queue import MAX_ERROR_LENGTH, backoff_delay
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+_RETRY_BASE_SECONDS = 60.0
+_RETRY_MAX_SECONDS = 3600.0
+
+INVOICE_REMINDER_PLACEHOLDERS = ("reference", "description", "amount", "due_date", "days")
+
+
+# ==================== RECURRENCE ====================
+
+
+@dataclass(frozen=True)
+class Recurrence:
+    freq: str  # DAILY | WEEKLY | MONTHLY
+    interval: int = 1
+    count: int | None = None
+    until: datetime | None = None
+
+
+def _parse_until(value: str) -> datetime:
+    if "T" in value:
+        return datetime.strptime(value, "%Y%m%dT%H%M%SZ").replace(tzinfo=UTC)
+    # Date-only UNTIL includes that whole day
+    day = datetime.strptime(value, "%Y%m%d").replace(tzinfo=UTC)
+    return day + timedelta(days=1) - timedelta(microseconds=1)
+
+
+def parse_recurrence(rule: str) -> Recurrence:
+    """Parse a recurrence rule; raises ValueError when it is not supported."""
+    try:
+        parts = dict(part.split("=", 1) for part in rule.strip().upper().split(";") if part)
+    except ValueError:
+        raise ValueError(f"Malformed recurrence rule: {rule!r}") from None
+    unknown = set(parts) - {"FREQ", "INTERVAL", "COUNT", "UNTIL"}
+    if unknown:
+        raise ValueError(f"Unsupported recurrence parts: {', '.join(sorted(unknown))}")
+    freq = parts.get("FREQ")
+    if freq not in ("DAILY", "WEEKLY", "MONTHLY"):
+        raise ValueError("FREQ must be DAILY, WEEKLY or MONTHLY")
+
+    interval = int(parts.get("INTERVAL", "1"))
+    count = int(parts["COUNT"]) if "COUNT" in parts else None
+    if interval < 1 or (count is not None and count < 1):
+        raise ValueError("INTERVAL and COUNT must be positive")
+    until = _parse_until(parts["UNTIL"]) if "UNTIL" in parts else None
+    return Recurrence(freq=freq, interval=interval, count=count, until=until)
+
+
+def _add_months(value: datetime, months: int) -> datetime:
+    month_index = value.month - 1 + months
+    year, month = value.year + month_index // 12, month_index % 12 + 1
+    day = min(value.day, calendar.monthrange(year, month)[1])
+    return value.replace(year=year, month=month, day=day)
+
+
+def _occurrence(starts_at: datetime, rec: Recurrence, index: int) -> datetime:
+    if rec.freq == "MONTHLY":
+        return _add_months(starts_at, index * rec.interval)
+    days = rec.interval * (7 if rec.freq == "WEEKLY" else 1)
+    return starts_at + timedelta(days=days * index)
+
+
+def next_occurrence(rule: str, starts_at: datetime, after: datetime) -> datetime | None:
+    """First occurrence of `rule` (anchored at `starts_at`) strictly after `after`."""
+    rec = parse_recurrence(rule)
+    if rec.freq == "MONTHLY":
+        months = (after.year - starts_at.year) * 12 + after.month - starts_at.month
+        index = max(months // rec.interval, 0)
+    else:
+        step = timedelta(days=rec.interval * (7 if rec.freq == "WEEKLY" else 1))
+        index = max((after - starts_at) // step, 0)
+    while (occurrence := _occurrence(starts_at, rec, index)) <= after:
+        index += 1
+
+    if rec.count is not None and index >= rec.count:
+        return None
+    if rec.until is not None and occurrence > rec.until:
+        return None
+    return occurrence
+
+
+# ==================== SCHEDULING ====================
+
+
+def schedule_notification(
+    db: Session,
+    notification: Notification,
+    *,
+    send_at: datetime,
+    recurrence: str | None,
+    audience: NotificationAudience,
+    broadcast: bool = False,
+) -> ScheduledJob:
+    """Replace the notification's live schedule (caller commits)."""
+    cancel_notification_schedule(db, notification.id)
+    notification.send_at = send_at
+    notification.recurrence = recurrence
+    job = ScheduledJob(
+        kind=ScheduledJobKind.NOTIFICATION,
+        notification_id=notification.id,
+        payload={"audience": audience.model_dump(mode="json"), "broadcast": broadcast},
+        starts_at=send_at,
+        run_at=send_at,
+        recurrence=recurrence,
+    )
+    db.add(job)
+    db.flush()
+    return job
+
+
+def cancel_notification_schedule(db: Session, notification_id: uuid.UUID) -> int:
+    """Cancel the notification's live schedule, if any. Returns jobs canceled."""
+    jobs = db.execute(
+        select(ScheduledJob)
+        .where(
+            ScheduledJob.notification_id == notification_id,
+            ScheduledJob.status == ScheduledJobStatus.SCHEDULED,
+        )
+        .with_for_update()
+    ).scalars().all()
+    for job in jobs:
+        job.status = ScheduledJobStatus.CANCELED
+    db.flush()
+    return len(jobs)
+
+
+def schedule_invoice_reminders(
+    db: Session,
+    *,
+    run_at: datetime,
+    recurrence: str | None,
+    days_before: int,
+    title_template: str,
+    body_template: str,
+    type: NotificationType = NotificationType.FINANCIAL,
+    channel: NotificationChannel = NotificationChannel.IN_APP,
+    priority: NotificationPriority = NotificationPriority.NORMAL,
+) -> ScheduledJob:
+    """Queue an automated invoice due reminder job (caller commits)."""
+    job = ScheduledJob(
+        kind=ScheduledJobKind.INVOICE_DUE_REMINDER,
+        payload={
+            "days_before": days_before,
+            "title_template": title_template,
+            "body_template": body_template,
+            "type": type.value,
+            "channel": channel.value,
+            "priority": priority.value,
+        },
+        starts_at=run_at,
+        run_at=run_at,
+        recurrence=recurrence,
+    )
+    db.add(job)
+    db.flush()
+    return job
+
+
+# ==================== JOB HANDLERS ====================
+
+
+def _run_notification_job(db: Session, job: ScheduledJob) -> None:
+    notification = db.get(Notification, job.notification_id)
+    audience = NotificationAudience.model_validate(job.payload.get("audience") or {})
+
+    target = notification
+    if job.recurrence:
+        # Each occurrence is its own notification, so students get it every time
+        target = Notification(
+            type=notification.type,
+            channel=notification.channel,
+            priority=notification.priority,
+            title=notification.title,
+            body=notification.body,
+            template_id=notification.id,
+        )
+        db.add(target)
+        db.flush()
+
+    if job.payload.get("broadcast"):
+        publish_broadcast(db, target, audience)
+    else:
+        fan_out_notification(db, target.id, audience_from_spec(audience))
+
+
+def _render(template: str, fields: dict) -> object:
+    """SQL expression substituting {placeholder}s of `template` with column values."""
+    expr = literal(template, String)
+    for name, value in fields.items():
+        if "{" + name + "}" in template:
+            expr = func.replace(expr, "{" + name + "}", value)
+    return expr
+
+
+def send_invoice_due_reminders(
+    db: Session,
+    *,
+    days_before: int,
+    title_template: str,
+    body_template: str,
+    type: NotificationType = NotificationType.FINANCIAL,
+    channel: NotificationChannel = NotificationChannel.IN_APP,
+    priority: NotificationPriority = NotificationPriority.NORMAL,
+    action_url: str | None = "/financeiro",
+) -> int:
+    """
+    Remind students of open invoices due within `days_before` days.
+
+    One statement: pick the invoices (not yet reminded for this lead time),
+    record them in comm.invoice_reminders, then insert one rendered
+    notification and its delivery per invoice. EMAIL/SMS messages are then
+    queued for exactly those (notification, student) pairs. The first
+    statement also announces every new delivery to open streams (on commit).
+    Returns reminders sent.
+    """
+    today = func.current_date()
+    days_left = cast(Invoice.due_date - today, Integer)
+    fields = {
+        "reference": func.coalesce(Invoice.reference, ""),
+        "description": Invoice.description,
+        "amount": func.replace(cast(Invoice.amount, String), ".", ","),
+        "due_date": func.to_char(Invoice.due_date, "DD/MM/YYYY"),
+        "days": cast(days_left, String),
+    }
+
+    # Materialized once (volatile gen_random_uuid), then shared by the inserts
+    candidates = (
+        select(
+            Invoice.id.label("invoice_id"),
+            Invoice.student_id.label("student_id"),
+            func.gen_random_uuid().label("notification_id"),
+            func.left(_render(title_template, fields), 150).label("title"),
+            _render(body_template, fields).label("body"),
+        )
+        .where(
+            Invoice.status.in_(OPEN_STATUSES),
+            Invoice.due_date >= today,
+            Invoice.due_date <= cast(today + days_before, Date),
+            ~exists().where(
+                InvoiceReminder.invoice_id == Invoice.id,
+                InvoiceReminder.days_before == days_before,
+            ),
+        )
+        .cte("candidates")
+    )
+    # Claiming through the primary key keeps concurrent runs from double-sending
+    claimed = (
+        insert(InvoiceReminder)
+        .from_select(
+            ["invoice_id", "days_before", "notification_id"],
+            select(candidates.c.invoice_id, literal(days_before), candidates.c.notification_id),
+            include_defaults=False,
+        )
+        .on_conflict_do_nothing(index_elements=["invoice_id", "days_before"])
+        .returning(InvoiceReminder.notification_id)
+        .cte("claimed")
+    )
+    rows = select(candidates).join(
+        claimed, claimed.c.notification_id == candidates.c.notification_id
+    ).cte("reminders")
+
+    notifications = (
+        insert(Notification)
+        .from_select(
+            ["id", "type", "channel", "priority", "title", "body", "delivered_count"],
+            select(
+                rows.c.notification_id,
+                literal(type, Notification.type.type),
+                literal(channel, Notification.channel.type),
+                literal(priority, Notification.priority.type),
+                rows.c.title,
+                rows.c.body,
+                literal(1),
+            ),
+            include_defaults=False,
+        )
+        .returning(Notification.id)
+        .cte("notifications")
+    )
+    deliveries = (
+        insert(UserNotification)
+        .from_select(
+            ["user_id", "notification_id", "action_url", "extra_data"],
+            select(
+                rows.c.student_id,
+                rows.c.notification_id,
+                literal(action_url, String),
+                func.jsonb_build_object("invoice_id", rows.c.invoice_id),
+            ),
+            include_defaults=False,
+        )
+        .returning(UserNotification.notification_id, UserNotification.user_id)
+        .cte("deliveries")
+    )
+    # One NOTIFY per new notification, sent on commit for the real-time stream
+    notified = notifies_cte("notification_id", deliveries.c.notification_id)
+    # add_cte: the notifications INSERT runs although nothing selects from it
+    reminders = db.execute(
+        select(
+            deliveries.c.notification_id,
+            deliveries.c.user_id,
+            select(func.count()).select_from(notified).scalar_subquery().label("announced"),
+        ).add_cte(notifications)
+    ).all()
+    if not reminders:
+        return 0
+
+    if channel != NotificationChannel.IN_APP:
+        # A separate statement: the notifications inserted above were not
+        # visible to the one that created them, and outbox_insert joins them.
+        ids = ARRAY(UUID(as_uuid=True))
+        run = select(
+            func.unnest(literal([r.notification_id for r in reminders], ids)).label(
+                "notification_id"
+            ),
+            func.unnest(literal([r.user_id for r in reminders], ids)).label("student_id"),
+        ).cte("run")
+        queued = outbox_insert(run.c.notification_id, run.c.student_id).cte("queued")
+        db.execute(select(func.count()).select_from(queued))
+    return len(reminders)
+
+
+def _run_invoice_reminder_job(db: Session, job: ScheduledJob) -> None:
+    payload = job.payload
+    sent = send_invoice_due_reminders(
+        db,
+        days_before=int(payload["days_before"]),
+        title_template=payload["title_template"],
+        body_template=payload["body_template"],
+        type=NotificationType(payload.get("type", NotificationType.FINANCIAL.value)),
+        channel=NotificationChannel(payload.get("channel", NotificationChannel.IN_APP.value)),
+        priority=NotificationPriority(payload.get("priority", NotificationPriority.NORMAL.value)),
+    )
+    logger.info("Invoice due reminders (%s days): %d sent", payload["days_before"], sent)
+
+
+_HANDLERS = {
+    ScheduledJobKind.NOTIFICATION: _run_notification_job,
+    ScheduledJobKind.INVOICE_DUE_REMINDER: _run_invoice_reminder_job,
+}
+
+
+# ==================== SCHEDULER LOOP ====================
+
+
+def _due_job_stmt():
+    return (
+        select(ScheduledJob)
+        .where(
+            ScheduledJob.status == ScheduledJobStatus.SCHEDULED,
+            ScheduledJob.run_at <= func.now(),
+        )
+        .order_by(ScheduledJob.run_at)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+
+
+def _advance(job: ScheduledJob, now: datetime) -> None:
+    job.runs_count += 1
+    job.attempts = 0
+    job.last_run_at = now
+    job.last_error = None
+    next_run = (
+        next_occurrence(job.recurrence, job.starts_at, max(now, job.run_at))
+        if job.recurrence
+        else None
+    )
+    if next_run is None:
+        job.status = ScheduledJobStatus.DONE
+    else:
+        job.run_at = next_run
+
+
+def _record_failure(job_id: uuid.UUID, error: Exception) -> None:
+    with SessionLocal() as db:
+        job = db.get(ScheduledJob, job_id, with_for_update=True)
+        if job is None or job.status != ScheduledJobStatus.SCHEDULED:
+            return
+        job.attempts += 1
+        job.last_error = repr(error)[:MAX_ERROR_LENGTH]
+        if job.attempts >= MAX_ATTEMPTS:
+            job.status = ScheduledJobStatus.FAILED
+        else:
+            delay = backoff_delay(
+                job.attempts, base_seconds=_RETRY_BASE_SECONDS, max_seconds=_RETRY_MAX_SECONDS
+            )
+            job.run_at = datetime.now(UTC) + timedelta(seconds=delay)
+        db.commit()
+
+
+def run_due_jobs(limit: int = 100) -> int:
+    """Run up to `limit` due jobs, one transaction each. Returns jobs run."""
+    ran = 0
+    while ran < limit:
+        with SessionLocal() as db:
+            job = db.execute(_due_job_stmt()).scalar_one_or_none()
+            if job is None:
+                db.rollback()
+                return ran
+            job_id = job.id
+            try:
+                _HANDLERS[job.kind](db, job)
+                _advance(job, datetime.now(UTC))
+                db.commit()
+            except Exception as exc:
+                db.rollback()
+                logger.exception("Scheduled job %s failed", job_id)
+                _record_failure(job_id, exc)
+        ran += 1
+    return ran
+
+
+async def run_scheduler_loop(interval_seconds: int) -> None:
+    """Poll the timer queue every `interval_seconds` until cancelled."""
+    while True:
+        try:
+            await asyncio.to_thread(run_due_jobs)
+        except Exception:
+            logger.exception("Scheduler poll failed")
+        await asyncio.sleep(interval_seconds)
+
@@ -0,0 +1,109 @@
+"""
+UniFECAF Portal do Aluno - Document storage.
+
+Generated documents are stored content-addressed: the key of a file is the
+SHA-256 of its bytes, so identical renders (the PDF writer is
+deterministic) are stored once and a key never changes meaning, which also
+makes it a strong ETag. StudentDocument.content_hash holds the key.
+
+`DocumentStorage` is the interface; `LocalDocumentStorage` (the default)
+keeps files under a directory, sharded by the first two hex digits of the
+key, and serves them by path so downloads go through FileResponse/sendfile.
+Other backends register in STORAGE_BACKENDS and are picked with
+DOCUMENTS_STORAGE_BACKEND.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import tempfile
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+
+_KEY = re.compile(r"^[0-9a-f]{64}$")
+
+
+@dataclass(frozen=True)
+class StoredFile:
+    key: str  # SHA-256 hex digest of the content
+    size: int
+    created: bool  # False when identical content was already stored
+
+
+def content_key(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+class DocumentStorage(ABC):
+    """Content-addressed blob store for generated documents."""
+
+    @abstractmethod
+    def put(self, content: bytes) -> StoredFile:
+        """Store `content` under its hash (no-op if already stored)."""
+
+    @abstractmethod
+    def local_path(self, key: str) -> Path | None:
+        """Filesystem path of a stored file, None if it does not exist."""
+
+    @abstractmethod
+    def delete(self, key: str) -> bool:
+        """Remove a stored file; False if it did not exist."""
+
+
+class LocalDocumentStorage(DocumentStorage):
+    """Files under `root`/<key[:2]>/<key>, written atomically."""
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        if not _KEY.match(key):
+            raise ValueError(f"Invalid storage key: {key!r}")
+        return self.root / key[:2] / key
+
+    def put(self, content: bytes) -> StoredFile:
+        key = content_key(content)
+        path = self._path(key)
+        if path.exists():
+            return StoredFile(key=key, size=len(content), created=False)
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Unique temporary name: concurrent workers may store the same content
+        fd, partial = tempfile.mkstemp(dir=path.parent, prefix=f".{key[:8]}.", suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                out.write(content)
+                out.flush()
+                os.fsync(out.fileno())
+            os.replace(partial, path)
+        except BaseException:
+            Path(partial).unlink(missing_ok=True)
+            raise
+        return StoredFile(key=key, size=len(content), created=True)
+
+    def local_path(self, key: str) -> Path | None:
+        path = self._path(key)
+        return path if path.is_file() else None
+
+    def delete(self, key: str) -> bool:
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            return False
+        return True
+
+
+STORAGE_BACKENDS: dict[str, type[DocumentStorage]] = {
+    "local": LocalDocumentStorage,
+}
+
+
+def build_document_storage(backend: str, root: str | Path) -> DocumentStorage:
+    try:
+        storage_class = STORAGE_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"Unknown document storage backend: {backend!r}") from None
+    return storage_class(root)
@@ -0,0 +1,181 @@
+"""
+UniFECAF Portal do Aluno - Transcript building and caching.
+
+A transcript only changes when the student's final grades do, which
+academics.student_grade_versions tracks (a stamp bumped by triggers on
+academics.final_grades, migration 030). Transcript artifacts are therefore
+cached under `TranscriptKey` (student, grade version, student row version):
+
+- the /me/transcript JSON in `TranscriptCache`, a bounded in-process LRU of
+  serialized bodies, rebuilt lazily on the first request after a change;
+- the TRANSCRIPT PDF in the document storage, whose StudentDocument records
+  the grade version it was rendered from (`transcript_is_current`).
+
+The key also gives a stable ETag, so clients revalidate with one small query.
+Renaming a subject, term or course does not bump the version; those show up
+on the next grade change.
+"""
+
+from __future__ import annotations
+
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, contains_eager
+
+from app.models.academics import (
+    Course,
+    FinalGrade,
+    Section,
+    Student,
+    StudentGradeVersion,
+    Subject,
+    Term,
+)
+from app.models.documents import DocumentStatus, StudentDocument
+from app.schemas.me import MeTranscriptResponse, MeTranscriptSubjectInfo, MeTranscriptTermInfo
+
+TOTAL_CREDITS_REQUIRED = 200  # Valor default, idealmente viria do Course
+
+
+@dataclass(frozen=True)
+class TranscriptKey:
+    student_id: uuid.UUID
+    grade_version: int
+    student_updated_at: datetime  # Name, RA, course and progress live on the student row
+
+    @property
+    def etag(self) -> str:
+        stamp = int(self.student_updated_at.timestamp() * 1_000_000)
+        return f'"{self.student_id.hex}-{self.grade_version}-{stamp:x}"'
+
+
+def grade_version(db: Session, student_id: uuid.UUID) -> int:
+    version = db.execute(
+        select(StudentGradeVersion.version).where(StudentGradeVersion.student_id == student_id)
+    ).scalar()
+    return version or 0
+
+
+def transcript_key(db: Session, student: Student) -> TranscriptKey:
+    return TranscriptKey(student.user_id, grade_version(db, student.user_id), student.updated_at)
+
+
+def transcript_is_current(db: Session, doc: StudentDocument) -> bool:
+    """True if `doc` (a TRANSCRIPT) is available and rendered from the current grades."""
+    return (
+        doc.status == DocumentStatus.AVAILABLE
+        and doc.content_hash is not None
+        and doc.grade_version is not None
+        and doc.grade_version == grade_version(db, doc.student_id)
+    )
+
+
+class TranscriptCache:
+    """Thread-safe LRU of serialized transcripts; stale keys simply age out."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[TranscriptKey, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: TranscriptKey) -> bytes | None:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def put(self, key: TranscriptKey, body: bytes) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _final_status(grade: FinalGrade) -> str:
+    if grade.final_score is not None:
+        return "APPROVED" if grade.final_score >= Decimal("6.0") else "FAILED"
+    return grade.status.value
+
+
+def build_transcript(db: Session, student: Student) -> MeTranscriptResponse:
+    """Full academic record of a student, grouped by term (two queries)."""
+    course_name = db.execute(select(Course.name).where(Course.id == student.course_id)).scalar()
+    grades = (
+        db.execute(
+            select(FinalGrade)
+            .join(FinalGrade.section)
+            .join(Section.subject)
+            .join(Section.term)
+            .options(
+                contains_eager(FinalGrade.section).contains_eager(Section.subject),
+                contains_eager(FinalGrade.section).contains_eager(Section.term),
+            )
+            .where(FinalGrade.student_id == student.user_id)
+            .order_by(Term.start_date.asc(), Subject.code)
+        )
+        .scalars()
+        .all()
+    )
+
+    terms: dict[str, MeTranscriptTermInfo] = {}
+    total_credits_completed = 0
+    all_scores: list[Decimal] = []
+    for fg in grades:
+        subject = fg.section.subject
+        term = fg.section.term
+        if term.code not in terms:
+            terms[term.code] = MeTranscriptTermInfo(
+                term_code=term.code,
+                term_name=term.code,  # Term has no name field
+                subjects=[],
+                term_average=None,
+                term_credits=0,
+            )
+        status = _final_status(fg)
+        terms[term.code].subjects.append(
+            MeTranscriptSubjectInfo(
+                subject_id=subject.id,
+                subject_code=subject.code,
+                subject_name=subject.name,
+                credits=subject.credits,
+                final_score=fg.final_score,
+                status=status,
+                term_code=term.code,
+            )
+        )
+        if status == "APPROVED":
+            total_credits_completed += subject.credits
+        if fg.final_score is not None:
+            all_scores.append(fg.final_score)
+
+    for term_info in terms.values():
+        scores = [s.final_score for s in term_info.subjects if s.final_score is not None]
+        if scores:
+            term_info.term_average = sum(scores) / len(scores)
+        term_info.term_credits = sum(
+            s.credits for s in term_info.subjects if s.status == "APPROVED"
+        )
+
+    return MeTranscriptResponse(
+        student_name=student.full_name,
+        ra=student.ra,
+        course_name=course_name or "Curso não encontrado",
+        terms=list(terms.values()),
+        total_credits_completed=total_credits_completed,
+        total_credits_required=TOTAL_CREDITS_REQUIRED,
+        cumulative_average=(sum(all_scores) / len(all_scores)) if all_scores else None,
+        progress_pct=student.total_progress,
+    )
@@ -0,0 +1,3 @@
+"""
+UniFECAF Portal do Aluno - Standalone worker processes (python -m app.workers.<name>).
+"""
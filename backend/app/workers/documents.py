@@ -0,0 +1,73 @@
+"""
+UniFECAF Portal do Aluno - Document generation worker pool.
+
+Runs DOCUMENT_WORKERS processes, each draining documents.document_jobs with
+a DocumentWorker, until SIGTERM/SIGINT. Rendering is CPU-bound, so the pool
+uses processes (one database connection each) and throughput grows with the
+worker count; several pools can also run side by side.
+
+Usage (from backend/):
+    python -m app.workers.documents
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import signal
+
+from app.core.config import get_settings
+from app.services.documents import DocumentWorker
+from app.services.storage import build_document_storage
+
+logger = logging.getLogger(__name__)
+
+LOG_FORMAT = "%(asctime)s %(levelname)s %(processName)s %(name)s: %(message)s"
+
+
+def _work(stop) -> None:
+    """Child process: the parent owns signal handling and sets `stop`."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+    settings = get_settings()
+    worker = DocumentWorker(
+        build_document_storage(settings.documents_storage_backend, settings.documents_storage_dir),
+        batch_size=settings.document_batch_size,
+        max_attempts=settings.document_max_attempts,
+        backoff_base_seconds=settings.document_backoff_base_seconds,
+        backoff_max_seconds=settings.document_backoff_max_seconds,
+    )
+    worker.run(stop, poll_seconds=settings.document_poll_seconds)
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+    settings = get_settings()
+    # spawn: children open their own database connections instead of
+    # inheriting the parent's pool
+    context = multiprocessing.get_context("spawn")
+    stop = context.Event()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, lambda *_: stop.set())
+
+    processes = [
+        context.Process(target=_work, args=(stop,), name=f"documents-{i}")
+        for i in range(max(settings.document_workers, 1))
+    ]
+    for process in processes:
+        process.start()
+    logger.info("Document worker pool started (%d processes)", len(processes))
+
+    while not stop.wait(1.0):
+        if not any(process.is_alive() for process in processes):
+            logger.error("All document workers exited")
+            break
+    stop.set()
+    for process in processes:
+        process.join()
+    logger.info("Document worker pool stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+UniFECAF Portal do Aluno - Outbox worker process.
+
+Drains comm.outbox_messages with one thread per channel (EMAIL always, SMS
+when SMS_GATEWAY_URL is set) until SIGTERM/SIGINT. Several processes can
+run side by side; rate limits apply per process.
+
+Usage (from backend/):
+    python -m app.workers.outbox
+"""
+
+from __future__ import annotations
+
+import logging
+import signal
+import threading
+
+from app.core.config import get_settings
+from app.models.notifications import NotificationChannel
+from app.services.outbox import HttpSmsTransport, OutboxWorker, SmtpTransport, Transport
+
+logger = logging.getLogger(__name__)
+
+
+def build_workers() -> list[OutboxWorker]:
+    settings = get_settings()
+    transports: list[tuple[NotificationChannel, Transport, float]] = [
+        (
+            NotificationChannel.EMAIL,
+            SmtpTransport(
+                settings.smtp_host,
+                settings.smtp_port,
+                sender=settings.email_sender,
+                username=settings.smtp_username,
+                password=settings.smtp_password,
+                starttls=settings.smtp_starttls,
+            ),
+            settings.outbox_email_rate_per_second,
+        )
+    ]
+    if settings.sms_gateway_url:
+        transports.append(
+            (
+                NotificationChannel.SMS,
+                HttpSmsTransport(settings.sms_gateway_url, token=settings.sms_gateway_token),
+                settings.outbox_sms_rate_per_second,
+            )
+        )
+    return [
+        OutboxWorker(
+            channel,
+            transport,
+            rate_per_second=rate,
+            batch_size=settings.outbox_batch_size,
+            max_attempts=settings.outbox_max_attempts,
+            backoff_base_seconds=settings.outbox_backoff_base_seconds,
+            backoff_max_seconds=settings.outbox_backoff_max_seconds,
+        )
+        for channel, transport, rate in transports
+    ]
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    settings = get_settings()
+    stop = threading.Event()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, lambda *_: stop.set())
+
+    threads = [
+        threading.Thread(
+            target=worker.run,
+            args=(stop,),
+            kwargs={"poll_seconds": settings.outbox_poll_seconds},
+            name=f"outbox-{worker.channel.value.lower()}",
+        )
+        for worker in build_workers()
+    ]
+    for thread in threads:
+        thread.start()
+    logger.info("Outbox worker started (%s)", ", ".join(t.name for t in threads))
+
+    # Signals are delivered to the main thread: wait on the event, not join()
+    while not stop.wait(1.0):
+        pass
+    for thread in threads:
+        thread.join()
+    logger.info("Outbox worker stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Benchmark: audit log data search - ILIKE over data::text vs. the GIN indexes
+of migration 034 (jsonb_path_ops containment, full-text tsvector).
+
+Needs a migrated database (DATABASE_URL). With --seed N, inserts N synthetic
+audit rows in the current month (removed afterwards unless --keep) so runs
+can be repeated on a 10M-row log. Prints the best time of each filter's
+COUNT (the listing's total) and the indexes its plan uses.
+
+Usage (from backend/):
+    python -m benchmarks.bench_audit_search --seed 10000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from sqlalchemy import Text, func, select, text
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.models.audit import AuditLog
+from app.routers.v1.admin_audit import _data_search_clause
+
+BENCH_DESCRIPTION = "bench-audit-search"
+
+SEED_SQL = text("""
+    INSERT INTO audit.audit_log (action, entity_type, data, created_at)
+    SELECT 'BENCH_EVENT',
+           'Bench',
+           jsonb_build_object(
+             'bench', CAST(:description AS text),
+             'seq', g,
+             'filters', jsonb_build_object(
+               'status', (ARRAY['ATIVO', 'TRANCADO', 'FORMADO', 'CANCELADO'])[1 + g % 4],
+               'course', 'curso-' || (g % 200)
+             ),
+             'note', (ARRAY['matrícula', 'boleto', 'rematrícula', 'declaração', 'senha'])[1 + g % 5]
+                     || ' ' || md5(g::text)
+           ),
+           date_trunc('month', now()) + (now() - date_trunc('month', now())) * random()
+    FROM generate_series(1, :n) AS g
+""")
+
+
+def measure(label: str, db: Session, condition, repeat: int) -> None:
+    """Time the listing's total (COUNT over the filter) and show the indexes it uses."""
+    stmt = select(func.count()).select_from(AuditLog).where(condition)
+    timings = []
+    rows = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = db.scalar(stmt)
+        timings.append(time.perf_counter() - start)
+
+    compiled = stmt.compile(dialect=db.get_bind().dialect)
+    plan = (
+        db.connection()
+        .exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled.string}", compiled.params)
+        .scalar_one()
+    )
+    indexes: set[str] = set()
+    nodes = [plan[0]["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        if "Index Name" in node:
+            indexes.add(node["Index Name"])
+        nodes.extend(node.get("Plans", []))
+    uses = ", ".join(sorted(indexes)) or "sequential scan"
+    print(f"{label:<44} {rows:>10,} rows  {min(timings) * 1000:>9,.1f} ms  ({uses})")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seed", type=int, default=0, help="Synthetic audit rows to insert.")
+    parser.add_argument("--keep", action="store_true", help="Keep seeded rows.")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.seed:
+        with SessionLocal() as db:
+            db.execute(SEED_SQL, {"n": args.seed, "description": BENCH_DESCRIPTION})
+            db.commit()
+            db.execute(text("ANALYZE audit.audit_log"))
+            db.commit()
+
+    try:
+        with SessionLocal() as db:
+            total = db.scalar(select(func.count()).select_from(AuditLog))
+            print(f"audit rows in database: {total:,}\n")
+
+            measure(
+                "key=value - ILIKE on data::text",
+                db,
+                AuditLog.data.cast(Text).ilike('%"course": "curso-42"%'),
+                args.repeat,
+            )
+            measure(
+                "key=value - containment (jsonb_path_ops)",
+                db,
+                AuditLog.data.contains({"filters": {"course": "curso-42"}}),
+                args.repeat,
+            )
+            measure(
+                "free text - ILIKE on data::text",
+                db,
+                AuditLog.data.cast(Text).ilike("%c4ca4238a0b923820dcc509a6f75849b%"),
+                args.repeat,
+            )
+            measure(
+                "free text - tsvector (GIN)",
+                db,
+                _data_search_clause("c4ca4238a0b923820dcc509a6f75849b"),
+                args.repeat,
+            )
+    finally:
+        if args.seed and not args.keep:
+            with SessionLocal() as db:
+                db.execute(
+                    text("DELETE FROM audit.audit_log WHERE data @> :bench"),
+                    {"bench": f'{{"bench": "{BENCH_DESCRIPTION}"}}'},
+                )
+                db.commit()
+
+
+if __name__ == "__main__":
+    main()
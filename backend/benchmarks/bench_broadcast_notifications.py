@@ -0,0 +1,182 @@
+"""
+Benchmark: fan-out-on-write vs broadcast (fan-out-on-read) notifications.
+
+Seeds N synthetic students, publishes K campus-wide notices both ways and
+reports comm.user_notifications growth plus inbox list / unread-count
+latency for a sample of students. Everything seeded is removed afterwards.
+Needs a migrated database with at least one course (DATABASE_URL).
+
+Usage (from backend/):
+    python -m benchmarks.bench_broadcast_notifications --students 30000 --notices 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import time
+from collections.abc import Callable, Sequence
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.models.notifications import Notification
+from app.schemas.admin_comm import NotificationAudience
+from app.services.notifications import (
+    all_students_audience,
+    count_unread,
+    fan_out_notification,
+    live_broadcast_ids,
+    publish_broadcast,
+    user_inbox_stmt,
+)
+
+BENCH_EMAIL_DOMAIN = "bench-broadcast.invalid"
+
+SEED_USERS_SQL = text("""
+    INSERT INTO auth.users (email, password_hash, role)
+    SELECT 'student' || g || '@' || :domain, 'x', 'STUDENT'
+    FROM generate_series(1, :n) AS g
+    ON CONFLICT (email) DO NOTHING
+""")
+
+SEED_STUDENTS_SQL = text("""
+    INSERT INTO academics.students (user_id, ra, full_name, course_id)
+    SELECT u.id, 'BB' || split_part(u.email, '@', 1), 'Bench Student', :course_id
+    FROM auth.users u
+    WHERE u.email LIKE '%@' || :domain
+    ON CONFLICT DO NOTHING
+""")
+
+TABLE_STATS_SQL = text("""
+    SELECT (SELECT count(*) FROM comm.user_notifications) AS rows,
+           pg_total_relation_size('comm.user_notifications') AS bytes
+""")
+
+
+def _timed_ms(fn: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def _summary(samples: Sequence[float]) -> str:
+    p50 = statistics.median(samples)
+    p95 = statistics.quantiles(samples, n=20)[-1] if len(samples) > 1 else samples[0]
+    return f"p50 {p50:6.2f} ms  p95 {p95:6.2f} ms"
+
+
+def _measure_reads(db: Session, user_ids: Sequence[UUID], *, broadcasts: bool) -> tuple[str, str]:
+    """Time the /me inbox page and unread count for each sampled student."""
+    list_ms: list[float] = []
+    count_ms: list[float] = []
+    for user_id in user_ids:
+
+        def inbox_page(user_id: UUID = user_id) -> None:
+            ids = live_broadcast_ids(db, user_id) if broadcasts else []
+            db.execute(user_inbox_stmt(user_id, ids).limit(20)).all()
+
+        def unread(user_id: UUID = user_id) -> None:
+            ids = live_broadcast_ids(db, user_id) if broadcasts else []
+            count_unread(db, user_id, ids)
+
+        list_ms.append(_timed_ms(inbox_page))
+        count_ms.append(_timed_ms(unread))
+    return _summary(list_ms), _summary(count_ms)
+
+
+def _table_stats(db: Session) -> tuple[int, int]:
+    row = db.execute(TABLE_STATS_SQL).one()
+    return row.rows, row.bytes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--students", type=int, default=30_000)
+    parser.add_argument("--notices", type=int, default=20)
+    parser.add_argument("--samples", type=int, default=200)
+    args = parser.parse_args()
+
+    notification_ids: list[UUID] = []
+    with SessionLocal() as db:
+        course_id = db.execute(text("SELECT id FROM academics.courses LIMIT 1")).scalar()
+        if course_id is None:
+            raise SystemExit("No course found: seed the database first")
+        db.execute(SEED_USERS_SQL, {"n": args.students, "domain": BENCH_EMAIL_DOMAIN})
+        db.execute(SEED_STUDENTS_SQL, {"course_id": course_id, "domain": BENCH_EMAIL_DOMAIN})
+        db.commit()
+        seeded = db.execute(
+            text("SELECT id FROM auth.users WHERE email LIKE '%@' || :domain"),
+            {"domain": BENCH_EMAIL_DOMAIN},
+        ).scalars().all()
+    sample = random.sample(seeded, min(args.samples, len(seeded)))
+
+    def create_notices(db: Session) -> list[Notification]:
+        notices = [Notification(title=f"bench notice {i}", body="bench") for i in range(args.notices)]
+        db.add_all(notices)
+        db.flush()
+        notification_ids.extend(n.id for n in notices)
+        return notices
+
+    try:
+        # Fan-out-on-write: one row per student per notice
+        with SessionLocal() as db:
+            rows_before, bytes_before = _table_stats(db)
+            for notice in create_notices(db):
+                fan_out_notification(db, notice.id, all_students_audience())
+            db.commit()
+            db.execute(text("ANALYZE comm.user_notifications"))
+            rows_after, bytes_after = _table_stats(db)
+            write_list, write_count = _measure_reads(db, sample, broadcasts=False)
+            db.execute(
+                text("DELETE FROM comm.notifications WHERE id = ANY(:ids)"),
+                {"ids": notification_ids},
+            )
+            db.commit()
+        notification_ids.clear()
+
+        print(f"{args.notices} notices x {len(seeded):,} seeded students")
+        print(f"fan-out-on-write: +{rows_after - rows_before:,} rows, "
+              f"+{(bytes_after - bytes_before) / 1024**2:,.1f} MiB")
+        print(f"  inbox page   {write_list}")
+        print(f"  unread count {write_count}")
+
+        # Broadcast: the audience lives on the notification
+        with SessionLocal() as db:
+            rows_before, bytes_before = _table_stats(db)
+            for notice in create_notices(db):
+                publish_broadcast(db, notice, NotificationAudience())
+            db.commit()
+            rows_after, bytes_after = _table_stats(db)
+            read_list, read_count = _measure_reads(db, sample, broadcasts=True)
+
+        print(f"broadcast:        +{rows_after - rows_before:,} rows, "
+              f"+{(bytes_after - bytes_before) / 1024**2:,.1f} MiB")
+        print(f"  inbox page   {read_list}")
+        print(f"  unread count {read_count}")
+    finally:
+        with SessionLocal() as db:
+            if notification_ids:
+                db.execute(
+                    text("DELETE FROM comm.notifications WHERE id = ANY(:ids)"),
+                    {"ids": notification_ids},
+                )
+            db.execute(
+                text(
+                    "DELETE FROM academics.students WHERE user_id IN "
+                    "(SELECT id FROM auth.users WHERE email LIKE '%@' || :domain)"
+                ),
+                {"domain": BENCH_EMAIL_DOMAIN},
+            )
+            db.execute(
+                text("DELETE FROM auth.users WHERE email LIKE '%@' || :domain"),
+                {"domain": BENCH_EMAIL_DOMAIN},
+            )
+            db.commit()
+
+
+if __name__ == "__main__":
+    main()
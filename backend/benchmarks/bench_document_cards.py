@@ -0,0 +1,72 @@
+"""
+Benchmark: student card rendering throughput (render + store).
+
+Renders synthetic student cards in memory (no database needed) and writes
+them to a temporary content-addressed document storage, in one process and
+in a pool of --processes processes (how the document workers scale, since
+rendering is CPU-bound). Prints cards per second for each.
+
+Usage (from backend/):
+    python -m benchmarks.bench_document_cards --cards 10000 --processes 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from pathlib import Path
+
+from app.services.document_rendering import StudentRecord, TermRecord, render_student_card
+from app.services.storage import LocalDocumentStorage
+
+TERM = TermRecord(code="2026.2", end_date=date(2026, 12, 18))
+TODAY = date(2026, 10, 19)
+
+
+def synthetic_students(n: int, offset: int = 0) -> list[StudentRecord]:
+    return [
+        StudentRecord(uuid.uuid4(), f"Aluno {i}", f"2026{i:05d}", "ACTIVE", "Engenharia")
+        for i in range(offset, offset + n)
+    ]
+
+
+def render_and_store(root: str, offset: int, n: int) -> int:
+    """Render and store `n` cards; returns files created."""
+    storage = LocalDocumentStorage(Path(root))
+    return sum(
+        storage.put(render_student_card(student, TERM, TODAY)).created
+        for student in synthetic_students(n, offset)
+    )
+
+
+def measure(label: str, cards: int, processes: int) -> None:
+    with tempfile.TemporaryDirectory() as root:
+        shares = [cards // processes + (i < cards % processes) for i in range(processes)]
+        offsets = [sum(shares[:i]) for i in range(processes)]
+        start = time.perf_counter()
+        if processes == 1:
+            created = render_and_store(root, 0, cards)
+        else:
+            with ProcessPoolExecutor(processes) as pool:
+                created = sum(pool.map(render_and_store, [root] * processes, offsets, shares))
+        elapsed = time.perf_counter() - start
+    print(f"{label:<28} {cards / elapsed:>10,.0f} cards/s  ({created:,} files, {elapsed:.2f} s)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cards", type=int, default=10_000)
+    parser.add_argument("--processes", type=int, default=4)
+    args = parser.parse_args()
+
+    measure("1 process", args.cards, 1)
+    if args.processes > 1:
+        measure(f"{args.processes} processes", args.cards, args.processes)
+
+
+if __name__ == "__main__":
+    main()
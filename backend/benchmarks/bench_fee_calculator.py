@@ -0,0 +1,100 @@
+"""
+Benchmark: vectorized fee calculator vs. the per-invoice Decimal rule.
+
+Generates synthetic open/closed invoices in memory (no database needed),
+projects them with `calculate_fees` and compares against
+`calculate_amount_due` on a sample (or every row with --verify-all).
+
+Usage (from backend/):
+    python -m benchmarks.bench_fee_calculator --invoices 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+
+from app.models.finance import InvoiceStatus
+from app.services.fees import (
+    InvoiceArrays,
+    calculate_amount_due,
+    calculate_fees,
+    micros_to_decimal,
+)
+
+EPOCH = date(1970, 1, 1)
+STATUSES = [InvoiceStatus.PENDING, InvoiceStatus.OVERDUE, InvoiceStatus.PAID, InvoiceStatus.CANCELED]
+
+
+def synthetic_invoices(n: int, as_of: date, seed: int = 27) -> tuple[InvoiceArrays, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    status_idx = rng.choice(len(STATUSES), size=n, p=[0.45, 0.25, 0.25, 0.05])
+    arrays = InvoiceArrays(
+        amount_cents=rng.integers(10_000, 500_000, size=n, dtype=np.int64),
+        fine_bp=rng.choice(np.array([0, 200, 250], dtype=np.int64), size=n),
+        interest_bp=rng.choice(np.array([0, 100, 133], dtype=np.int64), size=n),
+        due_day=(as_of - EPOCH).days - rng.integers(-180, 1_100, size=n, dtype=np.int64),
+        is_open=status_idx < 2,
+    )
+    return arrays, status_idx
+
+
+def decimal_amount_due(arrays: InvoiceArrays, status_idx: np.ndarray, i: int, as_of: date) -> Decimal:
+    return calculate_amount_due(
+        Decimal(int(arrays.amount_cents[i])).scaleb(-2),
+        Decimal(int(arrays.fine_bp[i])).scaleb(-2),
+        Decimal(int(arrays.interest_bp[i])).scaleb(-2),
+        EPOCH + timedelta(days=int(arrays.due_day[i])),
+        STATUSES[status_idx[i]],
+        as_of,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--invoices", type=int, default=1_000_000)
+    parser.add_argument("--sample", type=int, default=100_000, help="Rows checked against Decimal.")
+    parser.add_argument("--verify-all", action="store_true")
+    parser.add_argument("--as-of", type=date.fromisoformat, default=date.today())
+    args = parser.parse_args()
+
+    arrays, status_idx = synthetic_invoices(args.invoices, args.as_of)
+
+    start = time.perf_counter()
+    fees = calculate_fees(arrays, args.as_of)
+    total_due = int(fees.amount_due.sum())
+    vectorized_s = time.perf_counter() - start
+
+    checked = args.invoices if args.verify_all else min(args.sample, args.invoices)
+    rows = np.random.default_rng(1).permutation(args.invoices)[:checked]
+    amount_due = fees.amount_due
+
+    start = time.perf_counter()
+    expected = [decimal_amount_due(arrays, status_idx, int(i), args.as_of) for i in rows]
+    decimal_s = time.perf_counter() - start
+
+    mismatches = sum(
+        1 for i, exp in zip(rows, expected, strict=True) if micros_to_decimal(amount_due[i]) != exp
+    )
+
+    per_row_decimal = decimal_s / checked
+    print(f"invoices:          {args.invoices:,}")
+    print(f"as_of:             {args.as_of.isoformat()}")
+    print(f"total due:         {micros_to_decimal(total_due):,.2f}")
+    print(f"vectorized:        {vectorized_s * 1000:,.1f} ms")
+    print(
+        f"decimal loop:      {decimal_s * 1000:,.1f} ms for {checked:,} rows "
+        f"(~{per_row_decimal * args.invoices:,.1f} s extrapolated)"
+    )
+    print(f"speedup (approx):  {per_row_decimal * args.invoices / vectorized_s:,.0f}x")
+    print(f"mismatches:        {mismatches} / {checked:,}")
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark: streaming invoice export (CSV / NDJSON / Parquet).
+
+Streams the full invoice export to a file and reports throughput and the
+tracemalloc peak, which should stay flat as the dataset grows. Needs a
+migrated database (DATABASE_URL); --seed N adds N synthetic invoices first
+(see bench_finance_reads) and removes them afterwards unless --keep.
+
+Usage (from backend/):
+    python -m benchmarks.bench_finance_export --seed 1000000 --format parquet
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy import text
+
+from app.core.database import SessionLocal
+from app.models.finance import Invoice
+from app.routers.v1.admin_finance import (
+    _INVOICE_EXPORT_COLUMNS,
+    _invoice_export_rows,
+    _invoice_list_stmt,
+)
+from app.services.exports import stream_export
+from benchmarks.bench_finance_reads import BENCH_DESCRIPTION, SEED_SQL
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--keep", action="store_true")
+    parser.add_argument("--format", choices=["csv", "ndjson", "parquet"], default="csv")
+    parser.add_argument("--chunk-size", type=int, default=5_000)
+    args = parser.parse_args()
+
+    if args.seed:
+        with SessionLocal() as db:
+            db.execute(SEED_SQL, {"n": args.seed, "description": BENCH_DESCRIPTION})
+            db.commit()
+
+    try:
+        stmt = _invoice_list_stmt().order_by(Invoice.due_date.desc(), Invoice.id)
+        with tempfile.NamedTemporaryFile(suffix=f".{args.format}", delete=False) as out:
+            path = out.name
+            tracemalloc.start()
+            start = time.perf_counter()
+            for part in stream_export(
+                stmt,
+                _INVOICE_EXPORT_COLUMNS,
+                args.format,
+                transform=_invoice_export_rows,
+                chunk_size=args.chunk_size,
+            ):
+                out.write(part)
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+        size = os.path.getsize(path)
+        os.unlink(path)
+        print(f"format:      {args.format}")
+        print(f"file size:   {size / 2**20:,.1f} MiB")
+        print(f"elapsed:     {elapsed:,.2f} s ({size / 2**20 / elapsed:,.1f} MiB/s)")
+        print(f"peak memory: {peak / 2**20:,.1f} MiB (tracemalloc)")
+    finally:
+        if args.seed and not args.keep:
+            with SessionLocal() as db:
+                db.execute(
+                    text("DELETE FROM finance.invoices WHERE description = :description"),
+                    {"description": BENCH_DESCRIPTION},
+                )
+                db.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Benchmark: entity loading (joined Student/Term) vs. column projections for
+finance list reads.
+
+Needs a migrated database (DATABASE_URL). With --seed N, inserts N synthetic
+invoices for existing students (removed afterwards unless --keep) so runs
+can be repeated on a 100k-invoice dataset.
+
+Usage (from backend/):
+    python -m benchmarks.bench_finance_reads --seed 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+from collections.abc import Callable
+
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session, joinedload
+
+from app.core.database import SessionLocal
+from app.models.finance import Invoice
+from app.routers.v1.admin_finance import (
+    _build_invoice_response,
+    _invoice_list_stmt,
+    _invoice_row_to_response,
+)
+
+BENCH_DESCRIPTION = "bench-finance-reads"
+
+SEED_SQL = text("""
+    WITH st AS (
+        SELECT array_agg(user_id ORDER BY user_id) AS ids, count(*) AS n
+        FROM academics.students
+    ),
+    term AS (
+        SELECT id FROM academics.terms ORDER BY start_date DESC LIMIT 1
+    )
+    INSERT INTO finance.invoices (student_id, term_id, description, due_date, amount, status)
+    SELECT st.ids[1 + (g % st.n)],
+           (SELECT id FROM term),
+           :description,
+           CURRENT_DATE + 180 - (g % 720),
+           500 + (g % 1000),
+           (CASE WHEN g % 4 = 0 THEN 'PAID' ELSE 'PENDING' END)::finance.invoice_status
+    FROM st, generate_series(1, :n) AS g
+""")
+
+
+def measure(label: str, fn: Callable[[Session], int], repeat: int) -> None:
+    timings = []
+    peak = 0
+    rows = 0
+    for _ in range(repeat):
+        with SessionLocal() as db:
+            tracemalloc.start()
+            start = time.perf_counter()
+            rows = fn(db)
+            timings.append(time.perf_counter() - start)
+            _, run_peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            peak = max(peak, run_peak)
+    best = min(timings) * 1000
+    print(f"{label:<44} {rows:>8,} rows  {best:>9,.1f} ms  peak {peak / 2**20:>8,.1f} MiB")
+
+
+# ----- list page (admin /invoices) -----
+
+
+def page_entities(offset: int) -> Callable[[Session], int]:
+    """Previous behaviour: entities with joined Student/Term + per-row lookups."""
+
+    def run(db: Session) -> int:
+        invoices = db.scalars(
+            select(Invoice)
+            .options(joinedload(Invoice.student), joinedload(Invoice.term))
+            .order_by(Invoice.due_date.desc())
+            .limit(100)
+            .offset(offset)
+        ).all()
+        return len([_build_invoice_response(db, inv) for inv in invoices])
+
+    return run
+
+
+def page_projection(offset: int) -> Callable[[Session], int]:
+    def run(db: Session) -> int:
+        rows = db.execute(
+            _invoice_list_stmt().order_by(Invoice.due_date.desc()).limit(100).offset(offset)
+        ).all()
+        return len([_invoice_row_to_response(row) for row in rows])
+
+    return run
+
+
+# ----- full scan (e.g. debt summaries over many students) -----
+
+
+def scan_entities(db: Session) -> int:
+    invoices = db.scalars(
+        select(Invoice).options(joinedload(Invoice.student), joinedload(Invoice.term))
+    ).all()
+    return len(invoices)
+
+
+def scan_projection(db: Session) -> int:
+    return len(db.execute(_invoice_list_stmt()).all())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seed", type=int, default=0, help="Synthetic invoices to insert.")
+    parser.add_argument("--keep", action="store_true", help="Keep seeded invoices.")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.seed:
+        with SessionLocal() as db:
+            db.execute(SEED_SQL, {"n": args.seed, "description": BENCH_DESCRIPTION})
+            db.commit()
+
+    try:
+        with SessionLocal() as db:
+            total = db.scalar(select(func.count()).select_from(Invoice))
+        print(f"invoices in database: {total:,}\n")
+
+        deep = max(0, (total or 0) // 2)
+        measure("page 1 - entities + joined load", page_entities(0), args.repeat)
+        measure("page 1 - projection", page_projection(0), args.repeat)
+        measure(f"page @ offset {deep:,} - entities + joined load", page_entities(deep), args.repeat)
+        measure(f"page @ offset {deep:,} - projection", page_projection(deep), args.repeat)
+        measure("full scan - entities + joined load", scan_entities, args.repeat)
+        measure("full scan - projection", scan_projection, args.repeat)
+    finally:
+        if args.seed and not args.keep:
+            with SessionLocal() as db:
+                db.execute(
+                    text("DELETE FROM finance.invoices WHERE description = :description"),
+                    {"description": BENCH_DESCRIPTION},
+                )
+                db.commit()
+
+
+if __name__ == "__main__":
+    main()
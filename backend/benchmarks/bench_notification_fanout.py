@@ -0,0 +1,78 @@
+"""
+Benchmark: notification fan-out to every student.
+
+Seeds N synthetic student users (auth.users only), creates a notification,
+and times `fan_out_notification` with the all-students audience. Everything
+seeded is removed afterwards. Needs a migrated database (DATABASE_URL).
+
+Usage (from backend/):
+    python -m benchmarks.bench_notification_fanout --students 30000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from sqlalchemy import text
+
+from app.core.database import SessionLocal
+from app.models.notifications import Notification
+from app.services.notifications import all_students_audience, fan_out_notification
+
+BENCH_EMAIL_DOMAIN = "bench-fanout.invalid"
+
+SEED_USERS_SQL = text("""
+    INSERT INTO auth.users (email, password_hash, role)
+    SELECT 'student' || g || '@' || :domain, 'x', 'STUDENT'
+    FROM generate_series(1, :n) AS g
+    ON CONFLICT (email) DO NOTHING
+""")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--students", type=int, default=30_000)
+    parser.add_argument("--budget-ms", type=float, default=1_000.0)
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        db.execute(SEED_USERS_SQL, {"n": args.students, "domain": BENCH_EMAIL_DOMAIN})
+        notif = Notification(title="bench fan-out", body="bench")
+        db.add(notif)
+        db.commit()
+        notification_id = notif.id
+
+    try:
+        with SessionLocal() as db:
+            start = time.perf_counter()
+            result = fan_out_notification(db, notification_id, all_students_audience())
+            db.commit()
+            elapsed_ms = (time.perf_counter() - start) * 1000
+
+        with SessionLocal() as db:
+            start = time.perf_counter()
+            replay = fan_out_notification(db, notification_id, all_students_audience())
+            db.commit()
+            replay_ms = (time.perf_counter() - start) * 1000
+
+        print(f"fan-out:  {result.delivered:,} delivered, {result.skipped:,} skipped "
+              f"in {elapsed_ms:,.0f} ms")
+        print(f"replay:   {replay.delivered:,} delivered, {replay.skipped:,} skipped "
+              f"in {replay_ms:,.0f} ms")
+        if elapsed_ms > args.budget_ms:
+            raise SystemExit(f"fan-out exceeded the {args.budget_ms:,.0f} ms budget")
+    finally:
+        with SessionLocal() as db:
+            db.execute(
+                text("DELETE FROM comm.notifications WHERE id = :id"), {"id": notification_id}
+            )
+            db.execute(
+                text("DELETE FROM auth.users WHERE email LIKE '%@' || :domain"),
+                {"domain": BENCH_EMAIL_DOMAIN},
+            )
+            db.commit()
+
+
+if __name__ == "__main__":
+    main()
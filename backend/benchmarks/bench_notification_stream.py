@@ -0,0 +1,123 @@
+"""
+Benchmark: idle SSE connections on /me/notifications/stream.
+
+Opens N concurrent streams against a running API (one uvicorn worker, so
+every stream shares its LISTEN hub), waits for the initial unread-count
+event on each, and reports the server's resident memory growth per
+connection (read from /proc/<pid>/status). Then delivers one notification
+to all students and measures how long until every stream received it.
+
+Usage (from backend/, API started with `uvicorn app.main:app`):
+    python -m benchmarks.bench_notification_stream --pid $(pgrep -f "uvicorn app.main") \\
+        --connections 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import resource
+import time
+import uuid
+
+import httpx
+
+STUDENT = {"email": "demo@unifecaf.edu.br", "password": "demo123"}
+ADMIN = {"email": "admin@unifecaf.edu.br", "password": "admin123"}
+
+
+def _rss_kib(pid: int) -> int:
+    with open(f"/proc/{pid}/status") as status_file:
+        for line in status_file:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    raise RuntimeError("VmRSS not found")
+
+
+async def _login(client: httpx.AsyncClient, credentials: dict) -> None:
+    res = await client.post("/api/v1/auth/login", json=credentials)
+    res.raise_for_status()
+
+
+async def _hold_stream(
+    client: httpx.AsyncClient, connected: asyncio.Event, counter: list[int], target: int,
+    notified: list[float], title: str,
+) -> None:
+    async with client.stream("GET", "/api/v1/me/notifications/stream") as res:
+        res.raise_for_status()
+        async for line in res.aiter_lines():
+            if line.startswith("data:") and "unread_count" in line and counter[0] < target:
+                counter[0] += 1
+                if counter[0] == target:
+                    connected.set()
+            elif line.startswith("data:") and title in line:
+                notified.append(time.perf_counter())
+
+
+async def run(args: argparse.Namespace) -> None:
+    # Raise the client's own fd limit so it is not the bottleneck
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (min(hard, args.connections + 1024), hard))
+
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    timeout = httpx.Timeout(None, connect=30)
+    title = f"bench stream {uuid.uuid4().hex[:8]}"
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=timeout) as student:
+        await _login(student, STUDENT)
+        rss_before = _rss_kib(args.pid)
+
+        connected = asyncio.Event()
+        counter = [0]
+        notified: list[float] = []
+        start = time.perf_counter()
+        tasks = [
+            asyncio.create_task(
+                _hold_stream(student, connected, counter, args.connections, notified, title)
+            )
+            for _ in range(args.connections)
+        ]
+        await connected.wait()
+        elapsed = time.perf_counter() - start
+        await asyncio.sleep(args.settle)
+        rss_after = _rss_kib(args.pid)
+
+        print(f"{args.connections:,} streams open in {elapsed:.1f}s")
+        print(f"server RSS {rss_before / 1024:,.1f} MiB -> {rss_after / 1024:,.1f} MiB "
+              f"({(rss_after - rss_before) / args.connections:.1f} KiB per connection)")
+
+        async with httpx.AsyncClient(base_url=args.url) as admin:
+            await _login(admin, ADMIN)
+            res = await admin.post(
+                "/api/v1/admin/notifications",
+                json={"type": "ADMIN", "channel": "IN_APP", "title": title, "body": "bench"},
+            )
+            notification_id = res.json()["id"]
+            sent = time.perf_counter()
+            await admin.post(
+                f"/api/v1/admin/notifications/{notification_id}/deliver",
+                json={"all_students": True},
+            )
+            deadline = sent + 30
+            while len(notified) < args.connections and time.perf_counter() < deadline:
+                await asyncio.sleep(0.05)
+            if notified:
+                print(f"delivered to {len(notified):,} streams; last after "
+                      f"{(max(notified) - sent) * 1000:,.0f} ms")
+            await admin.delete(f"/api/v1/admin/notifications/{notification_id}")
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--pid", type=int, required=True, help="uvicorn worker pid")
+    parser.add_argument("--connections", type=int, default=5_000)
+    parser.add_argument("--settle", type=float, default=2.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1372,9 +1372,15 @@ def seed_notifications(session: Session, students: list[dict]) -> None:
 
             session.execute(
                 text("""
+                    WITH updated AS (
+                        UPDATE comm.user_notifications SET read_at = :read_at
+                        WHERE user_id = :user_id AND notification_id = :notification_id
+                        RETURNING id
+                    )
                     INSERT INTO comm.user_notifications (user_id, notification_id, read_at)
-                    VALUES (:user_id, :notification_id, :read_at)
-                    ON CONFLICT (user_id, notification_id) DO UPDATE SET read_at = EXCLUDED.read_at
+                    SELECT CAST(:user_id AS uuid), CAST(:notification_id AS uuid),
+                           CAST(:read_at AS timestamptz)
+                    WHERE NOT EXISTS (SELECT 1 FROM updated)
                 """),
                 {
                     "user_id": user_id,
@@ -1389,8 +1395,8 @@ def seed_notifications(session: Session, students: list[dict]) -> None:
 
 
 def seed_documents(session: Session, students: list[dict]) -> None:
-    """Cria documentos para cada aluno."""
-    print("  → Criando documentos...")
+    """Solicita os documentos de cada aluno (o worker de documentos gera os PDFs)."""
+    print("  → Solicitando documentos...")
 
     doc_types = [
         ("DECLARATION", "Declaração de Matrícula"),
@@ -1401,31 +1407,36 @@ def seed_documents(session: Session, students: list[dict]) -> None:
     total = 0
     for student in students:
         user_id = student["user_id"]
-        ra = student["ra"]
 
         for doc_type, title in doc_types:
-            file_url = f"https://files.local/demo/{ra}/{doc_type.lower()}.pdf"
-
+            # Sem arquivo armazenado o documento não fica AVAILABLE: entra na
+            # fila como uma solicitação (documentos já gerados são mantidos)
             session.execute(
                 text("""
-                    INSERT INTO documents.student_documents (student_id, doc_type, status, title, file_url, generated_at)
-                    VALUES (:student_id, CAST(:doc_type AS documents.document_type), 'AVAILABLE'::documents.document_status, :title, :file_url, NOW())
-                    ON CONFLICT (student_id, doc_type) DO UPDATE SET
-                        status = EXCLUDED.status,
-                        title = EXCLUDED.title,
-                        file_url = EXCLUDED.file_url,
-                        generated_at = EXCLUDED.generated_at
+                    WITH doc AS (
+                        INSERT INTO documents.student_documents (student_id, doc_type, status, title)
+                        VALUES (:student_id, CAST(:doc_type AS documents.document_type), 'GENERATING'::documents.document_status, :title)
+                        ON CONFLICT (student_id, doc_type) DO UPDATE SET
+                            title = EXCLUDED.title,
+                            status = CASE WHEN documents.student_documents.content_hash IS NULL
+                                          THEN EXCLUDED.status ELSE documents.student_documents.status END,
+                            file_url = CASE WHEN documents.student_documents.content_hash IS NULL
+                                            THEN NULL ELSE documents.student_documents.file_url END
+                        RETURNING id, content_hash
+                    )
+                    INSERT INTO documents.document_jobs (document_id)
+                    SELECT id FROM doc WHERE content_hash IS NULL
+                    ON CONFLICT (document_id) WHERE status IN ('PENDING', 'RUNNING') DO NOTHING
                 """),
                 {
                     "student_id": user_id,
                     "doc_type": doc_type,
                     "title": title,
-                    "file_url": file_url,
                 },
             )
             total += 1
 
-    print(f"    ✓ {total} documentos criados/atualizados")
+    print(f"    ✓ {total} documentos solicitados (gerados pelo worker de documentos)")
 
 
 def run_validations(session: Session) -> None:
@@ -3,6 +3,7 @@ UniFECAF Portal do Aluno - Test Configuration
 """
 
 import os
+from contextlib import contextmanager
 
 import pytest
 from fastapi.testclient import TestClient
@@ -42,3 +43,44 @@ def admin_client(client):
     _login(client, email="admin@unifecaf.edu.br", password="admin123")
     yield client
     client.post("/api/v1/auth/logout")
+
+
+def _explain_relations(db, stmt) -> set[str]:
+    """Tables (partitions included) a statement's plan reads, via EXPLAIN (FORMAT JSON)."""
+    from psycopg2.extras import register_uuid
+
+    register_uuid()
+    compiled = stmt.compile(dialect=db.get_bind().dialect)
+    plan = (
+        db.connection()
+        .exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled.string}", compiled.params)
+        .scalar_one()
+    )
+
+    relations: set[str] = set()
+    nodes = [plan[0]["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        if "Relation Name" in node:
+            relations.add(node["Relation Name"])
+        nodes.extend(node.get("Plans", []))
+    return relations
+
+
+@contextmanager
+def _recorded_statements():
+    """SQL statements the app engine runs inside the block (query-count tests)."""
+    from sqlalchemy import event
+
+    from app.core.database import engine
+
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
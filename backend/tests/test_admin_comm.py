@@ -0,0 +1,228 @@
+"""
+Admin communications tests (fan-out, audiences and broadcasts).
+"""
+
+from uuid import uuid4
+
+from starlette import status
+
+from tests.conftest import _login, _recorded_statements
+
+
+def _create_notification(admin_client) -> str:
+    res = admin_client.post(
+        "/api/v1/admin/notifications",
+        json={"type": "ADMIN", "channel": "IN_APP", "priority": "NORMAL",
+              "title": f"Aviso {uuid4().hex[:8]}", "body": "Teste de entrega"},
+    )
+    assert res.status_code == status.HTTP_201_CREATED
+    return res.json()["id"]
+
+
+def test_deliver_to_all_students_is_idempotent(admin_client):
+    notification_id = _create_notification(admin_client)
+    url = f"/api/v1/admin/notifications/{notification_id}/deliver"
+
+    first = admin_client.post(url, json={"all_students": True})
+    assert first.status_code == status.HTTP_200_OK
+    delivered = first.json()["delivered"]
+    assert delivered > 0
+    assert first.json()["skipped_existing"] == 0
+
+    second = admin_client.post(url, json={"all_students": True})
+    assert second.status_code == status.HTTP_200_OK
+    assert second.json() == {
+        "notification_id": notification_id,
+        "delivered": 0,
+        "skipped_existing": delivered,
+    }
+
+    detail = admin_client.get(f"/api/v1/admin/notifications/{notification_id}")
+    assert detail.json()["delivered_count"] == delivered
+
+
+def test_deliver_to_explicit_ids_skips_unknown_users(admin_client):
+    notification_id = _create_notification(admin_client)
+    res = admin_client.post(
+        f"/api/v1/admin/notifications/{notification_id}/deliver",
+        json={"user_ids": [str(uuid4())]},
+    )
+    assert res.status_code == status.HTTP_200_OK
+    assert res.json()["delivered"] == 0
+    assert res.json()["skipped_existing"] == 1
+
+
+def test_audience_count_matches_delivery(admin_client):
+    audience = {"student_statuses": ["ACTIVE"], "has_overdue_invoices": True}
+    count = admin_client.post("/api/v1/admin/notifications/audience/count", json=audience)
+    assert count.status_code == status.HTTP_200_OK
+    total = count.json()["total"]
+
+    notification_id = _create_notification(admin_client)
+    res = admin_client.post(
+        f"/api/v1/admin/notifications/{notification_id}/deliver",
+        json={"audience": audience},
+    )
+    assert res.status_code == status.HTTP_200_OK
+    assert res.json()["delivered"] == total
+    assert res.json()["skipped_existing"] == 0
+
+
+def test_audience_criteria_narrow_the_selection(admin_client):
+    url = "/api/v1/admin/notifications/audience/count"
+    everyone = admin_client.post(url, json={}).json()["total"]
+    delinquent = admin_client.post(url, json={"has_overdue_invoices": True}).json()["total"]
+    current = admin_client.post(url, json={"has_overdue_invoices": False}).json()["total"]
+    assert delinquent + current == everyone
+
+    nobody = admin_client.post(url, json={"course_ids": [str(uuid4())]})
+    assert nobody.json() == {"total": 0}
+
+    invalid = admin_client.post(url, json={"min_absences_pct": 150})
+    assert invalid.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_broadcast_state_is_created_on_first_interaction(client):
+    _login(client, email="admin@unifecaf.edu.br", password="admin123")
+    notification_id = _create_notification(client)
+    published = client.post(f"/api/v1/admin/notifications/{notification_id}/broadcast", json={})
+    assert published.status_code == status.HTTP_200_OK
+    assert published.json()["published_at"] is not None
+    assert published.json()["delivered_count"] > 0
+
+    # Nothing is fanned out up front
+    deliveries = client.get(
+        "/api/v1/admin/user-notifications", params={"notification_id": notification_id}
+    )
+    assert deliveries.json()["total"] == 0
+
+    client.post("/api/v1/auth/logout")
+    _login(client, email="demo@unifecaf.edu.br", password="demo123")
+    unread_before = client.get("/api/v1/me/notifications/unread-count").json()["unread_count"]
+    inbox = client.get("/api/v1/me/notifications", params={"limit": 100}).json()["items"]
+    item = next(i for i in inbox if i["notification_id"] == notification_id)
+    assert item["id"] == notification_id
+    assert item["is_read"] is False
+
+    res = client.post(f"/api/v1/me/notifications/{item['id']}/read")
+    assert res.status_code == status.HTTP_204_NO_CONTENT
+    unread_after = client.get("/api/v1/me/notifications/unread-count").json()["unread_count"]
+    assert unread_after == unread_before - 1
+
+    inbox = client.get("/api/v1/me/notifications", params={"limit": 100}).json()["items"]
+    matches = [i for i in inbox if i["notification_id"] == notification_id]
+    assert len(matches) == 1
+    assert matches[0]["is_read"] is True
+    assert matches[0]["id"] != notification_id  # Now the student's own state row
+
+
+def test_counters_follow_read_unread_and_archive(client):
+    _login(client, email="admin@unifecaf.edu.br", password="admin123")
+    notification_id = _create_notification(client)
+    client.post(f"/api/v1/admin/notifications/{notification_id}/deliver", json={"all_students": True})
+    stats_before = client.get("/api/v1/admin/notifications/stats").json()
+
+    client.post("/api/v1/auth/logout")
+    _login(client, email="demo@unifecaf.edu.br", password="demo123")
+    unread_url = "/api/v1/me/notifications/unread-count"
+    unread = client.get(unread_url).json()["unread_count"]
+    inbox = client.get("/api/v1/me/notifications", params={"limit": 100}).json()["items"]
+    item_id = next(i["id"] for i in inbox if i["notification_id"] == notification_id)
+
+    client.post(f"/api/v1/me/notifications/{item_id}/read")
+    client.post(f"/api/v1/me/notifications/{item_id}/read")  # Idempotent
+    assert client.get(unread_url).json()["unread_count"] == unread - 1
+    client.post(f"/api/v1/me/notifications/{item_id}/unread")
+    assert client.get(unread_url).json()["unread_count"] == unread
+    client.post(f"/api/v1/me/notifications/{item_id}/read")
+    client.post(f"/api/v1/me/notifications/{item_id}/archive")
+    assert client.get(unread_url).json()["unread_count"] == unread - 1
+
+    client.post("/api/v1/auth/logout")
+    _login(client, email="admin@unifecaf.edu.br", password="admin123")
+    detail = client.get(f"/api/v1/admin/notifications/{notification_id}").json()
+    assert detail["read_count"] == 1
+    stats = client.get("/api/v1/admin/notifications/stats").json()
+    assert stats["total_reads"] == stats_before["total_reads"] + 1
+    assert stats["by_type"]["ADMIN"] == stats_before["by_type"]["ADMIN"]
+
+    # Triggers keep the counters exact, so there is nothing to repair
+    repair = client.post("/api/v1/admin/notifications/counters/reconcile").json()
+    assert repair == {"reconciled": True, "users_fixed": 0, "notifications_fixed": 0}
+
+
+def test_bulk_archive_and_delete_by_filter(admin_client):
+    token = uuid4().hex[:8]
+    ids = []
+    for _ in range(2):
+        res = admin_client.post(
+            "/api/v1/admin/notifications",
+            json={"type": "ADMIN", "channel": "IN_APP", "title": f"Lote {token}", "body": "x"},
+        )
+        ids.append(res.json()["id"])
+    delivered = admin_client.post(
+        f"/api/v1/admin/notifications/{ids[0]}/deliver", json={"all_students": True}
+    ).json()["delivered"]
+
+    archived = admin_client.post(
+        "/api/v1/admin/user-notifications/bulk-archive",
+        json={"notification_id": ids[0], "read": False},
+    )
+    assert archived.json() == {"affected": delivered}
+
+    res = admin_client.post("/api/v1/admin/notifications/bulk-archive", json={"search": token})
+    assert res.json() == {"affected": 2}
+    res = admin_client.post(
+        "/api/v1/admin/notifications/bulk-delete", json={"search": token, "is_archived": True}
+    )
+    assert res.json() == {"affected": 2}
+    deliveries = admin_client.get(
+        "/api/v1/admin/user-notifications", params={"notification_id": ids[0]}
+    )
+    assert deliveries.json()["total"] == 0
+
+    unfiltered = admin_client.post("/api/v1/admin/notifications/bulk-delete", json={})
+    assert unfiltered.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    assert unfiltered.json()["error"]["code"] == "BULK_FILTER_REQUIRED"
+
+
+def test_bulk_delivery_changes_are_announced_in_one_statement(admin_client):
+    notification_id = _create_notification(admin_client)
+    delivered = admin_client.post(
+        f"/api/v1/admin/notifications/{notification_id}/deliver", json={"all_students": True}
+    ).json()["delivered"]
+    bulk = {"notification_id": notification_id}
+
+    for action in ("bulk-archive", "bulk-delete"):
+        with _recorded_statements() as statements:
+            res = admin_client.post(f"/api/v1/admin/user-notifications/{action}", json=bulk)
+        assert res.json() == {"affected": delivered}
+        # Every affected user is announced by the bulk statement itself
+        announcing = [s for s in statements if "pg_notify" in s]
+        assert len(announcing) == 1
+        assert "comm.user_notifications" in announcing[0]
+
+
+def test_user_notification_listing_is_enriched_and_searchable(admin_client):
+    notification_id = _create_notification(admin_client)
+    admin_client.post(
+        f"/api/v1/admin/notifications/{notification_id}/deliver", json={"all_students": True}
+    )
+    url = "/api/v1/admin/user-notifications"
+
+    res = admin_client.get(url, params={"notification_id": notification_id, "search": "DEMO@unifecaf"})
+    assert res.status_code == status.HTTP_200_OK
+    items = res.json()["items"]
+    assert res.json()["total"] == len(items) == 1
+    assert items[0]["user_email"] == "demo@unifecaf.edu.br"
+    assert items[0]["user_name"]
+    assert items[0]["notification_title"].startswith("Aviso ")
+
+    # The same student found by (part of) their name
+    by_name = admin_client.get(
+        url, params={"notification_id": notification_id, "search": items[0]["user_name"][:5]}
+    )
+    assert items[0]["id"] in {i["id"] for i in by_name.json()["items"]}
+
+    nobody = admin_client.get(url, params={"search": uuid4().hex})
+    assert nobody.json()["total"] == 0
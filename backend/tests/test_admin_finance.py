@@ -0,0 +1,133 @@
+"""
+Admin finance tests (lists, exports, negotiation, receivables aging, projection).
+"""
+
+import json
+from datetime import date, timedelta
+from decimal import Decimal
+
+from starlette import status
+
+
+def test_receivables_aging_report_and_drilldown(admin_client):
+    refresh = admin_client.post("/api/v1/admin/receivables/aging/refresh")
+    assert refresh.status_code == status.HTTP_200_OK
+
+    report = admin_client.get("/api/v1/admin/receivables/aging")
+    assert report.status_code == status.HTTP_200_OK
+    data = report.json()
+    assert "rows" in data
+    totals = data["totals"]
+    assert set(totals) >= {"current", "days_0_30", "days_31_60", "days_61_90", "days_over_90"}
+
+    page = admin_client.get("/api/v1/admin/receivables/aging/students?limit=2")
+    assert page.status_code == status.HTTP_200_OK
+    body = page.json()
+    assert len(body["items"]) <= 2
+    if not body["next_cursor"]:
+        return
+
+    next_page = admin_client.get(
+        f"/api/v1/admin/receivables/aging/students?limit=2&cursor={body['next_cursor']}"
+    )
+    assert next_page.status_code == status.HTTP_200_OK
+    first_ids = {i["student_id"] for i in body["items"]}
+    assert not first_ids & {i["student_id"] for i in next_page.json()["items"]}
+
+
+def test_receivables_aging_rejects_invalid_cursor(admin_client):
+    res = admin_client.get("/api/v1/admin/receivables/aging/students?cursor=bogus")
+    assert res.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    assert res.json()["error"]["code"] == "INVALID_CURSOR"
+
+
+def test_portfolio_projection_grows_with_future_date(admin_client):
+    today = admin_client.get("/api/v1/admin/receivables/projection")
+    assert today.status_code == status.HTTP_200_OK
+    now = today.json()
+
+    future = admin_client.get("/api/v1/admin/receivables/projection?as_of=2100-01-01")
+    assert future.status_code == status.HTTP_200_OK
+    later = future.json()
+
+    assert later["invoices_count"] == now["invoices_count"]
+    assert later["total_principal"] == now["total_principal"]
+    assert later["overdue_count"] == later["invoices_count"]
+    assert Decimal(later["total_due"]) >= Decimal(now["total_due"])
+
+
+def test_invoice_and_payment_lists_match_detail_views(admin_client):
+    invoices = admin_client.get("/api/v1/admin/invoices?limit=5")
+    assert invoices.status_code == status.HTTP_200_OK
+    body = invoices.json()
+    assert body["total"] >= len(body["items"])
+    if body["items"]:
+        item = body["items"][0]
+        detail = admin_client.get(f"/api/v1/admin/invoices/{item['id']}")
+        assert detail.status_code == status.HTTP_200_OK
+        assert detail.json() == item
+
+    payments = admin_client.get("/api/v1/admin/payments?limit=5")
+    assert payments.status_code == status.HTTP_200_OK
+    body = payments.json()
+    if body["items"]:
+        item = body["items"][0]
+        detail = admin_client.get(f"/api/v1/admin/payments/{item['id']}")
+        assert detail.status_code == status.HTTP_200_OK
+        assert detail.json() == item
+
+
+def test_negotiation_is_recorded_and_not_replayed(admin_client):
+    students = admin_client.get("/api/v1/admin/students?status=ACTIVE&limit=1")
+    assert students.status_code == status.HTTP_200_OK
+    student_id = students.json()["items"][0]["user_id"]
+
+    due = (date.today() + timedelta(days=30)).isoformat()
+    invoice = admin_client.post(
+        "/api/v1/admin/invoices",
+        json={"student_id": student_id, "due_date": due, "amount": "300.00"},
+    )
+    assert invoice.status_code == status.HTTP_201_CREATED
+    invoice_id = invoice.json()["id"]
+
+    payload = {
+        "student_id": student_id,
+        "installments": [
+            {"installment_number": 1, "due_date": due, "amount": "150.00", "description": "Parcela 1/2"},
+            {"installment_number": 2, "due_date": due, "amount": "150.00", "description": "Parcela 2/2"},
+        ],
+        "cancel_pending_ids": [invoice_id],
+    }
+    executed = admin_client.post("/api/v1/admin/invoices/negotiation/execute", json=payload)
+    assert executed.status_code == status.HTTP_200_OK
+    body = executed.json()
+    assert body["canceled_invoices"] == [invoice_id]
+    assert body["total_created"] == 2
+
+    plan = admin_client.get(f"/api/v1/admin/negotiation-plans/{body['plan_id']}")
+    assert plan.status_code == status.HTTP_200_OK
+    assert plan.json()["canceled_invoice_ids"] == [invoice_id]
+    assert len(plan.json()["installments"]) == 2
+
+    # Same invoices again (e.g. a second admin): rejected, nothing created
+    replay = admin_client.post("/api/v1/admin/invoices/negotiation/execute", json=payload)
+    assert replay.status_code == status.HTTP_409_CONFLICT
+    assert replay.json()["error"]["code"] == "NEGOTIATION_CONFLICT"
+
+
+def test_invoice_and_payment_exports_stream_filtered_rows(admin_client):
+    listed = admin_client.get("/api/v1/admin/invoices?status=PAID&limit=1")
+    assert listed.status_code == status.HTTP_200_OK
+    total = listed.json()["total"]
+
+    csv_export = admin_client.get("/api/v1/admin/invoices/export?status=PAID")
+    assert csv_export.status_code == status.HTTP_200_OK
+    assert csv_export.headers["content-type"].startswith("text/csv")
+    lines = csv_export.text.splitlines()
+    assert lines[0].startswith("id,reference,student_id")
+    assert len(lines) == total + 1
+
+    ndjson_export = admin_client.get("/api/v1/admin/payments/export?format=ndjson")
+    assert ndjson_export.status_code == status.HTTP_200_OK
+    records = [json.loads(line) for line in ndjson_export.text.splitlines()]
+    assert len(records) == admin_client.get("/api/v1/admin/payments?limit=1").json()["total"]
@@ -0,0 +1,147 @@
+"""
+Audit log writer: batching on size and time, backpressure, flush on stop,
+and events following the transaction that recorded them.
+"""
+
+import threading
+import time
+import uuid
+
+from sqlalchemy import select
+
+from app.core.database import SessionLocal
+from app.models.audit import AuditLog
+from app.services.audit import AuditEvent, AuditSink, audit_sink, record_audit
+
+# ==================== LOCAL STAND-IN ====================
+
+
+class _RecordingSession:
+    """Session stand-in: keeps the rows of each INSERT; the flusher waits on `gate`."""
+
+    def __init__(self, inserts: list[list[dict]], gate: threading.Event) -> None:
+        self.inserts = inserts
+        self.gate = gate
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+    def execute(self, stmt, rows) -> None:
+        if threading.current_thread().name == "audit-sink":
+            self.gate.wait(5)
+        self.inserts.append(rows)
+
+    def commit(self) -> None:
+        pass
+
+
+def _sink() -> tuple[AuditSink, list[list[dict]], threading.Event]:
+    inserts: list[list[dict]] = []
+    gate = threading.Event()
+    gate.set()
+    return AuditSink(lambda: _RecordingSession(inserts, gate)), inserts, gate
+
+
+def _wait_for(condition, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def _event(i: int = 0) -> AuditEvent:
+    return AuditEvent(action="TEST_EVENT", data={"i": i})
+
+
+# ==================== SINK ====================
+
+
+def test_sink_writes_synchronously_until_started():
+    sink, inserts, _ = _sink()
+    sink.emit(_event())
+    assert len(inserts) == 1
+    assert sink.stats.direct == 1
+
+
+def test_sink_flushes_full_batches_as_one_insert():
+    sink, inserts, _ = _sink()
+    sink.start(batch_size=3, flush_interval_seconds=60)
+    try:
+        sink.emit(_event(1), _event(2))
+        time.sleep(0.05)
+        assert inserts == []  # Below the batch size, before the interval
+        sink.emit(_event(3))
+        _wait_for(lambda: inserts)
+        assert [row["data"]["i"] for row in inserts[0]] == [1, 2, 3]
+        assert inserts[0][0]["action"] == "TEST_EVENT"
+        assert inserts[0][0]["created_at"] is not None
+    finally:
+        sink.stop()
+
+
+def test_sink_flushes_on_interval_and_on_stop():
+    sink, inserts, _ = _sink()
+    sink.start(batch_size=100, flush_interval_seconds=0.05)
+    sink.emit(_event())
+    _wait_for(lambda: inserts)
+    sink.stop()
+
+    sink.start(batch_size=2, flush_interval_seconds=60)
+    sink.emit(*[_event(i) for i in range(5)])
+    sink.stop()
+    assert sum(len(rows) for rows in inserts) == 6
+    assert len(sink) == 0
+    assert sink.stats.written == 6
+
+
+def test_full_sink_applies_backpressure_then_writes_directly():
+    sink, inserts, gate = _sink()
+    gate.clear()  # The flusher blocks in its INSERT
+    sink.start(max_pending=2, batch_size=1, flush_interval_seconds=60, enqueue_timeout_seconds=0.05)
+    try:
+        sink.emit(_event(0))
+        _wait_for(lambda: len(sink) == 0)  # Taken by the (blocked) flusher
+        sink.emit(_event(1), _event(2))
+
+        started = time.monotonic()
+        sink.emit(_event(3))
+        assert time.monotonic() - started >= 0.05
+        assert sink.stats.direct == 1
+        assert len(sink) == 2
+    finally:
+        gate.set()
+        sink.stop()
+    assert sorted(row["data"]["i"] for rows in inserts for row in rows) == [0, 1, 2, 3]
+
+
+# ==================== TRANSACTIONS ====================
+
+
+def _audit_rows(db, marker: str) -> list[str]:
+    return list(db.scalars(select(AuditLog.action).where(AuditLog.data["marker"].astext == marker)))
+
+
+def test_recorded_events_follow_the_transaction(client):
+    assert audit_sink.running  # Started by the lifespan
+    marker = uuid.uuid4().hex
+    with SessionLocal() as db:
+        record_audit(db, AuditEvent(action="TEST_ROLLED_BACK", data={"marker": marker}))
+        db.rollback()
+        record_audit(db, AuditEvent(action="TEST_COMMITTED", data={"marker": marker}))
+        assert _audit_rows(db, marker) == []  # Buffered, not in the transaction
+        db.commit()
+        record_audit(db, AuditEvent(action="TEST_CRITICAL", data={"marker": marker}), critical=True)
+        assert _audit_rows(db, marker) == ["TEST_CRITICAL"]
+        db.commit()
+
+    while audit_sink.flush():
+        pass
+    with SessionLocal() as db:
+        assert sorted(_audit_rows(db, marker)) == ["TEST_COMMITTED", "TEST_CRITICAL"]
+        db.query(AuditLog).filter(AuditLog.data["marker"].astext == marker).delete(
+            synchronize_session=False
+        )
+        db.commit()
@@ -0,0 +1,56 @@
+"""
+Monthly partitions of audit.audit_log: date-bounded listing and stats only
+read the matching partitions, maintenance keeps partitions ahead.
+"""
+
+from datetime import UTC, datetime
+
+from app.core.database import SessionLocal
+from app.models.audit import AuditLog
+from app.routers.v1.admin_audit import _audit_log_list_stmt
+from app.services.audit_retention import audit_retention_cutoff, maintain_audit_partitions
+from app.services.audit_stats import audit_stats_stmt
+from app.services.partitions import list_partitions, month_start
+from tests.conftest import _explain_relations
+
+
+def test_retention_cutoff_is_month_aligned():
+    now = datetime(2026, 3, 15, 12, tzinfo=UTC)
+    assert audit_retention_cutoff(24, now) == datetime(2024, 3, 1, tzinfo=UTC)
+    assert audit_retention_cutoff(0, now) is None
+
+
+def test_listing_prunes_partitions_outside_the_date_range(client):
+    start = month_start(datetime.now(UTC), 2)
+    stmt = _audit_log_list_stmt().where(
+        AuditLog.created_at >= start, AuditLog.created_at <= month_start(start, 1)
+    )
+    with SessionLocal() as db:
+        relations = _explain_relations(db, stmt)
+
+    scanned = {r for r in relations if r.startswith("audit_log")}
+    # <= the next month's first instant also reaches into that partition
+    assert scanned <= {f"audit_log_p{start:%Y%m}", f"audit_log_p{month_start(start, 1):%Y%m}"}
+    assert f"audit_log_p{start:%Y%m}" in scanned
+
+
+def test_stats_skip_partitions_before_the_period(client):
+    since = month_start(datetime.now(UTC), 1)
+    with SessionLocal() as db:
+        relations = _explain_relations(db, audit_stats_stmt(since))
+
+    scanned = {r for r in relations if r.startswith("audit_log")}
+    assert "audit_log_legacy" not in scanned
+    assert f"audit_log_p{datetime.now(UTC):%Y%m}" not in scanned
+
+
+def test_maintenance_keeps_partitions_ahead(client, tmp_path):
+    result = maintain_audit_partitions(months_ahead=3, retention_months=0, archive_dir=tmp_path)
+
+    assert result is not None
+    assert result.created == 0  # Startup already created them
+    assert result.archived == {}
+    with SessionLocal() as db:
+        names = {p.name for p in list_partitions(db, "audit.audit_log")}
+    now = datetime.now(UTC)
+    assert {f"audit_log_p{month_start(now, i):%Y%m}" for i in range(4)} <= names
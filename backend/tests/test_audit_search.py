@@ -0,0 +1,147 @@
+"""
+Audit log data search: key=value / containment filters and full-text search,
+both answered from the GIN indexes of migration 034.
+"""
+
+import uuid
+from datetime import UTC, datetime
+
+import pytest
+from sqlalchemy import text
+
+from app.core.database import SessionLocal
+from app.core.errors import ApiException
+from app.models.audit import AuditLog
+from app.routers.v1.admin_audit import (
+    _audit_log_list_stmt,
+    _data_search_clause,
+    _parse_data_filters,
+)
+from app.services.audit import AuditEvent, write_audit_events
+from app.services.partitions import month_start
+
+# ==================== FILTER PARSING ====================
+
+
+def test_data_filters_build_containment_documents():
+    documents = _parse_data_filters(
+        ["filters.action=USER_CREATED", "count=3", "active=true", "name=Ana Souza"],
+        '{"ip": "10.0.0.1"}',
+    )
+    assert documents == [
+        {"filters": {"action": "USER_CREATED"}},
+        {"count": 3},
+        {"active": True},
+        {"name": "Ana Souza"},
+        {"ip": "10.0.0.1"},
+    ]
+
+
+@pytest.mark.parametrize(
+    ("data", "data_contains"), [(["no-equals"], None), (["a..b=1"], None), ([], "[1, 2]")]
+)
+def test_malformed_data_filters_are_rejected(data, data_contains):
+    with pytest.raises(ApiException):
+        _parse_data_filters(data, data_contains)
+
+
+# ==================== ENDPOINT ====================
+
+
+@pytest.fixture
+def marked_events():
+    marker = uuid.uuid4().hex
+    with SessionLocal() as db:
+        write_audit_events(
+            db,
+            [
+                AuditEvent(
+                    action="TEST_SEARCH",
+                    data={"marker": marker, "filters": {"status": "ATIVO"}, "note": "matrícula"},
+                ),
+                AuditEvent(
+                    action="TEST_SEARCH",
+                    data={"marker": marker, "filters": {"status": "TRANCADO"}, "note": "boleto"},
+                ),
+            ],
+        )
+        db.commit()
+    yield marker
+    with SessionLocal() as db:
+        db.query(AuditLog).filter(AuditLog.data["marker"].astext == marker).delete(
+            synchronize_session=False
+        )
+        db.commit()
+
+
+def _notes(admin_client, **params) -> list[str]:
+    res = admin_client.get("/api/v1/admin/audit-logs", params=params)
+    assert res.status_code == 200, res.text
+    return sorted(item["data"]["note"] for item in res.json()["items"])
+
+
+def test_listing_filters_by_data_key_value(admin_client, marked_events):
+    marker = marked_events
+    assert _notes(admin_client, data=[f"marker={marker}"]) == ["boleto", "matrícula"]
+    assert _notes(admin_client, data=[f"marker={marker}", "filters.status=ATIVO"]) == ["matrícula"]
+    assert _notes(
+        admin_client, data=[f"marker={marker}"], data_contains='{"filters": {"status": "TRANCADO"}}'
+    ) == ["boleto"]
+
+
+def test_listing_full_text_search(admin_client, marked_events):
+    assert _notes(admin_client, data=[f"marker={marked_events}"], search="boleto") == ["boleto"]
+    assert _notes(admin_client, search=marked_events) == ["boleto", "matrícula"]
+
+
+def test_listing_rejects_malformed_data_filter(admin_client):
+    res = admin_client.get("/api/v1/admin/audit-logs", params={"data": "sem-igual"})
+    assert res.status_code == 422
+    assert res.json()["error"]["code"] == "VALIDATION_ERROR"
+
+
+# ==================== INDEX USE ====================
+
+
+def _explain_parent_indexes(db, stmt) -> set[str]:
+    """Partitioned (parent) indexes behind the index scans of a plan, seq scans disabled."""
+    compiled = stmt.compile(dialect=db.get_bind().dialect)
+    db.execute(text("SET LOCAL enable_seqscan = off"))
+    plan = (
+        db.connection()
+        .exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled.string}", compiled.params)
+        .scalar_one()
+    )
+    names: set[str] = set()
+    nodes = [plan[0]["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        if "Index Name" in node:
+            names.add(node["Index Name"])
+        nodes.extend(node.get("Plans", []))
+    parents = db.execute(
+        text("""
+            SELECT p.relname FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            JOIN pg_class p ON p.oid = i.inhparent
+            WHERE c.relname = ANY(:names)
+        """),
+        {"names": list(names)},
+    ).scalars()
+    db.rollback()
+    return set(parents)
+
+
+def test_data_filters_and_search_use_the_gin_indexes(client):
+    start = month_start(datetime.now(UTC))
+    stmt = _audit_log_list_stmt().where(
+        AuditLog.created_at >= start, AuditLog.created_at < month_start(start, 1)
+    )
+    with SessionLocal() as db:
+        contains = _explain_parent_indexes(
+            db, stmt.where(AuditLog.data.contains({"filters": {"status": "ATIVO"}}))
+        )
+        search = _explain_parent_indexes(db, stmt.where(_data_search_clause("boleto")))
+
+    assert "idx_audit_log_data_path" in contains
+    assert "idx_audit_log_data_tsv" in search
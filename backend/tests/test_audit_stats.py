@@ -0,0 +1,83 @@
+"""
+Audit summary rollup: whole-day periods, closed hours folded once, and the
+rollup plus the raw tail matching the raw aggregates.
+"""
+
+import uuid
+from datetime import UTC, datetime
+
+from sqlalchemy import func, select
+
+from app.core.database import SessionLocal
+from app.models.audit import AuditLog
+from app.models.user import User
+from app.services.audit import AuditEvent, write_audit_events
+from app.services.audit_stats import audit_stats_since, audit_stats_stmt, roll_up_audit_stats
+from tests.conftest import _explain_relations
+
+
+def test_period_is_whole_utc_days():
+    now = datetime(2026, 3, 15, 1, 30, tzinfo=UTC)
+    assert audit_stats_since(1, now) == datetime(2026, 3, 15, tzinfo=UTC)
+    assert audit_stats_since(30, now) == datetime(2026, 2, 14, tzinfo=UTC)
+
+
+def test_rollup_folds_each_closed_hour_once(client):
+    with SessionLocal() as db:
+        roll_up_audit_stats(db)
+        assert roll_up_audit_stats(db) == 0
+
+
+def test_summary_reads_the_rollup(client):
+    with SessionLocal() as db:
+        relations = _explain_relations(db, audit_stats_stmt(audit_stats_since(30)))
+    assert {"audit_stats_hourly", "audit_stats_daily_actors"} <= relations
+
+
+def test_summary_matches_raw_aggregates(client):
+    action = f"TEST_STATS_{uuid.uuid4().hex[:8].upper()}"
+    with SessionLocal() as db:
+        demo_id = db.scalar(select(User.id).where(User.email == "demo@unifecaf.edu.br"))
+        write_audit_events(db, [AuditEvent(action=action, actor_user_id=demo_id) for _ in range(3)])
+        db.commit()
+        roll_up_audit_stats(db)
+
+        since = audit_stats_since(7)
+        summary = db.execute(audit_stats_stmt(since)).one()
+        in_period = AuditLog.created_at >= since
+        raw_total, raw_actions, raw_actors, raw_failures = db.execute(
+            select(
+                func.count(),
+                func.count(func.distinct(AuditLog.action)),
+                func.count(func.distinct(AuditLog.actor_user_id)),
+                func.count().filter(AuditLog.action == "USER_LOGIN_FAILED"),
+            ).where(in_period)
+        ).one()
+        raw_top = db.execute(
+            select(AuditLog.action, func.count().label("count"))
+            .where(in_period)
+            .group_by(AuditLog.action)
+            .order_by(func.count().desc(), AuditLog.action)
+            .limit(10)
+        ).all()
+
+        db.query(AuditLog).filter(AuditLog.action == action).delete(synchronize_session=False)
+        db.commit()
+
+    assert summary.total_logs == raw_total
+    assert summary.unique_actions == raw_actions
+    assert summary.unique_actors >= raw_actors  # Deleted actors still count in the rollup
+    assert summary.login_failures == raw_failures
+    assert summary.top_actions == [{"action": a, "count": n} for a, n in raw_top]
+
+
+def test_summary_endpoint(admin_client):
+    res = admin_client.get("/api/v1/admin/audit-logs/stats/summary", params={"period_days": 7})
+    assert res.status_code == 200
+    body = res.json()
+    assert body["period_days"] == 7
+    assert body["total_logs"] >= body["login_failures"]
+    assert len(body["top_actions"]) <= 10
+
+    res = admin_client.get("/api/v1/admin/audit-logs/stats/summary", params={"period_days": 91})
+    assert res.status_code == 422
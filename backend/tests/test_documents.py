@@ -0,0 +1,555 @@
+"""
+Student documents: the PDF writer, content-addressed storage, the generation
+queue and worker, bulk generation, downloads (Range, ETag) and public
+verification codes, plus the admin listing and stats.
+
+Rendering throughput is measured by benchmarks/bench_document_cards.py.
+"""
+
+import uuid
+import zlib
+from datetime import date
+
+import pytest
+from starlette import status
+
+from app.core.database import SessionLocal
+from app.core.deps import get_document_storage
+from app.main import app
+from app.models.academics import Student
+from app.models.documents import (
+    DocumentBatch,
+    DocumentJob,
+    DocumentJobStatus,
+    DocumentType,
+    StudentDocument,
+)
+from app.models.user import User
+from app.routers.v1 import public as public_router
+from app.services.document_rendering import StudentRecord, TermRecord, render_student_card
+from app.services.document_verification import (
+    ClientRateLimiter,
+    VerificationCache,
+    format_verification_code,
+    normalize_verification_code,
+)
+from app.services.documents import DocumentWorker
+from app.services.pdf import ID_CARD, PdfBuilder
+from app.services.storage import LocalDocumentStorage, content_key
+from tests.conftest import _login, _recorded_statements
+
+# ==================== PDF WRITER ====================
+
+
+def _page_count(pdf: bytes) -> int:
+    return pdf.count(b"/Type /Page ")
+
+
+def test_pdf_is_well_formed_and_deterministic():
+    def build() -> bytes:
+        pdf = PdfBuilder("Declaração")
+        pdf.line("Declaração de Matrícula", size=16, bold=True)
+        pdf.paragraph("Declaramos (para os devidos fins) que o aluno está matriculado. " * 10)
+        return pdf.render()
+
+    first = build()
+    assert first.startswith(b"%PDF-1.4")
+    assert first.rstrip().endswith(b"%%EOF")
+    assert first == build()
+
+    # startxref points at the xref table
+    offset = int(first.rsplit(b"startxref\n", 1)[1].split(b"\n", 1)[0])
+    assert first[offset:].startswith(b"xref")
+
+    stream = first.split(b"stream\n", 1)[1].split(b"\nendstream", 1)[0]
+    content = zlib.decompress(stream)
+    assert "Declaração".encode("cp1252") in content
+    assert b"\\(para os devidos fins\\)" in content
+
+
+def test_pdf_paginates_and_sizes_pages():
+    pdf = PdfBuilder("Histórico")
+    for i in range(120):
+        pdf.row([f"MAT{i:03d}", "Disciplina", "4"], [0.0, 0.2, 0.9])
+    assert _page_count(pdf.render()) > 1
+
+    card = PdfBuilder("Carteirinha", page_size=ID_CARD, margin=12)
+    card.line("UniFECAF")
+    rendered = card.render()
+    assert _page_count(rendered) == 1
+    assert b"/MediaBox [0 0 242.65 153.07]" in rendered
+
+
+def test_student_cards_are_stored_as_distinct_files(tmp_path):
+    storage = LocalDocumentStorage(tmp_path)
+    term = TermRecord(code="2026.2", end_date=date(2026, 12, 18))
+    students = [
+        StudentRecord(uuid.uuid4(), f"Aluno {i}", f"2026{i:05d}", "ACTIVE", "Engenharia")
+        for i in range(5)
+    ]
+
+    for student in students:
+        storage.put(render_student_card(student, term, date(2026, 10, 19)))
+
+    assert len([p for p in tmp_path.rglob("*") if p.is_file()]) == len(students)
+
+
+# ==================== STORAGE ====================
+
+
+def test_local_storage_deduplicates_identical_content(tmp_path):
+    storage = LocalDocumentStorage(tmp_path)
+
+    first = storage.put(b"%PDF-1.4 same")
+    second = storage.put(b"%PDF-1.4 same")
+    other = storage.put(b"%PDF-1.4 other")
+
+    assert first.key == second.key == content_key(b"%PDF-1.4 same")
+    assert (first.created, second.created, other.created) == (True, False, True)
+    assert storage.local_path(first.key) == tmp_path / first.key[:2] / first.key
+    assert storage.local_path(first.key).read_bytes() == b"%PDF-1.4 same"
+    assert len([p for p in tmp_path.rglob("*") if p.is_file()]) == 2
+
+    assert storage.delete(other.key)
+    assert storage.local_path(other.key) is None
+    assert not storage.delete(other.key)
+
+
+def test_local_storage_rejects_non_hash_keys(tmp_path):
+    storage = LocalDocumentStorage(tmp_path)
+
+    with pytest.raises(ValueError):
+        storage.local_path("../../etc/passwd")
+
+
+# ==================== QUEUE + WORKER ====================
+
+
+def _worker(tmp_path, **kwargs) -> DocumentWorker:
+    return DocumentWorker(LocalDocumentStorage(tmp_path), batch_size=50, **kwargs)
+
+
+@pytest.fixture()
+def storage_dir(tmp_path):
+    """Downloads served from the directory the test worker writes to."""
+    app.dependency_overrides[get_document_storage] = lambda: LocalDocumentStorage(tmp_path)
+    yield tmp_path
+    app.dependency_overrides.pop(get_document_storage, None)
+
+
+def _drain(worker: DocumentWorker) -> None:
+    while worker.process_once().claimed:
+        pass
+
+
+def _demo_document(db, doc_type: DocumentType) -> StudentDocument:
+    return (
+        db.query(StudentDocument)
+        .join(User, User.id == StudentDocument.student_id)
+        .filter(User.email == "demo@unifecaf.edu.br", StudentDocument.doc_type == doc_type)
+        .one()
+    )
+
+
+def _clear_file(db, doc_type: DocumentType) -> None:
+    """Forget the demo document's file, as if it had never been generated."""
+    doc = _demo_document(db, doc_type)
+    doc.file_url = doc.content_hash = doc.grade_version = None
+    db.commit()
+
+
+def test_requested_documents_are_rendered_by_the_worker(authenticated_client, storage_dir):
+    with SessionLocal() as db:
+        for doc_type in DocumentType:
+            _clear_file(db, doc_type)
+
+    for doc_type in DocumentType:
+        res = authenticated_client.post(f"/api/v1/me/documents/{doc_type.value}/request")
+        assert res.status_code == status.HTTP_202_ACCEPTED
+        assert res.json()["status"] == "GENERATING"
+
+    _drain(_worker(storage_dir))
+
+    storage = LocalDocumentStorage(storage_dir)
+    with SessionLocal() as db:
+        for doc_type in DocumentType:
+            doc = _demo_document(db, doc_type)
+            assert doc.status.value == "AVAILABLE"
+            assert doc.file_type == "application/pdf"
+            content = storage.local_path(doc.content_hash).read_bytes()
+            assert content.startswith(b"%PDF")
+            assert doc.file_size == len(content)
+            assert doc.content_hash == content_key(content)
+
+    dl = authenticated_client.get("/api/v1/me/documents/TRANSCRIPT/download")
+    assert dl.status_code == status.HTTP_200_OK
+    assert dl.headers["content-type"] == "application/pdf"
+    assert dl.content.startswith(b"%PDF")
+
+
+def test_identical_renders_share_one_file(authenticated_client, storage_dir):
+    for _ in range(2):
+        authenticated_client.post("/api/v1/me/documents/DECLARATION/request")
+        _drain(_worker(storage_dir))
+
+    # Same data on the same day renders the same bytes
+    assert len([p for p in storage_dir.rglob("*") if p.is_file()]) == 1
+
+
+def test_download_supports_range_and_etag(authenticated_client, storage_dir):
+    authenticated_client.post("/api/v1/me/documents/DECLARATION/request")
+    _drain(_worker(storage_dir))
+
+    full = authenticated_client.get("/api/v1/me/documents/DECLARATION/download")
+    etag = full.headers["etag"]
+    assert full.headers["accept-ranges"] == "bytes"
+
+    part = authenticated_client.get(
+        "/api/v1/me/documents/DECLARATION/download", headers={"Range": "bytes=0-7"}
+    )
+    assert part.status_code == status.HTTP_206_PARTIAL_CONTENT
+    assert part.content == full.content[:8]
+    assert part.headers["content-range"] == f"bytes 0-7/{len(full.content)}"
+
+    cached = authenticated_client.get(
+        "/api/v1/me/documents/DECLARATION/download", headers={"If-None-Match": etag}
+    )
+    assert cached.status_code == status.HTTP_304_NOT_MODIFIED
+    assert cached.headers["etag"] == etag
+    assert not cached.content
+
+
+def test_download_of_missing_file_is_not_available(authenticated_client, storage_dir):
+    with SessionLocal() as db:
+        _clear_file(db, DocumentType.DECLARATION)
+    authenticated_client.post("/api/v1/me/documents/DECLARATION/request")
+    res = authenticated_client.get("/api/v1/me/documents/DECLARATION/download")
+
+    assert res.status_code == status.HTTP_404_NOT_FOUND
+    assert res.json()["error"]["code"] == "DOCUMENT_NOT_AVAILABLE"
+    # Nor is a download link listed for it
+    listed = authenticated_client.get("/api/v1/me/documents").json()
+    assert {d["doc_type"]: d["file_url"] for d in listed}["DECLARATION"] is None
+    _drain(_worker(storage_dir))
+
+
+def test_repeated_requests_share_one_job(authenticated_client, tmp_path):
+    for _ in range(3):
+        authenticated_client.post("/api/v1/me/documents/DECLARATION/request")
+
+    with SessionLocal() as db:
+        doc = _demo_document(db, DocumentType.DECLARATION)
+        active = (
+            db.query(DocumentJob)
+            .filter(
+                DocumentJob.document_id == doc.id,
+                DocumentJob.status.in_([DocumentJobStatus.PENDING, DocumentJobStatus.RUNNING]),
+            )
+            .count()
+        )
+    assert active == 1
+    _drain(_worker(tmp_path))
+
+
+def _broken_worker(storage_dir, target: uuid.UUID) -> DocumentWorker:
+    """A worker whose renders of `target` always fail, giving up at once."""
+
+    class BrokenWorker(DocumentWorker):
+        def _generate(self, db, task):
+            if task.document_id == target:
+                raise RuntimeError("render failed")
+            return super()._generate(db, task)
+
+    return BrokenWorker(LocalDocumentStorage(storage_dir), batch_size=50, max_attempts=1)
+
+
+def test_failing_document_ends_in_error(authenticated_client, tmp_path):
+    with SessionLocal() as db:
+        _clear_file(db, DocumentType.STUDENT_CARD)
+        target = _demo_document(db, DocumentType.STUDENT_CARD).id
+    authenticated_client.post("/api/v1/me/documents/STUDENT_CARD/request")
+
+    _drain(_broken_worker(tmp_path, target))
+
+    with SessionLocal() as db:
+        assert _demo_document(db, DocumentType.STUDENT_CARD).status.value == "ERROR"
+        job = (
+            db.query(DocumentJob)
+            .filter(DocumentJob.document_id == target)
+            .order_by(DocumentJob.created_at.desc())
+            .first()
+        )
+        assert job.status == DocumentJobStatus.FAILED
+        assert "render failed" in job.last_error
+
+    # A new request queues it again
+    res = authenticated_client.post("/api/v1/me/documents/STUDENT_CARD/request")
+    assert res.json()["status"] == "GENERATING"
+    _drain(_worker(tmp_path))
+
+
+def test_regeneration_keeps_serving_the_current_file(authenticated_client, storage_dir):
+    url = "/api/v1/me/documents/DECLARATION"
+    authenticated_client.post(f"{url}/request")
+    _drain(_worker(storage_dir))
+    etag = authenticated_client.get(f"{url}/download").headers["etag"]
+    with SessionLocal() as db:
+        target = _demo_document(db, DocumentType.DECLARATION).id
+
+    res = authenticated_client.post(f"{url}/request")
+    assert res.status_code == status.HTTP_202_ACCEPTED
+    assert res.json()["status"] == "AVAILABLE"
+    assert authenticated_client.get(f"{url}/download").headers["etag"] == etag
+
+    # Giving up on the new render leaves the previous file in place
+    _drain(_broken_worker(storage_dir, target))
+    with SessionLocal() as db:
+        assert _demo_document(db, DocumentType.DECLARATION).status.value == "AVAILABLE"
+    dl = authenticated_client.get(f"{url}/download")
+    assert dl.status_code == status.HTTP_200_OK
+    assert dl.headers["etag"] == etag
+
+
+# ==================== BULK GENERATION ====================
+
+
+def _demo_student(db) -> Student:
+    return (
+        db.query(Student)
+        .join(User, User.id == Student.user_id)
+        .filter(User.email == "demo@unifecaf.edu.br")
+        .one()
+    )
+
+
+def test_batch_generates_cards_for_the_course(admin_client, tmp_path):
+    with SessionLocal() as db:
+        demo = _demo_student(db)
+        course_id, demo_id = demo.course_id, demo.user_id
+
+    res = admin_client.post(
+        "/api/v1/admin/student-documents/batches",
+        json={"doc_type": "STUDENT_CARD", "course_id": str(course_id)},
+    )
+    assert res.status_code == status.HTTP_202_ACCEPTED
+    batch = res.json()
+    assert batch["status"] == "PENDING"
+    assert batch["total_students"] >= 1
+    assert batch["done_chunks"] == 0
+
+    _drain(_worker(tmp_path))
+
+    res = admin_client.get(f"/api/v1/admin/student-documents/batches/{batch['id']}")
+    done = res.json()
+    assert done["status"] == "DONE"
+    assert done["done_chunks"] == done["total_chunks"]
+    assert done["generated"] == done["total_students"]
+    assert done["progress"] == 100.0
+
+    with SessionLocal() as db:
+        card = (
+            db.query(StudentDocument)
+            .filter(
+                StudentDocument.student_id == demo_id,
+                StudentDocument.doc_type == DocumentType.STUDENT_CARD,
+            )
+            .one()
+        )
+        assert card.status.value == "AVAILABLE"
+        assert LocalDocumentStorage(tmp_path).local_path(card.content_hash) is not None
+
+    # Nothing failed: resuming requeues nothing
+    res = admin_client.post(f"/api/v1/admin/student-documents/batches/{batch['id']}/resume")
+    assert res.json()["done_chunks"] == done["total_chunks"]
+
+    with SessionLocal() as db:
+        db.query(DocumentBatch).filter(DocumentBatch.id == batch["id"]).delete()
+        db.commit()
+
+
+def test_batch_validation(admin_client):
+    res = admin_client.post(
+        "/api/v1/admin/student-documents/batches", json={"doc_type": "TRANSCRIPT"}
+    )
+    assert res.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    assert res.json()["error"]["code"] == "VALIDATION_ERROR"
+
+    res = admin_client.post(
+        "/api/v1/admin/student-documents/batches", json={"doc_type": "STUDENT_CARD"}
+    )
+    assert res.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    res = admin_client.post(
+        "/api/v1/admin/student-documents/batches",
+        json={"doc_type": "DECLARATION", "term_id": str(uuid.uuid4())},
+    )
+    assert res.status_code == status.HTTP_404_NOT_FOUND
+    assert res.json()["error"]["code"] == "TERM_NOT_FOUND"
+
+
+# ==================== PUBLIC VERIFICATION ====================
+
+
+def test_verification_codes_are_normalized():
+    assert normalize_verification_code("7k2m-9qxa-4tbc") == "7K2M9QXA4TBC"
+    assert normalize_verification_code(" 7K2M 9QXA 4TBO ") == "7K2M9QXA4TB0"  # O read as 0
+    assert normalize_verification_code("7K2M-9QXA-4TBU") is None  # U is not in the alphabet
+    assert normalize_verification_code("7K2M-9QXA") is None
+    assert format_verification_code("7K2M9QXA4TBC") == "7K2M-9QXA-4TBC"
+
+
+def test_verification_cache_expires_and_remembers_misses():
+    now = [0.0]
+    cache = VerificationCache(2, ttl_seconds=60, negative_ttl_seconds=10, clock=lambda: now[0])
+    cache.put("A" * 12, b"{}")
+    cache.put("B" * 12, None)
+    assert cache.get("A" * 12) == (True, b"{}")
+    assert cache.get("B" * 12) == (True, None)
+    assert cache.get("C" * 12) == (False, None)
+
+    now[0] = 30
+    assert cache.get("B" * 12) == (False, None)  # Misses expire sooner
+    assert cache.get("A" * 12) == (True, b"{}")
+
+    cache.put("C" * 12, b"{}")
+    cache.put("D" * 12, b"{}")
+    assert len(cache) == 2
+    assert cache.get("A" * 12) == (False, None)
+
+    cache.discard("C" * 12)
+    assert cache.get("C" * 12) == (False, None)
+
+
+def test_client_rate_limiter_refills_per_client():
+    now = [0.0]
+    limiter = ClientRateLimiter(1.0, burst=2, clock=lambda: now[0])
+    assert limiter.acquire("10.0.0.1") == 0
+    assert limiter.acquire("10.0.0.1") == 0
+    assert limiter.acquire("10.0.0.1") == pytest.approx(1.0)
+    assert limiter.acquire("10.0.0.2") == 0
+
+    now[0] = 1.0
+    assert limiter.acquire("10.0.0.1") == 0
+
+
+@pytest.fixture()
+def fresh_verification(monkeypatch):
+    """Empty verification cache and an unlimited rate limiter."""
+    cache = VerificationCache(100, ttl_seconds=300, negative_ttl_seconds=60)
+    monkeypatch.setattr(public_router, "verification_cache", cache)
+    monkeypatch.setattr(public_router, "verification_limiter", ClientRateLimiter(0))
+    return cache
+
+
+def test_generated_document_is_publicly_verifiable(
+    authenticated_client, storage_dir, fresh_verification
+):
+    authenticated_client.post("/api/v1/me/documents/DECLARATION/request")
+    _drain(_worker(storage_dir))
+    with SessionLocal() as db:
+        doc = _demo_document(db, DocumentType.DECLARATION)
+        code, content_hash = doc.verification_code, doc.content_hash
+
+    pdf = LocalDocumentStorage(storage_dir).local_path(content_hash).read_bytes()
+    stream = pdf.split(b"stream\n", 1)[1].split(b"\nendstream", 1)[0]
+    assert format_verification_code(code).encode() in zlib.decompress(stream)
+
+    authenticated_client.post("/api/v1/auth/logout")
+    res = authenticated_client.get(f"/api/v1/public/documents/verify/{code.lower()}")
+    assert res.status_code == status.HTTP_200_OK
+    body = res.json()
+    assert body["doc_type"] == "DECLARATION"
+    assert body["verification_code"] == format_verification_code(code)
+    assert body["content_hash"] == content_hash
+    assert body["ra"].startswith("*")
+    assert res.headers["cache-control"].startswith("public")
+
+    # Served from the cache afterwards, unknown codes included
+    assert authenticated_client.get(f"/api/v1/public/documents/verify/{code}").json() == body
+    unknown = "0" * 12
+    for path in (unknown, unknown, "not-a-code"):
+        res = authenticated_client.get(f"/api/v1/public/documents/verify/{path}")
+        assert res.status_code == status.HTTP_404_NOT_FOUND
+        assert res.json()["error"]["code"] == "DOCUMENT_NOT_VERIFIED"
+    assert fresh_verification.get(unknown) == (True, None)
+
+
+def test_admin_status_change_evicts_cached_verification(client, storage_dir, fresh_verification):
+    _login(client, email="demo@unifecaf.edu.br", password="demo123")
+    client.post("/api/v1/me/documents/DECLARATION/request")
+    _drain(_worker(storage_dir))
+    with SessionLocal() as db:
+        doc = _demo_document(db, DocumentType.DECLARATION)
+        doc_id, code = doc.id, doc.verification_code
+
+    url = f"/api/v1/public/documents/verify/{code}"
+    assert client.get(url).status_code == status.HTTP_200_OK
+    assert fresh_verification.get(code)[0]
+
+    client.post("/api/v1/auth/logout")
+    _login(client, email="admin@unifecaf.edu.br", password="admin123")
+    try:
+        res = client.patch(f"/api/v1/admin/student-documents/{doc_id}", json={"status": "ERROR"})
+        assert res.status_code == status.HTTP_200_OK
+        assert client.get(url).status_code == status.HTTP_404_NOT_FOUND
+    finally:
+        client.patch(f"/api/v1/admin/student-documents/{doc_id}", json={"status": "AVAILABLE"})
+        client.post("/api/v1/auth/logout")
+
+
+def test_verification_is_rate_limited_per_client(client, fresh_verification, monkeypatch):
+    monkeypatch.setattr(public_router, "verification_limiter", ClientRateLimiter(0.01, burst=3))
+    codes = [
+        client.get("/api/v1/public/documents/verify/0000-0000-0000").status_code for _ in range(4)
+    ]
+    assert codes == [404, 404, 404, 429]
+    res = client.get("/api/v1/public/documents/verify/0000-0000-0000")
+    assert res.json()["error"]["code"] == "RATE_LIMITED"
+    assert res.json()["error"]["details"]["retry_after_seconds"] > 0
+
+
+# ==================== ADMIN LISTING + STATS ====================
+
+
+def _document_statements(statements: list[str]) -> list[str]:
+    return [s for s in statements if "student_documents" in s]
+
+
+def test_admin_document_listing_is_one_joined_query(admin_client):
+    url = "/api/v1/admin/student-documents"
+    counts = []
+    for limit in (1, 50):
+        with _recorded_statements() as statements:
+            res = admin_client.get(url, params={"limit": limit})
+        assert res.status_code == status.HTTP_200_OK
+        counts.append(len(_document_statements(statements)))
+    # Total + page, whatever the page size
+    assert counts == [2, 2]
+
+    items = res.json()["items"]
+    demo = next(i for i in items if i["student_ra"] and i["student_name"])
+    with _recorded_statements() as statements:
+        found = admin_client.get(url, params={"search": demo["student_name"][:6].upper()})
+    assert demo["id"] in {i["id"] for i in found.json()["items"]}
+    assert len(_document_statements(statements)) == 2
+
+    detail = admin_client.get(f"{url}/{demo['id']}").json()
+    assert detail["student_name"] == demo["student_name"]
+    assert detail["doc_type"] in {t.value for t in DocumentType}
+
+    missing = admin_client.get(f"{url}/{uuid.uuid4()}")
+    assert missing.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_admin_document_stats_are_one_query(admin_client):
+    with _recorded_statements() as statements:
+        res = admin_client.get("/api/v1/admin/student-documents/stats")
+    assert res.status_code == status.HTTP_200_OK
+    assert len(_document_statements(statements)) == 1
+
+    stats = res.json()
+    assert sum(stats["by_status"].values()) == stats["total_documents"]
+    assert sum(stats["by_type"].values()) == stats["total_documents"]
+    assert stats["generating_count"] == stats["by_status"].get("GENERATING", 0)
+    assert stats["error_count"] == stats["by_status"].get("ERROR", 0)
+    assert 0 <= stats["recent_requests"] <= stats["total_documents"]
@@ -0,0 +1,84 @@
+"""
+Fee calculator tests: the vectorized batch must match the Decimal rule exactly.
+"""
+
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+from app.models.finance import InvoiceStatus
+from app.services.fees import (
+    InvoiceArrays,
+    calculate_amount_due,
+    calculate_amounts_due,
+    calculate_fees,
+    micros_to_decimal,
+)
+
+AS_OF = date(2026, 3, 15)
+
+
+def _invoice(amount, fine_rate, interest_rate, due_date, status=InvoiceStatus.PENDING):
+    return SimpleNamespace(
+        amount=Decimal(amount),
+        fine_rate=Decimal(fine_rate),
+        interest_rate=Decimal(interest_rate),
+        due_date=due_date,
+        status=status,
+    )
+
+
+def _expected(inv, as_of=AS_OF):
+    return calculate_amount_due(
+        inv.amount, inv.fine_rate, inv.interest_rate, inv.due_date, inv.status, as_of
+    )
+
+
+def test_batch_matches_decimal_rule_on_edge_cases():
+    invoices = [
+        _invoice("850.00", "2.00", "1.00", AS_OF),  # due today
+        _invoice("850.00", "2.00", "1.00", AS_OF - timedelta(days=1)),
+        _invoice("850.00", "2.00", "1.00", AS_OF - timedelta(days=29)),
+        _invoice("850.00", "2.00", "1.00", AS_OF - timedelta(days=60)),
+        _invoice("0.01", "2.55", "1.33", AS_OF - timedelta(days=400)),
+        _invoice("999.99", "0.00", "0.00", AS_OF - timedelta(days=90)),
+        _invoice("500.00", "2.00", "1.00", AS_OF - timedelta(days=90), InvoiceStatus.PAID),
+        _invoice("500.00", "2.00", "1.00", AS_OF - timedelta(days=90), InvoiceStatus.CANCELED),
+        _invoice("500.00", "2.00", "1.00", AS_OF - timedelta(days=90), InvoiceStatus.OVERDUE),
+        _invoice("500.00", "2.00", "1.00", AS_OF + timedelta(days=10)),
+    ]
+
+    assert calculate_amounts_due(invoices, AS_OF) == [_expected(inv) for inv in invoices]
+
+
+def test_batch_matches_decimal_rule_on_random_invoices():
+    rng = random.Random(27)
+    statuses = list(InvoiceStatus)
+    invoices = [
+        _invoice(
+            f"{rng.randint(1, 500_000) / 100:.2f}",
+            f"{rng.randint(0, 1_000) / 100:.2f}",
+            f"{rng.randint(0, 500) / 100:.2f}",
+            AS_OF - timedelta(days=rng.randint(-120, 1_500)),
+            rng.choice(statuses),
+        )
+        for _ in range(5_000)
+    ]
+
+    assert calculate_amounts_due(invoices, AS_OF) == [_expected(inv) for inv in invoices]
+
+
+def test_batch_falls_back_to_exact_ints_on_int64_overflow():
+    inv = _invoice("9999999999.99", "999.99", "999.99", date(1970, 1, 1))
+
+    assert calculate_amounts_due([inv] * 3, AS_OF) == [_expected(inv)] * 3
+
+
+def test_fee_components_sum_to_amount_due():
+    invoices = [_invoice("1000.00", "2.00", "1.00", AS_OF - timedelta(days=65))]
+    fees = calculate_fees(InvoiceArrays.from_invoices(invoices), AS_OF)
+
+    assert micros_to_decimal(fees.fine.sum()) == Decimal("20.00")
+    assert micros_to_decimal(fees.interest.sum()) == Decimal("20.00")  # 2 months
+    assert int(fees.days_overdue[0]) == 65
@@ -2,6 +2,8 @@
 /me endpoints smoke tests.
 """
 
+from uuid import uuid4
+
 from starlette import status
 
 
@@ -71,14 +73,34 @@ def test_me_notifications_and_actions(authenticated_client):
     assert r3.status_code == status.HTTP_204_NO_CONTENT
 
 
+def test_me_notifications_bulk_actions(authenticated_client):
+    ids = authenticated_client.post(
+        "/api/v1/me/notifications/read", json={"ids": [str(uuid4())]}
+    )
+    assert ids.status_code == status.HTTP_200_OK
+    assert ids.json() == {"affected": 0}  # Not in the student's inbox
+
+    read_all = authenticated_client.post("/api/v1/me/notifications/read-all")
+    assert read_all.status_code == status.HTTP_200_OK
+    count = authenticated_client.get("/api/v1/me/notifications/unread-count")
+    assert count.json()["unread_count"] == 0
+    again = authenticated_client.post("/api/v1/me/notifications/read-all")
+    assert again.json() == {"affected": 0}
+
+    archived = authenticated_client.post(
+        "/api/v1/me/notifications/archive", json={"before": "2000-01-01T00:00:00Z"}
+    )
+    assert archived.status_code == status.HTTP_200_OK
+    assert archived.json() == {"affected": 0}
+
+
 def test_me_documents(authenticated_client):
     req = authenticated_client.post("/api/v1/me/documents/DECLARATION/request")
-    assert req.status_code == status.HTTP_200_OK
+    assert req.status_code == status.HTTP_202_ACCEPTED
     data = req.json()
     assert data["doc_type"] == "DECLARATION"
-    assert data["status"] == "AVAILABLE"
-    assert data["file_url"]
+    assert data["status"] == "GENERATING"
 
-    dl = authenticated_client.get("/api/v1/me/documents/DECLARATION/download")
-    assert dl.status_code == status.HTTP_200_OK
-    assert dl.json()["file_url"]
+    docs = authenticated_client.get("/api/v1/me/documents").json()
+    statuses = {d["doc_type"]: d["status"] for d in docs}
+    assert statuses["DECLARATION"] == "GENERATING"
@@ -0,0 +1,140 @@
+"""
+comm.user_notifications monthly partitions: bound parsing, the inbox window,
+partition pruning (EXPLAIN), delivery dedup without a unique constraint and
+the maintenance job.
+"""
+
+import gzip
+import json
+import uuid
+from datetime import UTC, datetime
+
+from sqlalchemy import func, select
+
+from app.core.database import SessionLocal
+from app.models.notifications import UserNotification
+from app.models.user import User
+from app.routers.v1.admin_comm import _user_notification_list_stmt
+from app.services.notification_retention import maintain_notification_partitions
+from app.services.notifications import inbox_window_start, user_inbox_stmt
+from app.services.partitions import Partition, export_ndjson, list_partitions, month_start
+from tests.conftest import _explain_relations
+
+# ==================== PURE ====================
+
+
+def test_partition_bounds_are_parsed():
+    monthly = Partition.from_bound(
+        "comm",
+        "user_notifications_p202611",
+        "FOR VALUES FROM ('2026-11-01 00:00:00+00') TO ('2026-12-01 00:00:00+00')",
+    )
+    legacy = Partition.from_bound(
+        "comm",
+        "user_notifications_legacy",
+        "FOR VALUES FROM (MINVALUE) TO ('2026-11-01 00:00:00+00')",
+    )
+
+    assert monthly.lower == datetime(2026, 11, 1, tzinfo=UTC)
+    assert monthly.upper == datetime(2026, 12, 1, tzinfo=UTC)
+    assert legacy.lower is None
+    assert legacy.expired(datetime(2026, 11, 1, tzinfo=UTC))
+    assert not monthly.expired(datetime(2026, 11, 30, tzinfo=UTC))
+
+
+def test_inbox_window_is_month_aligned():
+    now = datetime(2026, 1, 15, 12, tzinfo=UTC)
+
+    assert inbox_window_start(12, now) == datetime(2025, 1, 1, tzinfo=UTC)
+    assert inbox_window_start(1, now) == datetime(2025, 12, 1, tzinfo=UTC)
+    assert inbox_window_start(0, now) is None
+    assert month_start(datetime(2026, 12, 31, 23, tzinfo=UTC), 1) == datetime(2027, 1, 1, tzinfo=UTC)
+
+
+# ==================== DATABASE ====================
+
+
+def _demo_user_id(db) -> uuid.UUID:
+    return db.query(User.id).filter(User.email == "demo@unifecaf.edu.br").scalar()
+
+
+def test_admin_listing_prunes_partitions_outside_the_window(client):
+    start = month_start(datetime.now(UTC), 2)
+    stmt = _user_notification_list_stmt().where(
+        UserNotification.delivered_at >= start,
+        UserNotification.delivered_at < month_start(start, 1),
+    )
+    with SessionLocal() as db:
+        relations = _explain_relations(db, stmt)
+
+    scanned = {r for r in relations if r.startswith("user_notifications")}
+    assert scanned == {f"user_notifications_p{start:%Y%m}"}
+
+
+def test_inbox_prunes_partitions_before_since(client):
+    since = month_start(datetime.now(UTC), 1)
+    with SessionLocal() as db:
+        relations = _explain_relations(db, user_inbox_stmt(_demo_user_id(db), [], since=since))
+
+    scanned = {r for r in relations if r.startswith("user_notifications")}
+    assert "user_notifications_legacy" not in scanned
+    assert f"user_notifications_p{datetime.now(UTC):%Y%m}" not in scanned
+
+
+def test_replayed_delivery_creates_one_row_per_user(admin_client):
+    res = admin_client.post(
+        "/api/v1/admin/notifications",
+        json={"type": "ADMIN", "channel": "IN_APP", "title": f"Dedup {uuid.uuid4().hex[:8]}",
+              "body": "Entrega repetida"},
+    )
+    notification_id = res.json()["id"]
+    with SessionLocal() as db:
+        demo_id = str(_demo_user_id(db))
+
+    delivered = []
+    for _ in range(2):
+        res = admin_client.post(
+            f"/api/v1/admin/notifications/{notification_id}/deliver", json={"user_ids": [demo_id]}
+        )
+        assert res.status_code == 200
+        delivered.append(res.json()["delivered"])
+    assert delivered == [1, 0]
+    with SessionLocal() as db:
+        rows = db.execute(
+            select(func.count()).where(UserNotification.notification_id == notification_id)
+        ).scalar_one()
+    assert rows == 1
+
+    admin_client.delete(f"/api/v1/admin/notifications/{notification_id}")
+
+
+def test_maintenance_keeps_partitions_ahead(client, tmp_path):
+    result = maintain_notification_partitions(
+        months_ahead=3, retention_months=0, archive_dir=tmp_path
+    )
+
+    assert result is not None
+    assert result.created == 0  # Startup already created them
+    assert result.archived == {}
+    with SessionLocal() as db:
+        names = {p.name for p in list_partitions(db, "comm.user_notifications")}
+    now = datetime.now(UTC)
+    assert {f"user_notifications_p{month_start(now, i):%Y%m}" for i in range(4)} <= names
+
+
+def test_export_ndjson_round_trips_awkward_text(tmp_path):
+    path = tmp_path / "rows.ndjson.gz"
+    with SessionLocal() as db:
+        rows = export_ndjson(
+            db,
+            "SELECT 1 AS n, E'linha\\ncom \\\\ \"aspas\" e ;' AS body UNION ALL SELECT 2, NULL",
+            path,
+        )
+
+    with gzip.open(path, "rt") as archive:
+        records = [json.loads(line) for line in archive]
+    assert rows == 2
+    assert records == [
+        {"n": 1, "body": 'linha\ncom \\ "aspas" e ;'},
+        {"n": 2, "body": None},
+    ]
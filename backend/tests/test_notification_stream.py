@@ -0,0 +1,161 @@
+"""
+Real-time notification stream tests: hub fan-out, backpressure, the SSE
+generator, an idle-connection soak and event resolution against the database.
+
+Memory per connection against a running API is reported by
+benchmarks/bench_notification_stream.py.
+"""
+
+import asyncio
+import gc
+import tracemalloc
+import uuid
+
+from starlette import status
+
+from app.core.database import SessionLocal
+from app.models.user import User
+from app.services.notification_stream import (
+    NotificationHub,
+    _resolve_events,
+    stream_events,
+    unread_count_event,
+)
+from tests.conftest import _recorded_statements
+
+# ==================== HUB ====================
+
+
+async def test_publish_reaches_every_stream_of_the_user_only():
+    hub = NotificationHub()
+    alice, bob = uuid.uuid4(), uuid.uuid4()
+    tab1, tab2, other = hub.subscribe(alice), hub.subscribe(alice), hub.subscribe(bob)
+
+    hub.publish([(alice, unread_count_event(3))])
+
+    assert await tab1.next_event(0.01) == unread_count_event(3)
+    assert await tab2.next_event(0.01) == unread_count_event(3)
+    assert await other.next_event(0.01) is None
+
+    hub.unsubscribe(tab1)
+    hub.unsubscribe(tab2)
+    assert hub.connections == 1
+
+
+async def test_lagging_stream_keeps_only_newest_events():
+    hub = NotificationHub(max_pending=2)
+    user_id = uuid.uuid4()
+    subscription = hub.subscribe(user_id)
+    hub.publish((user_id, unread_count_event(n)) for n in range(5))
+
+    assert await subscription.next_event(0.01) == unread_count_event(3)
+    assert await subscription.next_event(0.01) == unread_count_event(4)
+
+
+async def test_stream_sends_initial_count_keepalives_and_unsubscribes():
+    hub = NotificationHub()
+    user_id = uuid.uuid4()
+    stream = stream_events(hub, hub.subscribe(user_id), initial_unread=7, heartbeat=0.01)
+
+    first = await anext(stream)
+    assert first.startswith("retry: ")
+    assert first.endswith(unread_count_event(7))
+    assert await anext(stream) == ": keep-alive\n\n"
+    hub.publish([(user_id, unread_count_event(8))])
+    assert await anext(stream) == unread_count_event(8)
+
+    await stream.aclose()
+    assert hub.connections == 0
+
+
+async def test_soak_idle_connections_memory():
+    """5k parked streams: memory per connection and delivery to one of them."""
+    connections = 5_000
+    hub = NotificationHub()
+    user_ids = [uuid.uuid4() for _ in range(connections)]
+    received: list[str] = []
+
+    async def consume(stream) -> None:
+        async for event in stream:
+            received.append(event)
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tasks = [
+        asyncio.create_task(
+            consume(stream_events(hub, hub.subscribe(u), initial_unread=0, heartbeat=3600))
+        )
+        for u in user_ids
+    ]
+    await asyncio.sleep(0.1)  # Every stream sent its first event and is parked
+    gc.collect()
+    per_connection = (tracemalloc.get_traced_memory()[0] - before) / connections
+    tracemalloc.stop()
+
+    assert hub.connections == connections
+    assert len(received) == connections
+    hub.publish([(user_ids[-1], unread_count_event(1))])
+    await asyncio.sleep(0.01)
+    assert received[-1] == unread_count_event(1)
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    assert hub.connections == 0
+
+    assert per_connection < 16 * 1024
+
+
+# ==================== DATABASE ====================
+
+
+def test_stream_requires_authentication(client):
+    res = client.get("/api/v1/me/notifications/stream")
+    assert res.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_delivery_resolves_to_notification_and_unread_events(admin_client):
+    res = admin_client.post(
+        "/api/v1/admin/notifications",
+        json={"type": "ADMIN", "channel": "IN_APP", "title": f"Ao vivo {uuid.uuid4().hex[:8]}",
+              "body": "Teste de stream"},
+    )
+    notification_id = res.json()["id"]
+    admin_client.post(
+        f"/api/v1/admin/notifications/{notification_id}/deliver", json={"all_students": True}
+    )
+    with SessionLocal() as db:
+        demo_id = db.query(User.id).filter(User.email == "demo@unifecaf.edu.br").scalar()
+        admin_id = db.query(User.id).filter(User.email == "admin@unifecaf.edu.br").scalar()
+
+    events = _resolve_events([{"notification_id": notification_id}], [demo_id, admin_id])
+
+    assert {user_id for user_id, _ in events} == {demo_id}
+    kinds = [event.split("\n", 1)[0] for _, event in events]
+    assert kinds == ["event: notification", "event: unread-count"]
+    assert notification_id in events[0][1]
+
+
+def test_burst_of_deliveries_resolves_in_constant_queries(admin_client):
+    notification_ids = []
+    for _ in range(3):
+        res = admin_client.post(
+            "/api/v1/admin/notifications",
+            json={"type": "ADMIN", "channel": "IN_APP", "title": f"Rajada {uuid.uuid4().hex[:8]}",
+                  "body": "Teste de stream"},
+        )
+        notification_ids.append(res.json()["id"])
+        admin_client.post(
+            f"/api/v1/admin/notifications/{notification_ids[-1]}/deliver",
+            json={"all_students": True},
+        )
+    with SessionLocal() as db:
+        demo_id = db.query(User.id).filter(User.email == "demo@unifecaf.edu.br").scalar()
+
+    with _recorded_statements() as statements:
+        events = _resolve_events([{"notification_id": n} for n in notification_ids], [demo_id])
+
+    kinds = [event.split("\n", 1)[0] for _, event in events]
+    assert kinds == ["event: notification"] * 3 + ["event: unread-count"]
+    assert len(statements) <= 4  # Notifications, recipients, live broadcasts, unread counts
@@ -0,0 +1,223 @@
+"""
+Outbound EMAIL/SMS tests: transports against local stand-ins, rate limiting,
+backoff and the outbox worker.
+"""
+
+import json
+import socketserver
+import threading
+import uuid
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from starlette import status
+
+from app.core.database import SessionLocal
+from app.models.notifications import NotificationChannel, OutboxMessage, OutboxStatus
+from app.services.outbox import (
+    HttpSmsTransport,
+    OutboxItem,
+    OutboxWorker,
+    RateLimiter,
+    SmtpTransport,
+    Transport,
+)
+from app.services.queue import backoff_delay
+
+# ==================== LOCAL STAND-INS ====================
+
+
+class _SmtpSinkHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP for smtplib.send_message; stores each DATA payload."""
+
+    def _reply(self, line: str) -> None:
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self) -> None:
+        self._reply("220 sink ready")
+        while line := self.rfile.readline():
+            command = line[:4].upper()
+            if command in (b"HELO", b"EHLO"):
+                self._reply("250 sink")
+            elif command == b"DATA":
+                self._reply("354 end with .")
+                data = []
+                while (chunk := self.rfile.readline()) not in (b".\r\n", b""):
+                    data.append(chunk)
+                self.server.messages.append(b"".join(data))
+                self._reply("250 queued")
+            elif command == b"QUIT":
+                self._reply("221 bye")
+                return
+            else:
+                self._reply("250 ok")
+
+
+class _SmsSinkHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like a real gateway
+
+    def do_POST(self) -> None:
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        code = 500 if payload["to"] == self.server.failing_number else 202
+        if code == 202:
+            self.server.messages.append(payload)
+        self.send_response(code)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture()
+def smtp_sink():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _SmtpSinkHandler)
+    server.daemon_threads = True
+    server.messages = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture()
+def sms_sink():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _SmsSinkHandler)
+    server.messages = []
+    server.failing_number = "+5500000000000"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _items(n: int, recipient: str = "aluno@example.com") -> list[OutboxItem]:
+    return [
+        OutboxItem(id=uuid.uuid4(), recipient=recipient, attempts=1, title=f"Aviso {i}", body="Corpo")
+        for i in range(n)
+    ]
+
+
+# ==================== TRANSPORTS ====================
+
+
+def test_smtp_transport_sends_batch_over_one_connection(smtp_sink):
+    transport = SmtpTransport("127.0.0.1", smtp_sink.server_address[1], sender="no-reply@test")
+    transport.open()
+    try:
+        for item in _items(200):
+            transport.send(item)
+    finally:
+        transport.close()
+
+    assert len(smtp_sink.messages) == 200
+    assert b"Subject: Aviso 0" in smtp_sink.messages[0]
+
+
+def test_sms_transport_posts_json_and_raises_on_gateway_error(sms_sink):
+    url = f"http://127.0.0.1:{sms_sink.server_address[1]}/send"
+    transport = HttpSmsTransport(url, token="t")
+    transport.open()
+    try:
+        for item in _items(100, recipient="+5511999990000"):
+            transport.send(item)
+        with pytest.raises(RuntimeError, match="500"):
+            transport.send(_items(1, recipient=sms_sink.failing_number)[0])
+    finally:
+        transport.close()
+
+    assert len(sms_sink.messages) == 100
+    assert sms_sink.messages[0] == {"to": "+5511999990000", "message": "Aviso 0: Corpo"}
+
+
+# ==================== RATE LIMIT / BACKOFF ====================
+
+
+def test_rate_limiter_paces_to_configured_rate():
+    clock = [0.0]
+    limiter = RateLimiter(
+        10.0, burst=2, clock=lambda: clock[0], sleep=lambda s: clock.__setitem__(0, clock[0] + s)
+    )
+    for _ in range(12):
+        limiter.acquire()
+    # 2 from the initial burst, then one every 100 ms
+    assert clock[0] == pytest.approx(1.0)
+
+
+def test_backoff_is_exponential_jittered_and_capped():
+    for attempts, full in [(1, 30), (2, 60), (3, 120), (10, 3600)]:
+        delay = backoff_delay(attempts, base_seconds=30, max_seconds=3600)
+        assert full / 2 <= delay <= full
+
+
+# ==================== WORKER (DATABASE) ====================
+
+
+class _FlakyTransport(Transport):
+    """Fails for recipients in `failing`, records the rest."""
+
+    def __init__(self, failing: set[str]) -> None:
+        self.failing = failing
+        self.sent: list[OutboxItem] = []
+
+    def send(self, item: OutboxItem) -> None:
+        if item.recipient in self.failing:
+            raise ConnectionError("mailbox unavailable")
+        self.sent.append(item)
+
+
+def _email_notification_delivered_to_all(admin_client) -> str:
+    res = admin_client.post(
+        "/api/v1/admin/notifications",
+        json={"type": "ADMIN", "channel": "EMAIL", "title": f"Email {uuid.uuid4().hex[:8]}",
+              "body": "Teste de envio"},
+    )
+    notification_id = res.json()["id"]
+    res = admin_client.post(
+        f"/api/v1/admin/notifications/{notification_id}/deliver", json={"all_students": True}
+    )
+    assert res.status_code == status.HTTP_200_OK
+    return notification_id
+
+
+def test_worker_sends_retries_and_dead_letters(admin_client):
+    notification_id = _email_notification_delivered_to_all(admin_client)
+    with SessionLocal() as db:
+        rows = db.query(OutboxMessage).filter(OutboxMessage.notification_id == notification_id).all()
+        assert rows, "EMAIL delivery should queue outbox messages"
+        failing = {rows[0].recipient}
+        # Only this notification's rows are due
+        db.query(OutboxMessage).filter(
+            OutboxMessage.notification_id != notification_id,
+            OutboxMessage.status == OutboxStatus.PENDING,
+        ).update({"next_attempt_at": OutboxMessage.next_attempt_at + timedelta(days=3650)})
+        db.commit()
+
+    transport = _FlakyTransport(failing)
+    worker = OutboxWorker(
+        NotificationChannel.EMAIL,
+        transport,
+        rate_per_second=0,
+        batch_size=len(rows),
+        max_attempts=2,
+        backoff_base_seconds=0,
+        backoff_max_seconds=0,
+    )
+    first = worker.drain_once()
+    assert first.sent == len(rows) - 1
+    assert first.retried == 1
+    second = worker.drain_once()
+    assert (second.claimed, second.dead) == (1, 1)
+
+    with SessionLocal() as db:
+        dead = db.query(OutboxMessage).filter(
+            OutboxMessage.notification_id == notification_id,
+            OutboxMessage.status == OutboxStatus.DEAD,
+        ).one()
+        assert dead.attempts == 2
+        assert "mailbox unavailable" in dead.last_error
+
+    stats = admin_client.get("/api/v1/admin/outbox/stats").json()
+    assert stats["by_channel"]["EMAIL"]["DEAD"] >= 1
+
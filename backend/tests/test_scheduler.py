@@ -0,0 +1,123 @@
+"""
+Scheduled notification tests: recurrence rules and the timer queue.
+"""
+
+from datetime import UTC, date, datetime, timedelta
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import select
+from starlette import status
+
+from app.core.database import SessionLocal
+from app.models.finance import Invoice, InvoiceStatus
+from app.models.notifications import InvoiceReminder, NotificationChannel, OutboxMessage
+from app.models.user import User
+from app.services.scheduler import (
+    next_occurrence,
+    parse_recurrence,
+    run_due_jobs,
+    send_invoice_due_reminders,
+)
+from tests.conftest import _recorded_statements
+
+START = datetime(2026, 1, 31, 9, 0, tzinfo=UTC)
+
+
+def _occurrences(rule: str, limit: int = 6) -> list[str]:
+    out, after = [], START
+    while len(out) < limit and (after := next_occurrence(rule, START, after)) is not None:
+        out.append(after.date().isoformat())
+    return out
+
+
+def test_monthly_recurrence_clamps_to_month_end_without_drifting():
+    assert _occurrences("FREQ=MONTHLY", 3) == ["2026-02-28", "2026-03-31", "2026-04-30"]
+
+
+def test_count_and_until_end_the_series():
+    # COUNT includes the first run at START
+    assert _occurrences("FREQ=DAILY;INTERVAL=2;COUNT=3") == ["2026-02-02", "2026-02-04"]
+    assert _occurrences("FREQ=WEEKLY;UNTIL=20260214") == ["2026-02-07", "2026-02-14"]
+
+
+def test_missed_occurrences_are_skipped_not_replayed():
+    late = START + timedelta(days=10, hours=1)
+    assert next_occurrence("FREQ=DAILY", START, late) == START + timedelta(days=11)
+
+
+@pytest.mark.parametrize("rule", ["FREQ=HOURLY", "FREQ=DAILY;BYDAY=MO", "DAILY", "FREQ=DAILY;INTERVAL=0"])
+def test_unsupported_rules_are_rejected(rule):
+    with pytest.raises(ValueError):
+        parse_recurrence(rule)
+
+
+def test_scheduled_notification_is_delivered_when_due(admin_client):
+    res = admin_client.post(
+        "/api/v1/admin/notifications",
+        json={"title": f"Agendada {uuid4().hex[:8]}", "body": "Teste de agendamento"},
+    )
+    notification_id = res.json()["id"]
+
+    res = admin_client.post(
+        f"/api/v1/admin/notifications/{notification_id}/schedule",
+        json={"send_at": (datetime.now(UTC) - timedelta(seconds=1)).isoformat()},
+    )
+    assert res.status_code == status.HTTP_201_CREATED
+    job_id = res.json()["id"]
+
+    run_due_jobs()
+
+    jobs = admin_client.get("/api/v1/admin/scheduled-jobs", params={"limit": 100}).json()["items"]
+    job = next(j for j in jobs if j["id"] == job_id)
+    assert job["status"] == "DONE"
+    assert job["runs_count"] == 1
+    detail = admin_client.get(f"/api/v1/admin/notifications/{notification_id}").json()
+    assert detail["delivered_count"] > 0
+
+
+def test_invalid_recurrence_is_a_validation_error(admin_client):
+    res = admin_client.post(
+        "/api/v1/admin/scheduled-jobs/invoice-reminders", json={"recurrence": "FREQ=YEARLY"}
+    )
+    assert res.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    assert res.json()["error"]["code"] == "VALIDATION_ERROR"
+
+
+def test_invoice_reminders_queue_and_announce_exactly_their_deliveries(client):
+    with SessionLocal() as db:
+        demo_id = db.scalar(select(User.id).where(User.email == "demo@unifecaf.edu.br"))
+        invoice = Invoice(
+            reference=f"T{uuid4().hex[:12].upper()}",
+            student_id=demo_id,
+            description="Lembrete de teste",
+            due_date=date.today() + timedelta(days=2),
+            amount=Decimal("100.00"),
+            status=InvoiceStatus.PENDING,
+        )
+        db.add(invoice)
+        db.flush()
+
+        with _recorded_statements() as statements:
+            sent = send_invoice_due_reminders(
+                db,
+                days_before=2,
+                title_template="Fatura {reference}",
+                body_template="Vence em {days} dias",
+                channel=NotificationChannel.EMAIL,
+            )
+        reminder = db.get(InvoiceReminder, (invoice.id, 2))
+        queued = db.scalars(
+            select(OutboxMessage.user_id).where(
+                OutboxMessage.notification_id == reminder.notification_id
+            )
+        ).all()
+        db.rollback()  # Nothing is sent: the NOTIFYs go away with the transaction
+
+    assert sent >= 1
+    assert queued == [demo_id]
+    # Announced by the statement that inserts the deliveries
+    notifies = [s for s in statements if "pg_notify" in s]
+    assert len(notifies) == 1
+    assert "comm.user_notifications" in notifies[0]
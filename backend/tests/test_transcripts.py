@@ -0,0 +1,129 @@
+"""
+Transcripts: the grade-version cache key, the in-process JSON cache, ETag
+revalidation on /me/transcript and reuse of a current transcript PDF.
+"""
+
+import uuid
+from datetime import UTC, datetime
+from decimal import Decimal
+
+from starlette import status
+
+from app.core.database import SessionLocal
+from app.models.academics import FinalGrade, Student
+from app.models.documents import DocumentType, StudentDocument
+from app.models.user import User
+from app.services.documents import DocumentWorker
+from app.services.storage import LocalDocumentStorage
+from app.services.transcripts import TranscriptCache, TranscriptKey
+
+# ==================== CACHE ====================
+
+
+def _key(version: int = 1, student_id: uuid.UUID | None = None) -> TranscriptKey:
+    updated = datetime(2026, 10, 19, 12, 0, tzinfo=UTC)
+    return TranscriptKey(student_id or uuid.uuid4(), version, updated)
+
+
+def test_transcript_key_etag_follows_the_grade_version():
+    student_id = uuid.uuid4()
+    first, second = _key(1, student_id), _key(2, student_id)
+
+    assert first.etag == _key(1, student_id).etag
+    assert first.etag != second.etag
+    assert first.etag.startswith('"') and first.etag.endswith('"')
+
+
+def test_transcript_cache_evicts_least_recently_used():
+    cache = TranscriptCache(max_entries=2)
+    a, b, c = _key(), _key(), _key()
+    cache.put(a, b"a")
+    cache.put(b, b"b")
+    assert cache.get(a) == b"a"  # a is now the most recent
+
+    cache.put(c, b"c")
+    assert len(cache) == 2
+    assert cache.get(b) is None
+    assert cache.get(a) == b"a"
+    assert cache.get(c) == b"c"
+
+
+def test_transcript_cache_can_be_disabled():
+    cache = TranscriptCache(max_entries=0)
+    cache.put(_key(), b"body")
+    assert len(cache) == 0
+
+
+# ==================== ENDPOINTS ====================
+
+
+def _demo_grade(db) -> FinalGrade:
+    return (
+        db.query(FinalGrade)
+        .join(Student, Student.user_id == FinalGrade.student_id)
+        .join(User, User.id == Student.user_id)
+        .filter(User.email == "demo@unifecaf.edu.br")
+        .order_by(FinalGrade.id)
+        .first()
+    )
+
+
+def test_transcript_revalidates_with_etag(authenticated_client):
+    res = authenticated_client.get("/api/v1/me/transcript")
+    assert res.status_code == status.HTTP_200_OK
+    etag = res.headers["etag"]
+
+    again = authenticated_client.get("/api/v1/me/transcript")
+    assert again.headers["etag"] == etag
+    assert again.json() == res.json()
+
+    cached = authenticated_client.get("/api/v1/me/transcript", headers={"If-None-Match": etag})
+    assert cached.status_code == status.HTTP_304_NOT_MODIFIED
+    assert cached.headers["etag"] == etag
+    assert not cached.content
+
+
+def test_grade_change_invalidates_the_transcript(authenticated_client):
+    before = authenticated_client.get("/api/v1/me/transcript")
+
+    with SessionLocal() as db:
+        grade = _demo_grade(db)
+        original = grade.final_score
+        grade.final_score = Decimal("9.5") if original != Decimal("9.5") else Decimal("8.5")
+        db.commit()
+    try:
+        after = authenticated_client.get(
+            "/api/v1/me/transcript", headers={"If-None-Match": before.headers["etag"]}
+        )
+        assert after.status_code == status.HTTP_200_OK
+        assert after.headers["etag"] != before.headers["etag"]
+    finally:
+        with SessionLocal() as db:
+            _demo_grade(db).final_score = original
+            db.commit()
+
+
+def test_current_transcript_pdf_is_not_generated_again(authenticated_client, tmp_path):
+    with SessionLocal() as db:
+        # Seeded documents carry no grade version
+        doc = (
+            db.query(StudentDocument)
+            .join(User, User.id == StudentDocument.student_id)
+            .filter(
+                User.email == "demo@unifecaf.edu.br",
+                StudentDocument.doc_type == DocumentType.TRANSCRIPT,
+            )
+            .one()
+        )
+        doc.grade_version = None
+        db.commit()
+
+    queued = authenticated_client.post("/api/v1/me/documents/TRANSCRIPT/request")
+    assert queued.status_code == status.HTTP_202_ACCEPTED
+    worker = DocumentWorker(LocalDocumentStorage(tmp_path), batch_size=50)
+    while worker.process_once().claimed:
+        pass
+
+    reused = authenticated_client.post("/api/v1/me/documents/TRANSCRIPT/request")
+    assert reused.status_code == status.HTTP_200_OK
+    assert reused.json()["status"] == "AVAILABLE"
@@ -67,8 +67,11 @@ async function proxy(request: NextRequest, pathParts: string[]) {
   });
 
   const resHeaders = filterResponseHeaders(backendResponse.headers);
+  // Streamed through (document downloads); 204/304 must not carry a body
   const responseBody =
-    backendResponse.status === 204 ? null : await backendResponse.arrayBuffer();
+    backendResponse.status === 204 || backendResponse.status === 304
+      ? null
+      : backendResponse.body;
   const nextRes = new NextResponse(responseBody, {
     status: backendResponse.status,
     headers: resHeaders,